@@ -0,0 +1,454 @@
+"""
+Interação Assíncrona com Google AI Studio
+- Versão asyncio do fluxo AIStudioLogin2FA → AIStudioInteraction
+- Verificação de login, criação de chat, envio e espera da resposta
+- Mesmos seletores, corrida de seletores e observador de resposta da versão síncrona
+- Um único event loop controla dezenas de páginas sem uma thread por navegador
+"""
+
+import sys
+import time
+import asyncio
+from datetime import datetime
+from typing import List, Optional, Sequence
+
+from selector_engine import RACE_SELECTORS_JS, split_matches
+from selector_cache import SelectorCache
+from response_detector import INSTALL_WATCH_JS, WATCH_STATE, EVENT_BINDING
+from fast_input import READ_FIELD_JS, CLEAR_FIELD_JS, _normalize
+from browser_pool import DEFAULT_LAUNCH_OPTIONS, DEFAULT_CONTEXT_OPTIONS, STEALTH_INIT_SCRIPT
+from route_policy import attach_route_policy_async
+from profile_manager import get_profile_manager
+from ai_studio_selectors import (
+    LOGGED_IN_SELECTORS,
+    LOGIN_NEEDED_SELECTORS,
+    MESSAGE_INPUT_SELECTORS,
+    SEND_BUTTON_SELECTORS,
+    RESPONSE_SELECTORS,
+    TYPING_SELECTORS
+)
+
+try:
+    from playwright.async_api import async_playwright, TimeoutError as PlaywrightTimeoutError
+    PLAYWRIGHT_AVAILABLE = True
+except ImportError:
+    PlaywrightTimeoutError = TimeoutError
+    PLAYWRIGHT_AVAILABLE = False
+
+AI_STUDIO_URL = "https://aistudio.google.com/"
+NEW_CHAT_URL = "https://aistudio.google.com/app/prompts/new_chat"
+
+async def race_selectors_async(page, selectors: Sequence[str], timeout: int = 5000,
+                               polling: int = 100) -> Optional[str]:
+    """
+    Versão assíncrona de selector_engine.race_selectors
+    
+    Args:
+        page: Página do Playwright (async_api)
+        selectors (Sequence[str]): Seletores em ordem de prioridade
+        timeout (int): Prazo global em milissegundos
+        polling (int): Intervalo entre verificações em milissegundos
+    
+    Returns:
+        Optional[str]: Primeiro seletor visível, ou None se o prazo expirar
+    """
+    selectors = list(selectors)
+    if not selectors:
+        return None
+    
+    if timeout <= 0:
+        result = await page.evaluate(RACE_SELECTORS_JS, selectors)
+        return selectors[result['index']] if result else None
+    
+    try:
+        handle = await page.wait_for_function(
+            RACE_SELECTORS_JS, arg=selectors, timeout=timeout, polling=polling
+        )
+    except PlaywrightTimeoutError:
+        return None
+    
+    result = await handle.json_value()
+    return selectors[result['index']] if result else None
+
+async def verify_field_async(page, selector: str, text: str) -> bool:
+    """Versão assíncrona de fast_input.verify_field"""
+    try:
+        value = await page.locator(selector).first.evaluate(READ_FIELD_JS)
+        return _normalize(value) == _normalize(text)
+    except Exception:
+        return False
+
+async def fill_fast_async(page, selector: str, text: str) -> bool:
+    """
+    Versão assíncrona de fast_input.fill_fast
+    
+    fill() primeiro; se o conteúdo não conferir, limpa o campo e usa
+    keyboard.insert_text().
+    
+    Args:
+        page: Página do Playwright (async_api)
+        selector (str): Seletor do campo
+        text (str): Texto a inserir
+    
+    Returns:
+        bool: True se o conteúdo final confere com o texto
+    """
+    field = page.locator(selector).first
+    
+    try:
+        await field.fill(text)
+        if await verify_field_async(page, selector, text):
+            return True
+    except Exception as e:
+        print(f"⚠️ fill() falhou, usando insertText: {e}")
+    
+    try:
+        await field.evaluate(CLEAR_FIELD_JS)
+        await field.focus()
+        await page.keyboard.insert_text(text)
+    except Exception as e:
+        print(f"❌ Erro ao inserir texto: {e}")
+        return False
+    
+    return await verify_field_async(page, selector, text)
+
+class AsyncResponseDetector:
+    """
+    Versão assíncrona do ResponseCompletionDetector
+    
+    Usa o mesmo observador instalado na página. Os eventos ficam registrados
+    no estado da página e são lidos ao final, sem expor funções ao Python.
+    """
+    
+    def __init__(self, page, stable_ms: int = 1500):
+        self.page = page
+        self.stable_ms = stable_ms
+        self.events: List[dict] = []
+        self.armed = False
+    
+    async def arm(self, include_existing: bool = False):
+        """Instala o observador na página (chamar antes do envio)"""
+        self.events = []
+        await self.page.evaluate(INSTALL_WATCH_JS, {
+            'responseSelectors': RESPONSE_SELECTORS,
+            'typingSelectors': TYPING_SELECTORS,
+            'stableMs': self.stable_ms,
+            'includeExisting': include_existing,
+            'binding': EVENT_BINDING
+        })
+        self.armed = True
+    
+    async def state(self) -> Optional[dict]:
+        """Lê o estado atual do observador sem esperar"""
+        return await self.page.evaluate(f"""
+            () => {{
+                const watch = {WATCH_STATE};
+                if (!watch) return null;
+                return {{
+                    text: watch.text,
+                    done: watch.done,
+                    typing: watch.typing,
+                    first_token_ms: watch.firstTokenAt === null ? null :
+                        Math.round(watch.firstTokenAt - watch.startedAt),
+                    events: watch.events
+                }};
+            }}
+        """)
+    
+    async def wait(self, timeout: float = 60) -> Optional[str]:
+        """
+        Aguarda a resposta ficar estável
+        
+        Polling por intervalo e não por requestAnimationFrame: com várias abas
+        abertas, as que estão em segundo plano não recebem frames.
+        
+        Args:
+            timeout (float): Prazo em segundos
+        
+        Returns:
+            Optional[str]: Texto da resposta, ou None se o prazo expirar
+        """
+        if not self.armed:
+            await self.arm(include_existing=True)
+        
+        try:
+            await self.page.wait_for_function(
+                f"() => {WATCH_STATE} && {WATCH_STATE}.done",
+                timeout=max(timeout, 0.001) * 1000,
+                polling=100
+            )
+        except PlaywrightTimeoutError:
+            return None
+        
+        self.armed = False
+        state = await self.state()
+        if not state:
+            return None
+        self.events = state['events']
+        return state['text']
+    
+    @property
+    def first_token_ms(self) -> Optional[int]:
+        """Tempo até o primeiro token, em milissegundos"""
+        for event in self.events:
+            if event['type'] == 'first_token':
+                return event['elapsed_ms']
+        return None
+
+class AsyncAIStudioSession:
+    """Navegador com perfil persistente que fornece páginas para as interações"""
+    
+    def __init__(self, headless: bool = True, user_data_dir: str = "/workspaces/replit/browser_profile"):
+        """
+        Inicializa a sessão
+        
+        Args:
+            headless (bool): Executar sem interface gráfica
+            user_data_dir (str): Perfil persistente com a sessão logada
+        """
+        self.headless = headless
+        self.user_data_dir = user_data_dir
+        self.profile_lease = None
+        self.playwright = None
+        self.context = None
+    
+    async def start(self):
+        """Inicia o Playwright e o contexto persistente"""
+        if not PLAYWRIGHT_AVAILABLE:
+            raise Exception("❌ Playwright não está instalado. "
+                            "Instale com 'pip install playwright' e 'playwright install'")
+        
+        self.profile_lease = get_profile_manager().lease_profile(self.user_data_dir)
+        self.playwright = await async_playwright().start()
+        self.context = await self.playwright.chromium.launch_persistent_context(
+            self.profile_lease.path,
+            headless=self.headless,
+            **DEFAULT_LAUNCH_OPTIONS,
+            **DEFAULT_CONTEXT_OPTIONS
+        )
+        await self.context.add_init_script(STEALTH_INIT_SCRIPT)
+        await attach_route_policy_async(self.context, self.headless)
+        print("✅ Navegador assíncrono inicializado com perfil persistente")
+        return self
+    
+    async def new_page(self):
+        """Abre uma nova aba no contexto logado"""
+        page = await self.context.new_page()
+        page.set_default_timeout(30000)
+        return page
+    
+    async def close(self):
+        """Fecha o contexto e o Playwright"""
+        try:
+            if self.context:
+                await self.context.close()
+            if self.playwright:
+                await self.playwright.stop()
+        except Exception:
+            pass
+        
+        if self.profile_lease:
+            self.profile_lease.release()
+            self.profile_lease = None
+    
+    async def __aenter__(self):
+        return await self.start()
+    
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
+
+class AsyncAIStudioInteraction:
+    """Fluxo de interação com o AI Studio em uma página async"""
+    
+    def __init__(self, page, selector_cache: Optional[SelectorCache] = None):
+        """
+        Inicializa a interação
+        
+        Args:
+            page: Página do Playwright (async_api)
+            selector_cache (SelectorCache): Cache de seletores compartilhado
+        """
+        self.page = page
+        self.selector_cache = selector_cache or SelectorCache()
+        self.detector = AsyncResponseDetector(page)
+        self.current_chat_url = None
+        self.conversation_history = []
+    
+    async def find_cached(self, kind: str, selectors: Sequence[str], timeout: int = 5000) -> Optional[str]:
+        """Corrida de seletores ordenada pelo cache, igual à versão síncrona"""
+        ordered = self.selector_cache.order(kind, self.page.url, selectors)
+        winner = await race_selectors_async(self.page, ordered, timeout=timeout)
+        self.selector_cache.record_result(kind, self.page.url, ordered, winner)
+        return winner
+    
+    async def check_if_logged_in(self) -> bool:
+        """Verifica se a sessão está logada no AI Studio"""
+        try:
+            await self.page.goto(AI_STUDIO_URL, wait_until='domcontentloaded', timeout=30000)
+            
+            if "accounts.google.com" in self.page.url:
+                print("⚠️ Redirecionado para login - não está logado")
+                return False
+            
+            selector = await race_selectors_async(
+                self.page, LOGGED_IN_SELECTORS + LOGIN_NEEDED_SELECTORS, timeout=10000
+            )
+            group = split_matches(selector, LOGGED_IN_SELECTORS, LOGIN_NEEDED_SELECTORS)
+            
+            if group == 0:
+                print(f"✅ Indicador de login encontrado: {selector}")
+                return True
+            
+            if group == 1:
+                print(f"⚠️ Indicador de login necessário: {selector}")
+                return False
+            
+            # Se não encontrou indicadores claros, fazer análise mais profunda
+            page_text = await self.page.evaluate("() => document.body.textContent")
+            
+            if any(term in page_text.lower() for term in ["sign in", "get started", "login"]):
+                print("⚠️ Texto indica que login é necessário")
+                return False
+            
+            print("✅ Assumindo que está logado (nenhum indicador de login encontrado)")
+            return True
+        
+        except Exception as e:
+            print(f"❌ Erro ao verificar login: {e}")
+            return False
+    
+    async def create_new_chat(self) -> bool:
+        """Abre um chat novo pela URL direta"""
+        try:
+            await self.page.goto(NEW_CHAT_URL, wait_until='domcontentloaded', timeout=30000)
+            
+            if "accounts.google.com" in self.page.url:
+                print("❌ Sessão expirada ao abrir chat")
+                return False
+            
+            if not await self.find_cached("message_input", MESSAGE_INPUT_SELECTORS, timeout=15000):
+                print("❌ Campo de mensagem não encontrado")
+                return False
+            
+            self.current_chat_url = self.page.url
+            return True
+        
+        except Exception as e:
+            print(f"❌ Erro ao criar chat: {e}")
+            return False
+    
+    async def send_message(self, message: str) -> bool:
+        """Preenche e envia a mensagem, armando o detector antes do envio"""
+        try:
+            input_field = await self.find_cached("message_input", MESSAGE_INPUT_SELECTORS, timeout=5000)
+            if not input_field:
+                print("❌ Campo de mensagem não encontrado")
+                return False
+            
+            # Sem conferir o campo, o Enter pode sair com o prompt vazio ou cortado
+            if not await fill_fast_async(self.page, input_field, message):
+                print("❌ Conteúdo do campo não confere após inserir texto")
+                return False
+            
+            await self.detector.arm()
+            
+            send_button = await self.find_cached("send_button", SEND_BUTTON_SELECTORS, timeout=1000)
+            if send_button:
+                await self.page.click(send_button)
+            else:
+                await self.page.press(input_field, "Enter")
+            
+            self.conversation_history.append({
+                'type': 'user_message',
+                'content': message,
+                'timestamp': datetime.now().isoformat()
+            })
+            return True
+        
+        except Exception as e:
+            print(f"❌ Erro ao enviar mensagem: {e}")
+            return False
+    
+    async def wait_for_ai_response(self, timeout: float = 60) -> Optional[str]:
+        """Aguarda a resposta do modelo ficar estável"""
+        response = await self.detector.wait(timeout)
+        if response:
+            self.conversation_history.append({
+                'type': 'ai_response',
+                'content': response,
+                'timestamp': datetime.now().isoformat()
+            })
+        return response
+    
+    async def complete_interaction(self, message: str, timeout: float = 60) -> dict:
+        """
+        Executa o fluxo completo: chat novo, envio e resposta
+        
+        Returns:
+            dict: message, response, success, first_token_ms e total_ms
+        """
+        started = time.time()
+        response = None
+        
+        if await self.create_new_chat() and await self.send_message(message):
+            response = await self.wait_for_ai_response(timeout)
+        
+        return {
+            'message': message,
+            'response': response,
+            'success': bool(response),
+            'first_token_ms': self.detector.first_token_ms,
+            'total_ms': round((time.time() - started) * 1000)
+        }
+
+async def run_many(messages: Sequence[str], concurrency: int = 10, headless: bool = True,
+                   timeout: float = 60) -> List[dict]:
+    """
+    Envia várias mensagens em paralelo, uma aba por mensagem em andamento
+    
+    Args:
+        messages (Sequence[str]): Mensagens a enviar
+        concurrency (int): Máximo de abas simultâneas
+        headless (bool): Executar sem interface gráfica
+        timeout (float): Prazo por resposta em segundos
+    
+    Returns:
+        List[dict]: Resultados na mesma ordem das mensagens
+    """
+    limit = asyncio.Semaphore(concurrency)
+    selector_cache = SelectorCache()
+    
+    async with AsyncAIStudioSession(headless=headless) as session:
+        check_page = await session.new_page()
+        logged_in = await AsyncAIStudioInteraction(check_page, selector_cache).check_if_logged_in()
+        await check_page.close()
+        if not logged_in:
+            raise Exception("Perfil não está logado. Execute o login antes.")
+        
+        async def run_one(message):
+            async with limit:
+                page = await session.new_page()
+                try:
+                    interaction = AsyncAIStudioInteraction(page, selector_cache)
+                    return await interaction.complete_interaction(message, timeout)
+                finally:
+                    await page.close()
+        
+        return await asyncio.gather(*(run_one(message) for message in messages))
+
+async def main():
+    """Envia as mensagens passadas na linha de comando"""
+    messages = sys.argv[1:] or ["Olá! Como você está?"]
+    
+    print("🤖 INTERAÇÃO ASSÍNCRONA - AI STUDIO")
+    print("=" * 40)
+    
+    results = await run_many(messages)
+    for result in results:
+        status = "✅" if result['success'] else "❌"
+        print(f"{status} {result['message'][:40]} ({result['total_ms']}ms)")
+        if result['response']:
+            print(f"   🤖 {result['response'][:200]}")
+
+if __name__ == "__main__":
+    asyncio.run(main())
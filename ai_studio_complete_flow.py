@@ -14,6 +14,8 @@ sys.path.append('/workspaces/replit')
 
 from ai_studio_login_2fa import AIStudioLogin2FA
 from credentials_manager import CredentialsManager
+from waits import wait_until, wait_for_page_ready, wait_for_url, wait_for_url_change
+from navigation import goto_app
 
 class AIStudioDisconnectedAccount(AIStudioLogin2FA):
     
@@ -124,7 +126,7 @@ class AIStudioDisconnectedAccount(AIStudioLogin2FA):
                                             print(f"   ✅ JavaScript click realizado")
                                     
                                     # Aguardar resposta
-                                    time.sleep(3)
+                                    wait_for_page_ready(self.page, 'account_select')
                                     
                                     # Verificar se URL mudou
                                     current_url = self.page.url
@@ -223,8 +225,8 @@ class AIStudioDisconnectedAccount(AIStudioLogin2FA):
                 print("❌ Não foi possível inserir senha")
                 return False
             
-            # Aguardar processamento
-            time.sleep(5)
+            # Aguardar processamento (campo de senha sai da tela)
+            wait_until(lambda: not self.page.is_visible('input[type="password"]'), 'password_step', page=self.page)
             
             # Verificar resultado
             current_url = self.page.url
@@ -251,8 +253,7 @@ class AIStudioDisconnectedAccount(AIStudioLogin2FA):
             target_url = "https://aistudio.google.com/u/3/prompts/new_chat"
             print(f"🔗 Acessando: {target_url}")
             
-            self.page.goto(target_url, timeout=30000)
-            time.sleep(3)
+            goto_app(self.page, target_url, timeout=30000)
             
             current_url = self.page.url
             print(f"📍 URL inicial: {current_url}")
@@ -269,7 +270,7 @@ class AIStudioDisconnectedAccount(AIStudioLogin2FA):
                     return False
                 
                 # Aguardar nova página carregar
-                time.sleep(5)
+                wait_for_url_change(self.page, current_url, 'account_select')
                 current_url = self.page.url
                 print(f"📍 URL após clicar na conta: {current_url}")
             
@@ -282,7 +283,7 @@ class AIStudioDisconnectedAccount(AIStudioLogin2FA):
                     return False
                 
                 # Aguardar após senha
-                time.sleep(5)
+                wait_for_url_change(self.page, current_url, 'password_step')
                 current_url = self.page.url
                 print(f"📍 URL após senha: {current_url}")
             
@@ -296,15 +297,9 @@ class AIStudioDisconnectedAccount(AIStudioLogin2FA):
                 self.take_screenshot("2fa_required")
                 
                 # Aguardar 2FA (até 60 segundos)
-                for i in range(12):  # 12 * 5 = 60 segundos
-                    time.sleep(5)
-                    current_url = self.page.url
-                    
-                    if "aistudio.google.com" in current_url:
-                        print("✅ 2FA aprovado! Acesso ao AI Studio")
-                        break
-                    
-                    print(f"⏳ Aguardando 2FA... ({(i+1)*5}s)")
+                print("⏳ Aguardando 2FA...")
+                if wait_for_url(self.page, lambda url: "aistudio.google.com" in url, 'twofa_manual', timeout=60):
+                    print("✅ 2FA aprovado! Acesso ao AI Studio")
                 
                 self.take_screenshot("after_2fa_check")
             
@@ -317,7 +312,7 @@ class AIStudioDisconnectedAccount(AIStudioLogin2FA):
                 self.take_screenshot("final_success")
                 
                 # Aguardar página carregar completamente
-                time.sleep(5)
+                wait_for_page_ready(self.page)
                 
                 print("💬 Sistema pronto para interagir com AI Studio")
                 return True
@@ -1,108 +1,83 @@
 #!/usr/bin/env python3
 """
 🚀 AI Studio - Sistema Híbrido Final
-Simula navegador real com curl e sessões
+Simula navegador real com requisições HTTP e sessões
+(motor em processo: conexões reaproveitadas, cookies em memória e a matriz de
+URLs disparada em paralelo)
 """
 
-import subprocess
 import json
 import time
 import os
 from pathlib import Path
 from credentials_manager import CredentialsManager
+from http_probe import HTTPProbe, DEFAULT_HEADERS
+
+# URLs testadas em test_direct_access
+DIRECT_URLS = [
+    ("AI Studio Welcome", "https://aistudio.google.com/"),
+    ("AI Studio Chat", "https://aistudio.google.com/prompts/new_chat"),
+    ("Gemini", "https://gemini.google.com/"),
+    ("API Gemini", "https://generativelanguage.googleapis.com/v1/models?key=demo"),
+]
+
+# APIs testadas em check_api_access
+API_URLS = [
+    ("Gemini API v1", "https://generativelanguage.googleapis.com/v1/models"),
+    ("AI Studio API", "https://aistudio.google.com/api/models"),
+    ("Makersuite API", "https://makersuite.google.com/api/models"),
+]
+
+# User-Agents testados em test_alternative_access
+ALTERNATIVE_USER_AGENTS = [
+    "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36",
+    "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36",
+    "Mozilla/5.0 (Android 11; Mobile; rv:68.0) Gecko/68.0 Firefox/68.0"
+]
 
 class AIStudioCURL:
     def __init__(self):
         self.credentials = CredentialsManager()
-        self.session_file = Path("curl_session.txt")
         self.results_file = Path("curl_results.json")
+        self.http = None
         
     def setup_session(self):
-        """Configura sessão curl com cookies"""
-        print("🔧 Configurando sessão CURL...")
+        """Configura a sessão HTTP (pool de conexões e cookies em memória)"""
+        print("🔧 Configurando sessão HTTP...")
         
-        # Limpar sessão anterior
-        if self.session_file.exists():
-            self.session_file.unlink()
-            
         # Headers para simular Chrome
-        self.headers = [
-            "-H", "User-Agent: Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
-            "-H", "Accept: text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8",
-            "-H", "Accept-Language: en-US,en;q=0.5",
-            "-H", "Accept-Encoding: gzip, deflate, br",
-            "-H", "DNT: 1",
-            "-H", "Connection: keep-alive",
-            "-H", "Upgrade-Insecure-Requests: 1",
-            "-H", "Sec-Fetch-Dest: document",
-            "-H", "Sec-Fetch-Mode: navigate",
-            "-H", "Sec-Fetch-Site: none"
-        ]
+        headers = dict(DEFAULT_HEADERS, **{
+            'Sec-Fetch-Dest': 'document',
+            'Sec-Fetch-Mode': 'navigate',
+            'Sec-Fetch-Site': 'none'
+        })
+        self.http = HTTPProbe(max_workers=8, timeout=30, headers=headers)
         
         return True
-        
-    def curl_get(self, url, save_cookies=True, follow_redirects=True):
-        """Executa GET com curl"""
-        cmd = ["curl", "-s", "-L" if follow_redirects else "", "--compressed"]
-        
-        # Adicionar headers
-        cmd.extend(self.headers)
-        
-        # Gerenciar cookies
-        if save_cookies:
-            cmd.extend(["-c", str(self.session_file)])
-        if self.session_file.exists():
-            cmd.extend(["-b", str(self.session_file)])
-            
-        # URL
-        cmd.append(url)
-        
-        # Remover strings vazias
-        cmd = [x for x in cmd if x]
-        
-        try:
-            result = subprocess.run(cmd, capture_output=True, timeout=30)
-            # Decodificar bytes para string
-            if result.returncode == 0:
-                try:
-                    content = result.stdout.decode('utf-8', errors='ignore')
-                    return content, True
-                except:
-                    # Fallback para latin-1 se UTF-8 falhar
-                    content = result.stdout.decode('latin-1', errors='ignore')
-                    return content, True
-            else:
-                return "", False
-        except subprocess.TimeoutExpired:
-            return "", False
+    
+    def url_matrix(self):
+        """Todas as requisições da análise, para dispará-las de uma vez"""
+        specs = [url for _, url in DIRECT_URLS]
+        specs.append("https://gemini.google.com/")
+        specs.extend(url for _, url in API_URLS)
+        specs.extend({'url': "https://aistudio.google.com/", 'headers': {'User-Agent': ua}}
+                     for ua in ALTERNATIVE_USER_AGENTS)
+        return specs
+    
+    def curl_get(self, url, save_cookies=True, follow_redirects=True, headers=None):
+        """
+        Executa GET (mesma interface da versão com curl)
+        
+        save_cookies é mantido por compatibilidade: os cookies ficam sempre no
+        jar em memória da sessão.
+        """
+        result = self.http.get(url, headers=headers, allow_redirects=follow_redirects)
+        return result.text, result.ok
             
     def curl_post(self, url, data=None, form_data=None):
-        """Executa POST com curl"""
-        cmd = ["curl", "-s", "-L"]
-        
-        # Adicionar headers
-        cmd.extend(self.headers)
-        
-        # Cookies
-        if self.session_file.exists():
-            cmd.extend(["-b", str(self.session_file)])
-        cmd.extend(["-c", str(self.session_file)])
-        
-        # Dados
-        if form_data:
-            for key, value in form_data.items():
-                cmd.extend(["-d", f"{key}={value}"])
-        elif data:
-            cmd.extend(["-d", data])
-            
-        # URL
-        cmd.append(url)
-        
-        try:
-            result = subprocess.run(cmd, capture_output=True, text=True, timeout=30)
-            return result.stdout, result.returncode == 0
-        except subprocess.TimeoutExpired:
-            return "", False
+        """Executa POST (mesma interface da versão com curl)"""
+        result = self.http.post(url, data=form_data or data)
+        return result.text, result.ok
             
     def test_direct_access(self):
         """Testa acesso direto aos serviços"""
@@ -111,19 +86,14 @@ class AIStudioCURL:
         
         results = {}
         
-        # URLs para testar
-        test_urls = [
-            ("AI Studio Welcome", "https://aistudio.google.com/"),
-            ("AI Studio Chat", "https://aistudio.google.com/prompts/new_chat"),
-            ("Gemini", "https://gemini.google.com/"),
-            ("API Gemini", "https://generativelanguage.googleapis.com/v1/models?key=demo"),
-        ]
+        # Todas as URLs em paralelo; a análise segue na ordem da lista
+        responses = self.http.fetch_all([url for _, url in DIRECT_URLS])
         
-        for name, url in test_urls:
+        for (name, url), response in zip(DIRECT_URLS, responses):
             print(f"\n🔍 Testando: {name}")
-            print(f"   URL: {url}")
+            print(f"   URL: {url} ({response.elapsed_ms:.0f}ms)")
             
-            content, success = self.curl_get(url)
+            content, success = response.text, response.ok
             
             if success:
                 print(f"   ✅ Acessível ({len(content)} bytes)")
@@ -203,15 +173,11 @@ class AIStudioCURL:
         print("\n🔌 TESTANDO ACESSO ÀS APIs")
         print("=" * 50)
         
-        apis = [
-            ("Gemini API v1", "https://generativelanguage.googleapis.com/v1/models"),
-            ("AI Studio API", "https://aistudio.google.com/api/models"),
-            ("Makersuite API", "https://makersuite.google.com/api/models"),
-        ]
+        responses = self.http.fetch_all([url for _, url in API_URLS])
         
-        for name, url in apis:
-            print(f"\n🔍 {name}")
-            content, success = self.curl_get(url)
+        for (name, url), response in zip(API_URLS, responses):
+            print(f"\n🔍 {name} ({response.elapsed_ms:.0f}ms)")
+            content, success = response.text, response.ok
             
             if success:
                 print(f"   📊 Resposta: {len(content)} bytes")
@@ -241,21 +207,16 @@ class AIStudioCURL:
         print("\n🔄 TESTANDO MÉTODOS ALTERNATIVOS")
         print("=" * 50)
         
-        # Testar com diferentes User-Agents
-        user_agents = [
-            "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36",
-            "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36",
-            "Mozilla/5.0 (Android 11; Mobile; rv:68.0) Gecko/68.0 Firefox/68.0"
-        ]
+        # Testar com diferentes User-Agents (cabeçalho por requisição, em paralelo)
+        responses = self.http.fetch_all([
+            {'url': "https://aistudio.google.com/", 'headers': {'User-Agent': ua}}
+            for ua in ALTERNATIVE_USER_AGENTS
+        ])
         
-        for i, ua in enumerate(user_agents):
+        for i, response in enumerate(responses):
             print(f"\n🌐 User-Agent {i+1}:")
             
-            # Modificar headers temporariamente
-            original_headers = self.headers.copy()
-            self.headers[1] = f"User-Agent: {ua}"
-            
-            content, success = self.curl_get("https://aistudio.google.com/")
+            content, success = response.text, response.ok
             
             if success and len(content) > 1000:
                 print(f"   ✅ Funcionou ({len(content)} bytes)")
@@ -265,9 +226,6 @@ class AIStudioCURL:
                     print("   ✅ Acesso direto possível")
             else:
                 print("   ❌ Não funcionou")
-                
-            # Restaurar headers
-            self.headers = original_headers
             
     def generate_report(self, results):
         """Gera relatório final"""
@@ -322,6 +280,10 @@ class AIStudioCURL:
         # Setup
         self.setup_session()
         
+        # Disparar a matriz inteira de uma vez: os testes abaixo consomem as
+        # respostas prontas e a análise dura o tempo da requisição mais lenta
+        self.http.prefetch(self.url_matrix())
+        
         # Testes
         results = self.test_direct_access()
         self.test_gemini_chat()
@@ -330,6 +292,7 @@ class AIStudioCURL:
         
         # Relatório
         self.generate_report(results)
+        print(f"📊 HTTP: {self.http.summary()}")
         
         return results
 
@@ -8,11 +8,15 @@ import json
 import os
 from datetime import datetime
 from ai_studio_login_2fa import AIStudioLogin2FA
+from fast_input import enter_text, read_field
+from capture_policy import get_capture_policy
+from waits import wait_until, wait_for_page_ready, wait_for_url, wait_for_url_change, wait_for_login_exit
+from navigation import goto_app
 from credentials_manager import CredentialsManager
 
 class AIStudioInteraction(AIStudioLogin2FA):
-    def __init__(self, headless=True):
-        super().__init__(headless)
+    def __init__(self, headless=True, pool=None):
+        super().__init__(headless, pool)
         self.current_chat_url = None
         self.conversation_history = []
         self.interactions_dir = "/workspaces/replit/interactions"
@@ -25,13 +29,13 @@ class AIStudioInteraction(AIStudioLogin2FA):
         os.makedirs(f"{self.interactions_dir}/screenshots", exist_ok=True)
         os.makedirs(f"{self.interactions_dir}/conversations", exist_ok=True)
     
-    def take_screenshot(self, name):
-        """Captura screenshot"""
+    def take_screenshot(self, name, kind=None):
+        """Captura screenshot conforme a política de captura (gravação em segundo plano)"""
         try:
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            path = f"{self.interactions_dir}/screenshots/{name}_{timestamp}.png"
-            self.page.screenshot(path=path, full_page=True)
-            print(f"📸 Screenshot: {path}")
+            policy = get_capture_policy("interaction", f"{self.interactions_dir}/screenshots")
+            path = policy.capture(self.page, name, kind)
+            if path:
+                print(f"📸 Screenshot: {path}")
             return path
         except Exception as e:
             print(f"❌ Erro screenshot: {e}")
@@ -43,8 +47,7 @@ class AIStudioInteraction(AIStudioLogin2FA):
             print("🎯 Acessando AI Studio...")
             
             target_url = "https://aistudio.google.com/u/3/prompts/new_chat"
-            self.page.goto(target_url, timeout=20000)
-            time.sleep(5)
+            goto_app(self.page, target_url, timeout=20000)
             
             final_url = self.page.url
             print(f"🔗 URL final: {final_url}")
@@ -57,8 +60,7 @@ class AIStudioInteraction(AIStudioLogin2FA):
                     print("✅ Login concluído")
                     
                     # Tentar acessar chat novamente
-                    self.page.goto(target_url, timeout=20000)
-                    time.sleep(5)
+                    goto_app(self.page, target_url, timeout=20000)
                     
                     final_url = self.page.url
                     print(f"🔗 URL após login: {final_url}")
@@ -104,7 +106,7 @@ class AIStudioInteraction(AIStudioLogin2FA):
     def smart_login(self):
         """Login inteligente que detecta diferentes tipos de página"""
         try:
-            time.sleep(3)
+            wait_for_page_ready(self.page)
             
             # Detectar tipo de página
             page_info = self.page.evaluate("""
@@ -184,7 +186,7 @@ class AIStudioInteraction(AIStudioLogin2FA):
             
             if account_selected:
                 print("✅ Conta selecionada")
-                time.sleep(5)
+                wait_for_page_ready(self.page, 'account_select')
                 return self.smart_login()  # Recursão para próxima etapa
             else:
                 return self.wait_manual_login()
@@ -201,11 +203,11 @@ class AIStudioInteraction(AIStudioLogin2FA):
                 return self.wait_manual_login()
             
             self.page.fill('input[type="email"]', email)
-            time.sleep(1)
             
             # Clicar Next
+            url_before = self.page.url
             if self.click_next_button():
-                time.sleep(5)
+                wait_for_url_change(self.page, url_before, 'email_step')
                 return self.smart_login()  # Recursão para próxima etapa
             
             return False
@@ -222,11 +224,11 @@ class AIStudioInteraction(AIStudioLogin2FA):
                 return self.wait_manual_login()
             
             self.page.fill('input[type="password"]', password)
-            time.sleep(1)
             
             # Clicar Next/Sign in
+            url_before = self.page.url
             if self.click_next_button():
-                time.sleep(3)
+                wait_for_url_change(self.page, url_before, 'password_step')
                 
                 # Screenshot após envio
                 self.take_screenshot("after_password_submit")
@@ -267,7 +269,9 @@ class AIStudioInteraction(AIStudioLogin2FA):
     def check_login_result(self):
         """Verifica resultado do login"""
         try:
-            time.sleep(5)
+            # Sair do login ou chegar ao desafio de 2FA encerra a espera
+            wait_for_url(self.page, lambda url: "accounts.google.com" not in url or "challenge" in url,
+                         'password_step')
             current_url = self.page.url
             
             if "accounts.google.com" not in current_url:
@@ -290,16 +294,11 @@ class AIStudioInteraction(AIStudioLogin2FA):
             print("📱 Aguarde - resolva o 2FA no seu dispositivo")
             print("⏳ 90 segundos para completar...")
             
-            for i in range(18):  # 18 x 5 = 90 segundos
-                time.sleep(5)
-                
-                if "accounts.google.com" not in self.page.url:
-                    print(f"✅ 2FA resolvido em {(i+1)*5}s!")
-                    self.take_screenshot("2fa_success")
-                    return True
-                
-                if i % 6 == 0:  # A cada 30 segundos
-                    print(f"⏳ Aguardando... ({(i+1)*5}s)")
+            started = time.time()
+            if wait_for_login_exit(self.page, 'twofa_manual', timeout=90):
+                print(f"✅ 2FA resolvido em {time.time() - started:.0f}s!")
+                self.take_screenshot("2fa_success")
+                return True
             
             print("⚠️ Timeout do 2FA")
             return False
@@ -313,13 +312,10 @@ class AIStudioInteraction(AIStudioLogin2FA):
         print("⚠️ Aguardando login manual...")
         print("⏳ 60 segundos para fazer login...")
         
-        for i in range(12):  # 12 x 5 = 60 segundos
-            time.sleep(5)
-            
-            if "accounts.google.com" not in self.page.url:
-                print("✅ Login manual concluído!")
-                return True
-                
+        if wait_for_login_exit(self.page, 'manual_login'):
+            print("✅ Login manual concluído!")
+            return True
+        
         print("⚠️ Timeout do login manual")
         return False
     
@@ -338,10 +334,9 @@ class AIStudioInteraction(AIStudioLogin2FA):
             for url in urls:
                 try:
                     self.page.goto(url, timeout=15000)
-                    time.sleep(3)
                     
-                    # Verificar se tem campo de input
-                    has_input = self.page.evaluate("""
+                    # Aguardar o campo de input aparecer (prazo curto por URL)
+                    has_input = wait_until(lambda: self.page.evaluate("""
                         () => {
                             const inputs = document.querySelectorAll('textarea, [contenteditable="true"]');
                             for (const input of inputs) {
@@ -351,7 +346,7 @@ class AIStudioInteraction(AIStudioLogin2FA):
                             }
                             return false;
                         }
-                    """)
+                    """), 'chat_probe', page=self.page)
                     
                     if has_input:
                         print(f"✅ Chat encontrado em: {url}")
@@ -372,6 +367,12 @@ class AIStudioInteraction(AIStudioLogin2FA):
     def find_input_field(self):
         """Encontra campo de input"""
         try:
+            # Tentar primeiro o seletor aprendido em execuções anteriores
+            cached = self.find_cached("message_input", [], timeout=1500)
+            if cached:
+                print(f"✅ Campo encontrado (cache): {cached}")
+                return cached
+            
             input_info = self.page.evaluate("""
                 () => {
                     const selectors = ['textarea', '[contenteditable="true"]', 'input[type="text"]'];
@@ -397,6 +398,7 @@ class AIStudioInteraction(AIStudioLogin2FA):
             
             if input_info:
                 print(f"✅ Campo encontrado: {input_info}")
+                self.selector_cache.record_hit("message_input", self.page.url, input_info)
                 return input_info
             else:
                 print("❌ Campo não encontrado")
@@ -415,42 +417,21 @@ class AIStudioInteraction(AIStudioLogin2FA):
             if not input_selector:
                 return False
             
-            # Focar e digitar
-            self.page.click(input_selector)
-            time.sleep(0.5)
-            
-            # Limpar e digitar
-            self.page.evaluate(f"""
-                () => {{
-                    const field = document.querySelector('{input_selector}');
-                    if (field) {{
-                        field.value = '';
-                        if (field.textContent !== undefined) field.textContent = '';
-                        field.focus();
-                    }}
-                }}
-            """)
-            
-            self.page.type(input_selector, message, delay=50)
-            time.sleep(1)
+            # Inserir o texto inteiro de uma vez (modo "fast") e conferir o campo
+            if not enter_text(self.page, input_selector, message, self.input_mode):
+                print("❌ Texto não foi inserido corretamente no campo")
+                self.take_screenshot("send_input_mismatch_error")
+                return False
             
             self.take_screenshot("before_send")
             
             # Enviar com Enter
+            self.arm_response_detector()
             self.page.press(input_selector, "Enter")
-            time.sleep(3)
             
-            # Verificar se enviou
-            field_empty = self.page.evaluate(f"""
-                () => {{
-                    const field = document.querySelector('{input_selector}');
-                    if (field) {{
-                        const value = field.value || field.textContent || '';
-                        return value.trim() === '';
-                    }}
-                    return false;
-                }}
-            """)
+            # Verificar se enviou (o campo é limpo quando a mensagem sai)
+            field_empty = wait_until(lambda: not read_field(self.page, input_selector).strip(),
+                                     'send', page=self.page)
             
             if field_empty:
                 print("✅ Mensagem enviada!")
@@ -472,12 +453,12 @@ class AIStudioInteraction(AIStudioLogin2FA):
         """Aguarda resposta do AI"""
         try:
             print("🤖 Aguardando resposta...")
-            start_time = time.time()
             
-            while time.time() - start_time < timeout:
-                time.sleep(3)
-                
-                # Procurar resposta
+            # O observador instalado no envio sinaliza quando a resposta estabiliza
+            response = self.get_response_detector().wait(timeout)
+            
+            if not response:
+                # Última tentativa com a busca heurística na página
                 response = self.page.evaluate("""
                     () => {
                         // Procurar por respostas do AI
@@ -509,20 +490,16 @@ class AIStudioInteraction(AIStudioLogin2FA):
                         return null;
                     }
                 """)
-                
-                if response:
-                    print(f"✅ Resposta: {response[:100]}...")
-                    self.conversation_history.append({
-                        'type': 'assistant',
-                        'content': response,
-                        'timestamp': datetime.now().isoformat()
-                    })
-                    self.take_screenshot("response_received")
-                    return response
-                
-                elapsed = int(time.time() - start_time)
-                if elapsed % 15 == 0:  # A cada 15 segundos
-                    print(f"⏳ Aguardando... ({elapsed}s)")
+            
+            if response:
+                print(f"✅ Resposta: {response[:100]}...")
+                self.conversation_history.append({
+                    'type': 'assistant',
+                    'content': response,
+                    'timestamp': datetime.now().isoformat()
+                })
+                self.take_screenshot("response_received")
+                return response
             
             print("⏰ Timeout - resposta não encontrada")
             return None
@@ -10,6 +10,8 @@ sys.path.append('/workspaces/replit')
 
 from ai_studio_login_2fa import AIStudioLogin2FA
 from credentials_manager import CredentialsManager
+from waits import wait_until, wait_for_page_ready, wait_for_url, wait_for_url_change
+from navigation import goto_app
 
 class AIStudioFinalSolution(AIStudioLogin2FA):
     
@@ -26,7 +28,7 @@ class AIStudioFinalSolution(AIStudioLogin2FA):
             
             print(f"🔗 Tentando URL direta de login...")
             self.page.goto(login_url, timeout=20000)
-            time.sleep(3)
+            wait_for_page_ready(self.page)
             
             new_url = self.page.url
             print(f"📍 Nova URL: {new_url}")
@@ -88,7 +90,7 @@ class AIStudioFinalSolution(AIStudioLogin2FA):
                     print("✅ Enter pressionado")
                     
                     # Aguardar carregar página de senha
-                    time.sleep(5)
+                    wait_for_url_change(self.page, current_url, 'email_step')
                     
                     new_url = self.page.url
                     print(f"📍 URL após email: {new_url}")
@@ -133,8 +135,8 @@ class AIStudioFinalSolution(AIStudioLogin2FA):
                 self.page.keyboard.press('Enter')
                 print("✅ Senha enviada")
                 
-                # Aguardar processamento
-                time.sleep(5)
+                # Aguardar processamento (campo de senha sai da tela)
+                wait_until(lambda: not self.page.is_visible('input[type="password"]'), 'password_step', page=self.page)
                 
                 # Screenshot após envio
                 screenshot_path = f"/workspaces/replit/after_password_{int(time.time())}.png"
@@ -151,13 +153,9 @@ class AIStudioFinalSolution(AIStudioLogin2FA):
                     print("⏳ Aguardando autorização por 60 segundos...")
                     
                     # Aguardar 2FA
-                    for i in range(12):  # 60 segundos
-                        time.sleep(5)
-                        current_url = self.page.url
-                        if "aistudio.google.com" in current_url:
-                            print("🎉 2FA autorizado! Acesso ao AI Studio!")
-                            return True
-                        print(f"⏳ Aguardando... {(i+1)*5}s")
+                    if wait_for_url(self.page, lambda url: "aistudio.google.com" in url, 'twofa_manual', timeout=60):
+                        print("🎉 2FA autorizado! Acesso ao AI Studio!")
+                        return True
                     
                     print("⏰ Timeout de 2FA")
                     return False
@@ -189,8 +187,7 @@ class AIStudioFinalSolution(AIStudioLogin2FA):
             # Estratégia 1: Tentar URL direta do AI Studio
             print("🎯 ESTRATÉGIA 1: Acesso direto")
             target_url = "https://aistudio.google.com/u/3/prompts/new_chat"
-            self.page.goto(target_url, timeout=30000)
-            time.sleep(3)
+            goto_app(self.page, target_url, timeout=30000)
             
             current_url = self.page.url
             print(f"📍 URL: {current_url}")
@@ -209,7 +206,7 @@ class AIStudioFinalSolution(AIStudioLogin2FA):
                     print("✅ Login bem-sucedido!")
                     
                     # Verificar se chegou ao AI Studio
-                    time.sleep(3)
+                    wait_for_url(self.page, lambda url: "aistudio.google.com" in url)
                     final_url = self.page.url
                     print(f"📍 URL final: {final_url}")
                     
@@ -11,10 +11,15 @@ from datetime import datetime
 sys.path.append('/workspaces/replit')
 
 from ai_studio_login_2fa import AIStudioLogin2FA
+from capture_policy import get_capture_policy
+from waits import wait_for_page_ready, wait_for_url
+from navigation import goto_app
+from parallel_explorer import explore_urls, print_inventory
+from ai_studio_selectors import GET_STARTED_SELECTORS
 
 class AIStudioFinalInteraction(AIStudioLogin2FA):
-    def __init__(self, headless=True):
-        super().__init__(headless)
+    def __init__(self, headless=True, pool=None):
+        super().__init__(headless, pool)
         self.interactions_dir = "/workspaces/replit/interactions"
         self.ensure_interaction_dirs()
         
@@ -24,13 +29,13 @@ class AIStudioFinalInteraction(AIStudioLogin2FA):
         os.makedirs(f"{self.interactions_dir}/screenshots", exist_ok=True)
         os.makedirs(f"{self.interactions_dir}/logs", exist_ok=True)
     
-    def take_screenshot(self, name):
-        """Captura screenshot"""
+    def take_screenshot(self, name, kind=None):
+        """Captura screenshot conforme a política de captura (gravação em segundo plano)"""
         try:
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            path = f"{self.interactions_dir}/screenshots/{name}_{timestamp}.png"
-            self.page.screenshot(path=path, full_page=True)
-            print(f"📸 Screenshot: {path}")
+            policy = get_capture_policy("interaction", f"{self.interactions_dir}/screenshots")
+            path = policy.capture(self.page, name, kind)
+            if path:
+                print(f"📸 Screenshot: {path}")
             return path
         except Exception as e:
             print(f"❌ Erro screenshot: {e}")
@@ -42,57 +47,42 @@ class AIStudioFinalInteraction(AIStudioLogin2FA):
             print("🎯 Procurando botão 'Get started'...")
             
             # Aguardar a página carregar
-            time.sleep(3)
+            wait_for_page_ready(self.page)
             
             # Screenshot antes de tentar clicar
             self.take_screenshot("before_get_started")
             
-            # Diferentes seletores possíveis para o botão Get started
-            get_started_selectors = [
-                "text=Get started",
-                "button:has-text('Get started')", 
-                "a:has-text('Get started')",
-                "[data-testid*='get-started']",
-                ".get-started",
-                "#get-started",
-                "button[aria-label*='Get started']",
-                "a[aria-label*='Get started']"
-            ]
+            # Todos os seletores possíveis para o botão Get started de uma vez
+            selector = self.find_first_visible(GET_STARTED_SELECTORS)
             
-            for selector in get_started_selectors:
+            if selector:
                 try:
-                    print(f"🔍 Tentando seletor: {selector}")
+                    print(f"✅ Botão encontrado: {selector}")
                     
-                    # Verificar se elemento existe e está visível
-                    if self.page.is_visible(selector, timeout=2000):
-                        print(f"✅ Botão encontrado: {selector}")
-                        
-                        # Rolar até o elemento
-                        self.page.evaluate(f'document.querySelector("{selector}").scrollIntoView()')
-                        time.sleep(1)
-                        
-                        # Clicar
-                        self.page.click(selector)
-                        print("🖱️ Clique realizado!")
-                        
-                        # Aguardar navegação
-                        time.sleep(5)
-                        
-                        new_url = self.page.url
-                        print(f"🔗 Nova URL: {new_url}")
-                        
-                        self.take_screenshot("after_get_started")
+                    # Rolar até o elemento
+                    self.page.locator(selector).first.scroll_into_view_if_needed()
+                    
+                    # Clicar
+                    self.page.click(selector)
+                    print("🖱️ Clique realizado!")
+                    
+                    # Aguardar navegação para fora da welcome
+                    wait_for_url(self.page, lambda url: "welcome" not in url)
+                    
+                    new_url = self.page.url
+                    print(f"🔗 Nova URL: {new_url}")
+                    
+                    self.take_screenshot("after_get_started")
+                    
+                    # Verificar se saiu da página welcome
+                    if "welcome" not in new_url and "accounts.google.com" not in new_url:
+                        print("✅ Navegação bem-sucedida!")
+                        return True
+                    else:
+                        print("⚠️ Ainda na welcome ou redirecionado para login")
                         
-                        # Verificar se saiu da página welcome
-                        if "welcome" not in new_url and "accounts.google.com" not in new_url:
-                            print("✅ Navegação bem-sucedida!")
-                            return True
-                        else:
-                            print("⚠️ Ainda na welcome ou redirecionado para login")
-                            
                 except Exception as e:
                     print(f"❌ Erro com seletor {selector}: {e}")
-                    continue
             
             # Busca mais ampla via JavaScript
             print("🔍 Busca JavaScript por 'Get started'...")
@@ -122,7 +112,7 @@ class AIStudioFinalInteraction(AIStudioLogin2FA):
             
             if js_result['success']:
                 print(f"✅ Clicado via JavaScript: {js_result['tag']} - '{js_result['text']}'")
-                time.sleep(5)
+                wait_for_url(self.page, lambda url: "welcome" not in url)
                 
                 new_url = self.page.url
                 print(f"🔗 URL após JS: {new_url}")
@@ -149,14 +139,13 @@ class AIStudioFinalInteraction(AIStudioLogin2FA):
                 print("📍 Na página welcome - tentando clicar 'Get started'...")
                 if self.click_get_started_button():
                     print("✅ Clique em Get started bem-sucedido")
-                    time.sleep(3)  # Aguardar carregamento
+                    wait_for_page_ready(self.page)  # Aguardar carregamento
                 else:
                     print("⚠️ Não foi possível clicar em Get started")
             
             # Ir para página de API key para verificar acesso
             print("🔑 Verificando página de API key...")
-            self.page.goto("https://aistudio.google.com/apikey", timeout=20000)
-            time.sleep(3)
+            goto_app(self.page, "https://aistudio.google.com/apikey", timeout=20000)
             
             current_url = self.page.url
             print(f"🔗 URL: {current_url}")
@@ -209,7 +198,7 @@ class AIStudioFinalInteraction(AIStudioLogin2FA):
             if "welcome" in current_url:
                 print("📍 Ainda na welcome - tentando Get started novamente...")
                 if self.click_get_started_button():
-                    time.sleep(5)
+                    wait_for_page_ready(self.page)
                     current_url = self.page.url
                     print(f"🔗 Nova URL após Get started: {current_url}")
                     
@@ -252,60 +241,23 @@ class AIStudioFinalInteraction(AIStudioLogin2FA):
                 "https://gemini.google.com/app"  # Nova interface Gemini
             ]
             
-            for url in urls_to_test:
-                print(f"\n🔗 Testando: {url}")
+            # Todas as URLs em abas paralelas; a página com campo de chat fica em primeiro
+            ranked = explore_urls(self.context, urls_to_test, max_tabs=4)
+            for inventory in ranked:
+                print_inventory(inventory)
+            
+            best = ranked[0] if ranked else None
+            if best and best.chat_inputs:
+                input_check = best.chat_inputs[0]
+                print(f"\n   ✅ SUCESSO! Campo encontrado em {best.final_url}:")
+                print(f"      {input_check['tag']} - {input_check['width']}x{input_check['height']}")
+                print(f"      Placeholder: '{input_check['placeholder']}'")
                 
-                try:
-                    self.page.goto(url, timeout=15000)
-                    time.sleep(4)
-                    
-                    final_url = self.page.url
-                    print(f"   Final: {final_url}")
-                    
-                    # Se não redirecionou para login
-                    if "accounts.google.com" not in final_url:
-                        # Verificar se tem campo de input
-                        input_check = self.page.evaluate("""
-                            () => {
-                                const inputs = document.querySelectorAll('textarea, input[type="text"], [contenteditable="true"]');
-                                let found = null;
-                                
-                                for (const input of inputs) {
-                                    if (input.offsetParent) {
-                                        const rect = input.getBoundingClientRect();
-                                        if (rect.width > 200 && rect.height > 30) {
-                                            found = {
-                                                tag: input.tagName,
-                                                placeholder: input.placeholder || '',
-                                                className: Array.from(input.classList).join(' ').slice(0, 50),
-                                                width: rect.width,
-                                                height: rect.height
-                                            };
-                                            break;
-                                        }
-                                    }
-                                }
-                                
-                                return found;
-                            }
-                        """)
-                        
-                        if input_check:
-                            print(f"   ✅ SUCESSO! Campo encontrado:")
-                            print(f"      {input_check['tag']} - {input_check['width']}x{input_check['height']}")
-                            print(f"      Placeholder: '{input_check['placeholder']}'")
-                            
-                            self.take_screenshot("working_chat_found")
-                            return final_url
-                        else:
-                            print(f"   ⚠️ Página carregou mas sem campo de input adequado")
-                    else:
-                        print(f"   ❌ Redirecionado para login")
-                        
-                except Exception as e:
-                    print(f"   ❌ Erro: {e}")
-                    continue
+                goto_app(self.page, best.final_url, timeout=15000, step='chat_probe')
+                self.take_screenshot("working_chat_found")
+                return best.final_url
             
+            print("   ⚠️ Nenhuma URL com campo de input adequado")
             return None
             
         except Exception as e:
@@ -8,11 +8,14 @@ import json
 import os
 from datetime import datetime
 from ai_studio_login_2fa import AIStudioLogin2FA
+from capture_policy import get_capture_policy
+from waits import wait_for_url_change, wait_for_login_exit
+from navigation import goto_app
 from credentials_manager import CredentialsManager
 
 class AIStudioInteractionFixed(AIStudioLogin2FA):
-    def __init__(self, headless=True):
-        super().__init__(headless)
+    def __init__(self, headless=True, pool=None):
+        super().__init__(headless, pool)
         self.current_chat_url = None
         self.conversation_history = []
         self.interactions_dir = "/workspaces/replit/interactions"
@@ -25,13 +28,13 @@ class AIStudioInteractionFixed(AIStudioLogin2FA):
         os.makedirs(f"{self.interactions_dir}/screenshots", exist_ok=True)
         os.makedirs(f"{self.interactions_dir}/conversations", exist_ok=True)
     
-    def take_screenshot(self, name):
-        """Captura screenshot"""
+    def take_screenshot(self, name, kind=None):
+        """Captura screenshot conforme a política de captura (gravação em segundo plano)"""
         try:
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            path = f"{self.interactions_dir}/screenshots/{name}_{timestamp}.png"
-            self.page.screenshot(path=path, full_page=True)
-            print(f"📸 Screenshot: {path}")
+            policy = get_capture_policy("interaction", f"{self.interactions_dir}/screenshots")
+            path = policy.capture(self.page, name, kind)
+            if path:
+                print(f"📸 Screenshot: {path}")
             return path
         except Exception as e:
             print(f"❌ Erro screenshot: {e}")
@@ -45,8 +48,7 @@ class AIStudioInteractionFixed(AIStudioLogin2FA):
             target_url = "https://aistudio.google.com/u/3/prompts/new_chat"
             print(f"🔗 URL: {target_url}")
             
-            self.page.goto(target_url, timeout=20000)
-            time.sleep(3)
+            goto_app(self.page, target_url, timeout=20000)
             
             final_url = self.page.url
             print(f"🔗 URL inicial: {final_url}")
@@ -59,8 +61,7 @@ class AIStudioInteractionFixed(AIStudioLogin2FA):
                     print("✅ Login realizado, tentando acessar chat novamente...")
                     
                     # Tentar novamente após login
-                    self.page.goto(target_url, timeout=20000)
-                    time.sleep(5)
+                    goto_app(self.page, target_url, timeout=20000)
                     
                     final_url = self.page.url
                     print(f"🔗 URL após login: {final_url}")
@@ -151,11 +152,9 @@ class AIStudioInteractionFixed(AIStudioLogin2FA):
                     if account_chooser_attempts > 2:
                         print("❌ Muitas tentativas na escolha de conta - possível loop")
                         print("🔧 Tentando aguardar mais tempo...")
-                        time.sleep(10)
                         
                         # Verificar se saiu da página
-                        new_url = self.page.url
-                        if "accounts.google.com" not in new_url:
+                        if wait_for_login_exit(self.page, 'url_change'):
                             print("✅ Saiu da página de login após aguardar!")
                             return True
                         
@@ -169,7 +168,7 @@ class AIStudioInteractionFixed(AIStudioLogin2FA):
                     if success:
                         # Aguardar navegação
                         print("⏳ Aguardando navegação...")
-                        time.sleep(5)
+                        wait_for_url_change(self.page, current_url, 'account_select')
                         
                         # Verificar se mudou de página
                         new_url = self.page.url
@@ -187,7 +186,7 @@ class AIStudioInteractionFixed(AIStudioLogin2FA):
                 elif page_info['hasEmailField']:
                     print("📧 Página de email")
                     if self.handle_email_step():
-                        time.sleep(3)
+                        wait_for_url_change(self.page, current_url, 'email_step')
                         continue
                     else:
                         break
@@ -196,14 +195,14 @@ class AIStudioInteractionFixed(AIStudioLogin2FA):
                 elif page_info['hasPasswordField']:
                     print("🔒 Página de senha")
                     if self.handle_password_step():
-                        time.sleep(5)
+                        wait_for_url_change(self.page, current_url, 'password_step')
                         continue
                     else:
                         break
                 
                 else:
                     print("❓ Página desconhecida - aguardando...")
-                    time.sleep(3)
+                    wait_for_url_change(self.page, current_url)
             
             print("❌ Login não concluído após todas as tentativas")
             return False
@@ -259,7 +258,6 @@ class AIStudioInteractionFixed(AIStudioLogin2FA):
             if email:
                 print(f"📧 Preenchendo email: {email}")
                 self.page.fill('input[type="email"]', email)
-                time.sleep(1)
                 
                 # Clicar Next
                 self.page.press('input[type="email"]', 'Enter')
@@ -278,7 +276,6 @@ class AIStudioInteractionFixed(AIStudioLogin2FA):
             if password:
                 print(f"🔒 Preenchendo senha...")
                 self.page.fill('input[type="password"]', password)
-                time.sleep(1)
                 
                 # Screenshot após senha
                 self.take_screenshot("after_password")
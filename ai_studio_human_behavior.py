@@ -15,11 +15,12 @@ sys.path.append('/workspaces/replit')
 
 from ai_studio_login_2fa import AIStudioLogin2FA
 from credentials_manager import CredentialsManager
+from waits import wait_for_url_change
 
 class AIStudioHumanBehavior(AIStudioLogin2FA):
     
-    def __init__(self, headless=False):
-        super().__init__(headless)
+    def __init__(self, headless=False, pool=None):
+        super().__init__(headless, pool)
         self.human_delays = {
             'quick': (0.5, 1.5),      # Ações rápidas
             'normal': (1.0, 3.0),     # Ações normais
@@ -273,7 +274,7 @@ class AIStudioHumanBehavior(AIStudioLogin2FA):
                         self.human_delay('reading')
                         
                         # Aguardar mudança de página
-                        time.sleep(5)
+                        wait_for_url_change(self.page, current_url, 'password_step')
                         current_url = self.page.url
                         print(f"📍 URL após senha: {current_url}")
                         
@@ -6,6 +6,7 @@ Permite navegar, criar chats e enviar mensagens após login
 import time
 import json
 from persistent_login import PersistentGoogleLogin
+from navigation import goto_app
 
 class AIStudioInteraction(PersistentGoogleLogin):
     def __init__(self):
@@ -16,9 +17,7 @@ class AIStudioInteraction(PersistentGoogleLogin):
         """Navega para a página principal do AI Studio"""
         try:
             print("🌐 Navegando para Google AI Studio...")
-            self.page.goto("https://aistudio.google.com/", timeout=30000)
-            self.page.wait_for_load_state('networkidle')
-            time.sleep(3)
+            goto_app(self.page, "https://aistudio.google.com/", timeout=30000)
             
             # Verificar se carregou corretamente
             title = self.page.title()
@@ -8,24 +8,30 @@ import json
 import os
 from datetime import datetime
 from ai_studio_login_2fa import AIStudioLogin2FA
+from interaction_log import InteractionLogReader, get_log_writer
+from capture_policy import get_capture_policy, TRACE
+from fast_input import enter_text
+from waits import wait_for_any
+from navigation import goto_app
+from ai_studio_selectors import (
+    NEW_CHAT_SELECTORS,
+    MESSAGE_INPUT_SELECTORS,
+    SEND_BUTTON_SELECTORS,
+    STOP_GENERATION_SELECTORS
+)
 
-class AIStudioInter                        current_url = self.page.url
-                        is_chat_page = ("chat" in current_url.lower() or 
-                                       "new" in current_url.lower() or 
-                                       "prompts" in current_url.lower())
-                        is_not_login = "accounts.google.com" not in current_url
-                        
-                        if is_chat_page and is_not_login:n(AIStudioLogin2FA):
-    def __init__(self, headless=True):
+class AIStudioInteraction(AIStudioLogin2FA):
+    def __init__(self, headless=True, pool=None):
         """
         Inicializa sistema de interação com AI Studio
         Herda funcionalidades de login do AIStudioLogin2FA
         """
-        super().__init__(headless)
+        super().__init__(headless, pool)
         self.current_chat_url = None
         self.conversation_history = []
         self.interactions_dir = "/workspaces/replit/interactions"
         self.ensure_interaction_dirs()
+        self.interaction_log = get_log_writer(self.interactions_dir)
         
     def ensure_interaction_dirs(self):
         """Cria diretórios para salvar interações"""
@@ -34,7 +40,7 @@ class AIStudioInter                        current_url = self.page.url
         os.makedirs(f"{self.interactions_dir}/conversations", exist_ok=True)
     
     def save_interaction_log(self, action, details=None):
-        """Salva log de interações"""
+        """Acrescenta uma entrada ao log de interações (JSONL)"""
         try:
             log_entry = {
                 'timestamp': datetime.now().isoformat(),
@@ -43,36 +49,26 @@ class AIStudioInter                        current_url = self.page.url
                 'url': self.page.url if self.page else None
             }
             
-            log_file = f"{self.interactions_dir}/interaction_log.json"
-            
-            # Carregar logs existentes
-            logs = []
-            if os.path.exists(log_file):
-                with open(log_file, 'r') as f:
-                    logs = json.load(f)
-            
-            logs.append(log_entry)
-            
-            # Manter apenas últimas 100 interações
-            if len(logs) > 100:
-                logs = logs[-100:]
-            
-            with open(log_file, 'w') as f:
-                json.dump(logs, f, indent=2)
-                
+            # Gravação em segundo plano, sem reler o arquivo
+            self.interaction_log.append(log_entry)
             print(f"📝 Log salvo: {action}")
             
         except Exception as e:
             print(f"⚠️ Erro ao salvar log: {e}")
     
-    def take_interaction_screenshot(self, name):
-        """Captura screenshot da interação"""
+    def load_interaction_log(self, limit=100):
+        """Retorna as últimas interações registradas, da mais antiga para a mais recente"""
+        self.interaction_log.flush()
+        return InteractionLogReader(self.interactions_dir).last(limit)
+    
+    def take_interaction_screenshot(self, name, kind=None):
+        """Captura screenshot da interação conforme a política de captura"""
         try:
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            screenshot_path = f"{self.interactions_dir}/screenshots/{name}_{timestamp}.png"
-            
-            self.page.screenshot(path=screenshot_path, full_page=True)
-            print(f"📸 Screenshot: {screenshot_path}")
+            # Bytes JPEG da área visível; compressão e disco ficam com o worker
+            policy = get_capture_policy("interaction", f"{self.interactions_dir}/screenshots")
+            screenshot_path = policy.capture(self.page, name, kind)
+            if screenshot_path:
+                print(f"📸 Screenshot: {screenshot_path}")
             return screenshot_path
             
         except Exception as e:
@@ -84,9 +80,7 @@ class AIStudioInter                        current_url = self.page.url
         try:
             print("🏠 Navegando para AI Studio...")
             
-            self.page.goto("https://aistudio.google.com/", timeout=30000)
-            self.page.wait_for_load_state('networkidle')
-            time.sleep(3)
+            state = goto_app(self.page, "https://aistudio.google.com/", timeout=30000)
             
             # Verificar se carregou corretamente
             current_url = self.page.url
@@ -100,7 +94,8 @@ class AIStudioInter                        current_url = self.page.url
             
             self.save_interaction_log("navigate_home", {
                 "url": current_url,
-                "title": title
+                "title": title,
+                "state": state
             })
             
             return True
@@ -114,63 +109,10 @@ class AIStudioInter                        current_url = self.page.url
         try:
             print("🔍 Procurando botão 'Novo Chat'...")
             
-            # Aguardar página carregar completamente
-            time.sleep(3)
-            
-            # Possíveis seletores para novo chat
-            new_chat_selectors = [
-                # Textos específicos de chat (mais específicos primeiro)
-                "text=New chat",
-                "text=Novo chat", 
-                "text=Create new chat",
-                "text=Criar novo chat",
-                "text=Start new conversation",
-                "text=Nova conversa",
-                
-                # Botões mais genéricos
-                "text=Create new",
-                "text=Criar novo",
-                "text=Start new",
-                
-                # Seletores por atributos
-                "[data-testid*='new-chat']",
-                "[data-testid*='create']",
-                "[aria-label*='new chat']",
-                "[aria-label*='create']",
-                "[aria-label*='novo']",
-                
-                # Seletores por classes comuns
-                ".new-chat-button",
-                ".create-button",
-                ".start-button",
-                
-                # Botões com texto específico
-                "button:has-text('New')",
-                "button:has-text('Create')",
-                "button:has-text('Novo')",
-                "button:has-text('Criar')",
-                
-                # Links com texto
-                "a:has-text('New')",
-                "a:has-text('Create')",
-                "a:has-text('Novo')",
-                
-                # Elementos com role button
-                "[role='button']:has-text('New')",
-                "[role='button']:has-text('Create')",
-                "[role='button']:has-text('Novo')"
-            ]
-            
-            found_button = None
-            
-            for selector in new_chat_selectors:
-                try:
-                    if self.page.is_visible(selector, timeout=2000):
-                        print(f"✅ Botão encontrado: {selector}")
-                        found_button = selector
-                        break
-                except:
-                    continue
+            # find_cached já aguarda o botão aparecer (corrida com prazo)
+            found_button = self.find_cached("new_chat_button", NEW_CHAT_SELECTORS)
+            if found_button:
+                print(f"✅ Botão encontrado: {found_button}")
             
             if not found_button:
                 # Busca mais avançada via JavaScript
@@ -218,11 +160,14 @@ class AIStudioInter                        current_url = self.page.url
                         found_button = f"#{found_button['id']}"
                     elif found_button['className']:
                         found_button = f".{found_button['className'].split()[0]}"
+                    
+                    if isinstance(found_button, str):
+                        self.selector_cache.record_hit("new_chat_button", self.page.url, found_button)
                     else:
                         # Usar coordenadas como fallback
                         print(f"🎯 Clicando em coordenadas: ({found_button['x']}, {found_button['y']})")
                         self.page.click(f"{found_button['x']},{found_button['y']}")
-                        time.sleep(3)
+                        wait_for_any(self.page, MESSAGE_INPUT_SELECTORS, 'chat_ready')
                         return True
             
             if found_button:
@@ -272,8 +217,7 @@ class AIStudioInter                        current_url = self.page.url
             for url in direct_urls:
                 try:
                     print(f"🔗 Tentando: {url}")
-                    self.page.goto(url, timeout=15000)
-                    time.sleep(3)
+                    goto_app(self.page, url, timeout=15000)
                     
                     current_url = self.page.url
                     is_chat_page = ("chat" in current_url.lower() or 
@@ -299,8 +243,7 @@ class AIStudioInter                        current_url = self.page.url
             print("� URLs diretas falharam, procurando botão...")
             
             # Voltar para página inicial
-            self.page.goto("https://aistudio.google.com/", timeout=15000)
-            time.sleep(3)
+            goto_app(self.page, "https://aistudio.google.com/", timeout=15000)
             
             # Encontrar botão de novo chat
             button_selector = self.find_new_chat_button()
@@ -308,54 +251,35 @@ class AIStudioInter                        current_url = self.page.url
             if not button_selector:
                 print("❌ Não foi possível criar novo chat")
                 return False
+            
+            # Clique por coordenadas já foi feito dentro da busca
+            if button_selector is not True:
+                print(f"🖱️ Clicando em: {button_selector}")
+                self.page.click(button_selector)
+                wait_for_any(self.page, MESSAGE_INPUT_SELECTORS, 'chat_ready')
+            
+            self.current_chat_url = self.page.url
+            self.take_interaction_screenshot("new_chat_created")
+            self.save_interaction_log("create_new_chat", {
+                "method": "button",
+                "selector": button_selector if button_selector is not True else "coordinates",
+                "final_url": self.current_chat_url
+            })
+            return True
+        
+        except Exception as e:
+            print(f"❌ Erro ao criar novo chat: {e}")
+            self.take_interaction_screenshot("create_chat_error")
+            return False
     
     def find_message_input(self):
         """Encontra campo de entrada de mensagem"""
         try:
             print("🔍 Procurando campo de mensagem...")
             
-            # Seletores para campo de texto
-            input_selectors = [
-                # Seletores específicos do AI Studio
-                "textarea[placeholder*='message']",
-                "textarea[placeholder*='pergunt']",
-                "textarea[placeholder*='question']",
-                "textarea[placeholder*='prompt']",
-                "textarea[placeholder*='type']",
-                "textarea[placeholder*='enter']",
-                "textarea[placeholder*='ask']",
-                
-                # Seletores genéricos
-                "textarea",
-                "input[type='text']",
-                "[contenteditable='true']",
-                
-                # Por classes comuns
-                ".chat-input",
-                ".message-input",
-                ".prompt-input",
-                ".text-input",
-                
-                # Por atributos
-                "[data-testid*='input']",
-                "[data-testid*='message']",
-                "[data-testid*='prompt']",
-                "[role='textbox']",
-                "[aria-label*='message']",
-                "[aria-label*='prompt']",
-                "[aria-label*='input']"
-            ]
-            
-            found_input = None
-            
-            for selector in input_selectors:
-                try:
-                    if self.page.is_visible(selector, timeout=2000):
-                        print(f"✅ Campo encontrado: {selector}")
-                        found_input = selector
-                        break
-                except:
-                    continue
+            found_input = self.find_cached("message_input", MESSAGE_INPUT_SELECTORS)
+            if found_input:
+                print(f"✅ Campo encontrado: {found_input}")
             
             if not found_input:
                 # Busca via JavaScript
@@ -390,6 +314,9 @@ class AIStudioInter                        current_url = self.page.url
                 if input_info:
                     print(f"✅ Campo encontrado via JS: {input_info['tagName']}")
                     found_input = input_info['selector']
+                    
+                    # Aprender o seletor descoberto para as próximas execuções
+                    self.selector_cache.record_hit("message_input", self.page.url, found_input)
             
             return found_input
             
@@ -410,75 +337,33 @@ class AIStudioInter                        current_url = self.page.url
                 self.take_interaction_screenshot("send_message_error_no_field")
                 return False
             
-            # Clicar no campo para focar
-            self.page.click(input_field)
-            time.sleep(0.5)
-            
-            # Limpar campo se houver texto
-            self.page.evaluate(f"""
-                () => {{
-                    const field = document.querySelector('{input_field}');
-                    if (field) {{
-                        field.value = '';
-                        if (field.textContent !== undefined) field.textContent = '';
-                    }}
-                }}
-            """)
-            
-            time.sleep(0.3)
-            
-            # Digitar mensagem de forma humana (com delays)
-            print("⌨️ Digitando mensagem...")
-            for i, char in enumerate(message):
-                self.page.type(input_field, char, delay=50 + (i % 3) * 20)  # Variação no delay
-            
-            time.sleep(1)
+            # Inserir o texto inteiro de uma vez (modo "fast") e conferir o campo
+            if not enter_text(self.page, input_field, message, self.input_mode):
+                print("❌ Texto não foi inserido corretamente no campo")
+                self.take_interaction_screenshot("send_message_error_input_mismatch")
+                return False
             
             # Screenshot antes de enviar
             self.take_interaction_screenshot("before_send")
             
-            # Procurar botão de envio
-            send_selectors = [
-                # Textos comuns
-                "text=Send",
-                "text=Enviar",
-                "text=Submit",
-                "text=Go",
-                
-                # Botões por tipo
-                "button[type='submit']",
-                
-                # Por atributos
-                "[aria-label*='send']",
-                "[aria-label*='enviar']",
-                "[aria-label*='submit']",
-                "[data-testid*='send']",
-                "[data-testid*='submit']",
-                
-                # Classes comuns
-                ".send-button",
-                ".submit-button",
-                
-                # Botões com ícones (comum em chats)
-                "button svg",
-                "button [role='img']",
-                "[role='button'] svg",
-                
-                # Botões próximos ao input
+            # Procurar botão de envio (incluindo botões próximos ao input)
+            send_selectors = SEND_BUTTON_SELECTORS + [
                 f"{input_field} + button",
                 f"{input_field} ~ button"
             ]
             
+            # Instalar o observador de resposta antes do envio
+            self.arm_response_detector()
+            
             sent = False
-            for selector in send_selectors:
+            selector = self.find_cached("send_button", send_selectors, timeout=3000)
+            if selector:
                 try:
-                    if self.page.is_visible(selector, timeout=2000):
-                        print(f"📤 Enviando via: {selector}")
-                        self.page.click(selector)
-                        sent = True
-                        break
+                    print(f"📤 Enviando via: {selector}")
+                    self.page.click(selector)
+                    sent = True
                 except:
-                    continue
+                    pass
             
             if not sent:
                 # Tentar Enter
@@ -494,7 +379,6 @@ class AIStudioInter                        current_url = self.page.url
             
             if sent:
                 print("✅ Mensagem enviada!")
-                time.sleep(2)  # Aguardar processamento
                 
                 # Screenshot após envio
                 self.take_interaction_screenshot("after_send")
@@ -528,101 +412,42 @@ class AIStudioInter                        current_url = self.page.url
         try:
             print("🤖 Aguardando resposta do AI...")
             
+            detector = self.get_response_detector()
             start_time = time.time()
-            last_screenshot_time = 0
+            response_text = None
             
             while time.time() - start_time < timeout:
-                current_time = time.time()
-                
                 # Capturar screenshot periodicamente durante a espera
-                if current_time - last_screenshot_time > 10:  # A cada 10 segundos
-                    self.take_interaction_screenshot(f"waiting_response_{int(current_time - start_time)}s")
-                    last_screenshot_time = current_time
+                elapsed = time.time() - start_time
+                self.take_interaction_screenshot(f"waiting_response_{int(elapsed)}s", TRACE)
                 
-                # Procurar indicadores de resposta
-                response_indicators = [
-                    # Elementos comuns de resposta
-                    ".ai-response",
-                    ".assistant-message", 
-                    ".bot-message",
-                    ".response-content",
-                    ".ai-message",
-                    
-                    # Por atributos
-                    "[data-testid*='response']",
-                    "[data-testid*='ai']",
-                    "[data-testid*='assistant']",
-                    "[role='article']",
-                    
-                    # Mensagens em geral (pegar a última)
-                    ".message:last-child",
-                    ".chat-message:last-child"
-                ]
+                # Aguardar o observador da página sinalizar que a resposta estabilizou
+                response_text = detector.wait(min(10, timeout - elapsed))
+                if response_text:
+                    break
+            
+            if response_text:
+                print(f"✅ Resposta recebida ({len(response_text)} caracteres)")
+                print(f"📝 Início: {response_text[:100]}...")
                 
-                for indicator in response_indicators:
-                    try:
-                        if self.page.is_visible(indicator, timeout=1000):
-                            # Aguardar um pouco mais para garantir que a resposta terminou
-                            time.sleep(3)
-                            
-                            # Verificar se há indicadores de que ainda está digitando
-                            typing_indicators = [
-                                ".typing",
-                                ".loading",
-                                ".generating",
-                                "[data-testid*='typing']",
-                                "[data-testid*='loading']"
-                            ]
-                            
-                            still_typing = False
-                            for typing_ind in typing_indicators:
-                                try:
-                                    if self.page.is_visible(typing_ind, timeout=500):
-                                        still_typing = True
-                                        break
-                                except:
-                                    continue
-                            
-                            if still_typing:
-                                print("⏳ AI ainda está digitando...")
-                                time.sleep(5)
-                                continue
-                            
-                            # Capturar texto da resposta
-                            response_text = self.page.evaluate(f"""
-                                () => {{
-                                    const element = document.querySelector('{indicator}');
-                                    if (element) {{
-                                        return element.textContent.trim();
-                                    }}
-                                    return '';
-                                }}
-                            """)
-                            
-                            if response_text and len(response_text) > 10:
-                                print(f"✅ Resposta recebida ({len(response_text)} caracteres)")
-                                print(f"📝 Início: {response_text[:100]}...")
-                                
-                                # Screenshot da resposta completa
-                                self.take_interaction_screenshot("ai_response_received")
-                                
-                                # Salvar no histórico
-                                self.conversation_history.append({
-                                    'type': 'ai_response',
-                                    'content': response_text,
-                                    'timestamp': datetime.now().isoformat()
-                                })
-                                
-                                self.save_interaction_log("receive_response", {
-                                    "response_length": len(response_text),
-                                    "response_preview": response_text[:200]
-                                })
-                                
-                                return response_text
-                    except:
-                        continue
+                # Screenshot da resposta completa
+                self.take_interaction_screenshot("ai_response_received")
+                
+                # Salvar no histórico
+                self.conversation_history.append({
+                    'type': 'ai_response',
+                    'content': response_text,
+                    'timestamp': datetime.now().isoformat()
+                })
+                
+                self.save_interaction_log("receive_response", {
+                    "response_length": len(response_text),
+                    "response_preview": response_text[:200],
+                    "first_token_ms": detector.first_token_ms,
+                    "total_ms": int((time.time() - start_time) * 1000)
+                })
                 
-                time.sleep(2)  # Aguardar antes da próxima verificação
+                return response_text
             
             print("⏰ Timeout aguardando resposta")
             self.take_interaction_screenshot("response_timeout")
@@ -632,6 +457,64 @@ class AIStudioInter                        current_url = self.page.url
             print(f"❌ Erro ao aguardar resposta: {e}")
             return None
     
+    def stream_response(self, timeout=90, stop_on_close=True):
+        """
+        Gera a resposta do AI em trechos conforme ela aparece na página
+        
+        Permite processar os primeiros tokens imediatamente. Se o consumidor
+        parar antes do fim (break), a geração é interrompida na página.
+        
+        Args:
+            timeout (int): Prazo total em segundos
+            stop_on_close (bool): Clicar em "Stop" quando o gerador for fechado antes do fim
+        
+        Yields:
+            ResponseDelta: Texto novo (ou completo, se reset=True) desde o trecho anterior
+        """
+        print("🤖 Recebendo resposta do AI em streaming...")
+        
+        detector = self.get_response_detector()
+        start_time = time.time()
+        response_text = ""
+        
+        try:
+            for delta in detector.stream(timeout):
+                response_text = delta.text if delta.reset else response_text + delta.text
+                yield delta
+        
+        except GeneratorExit:
+            print(f"⏹️ Streaming interrompido pelo consumidor ({len(response_text)} caracteres)")
+            try:
+                detector.stop()
+                if stop_on_close:
+                    stop_button = self.find_first_visible(STOP_GENERATION_SELECTORS, timeout=1000)
+                    if stop_button:
+                        self.page.click(stop_button)
+            except Exception as e:
+                print(f"⚠️ Erro ao interromper geração: {e}")
+            raise
+        
+        if detector.armed:
+            print("⏰ Timeout durante o streaming da resposta")
+            self.take_interaction_screenshot("stream_timeout")
+            return
+        
+        print(f"✅ Resposta recebida via streaming ({len(response_text)} caracteres)")
+        
+        self.conversation_history.append({
+            'type': 'ai_response',
+            'content': response_text,
+            'timestamp': datetime.now().isoformat()
+        })
+        
+        self.save_interaction_log("receive_response", {
+            "response_length": len(response_text),
+            "response_preview": response_text[:200],
+            "first_token_ms": detector.first_token_ms,
+            "total_ms": int((time.time() - start_time) * 1000),
+            "streamed": True
+        })
+    
     def save_conversation(self, filename=None):
         """Salva conversa atual em arquivo"""
         try:
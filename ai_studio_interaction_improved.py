@@ -8,11 +8,15 @@ import json
 import os
 from datetime import datetime
 from ai_studio_login_2fa import AIStudioLogin2FA
+from fast_input import enter_text, read_field
+from capture_policy import get_capture_policy, TRACE
+from waits import wait_until, wait_for_page_ready, wait_for_any, wait_for_url_change, wait_for_login_exit
+from navigation import goto_app
 from credentials_manager import CredentialsManager
 
 class AIStudioInteraction(AIStudioLogin2FA):
-    def __init__(self, headless=True):
-        super().__init__(headless)
+    def __init__(self, headless=True, pool=None):
+        super().__init__(headless, pool)
         self.current_chat_url = None
         self.conversation_history = []
         self.interactions_dir = "/workspaces/replit/interactions"
@@ -25,13 +29,13 @@ class AIStudioInteraction(AIStudioLogin2FA):
         os.makedirs(f"{self.interactions_dir}/screenshots", exist_ok=True)
         os.makedirs(f"{self.interactions_dir}/conversations", exist_ok=True)
     
-    def take_screenshot(self, name):
-        """Captura screenshot"""
+    def take_screenshot(self, name, kind=None):
+        """Captura screenshot conforme a política de captura (gravação em segundo plano)"""
         try:
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            path = f"{self.interactions_dir}/screenshots/{name}_{timestamp}.png"
-            self.page.screenshot(path=path, full_page=True)
-            print(f"📸 Screenshot: {path}")
+            policy = get_capture_policy("interaction", f"{self.interactions_dir}/screenshots")
+            path = policy.capture(self.page, name, kind)
+            if path:
+                print(f"📸 Screenshot: {path}")
             return path
         except Exception as e:
             print(f"❌ Erro screenshot: {e}")
@@ -47,8 +51,7 @@ class AIStudioInteraction(AIStudioLogin2FA):
             
             print(f"🔗 Tentando: {target_url}")
             
-            self.page.goto(target_url, timeout=20000)
-            time.sleep(5)  # Aguardar carregamento
+            goto_app(self.page, target_url, timeout=20000)  # Aguardar carregamento
             
             final_url = self.page.url
             print(f"🔗 URL final: {final_url}")
@@ -63,8 +66,7 @@ class AIStudioInteraction(AIStudioLogin2FA):
                     
                     # Tentar novamente após login
                     print(f"🔄 Tentando acessar chat novamente...")
-                    self.page.goto(target_url, timeout=20000)
-                    time.sleep(5)
+                    goto_app(self.page, target_url, timeout=20000)
                     
                     final_url = self.page.url
                     print(f"🔗 URL final após login: {final_url}")
@@ -119,7 +121,7 @@ class AIStudioInteraction(AIStudioLogin2FA):
                 return False
             
             # Aguardar página carregar completamente
-            time.sleep(3)
+            wait_for_page_ready(self.page)
             
             # Verificar que tipo de página de login temos
             page_type = self.page.evaluate("""
@@ -174,7 +176,7 @@ class AIStudioInteraction(AIStudioLogin2FA):
                     
                     if account_clicked:
                         print("✅ Conta selecionada")
-                        time.sleep(3)
+                        wait_for_page_ready(self.page, 'account_select')
                         
                         # Verificar se precisa de senha
                         has_password_field = self.page.evaluate("""
@@ -188,7 +190,7 @@ class AIStudioInteraction(AIStudioLogin2FA):
                             return self.fill_password_and_login()
                         else:
                             # Verificar se já logou
-                            time.sleep(3)
+                            wait_for_login_exit(self.page, 'account_select')
                             final_url = self.page.url
                             if "accounts.google.com" not in final_url:
                                 print("✅ Login concluído sem senha adicional!")
@@ -209,8 +211,8 @@ class AIStudioInteraction(AIStudioLogin2FA):
                 print("⚠️ Tipo de página de login não reconhecido")
                 self.take_screenshot("unknown_login_page")
                 print("📸 Screenshot salvo para análise")
-                print("⏳ Aguardando 30 segundos para login manual...")
-                time.sleep(30)
+                print("⏳ Aguardando até 30 segundos para login manual...")
+                wait_for_login_exit(self.page, 'manual_login', timeout=30)
                 
                 final_url = self.page.url
                 if "accounts.google.com" not in final_url:
@@ -227,6 +229,10 @@ class AIStudioInteraction(AIStudioLogin2FA):
     def fill_email_and_continue(self):
         """Preenche email e continua"""
         try:
+            # Verificar se o email já foi preenchido
+            email_value = self.page.input_value('input[type="email"]')
+            
+            if not email_value:
                 # Verificar se temos credenciais configuradas
                 email = self.credentials_manager.get_email()
                 password = self.credentials_manager.get_password()
@@ -237,11 +243,9 @@ class AIStudioInteraction(AIStudioLogin2FA):
                     # Preencher email
                     print("📧 Preenchendo email...")
                     self.page.fill('input[type="email"]', email)
-                    time.sleep(1)
                     
                     # Clicar em Next
                     print("➡️ Clicando em Avançar...")
-                    time.sleep(2)  # Aguardar um pouco mais
                     
                     # Tentar múltiplos seletores para o botão Next
                     next_selectors = [
@@ -288,14 +292,12 @@ class AIStudioInteraction(AIStudioLogin2FA):
                             print("❌ Enter também falhou")
                             return False
                     
-                    if button_clicked:
-                        time.sleep(4)  # Aguardar navegação
-                    else:
+                    if not button_clicked:
                         return False
                     
                     # Aguardar página de senha e preencher
                     print("🔒 Aguardando página de senha...")
-                    time.sleep(3)
+                    wait_for_any(self.page, ['input[type="password"]'], 'email_step')
                     
                     # Verificar se chegou na página de senha
                     has_password_field = self.page.evaluate("""
@@ -307,11 +309,10 @@ class AIStudioInteraction(AIStudioLogin2FA):
                     if has_password_field:
                         print("🔒 Preenchendo senha...")
                         self.page.fill('input[type="password"]', password)
-                        time.sleep(1)
                         
                         # Clicar em entrar
                         print("🔑 Fazendo login...")
-                        time.sleep(2)
+                        url_before_submit = self.page.url
                         
                         # Tentar múltiplos seletores para botão de login
                         login_selectors = [
@@ -355,16 +356,16 @@ class AIStudioInteraction(AIStudioLogin2FA):
                                 return False
                         
                         if login_clicked:
-                            time.sleep(3)  # Aguardar um pouco menos primeiro
+                            wait_for_url_change(self.page, url_before_submit, 'password_step')
                             
                             # SCREENSHOT IMEDIATAMENTE após login
                             print("📸 Capturando tela após envio da senha...")
                             screenshot_path = self.take_screenshot("after_password_submit")
                             print(f"📸 Screenshot salvo: {screenshot_path}")
                             print("👀 VERIFIQUE A IMAGEM PARA VER SE APARECEU 2FA!")
-                            print("⏳ Aguardando mais um momento para processar...")
+                            print("⏳ Aguardando a página processar...")
                             
-                            time.sleep(3)  # Aguardar mais um pouco
+                            wait_for_page_ready(self.page)
                         else:
                             return False
                         
@@ -387,21 +388,18 @@ class AIStudioInteraction(AIStudioLogin2FA):
                             # Aguardar resolução manual do 2FA
                             print("⏳ Aguardando 90 segundos para você resolver 2FA...")
                             
-                            # Verificar a cada 10 segundos se 2FA foi resolvido
-                            for i in range(9):  # 9 x 10 = 90 segundos
-                                time.sleep(10)
-                                current_url = self.page.url
-                                
-                                if "accounts.google.com" not in current_url:
-                                    print(f"✅ 2FA resolvido após {(i+1)*10} segundos!")
+                            # Aguardar a saída do login em janelas de 30 segundos
+                            started = time.time()
+                            for i in range(3):  # 3 x 30 = 90 segundos
+                                if wait_for_login_exit(self.page, 'twofa_manual', timeout=30):
+                                    print(f"✅ 2FA resolvido após {time.time() - started:.0f} segundos!")
                                     # Screenshot de sucesso
                                     self.take_screenshot("2fa_resolved_success")
                                     return True
                                 
                                 # Screenshot a cada 30 segundos para acompanhar
-                                if (i+1) % 3 == 0:
-                                    self.take_screenshot(f"2fa_waiting_{(i+1)*10}s")
-                                    print(f"⏳ Ainda aguardando 2FA... ({(i+1)*10}s)")
+                                self.take_screenshot(f"2fa_waiting_{(i+1)*30}s", TRACE)
+                                print(f"⏳ Ainda aguardando 2FA... ({(i+1)*30}s)")
                             
                             # Verificação final
                             final_check_url = self.page.url
@@ -423,8 +421,8 @@ class AIStudioInteraction(AIStudioLogin2FA):
                     print("ℹ️ Configure credenciais ou faça login manualmente")
                     
                     # Aguardar login manual
-                    print("⏳ Aguardando 30 segundos para login manual...")
-                    time.sleep(30)
+                    print("⏳ Aguardando até 30 segundos para login manual...")
+                    wait_for_login_exit(self.page, 'manual_login', timeout=30)
                     
                     # Verificar se login foi concluído
                     final_url = self.page.url
@@ -442,14 +440,13 @@ class AIStudioInteraction(AIStudioLogin2FA):
             try:
                 next_button = self.page.locator('button:has-text("Next"), button:has-text("Avançar"), #identifierNext')
                 next_button.click()
-                time.sleep(3)
             except:
                 print("❌ Botão Avançar não encontrado")
                 return False
             
             # Aguardar página de senha
             print("🔒 Aguardando página de senha...")
-            time.sleep(3)
+            wait_for_any(self.page, ['input[type="password"]'], 'email_step')
             
             # Verificar se chegou na página de senha
             has_password_field = self.page.evaluate("""
@@ -464,8 +461,8 @@ class AIStudioInteraction(AIStudioLogin2FA):
                 print("ℹ️ Complete o login manualmente ou configure credenciais")
                 
                 # Aguardar um tempo para login manual
-                print("⏳ Aguardando 30 segundos para login manual...")
-                time.sleep(30)
+                print("⏳ Aguardando até 30 segundos para login manual...")
+                wait_for_login_exit(self.page, 'manual_login', timeout=30)
                 
                 # Verificar se login foi concluído
                 final_url = self.page.url
@@ -488,8 +485,11 @@ class AIStudioInteraction(AIStudioLogin2FA):
         try:
             print("🔍 Procurando campo de entrada...")
             
-            # Aguardar um pouco
-            time.sleep(2)
+            # Tentar primeiro o seletor aprendido em execuções anteriores
+            cached = self.find_cached("message_input", [], timeout=2000)
+            if cached:
+                print(f"✅ Campo encontrado (cache): {cached}")
+                return cached
             
             # Usar JavaScript para encontrar o melhor campo
             input_info = self.page.evaluate("""
@@ -555,6 +555,7 @@ class AIStudioInteraction(AIStudioLogin2FA):
                 print(f"✅ Campo encontrado: {input_info['selector']}")
                 print(f"   📐 Tamanho: {input_info['width']}x{input_info['height']}")
                 print(f"   📝 Placeholder: '{input_info['placeholder']}'")
+                self.selector_cache.record_hit("message_input", self.page.url, input_info['selector'])
                 return input_info['selector']
             else:
                 print("❌ Nenhum campo adequado encontrado")
@@ -575,49 +576,24 @@ class AIStudioInteraction(AIStudioLogin2FA):
                 print("❌ Campo não encontrado")
                 return False
             
-            # Focar e limpar
+            # Inserir o texto inteiro de uma vez (modo "fast") e conferir o campo
             print(f"🎯 Usando campo: {input_selector}")
-            self.page.click(input_selector)
-            time.sleep(0.5)
-            
-            # Limpar qualquer texto existente
-            self.page.evaluate(f"""
-                () => {{
-                    const field = document.querySelector('{input_selector}');
-                    if (field) {{
-                        field.value = '';
-                        if (field.textContent !== undefined) field.textContent = '';
-                        field.focus();
-                    }}
-                }}
-            """)
-            
-            time.sleep(0.5)
-            
-            # Digitar mensagem
-            print("⌨️ Digitando...")
-            self.page.type(input_selector, message, delay=50)
-            time.sleep(1)
+            if not enter_text(self.page, input_selector, message, self.input_mode):
+                print("❌ Texto não foi inserido corretamente no campo")
+                self.take_screenshot("send_input_mismatch_error")
+                return False
             
             # Screenshot antes de enviar
             self.take_screenshot("before_send")
             
             # Enviar com Enter
             print("📤 Enviando com Enter...")
+            self.arm_response_detector()
             self.page.press(input_selector, "Enter")
-            time.sleep(3)
             
             # Verificar se campo foi limpo (indica sucesso)
-            field_empty = self.page.evaluate(f"""
-                () => {{
-                    const field = document.querySelector('{input_selector}');
-                    if (field) {{
-                        const value = field.value || field.textContent || '';
-                        return value.trim() === '';
-                    }}
-                    return false;
-                }}
-            """)
+            field_empty = wait_until(lambda: not read_field(self.page, input_selector).strip(),
+                                     'send', page=self.page)
             
             if field_empty:
                 print("✅ Mensagem enviada (campo limpo)")
@@ -643,12 +619,12 @@ class AIStudioInteraction(AIStudioLogin2FA):
         """Aguarda resposta do AI"""
         try:
             print("🤖 Aguardando resposta...")
-            start_time = time.time()
             
-            while time.time() - start_time < timeout:
-                time.sleep(3)
-                
-                # Procurar resposta na página
+            # O observador instalado no envio sinaliza quando a resposta estabiliza
+            response = self.get_response_detector().wait(timeout)
+            
+            if not response:
+                # Última tentativa com a busca heurística na página
                 response = self.page.evaluate("""
                     () => {
                         // Selectors comuns para respostas de AI
@@ -687,23 +663,20 @@ class AIStudioInteraction(AIStudioLogin2FA):
                         return null;
                     }
                 """)
+            
+            if response:
+                print(f"✅ Resposta encontrada ({len(response)} chars)")
+                print(f"📝 Início: {response[:100]}...")
                 
-                if response:
-                    print(f"✅ Resposta encontrada ({len(response)} chars)")
-                    print(f"📝 Início: {response[:100]}...")
-                    
-                    # Adicionar ao histórico
-                    self.conversation_history.append({
-                        'type': 'assistant',
-                        'content': response,
-                        'timestamp': datetime.now().isoformat()
-                    })
-                    
-                    self.take_screenshot("response_received")
-                    return response
+                # Adicionar ao histórico
+                self.conversation_history.append({
+                    'type': 'assistant',
+                    'content': response,
+                    'timestamp': datetime.now().isoformat()
+                })
                 
-                elapsed = int(time.time() - start_time)
-                print(f"⏳ Aguardando... ({elapsed}s)")
+                self.take_screenshot("response_received")
+                return response
             
             print("⏰ Timeout - resposta não encontrada")
             return None
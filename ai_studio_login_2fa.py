@@ -11,22 +11,58 @@ import time
 import json
 from playwright.sync_api import sync_playwright
 from datetime import datetime
+from selector_engine import race_selectors, split_matches
+from selector_cache import SelectorCache
+from response_detector import ResponseCompletionDetector
+from capture_policy import get_capture_policy, ERROR
+from fast_input import DEFAULT_INPUT_MODE
+from waits import (
+    wait_until,
+    wait_for_page_ready,
+    wait_for_any,
+    wait_for_url_change,
+    wait_for_login_exit,
+    get_wait_report
+)
+from navigation import goto_app, HOME
+from route_policy import attach_route_policy, get_route_policy
+from asset_cache import get_asset_cache
+from session_probe import probe_session, VALID
+from auth_state import get_auth_store
+from profile_manager import get_profile_manager
+from tracing import Traced, get_tracer
+from ai_studio_selectors import (
+    LOGGED_IN_SELECTORS,
+    LOGIN_NEEDED_SELECTORS,
+    TWOFA_INDICATOR_SELECTORS,
+    TWOFA_CODE_FIELD_SELECTORS,
+    TWOFA_SUBMIT_SELECTORS
+)
 
-class AIStudioLogin2FA:
-    def __init__(self, headless=False):
+class AIStudioLogin2FA(Traced):
+    def __init__(self, headless=False, pool=None):
         """
         Inicializa sistema de login com 2FA
         
         Args:
             headless (bool): False para mostrar navegador (útil para debug)
+            pool (BrowserPool): Pool compartilhado; se informado, a página é
+                emprestada do pool em vez de lançar um navegador próprio
         """
         self.headless = headless
+        self.pool = pool
+        self.pooled_page = None
         self.user_data_dir = "/workspaces/replit/browser_profile"
+        self.profile_lease = None
         self.session_file = "/workspaces/replit/session_data.json"
+        self.selector_cache = SelectorCache()
         self.playwright = None
         self.browser = None
         self.context = None
         self.page = None
+        self.response_detector = None
+        # "fast" insere o prompt de uma vez; "human" digita caractere a caractere
+        self.input_mode = DEFAULT_INPUT_MODE
         
     def ensure_directories(self):
         """Cria diretórios necessários"""
@@ -35,6 +71,18 @@ class AIStudioLogin2FA:
         
     def initialize_browser(self):
         """Inicializa navegador com perfil persistente"""
+        if self.page and not self.page.is_closed():
+            return
+        
+        if self.pool:
+            self.ensure_directories()
+            self.pooled_page = self.pool.checkout()
+            self.context = self.pooled_page.context
+            self.page = self.pooled_page.page
+            self.response_detector = None
+            print("✅ Página emprestada do pool de navegadores")
+            return
+        
         try:
             self.ensure_directories()
             self.playwright = sync_playwright().start()
@@ -56,13 +104,19 @@ class AIStudioLogin2FA:
                 ]
             }
             
+            # Perfil exclusivo deste processo (clone do principal se estiver em uso)
+            self.profile_lease = get_profile_manager().lease_profile(self.user_data_dir)
+            
             # Usar contexto persistente para manter sessão
             self.context = self.playwright.chromium.launch_persistent_context(
-                self.user_data_dir,
+                self.profile_lease.path,
                 **launch_options,
                 viewport={'width': 1366, 'height': 768}
             )
             
+            # Bloquear imagens, fontes e analytics em execuções headless
+            attach_route_policy(self.context, self.headless)
+            
             self.page = self.context.new_page()
             
             # Script para mascarar automação
@@ -82,8 +136,87 @@ class AIStudioLogin2FA:
             self.cleanup()
             raise Exception(f"Erro ao inicializar navegador: {e}")
     
-    def save_session_info(self, status, details=None):
-        """Salva informações da sessão"""
+    def find_first_visible(self, selectors, timeout=5000):
+        """
+        Retorna o primeiro seletor visível da lista em ordem de prioridade
+        
+        Todos os candidatos são avaliados em uma única passada na página,
+        com um único prazo para a lista inteira.
+        
+        Args:
+            selectors (list): Seletores em ordem de prioridade
+            timeout (int): Prazo global em milissegundos
+        """
+        try:
+            return race_selectors(self.page, selectors, timeout=timeout)
+        except Exception as e:
+            print(f"⚠️ Erro ao resolver seletores: {e}")
+            return None
+    
+    def find_cached(self, kind, selectors, timeout=5000):
+        """
+        Resolve seletores usando o histórico de vencedores desta página
+        
+        O último vencedor e os seletores com maior taxa de acerto entram na
+        frente da lista, então execuções aquecidas resolvem na primeira
+        verificação.
+        
+        Args:
+            kind (str): Tipo de elemento procurado (ex.: "message_input")
+            selectors (list): Seletores estáticos em ordem de prioridade
+            timeout (int): Prazo global em milissegundos
+        """
+        url = self.page.url
+        ordered = self.selector_cache.order(kind, url, selectors)
+        if not ordered:
+            return None
+        
+        selector = self.find_first_visible(ordered, timeout=timeout)
+        self.selector_cache.record_result(kind, url, ordered, selector)
+        return selector
+    
+    def get_response_detector(self):
+        """Retorna o detector de conclusão de resposta da página atual"""
+        if not self.response_detector or self.response_detector.page is not self.page:
+            self.response_detector = ResponseCompletionDetector(self.page)
+        return self.response_detector
+    
+    def arm_response_detector(self):
+        """Instala o observador de resposta logo antes de enviar uma mensagem"""
+        try:
+            self.get_response_detector().arm()
+        except Exception as e:
+            print(f"⚠️ Erro ao armar detector de resposta: {e}")
+    
+    def capture_screenshot(self, name, kind=None, full_page=False):
+        """
+        Captura screenshot de diagnóstico conforme a política de captura
+        
+        Args:
+            name (str): Nome do arquivo (sem extensão)
+            kind (str): Tipo da captura (deduzido do nome se omitido)
+            full_page (bool): Página inteira em vez da área visível
+        
+        Returns:
+            str: Caminho gravado, ou None se a política não gravou em disco
+        """
+        try:
+            policy = get_capture_policy("login", os.getcwd())
+            return policy.capture(self.page, name, kind, full_page=full_page, path=f"{name}.png")
+        except Exception as e:
+            print(f"⚠️ Erro ao capturar screenshot: {e}")
+            return None
+    
+    def save_session_info(self, status, details=None, capture=True):
+        """
+        Salva informações da sessão
+        
+        Args:
+            status (str): Estado da sessão ("logged_in", ...)
+            details (dict): Detalhes extras gravados no arquivo
+            capture (bool): Exportar o storage_state do contexto para o armazém
+                quando o status for "logged_in"
+        """
         try:
             session_data = {
                 'timestamp': datetime.now().isoformat(),
@@ -97,6 +230,10 @@ class AIStudioLogin2FA:
                 
             print(f"💾 Sessão salva: {status}")
             
+            # Estado do perfil para a sonda rápida e para contextos novos já logados
+            if capture and status == "logged_in" and self.context:
+                get_auth_store().capture(self.context)
+        
         except Exception as e:
             print(f"⚠️ Erro ao salvar sessão: {e}")
     
@@ -111,64 +248,82 @@ class AIStudioLogin2FA:
             print(f"⚠️ Erro ao carregar sessão: {e}")
             return None
     
-    def check_if_logged_in(self):
-        """Verifica se já está logado no AI Studio"""
+    def _store_state_path(self):
+        """
+        storage_state de onde o contexto atual foi criado, se veio do armazém
+        
+        Só um slot do pool criado a partir do armazém tem os mesmos cookies do
+        arquivo; um perfil persistente (ou clone) tem cookies próprios.
+        
+        Returns:
+            str: Caminho da versão usada pelo slot, ou None
+        """
+        slot = self.pooled_page
+        if not slot or slot.auth_version is None or not self.pool or not self.pool.auth_store:
+            return None
+        return self.pool.auth_store.path_for(slot.auth_version)
+    
+    def check_if_logged_in(self, use_probe=True):
+        """
+        Verifica se já está logado no AI Studio
+        
+        Args:
+            use_probe (bool): Aceitar a sonda HTTP do estado salvo como atalho.
+                Só vale na entrada do fluxo: depois de senha/2FA o resultado
+                tem que vir da página, não de uma sessão antiga ainda válida.
+        """
         try:
             print("🔍 Verificando status de login...")
             
-            # Navegar para AI Studio
-            self.page.goto("https://aistudio.google.com/", timeout=30000)
-            self.page.wait_for_load_state('networkidle')
-            time.sleep(3)
+            # Sonda HTTP com os cookies do storage_state que criou este contexto.
+            # Só o resultado positivo é aceito, e ele não recaptura o estado:
+            # a página não foi conferida.
+            state_path = self._store_state_path() if use_probe else None
+            if state_path:
+                probe = probe_session(state_path)
+                if probe.status == VALID and self.page and "accounts.google.com" in self.page.url:
+                    print("ℹ️ Sonda válida, mas a página está no login do Google; verificando no navegador")
+                elif probe.status == VALID:
+                    print(f"⚡ Sessão válida pela sonda ({probe.elapsed_ms}ms) - {probe.reason}")
+                    self.save_session_info("logged_in", {"method": "probe"}, capture=False)
+                    return True
+                else:
+                    print(f"ℹ️ Sonda inconclusiva ({probe.status}: {probe.reason}), verificando no navegador")
+            
+            # Navegar para AI Studio (termina no primeiro sinal do app)
+            state = goto_app(self.page, "https://aistudio.google.com/", timeout=30000)
             
             current_url = self.page.url
             print(f"🔗 URL atual: {current_url}")
             
             # Capturar screenshot para análise
-            self.page.screenshot(path="login_status_check.png", full_page=True)
-            print("📸 Screenshot de status: login_status_check.png")
-            
-            # Indicadores de que está logado
-            logged_in_selectors = [
-                "text=Create new",
-                "text=New chat",
-                "text=Workspace",
-                "text=API key",
-                "[data-testid*='user']",
-                ".user-avatar",
-                "button[aria-label*='account']",
-                "button[aria-label*='profile']"
-            ]
-            
-            for selector in logged_in_selectors:
-                try:
-                    if self.page.is_visible(selector, timeout=2000):
-                        print(f"✅ Indicador de login encontrado: {selector}")
-                        self.save_session_info("logged_in", {"method": "existing_session"})
-                        return True
-                except:
-                    continue
+            if self.capture_screenshot("login_status_check", full_page=True):
+                print("📸 Screenshot de status: login_status_check.png")
             
             # Verificar se está na página de login
             if "accounts.google.com" in current_url:
                 print("⚠️ Redirecionado para login - não está logado")
                 return False
             
-            # Verificar por indicadores de login necessário
-            login_needed_selectors = [
-                "text=Get started",
-                "text=Sign in", 
-                "text=Login",
-                "text=Continue"
-            ]
+            # Só os marcadores de conta (HOME) provam a sessão: um campo de texto
+            # (CHAT_READY) também aparece em páginas deslogadas
+            if state == HOME:
+                print(f"✅ App pronto ({state}) - sessão ativa")
+                self.save_session_info("logged_in", {"method": "existing_session", "state": state})
+                return True
             
-            for selector in login_needed_selectors:
-                try:
-                    if self.page.is_visible(selector, timeout=2000):
-                        print(f"⚠️ Indicador de login necessário: {selector}")
-                        return False
-                except:
-                    continue
+            # Indicadores de login e de login necessário avaliados juntos
+            selector = self.find_first_visible(LOGGED_IN_SELECTORS + LOGIN_NEEDED_SELECTORS)
+            group = split_matches(selector, LOGGED_IN_SELECTORS, LOGIN_NEEDED_SELECTORS)
+            
+            if group == 0:
+                print(f"✅ Indicador de login encontrado: {selector}")
+                self.save_session_info("logged_in", {"method": "existing_session"})
+                return True
+            
+            if group == 1:
+                print(f"⚠️ Indicador de login necessário: {selector}")
+                return False
             
             # Se não encontrou indicadores claros, fazer análise mais profunda
             page_text = self.page.evaluate("() => document.body.textContent")
@@ -183,7 +338,7 @@ class AIStudioLogin2FA:
             
         except Exception as e:
             print(f"❌ Erro ao verificar login: {e}")
-            self.page.screenshot(path="login_check_error.png")
+            self.capture_screenshot("login_check_error", ERROR)
             return False
     
     def start_login_process(self, email, password):
@@ -194,7 +349,7 @@ class AIStudioLogin2FA:
             # Se não estiver na página de login, ir para lá
             if "accounts.google.com" not in self.page.url:
                 self.page.goto("https://accounts.google.com/signin")
-                time.sleep(2)
+                wait_for_any(self.page, ["input[type='email']", "input[name='identifier']"], 'page_load')
             
             # Inserir email
             email_selectors = [
@@ -209,7 +364,6 @@ class AIStudioLogin2FA:
                     if self.page.is_visible(selector, timeout=3000):
                         print(f"📧 Inserindo email no campo: {selector}")
                         self.page.fill(selector, email)
-                        time.sleep(1)
                         
                         # Clicar em "Próximo"
                         next_selectors = ["text=Next", "text=Próximo", "button[type='submit']"]
@@ -230,14 +384,13 @@ class AIStudioLogin2FA:
             if not email_inserted:
                 raise Exception("Não foi possível inserir email")
             
-            time.sleep(3)
-            
             # Inserir senha
             password_selectors = [
                 "input[type='password']",
                 "input[name='password']",
                 "#password"
             ]
+            wait_for_any(self.page, password_selectors, 'email_step')
             
             password_inserted = False
             for selector in password_selectors:
@@ -245,7 +398,6 @@ class AIStudioLogin2FA:
                     if self.page.is_visible(selector, timeout=5000):
                         print(f"🔒 Inserindo senha no campo: {selector}")
                         self.page.fill(selector, password)
-                        time.sleep(1)
                         
                         # Clicar em "Próximo" ou "Entrar"
                         submit_selectors = ["text=Next", "text=Próximo", "text=Sign in", "text=Entrar", "button[type='submit']"]
@@ -267,12 +419,12 @@ class AIStudioLogin2FA:
                 raise Exception("Não foi possível inserir senha")
             
             print("✅ Credenciais inseridas, aguardando resposta...")
-            time.sleep(5)
+            wait_until(lambda: not self.page.is_visible("input[type='password']"), 'password_step', page=self.page)
             return True
             
         except Exception as e:
             print(f"❌ Erro no processo de login: {e}")
-            self.page.screenshot(path="login_process_error.png")
+            self.capture_screenshot("login_process_error", ERROR)
             return False
     
     def detect_and_handle_2fa(self):
@@ -280,15 +432,15 @@ class AIStudioLogin2FA:
         try:
             print("🔍 Verificando se 2FA é necessário...")
             
-            # Aguardar um pouco para a página carregar
-            time.sleep(3)
+            # Aguardar a página carregar
+            wait_for_page_ready(self.page, 'twofa_detect')
             
             current_url = self.page.url
             print(f"🔗 URL atual: {current_url}")
             
             # Capturar screenshot da situação atual
-            self.page.screenshot(path="after_password.png", full_page=True)
-            print("📸 Screenshot após senha: after_password.png")
+            if self.capture_screenshot("after_password", full_page=True):
+                print("📸 Screenshot após senha: after_password.png")
             
             # Verificar se está na página de 2FA
             if "accounts.google.com" not in current_url:
@@ -296,36 +448,16 @@ class AIStudioLogin2FA:
                 return True
             
             # Procurar por campos/textos de 2FA
-            twofa_indicators = [
-                "text=Enter the code",
-                "text=verification code", 
-                "text=2-step verification",
-                "text=código de verificação",
-                "text=verificação em 2 etapas",
-                "input[type='tel']",
-                "input[name='totpPin']",
-                "input[autocomplete='one-time-code']",
-                "input[inputmode='numeric']",
-                "input[aria-label*='code']",
-                "input[aria-label*='pin']"
-            ]
-            
-            twofa_detected = False
             twofa_field = None
+            indicator = self.find_first_visible(TWOFA_INDICATOR_SELECTORS)
+            twofa_detected = indicator is not None
             
-            for indicator in twofa_indicators:
-                try:
-                    if self.page.is_visible(indicator, timeout=2000):
-                        print(f"🔍 Indicador de 2FA detectado: {indicator}")
-                        twofa_detected = True
-                        
-                        # Se for um campo de input, salvar para uso posterior
-                        if indicator.startswith("input"):
-                            twofa_field = indicator
-                        
-                        break
-                except:
-                    continue
+            if twofa_detected:
+                print(f"🔍 Indicador de 2FA detectado: {indicator}")
+                
+                # Se for um campo de input, salvar para uso posterior
+                if indicator.startswith("input"):
+                    twofa_field = indicator
             
             if not twofa_detected:
                 # Verificar por texto na página
@@ -341,13 +473,13 @@ class AIStudioLogin2FA:
             else:
                 print("ℹ️ 2FA não detectado, verificando se login foi concluído...")
                 
-                # Aguardar um pouco mais e verificar novamente
-                time.sleep(5)
-                return self.check_if_logged_in()
+                # Aguardar o redirecionamento para fora do login e verificar novamente
+                wait_for_login_exit(self.page, 'url_change')
+                return self.check_if_logged_in(use_probe=False)
                 
         except Exception as e:
             print(f"❌ Erro na detecção de 2FA: {e}")
-            self.page.screenshot(path="2fa_detection_error.png")
+            self.capture_screenshot("2fa_detection_error", ERROR)
             return False
     
     def handle_2fa_input(self, field_selector=None):
@@ -363,35 +495,19 @@ class AIStudioLogin2FA:
             
             # Tentar encontrar o campo de código se não foi fornecido
             if not field_selector:
-                code_field_selectors = [
-                    "input[type='tel']",
-                    "input[name='totpPin']",
-                    "input[autocomplete='one-time-code']",
-                    "input[inputmode='numeric']",
-                    "input[aria-label*='code']",
-                    "input[aria-label*='pin']",
-                    "input[maxlength='6']",
-                    "input[maxlength='8']"
-                ]
-                
-                for selector in code_field_selectors:
-                    try:
-                        if self.page.is_visible(selector, timeout=2000):
-                            field_selector = selector
-                            print(f"✅ Campo de código encontrado: {selector}")
-                            break
-                    except:
-                        continue
+                field_selector = self.find_first_visible(TWOFA_CODE_FIELD_SELECTORS)
+                if field_selector:
+                    print(f"✅ Campo de código encontrado: {field_selector}")
             
             if not field_selector:
                 print("⚠️ Campo de código não encontrado automaticamente")
                 print("📱 Verifique o screenshot e insira o código manualmente no navegador")
                 
                 # Aguardar um tempo para permitir inserção manual
-                print("⏳ Aguardando 120 segundos para inserção manual...")
-                time.sleep(120)
+                print("⏳ Aguardando até 120 segundos para inserção manual...")
+                wait_for_login_exit(self.page, 'twofa_manual')
                 
-                return self.check_if_logged_in()
+                return self.check_if_logged_in(use_probe=False)
             
             # Solicitar código ao usuário
             print("\n" + "="*50)
@@ -434,30 +550,18 @@ class AIStudioLogin2FA:
             # Inserir código
             print(f"⌨️ Inserindo código: {code}")
             self.page.fill(field_selector, code)
-            time.sleep(1)
             
             # Procurar e clicar botão de envio
-            submit_selectors = [
-                "text=Next",
-                "text=Próximo", 
-                "text=Verify",
-                "text=Verificar",
-                "text=Continue",
-                "text=Continuar",
-                "button[type='submit']",
-                "[data-testid*='submit']"
-            ]
-            
+            url_before_submit = self.page.url
             submitted = False
-            for selector in submit_selectors:
+            selector = self.find_first_visible(TWOFA_SUBMIT_SELECTORS)
+            if selector:
                 try:
-                    if self.page.is_visible(selector, timeout=2000):
-                        print(f"📤 Enviando via: {selector}")
-                        self.page.click(selector)
-                        submitted = True
-                        break
-                except:
-                    continue
+                    print(f"📤 Enviando via: {selector}")
+                    self.page.click(selector)
+                    submitted = True
+                except Exception:
+                    pass
             
             if not submitted:
                 # Tentar Enter
@@ -465,20 +569,20 @@ class AIStudioLogin2FA:
                 self.page.press(field_selector, "Enter")
             
             print("✅ Código 2FA enviado!")
-            time.sleep(5)
+            wait_for_url_change(self.page, url_before_submit)
             
             # Verificar resultado
             current_url = self.page.url
             print(f"🔗 URL após 2FA: {current_url}")
             
-            if "accounts.google.com" not in current_url or self.check_if_logged_in():
+            if "accounts.google.com" not in current_url or self.check_if_logged_in(use_probe=False):
                 print("🎉 2FA CONCLUÍDO COM SUCESSO!")
-                self.page.screenshot(path="2fa_success.png")
+                self.capture_screenshot("2fa_success")
                 self.save_session_info("logged_in", {"method": "2fa_completed"})
                 return True
             else:
                 print("❌ 2FA pode ter falhado")
-                self.page.screenshot(path="2fa_failed.png")
+                self.capture_screenshot("2fa_failed", ERROR)
                 
                 # Verificar se há mensagem de erro
                 error_text = self.page.evaluate("() => document.body.textContent")
@@ -490,7 +594,7 @@ class AIStudioLogin2FA:
                 
         except Exception as e:
             print(f"❌ Erro no manuseio do 2FA: {e}")
-            self.page.screenshot(path="2fa_handle_error.png")
+            self.capture_screenshot("2fa_handle_error", ERROR)
             return False
     
     def complete_login(self, email=None, password=None):
@@ -524,8 +628,8 @@ class AIStudioLogin2FA:
             if not self.detect_and_handle_2fa():
                 return False
             
-            # Verificação final
-            if self.check_if_logged_in():
+            # Verificação final (na página, sem o atalho da sonda)
+            if self.check_if_logged_in(use_probe=False):
                 print("\n🎉 LOGIN COMPLETO CONCLUÍDO COM SUCESSO!")
                 print("💾 Sessão salva no perfil do navegador")
                 print("⚡ Próximo login será mais rápido!")
@@ -536,7 +640,7 @@ class AIStudioLogin2FA:
                 
         except Exception as e:
             print(f"❌ Erro no login completo: {e}")
-            self.page.screenshot(path="complete_login_error.png")
+            self.capture_screenshot("complete_login_error", ERROR)
             return False
     
     def quick_login(self):
@@ -569,6 +673,25 @@ class AIStudioLogin2FA:
     
     def cleanup(self):
         """Limpa recursos"""
+        if self.pooled_page:
+            # Devolver a página ao pool em vez de fechar o navegador
+            self.pool.checkin(self.pooled_page)
+            self.pooled_page = None
+            self.context = None
+            self.page = None
+            self.response_detector = None
+            return
+        
+        # Tempo gasto esperando em cada etapa comparado ao orçamento
+        if get_wait_report().steps:
+            get_wait_report().print_report()
+        if get_route_policy().stats['requests']:
+            get_route_policy().print_report()
+        asset_cache = get_asset_cache()
+        if asset_cache and asset_cache.stats['hits'] + asset_cache.stats['misses']:
+            asset_cache.print_report()
+        get_tracer().print_report()
+        
         try:
             if self.page:
                 self.page.close()
@@ -578,6 +701,10 @@ class AIStudioLogin2FA:
                 self.playwright.stop()
         except:
             pass
+        
+        if self.profile_lease:
+            self.profile_lease.release()
+            self.profile_lease = None
 
 def main():
     """Função principal para teste"""
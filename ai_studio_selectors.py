@@ -0,0 +1,243 @@
+"""
+Seletores Compartilhados do Google AI Studio
+Listas em ordem de prioridade usadas pelos fluxos de login e interação
+"""
+
+# Indicadores de que a sessão está logada no AI Studio
+LOGGED_IN_SELECTORS = [
+    "text=Create new",
+    "text=New chat",
+    "text=Workspace",
+    "text=API key",
+    "[data-testid*='user']",
+    ".user-avatar",
+    "button[aria-label*='account']",
+    "button[aria-label*='profile']"
+]
+
+# Indicadores de que é necessário fazer login
+LOGIN_NEEDED_SELECTORS = [
+    "text=Get started",
+    "text=Sign in",
+    "text=Login",
+    "text=Continue"
+]
+
+# Indicadores de página de verificação em duas etapas
+TWOFA_INDICATOR_SELECTORS = [
+    "text=Enter the code",
+    "text=verification code",
+    "text=2-step verification",
+    "text=código de verificação",
+    "text=verificação em 2 etapas",
+    "input[type='tel']",
+    "input[name='totpPin']",
+    "input[autocomplete='one-time-code']",
+    "input[inputmode='numeric']",
+    "input[aria-label*='code']",
+    "input[aria-label*='pin']"
+]
+
+# Campos de entrada do código 2FA
+TWOFA_CODE_FIELD_SELECTORS = [
+    "input[type='tel']",
+    "input[name='totpPin']",
+    "input[autocomplete='one-time-code']",
+    "input[inputmode='numeric']",
+    "input[aria-label*='code']",
+    "input[aria-label*='pin']",
+    "input[maxlength='6']",
+    "input[maxlength='8']"
+]
+
+# Botões de envio do código 2FA
+TWOFA_SUBMIT_SELECTORS = [
+    "text=Next",
+    "text=Próximo",
+    "text=Verify",
+    "text=Verificar",
+    "text=Continue",
+    "text=Continuar",
+    "button[type='submit']",
+    "[data-testid*='submit']"
+]
+
+# Botões para criar novo chat (mais específicos primeiro)
+NEW_CHAT_SELECTORS = [
+    # Textos específicos de chat
+    "text=New chat",
+    "text=Novo chat",
+    "text=Create new chat",
+    "text=Criar novo chat",
+    "text=Start new conversation",
+    "text=Nova conversa",
+    
+    # Botões mais genéricos
+    "text=Create new",
+    "text=Criar novo",
+    "text=Start new",
+    
+    # Seletores por atributos
+    "[data-testid*='new-chat']",
+    "[data-testid*='create']",
+    "[aria-label*='new chat']",
+    "[aria-label*='create']",
+    "[aria-label*='novo']",
+    
+    # Seletores por classes comuns
+    ".new-chat-button",
+    ".create-button",
+    ".start-button",
+    
+    # Botões com texto específico
+    "button:has-text('New')",
+    "button:has-text('Create')",
+    "button:has-text('Novo')",
+    "button:has-text('Criar')",
+    
+    # Links com texto
+    "a:has-text('New')",
+    "a:has-text('Create')",
+    "a:has-text('Novo')",
+    
+    # Elementos com role button
+    "[role='button']:has-text('New')",
+    "[role='button']:has-text('Create')",
+    "[role='button']:has-text('Novo')"
+]
+
+# Campos de entrada de mensagem
+MESSAGE_INPUT_SELECTORS = [
+    # Seletores específicos do AI Studio
+    "textarea[placeholder*='message']",
+    "textarea[placeholder*='pergunt']",
+    "textarea[placeholder*='question']",
+    "textarea[placeholder*='prompt']",
+    "textarea[placeholder*='type']",
+    "textarea[placeholder*='enter']",
+    "textarea[placeholder*='ask']",
+    
+    # Seletores genéricos
+    "textarea",
+    "input[type='text']",
+    "[contenteditable='true']",
+    
+    # Por classes comuns
+    ".chat-input",
+    ".message-input",
+    ".prompt-input",
+    ".text-input",
+    
+    # Por atributos
+    "[data-testid*='input']",
+    "[data-testid*='message']",
+    "[data-testid*='prompt']",
+    "[role='textbox']",
+    "[aria-label*='message']",
+    "[aria-label*='prompt']",
+    "[aria-label*='input']"
+]
+
+# Botões de envio de mensagem
+SEND_BUTTON_SELECTORS = [
+    # Textos comuns
+    "text=Send",
+    "text=Enviar",
+    "text=Submit",
+    "text=Go",
+    
+    # Botões por tipo
+    "button[type='submit']",
+    
+    # Por atributos
+    "[aria-label*='send']",
+    "[aria-label*='enviar']",
+    "[aria-label*='submit']",
+    "[data-testid*='send']",
+    "[data-testid*='submit']",
+    
+    # Classes comuns
+    ".send-button",
+    ".submit-button",
+    
+    # Botões com ícones (comum em chats)
+    "button svg",
+    "button [role='img']",
+    "[role='button'] svg"
+]
+
+# Elementos de resposta do modelo
+RESPONSE_SELECTORS = [
+    # Seletores do AI Studio
+    "[data-message-author-role='model']",
+    ".model-response",
+    
+    # Elementos comuns de resposta
+    ".ai-response",
+    ".assistant-message",
+    ".bot-message",
+    ".response-content",
+    ".ai-message",
+    
+    # Por atributos
+    "[data-testid*='response']",
+    "[data-testid*='ai']",
+    "[data-testid*='assistant']",
+    "[role='article']",
+    
+    # Mensagens em geral (pegar a última)
+    ".message:last-child",
+    ".chat-message:last-child"
+]
+
+# Indicadores de que o modelo ainda está gerando a resposta
+TYPING_SELECTORS = [
+    ".typing",
+    ".loading",
+    ".generating",
+    "[data-testid*='typing']",
+    "[data-testid*='loading']"
+]
+
+# Botões para interromper a geração em andamento
+STOP_GENERATION_SELECTORS = [
+    "button[aria-label*='Stop']",
+    "button[aria-label*='Parar']",
+    "button:has-text('Stop')",
+    "button:has-text('Parar')"
+]
+
+# Botões "Get started" da página welcome
+GET_STARTED_SELECTORS = [
+    "text=Get started",
+    "button:has-text('Get started')",
+    "a:has-text('Get started')",
+    "[data-testid*='get-started']",
+    ".get-started",
+    "#get-started",
+    "button[aria-label*='Get started']",
+    "a[aria-label*='Get started']"
+]
+
+# Indicadores de 2FA usados pelo GoogleAIStudioAutomation
+AUTOMATION_2FA_INDICATOR_SELECTORS = [
+    "text=2-Step Verification",
+    "text=Verificação em duas etapas",
+    "text=Enter code",
+    "text=Digite o código",
+    "input[type='tel']",
+    "input[name='totpPin']",
+    "input[id*='code']",
+    "input[id*='pin']",
+    "[data-testid*='code']"
+]
+
+# Campos de código 2FA usados pelo GoogleAIStudioAutomation
+AUTOMATION_2FA_CODE_SELECTORS = [
+    "input[type='tel']",
+    "input[name='totpPin']",
+    "input[id*='code']",
+    "input[id*='pin']",
+    "input[autocomplete='one-time-code']",
+    "input[inputmode='numeric']"
+]
@@ -0,0 +1,630 @@
+"""
+Simulador Offline do Google AI Studio
+- Servidor HTTP local com páginas equivalentes às que os seletores procuram:
+  welcome, escolha de conta, email, senha, 2FA e a interface de chat
+- Respostas do modelo renderizadas token a token no ritmo configurado
+- Injeção de latência, carregamentos lentos e falhas (determinística com seed)
+- AI_STUDIO_SIMULATOR=<url> desvia aistudio.google.com e accounts.google.com de
+  todos os contextos (via attach_route_policy) e a sonda de sessão para o simulador
+"""
+
+import re
+import html
+import json
+import time
+import random
+import secrets
+import argparse
+import threading
+from string import Template
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Optional, Tuple
+from urllib.parse import parse_qs, quote, urlsplit
+
+# Gancho dos fluxos (reexportado para quem usa o simulador diretamente)
+from simulator_hook import (
+    SIMULATOR_ENV,
+    SIM_HOST_HEADER,
+    AI_STUDIO_HOST,
+    ACCOUNTS_HOST,
+    SIMULATED_HOSTS,
+    SIMULATED_URL_PATTERN,
+    simulator_url,
+    simulated_request,
+    attach_simulator,
+    attach_simulator_async
+)
+
+CHAT_PATH = "/app/prompts/new_chat"
+
+DEFAULT_CONFIG = {
+    # Latência e falhas
+    'latency_ms': 0,            # atraso de toda resposta do servidor
+    'slow_paths': {},           # trecho do caminho → atraso extra (ms)
+    'fail_paths': {},           # trecho do caminho → status HTTP de erro
+    'failure_rate': 0.0,        # fração das páginas que respondem 503
+    'seed': 0,                  # semente das falhas aleatórias
+    
+    # Login
+    'account_chooser': False,   # redirecionar para a escolha de conta em vez do email
+    'accounts': ["usuario.teste@gmail.com"],
+    'password': None,           # None aceita qualquer senha
+    'require_2fa': True,
+    'twofa_code': "123456",
+    'session_ttl': 86400,       # validade dos cookies de sessão (s)
+    
+    # Chat
+    'render_delay_ms': 300,     # montagem do campo de mensagem depois do carregamento
+    'first_token_ms': 800,      # do envio até o primeiro token
+    'token_ms': 40,             # intervalo entre tokens
+    'response_tokens': 40,      # tamanho da resposta gerada (palavras)
+    'response_text': None,      # texto fixo da resposta ({prompt} é substituído)
+    'response_error': False     # o modelo responde com erro em vez de texto
+}
+
+PAGE_TEMPLATE = Template("""<!DOCTYPE html>
+<html lang="en">
+<head>
+<meta charset="utf-8">
+<title>$title</title>
+<style>
+    body { font-family: sans-serif; margin: 0; }
+    main { max-width: 760px; margin: 40px auto; }
+    .card { border: 1px solid #ddd; border-radius: 8px; padding: 32px; }
+    input, textarea { width: 100%; min-height: 36px; font-size: 16px; box-sizing: border-box; }
+    textarea { min-height: 80px; }
+    button, .button { padding: 8px 24px; margin-top: 16px; display: inline-block; }
+    .error { color: #c00; }
+    [data-identifier] { padding: 12px; border-bottom: 1px solid #eee; cursor: pointer; }
+    .chat-turn { padding: 12px; margin: 8px 0; border-radius: 8px; }
+    .chat-turn.user { background: #eef; }
+    .chat-turn.model { background: #f6f6f6; }
+    .generating { color: #888; }
+    [hidden] { display: none !important; }
+</style>
+</head>
+<body>
+$body
+</body>
+</html>
+""")
+
+WELCOME_BODY = Template("""<main class="welcome">
+    <h1>Google AI Studio</h1>
+    <p>The fastest path from prompt to production with Gemini.</p>
+    <a class="get-started button" data-testid="get-started" href="$chat_url">Get started</a>
+    <a class="button" href="$signin_url">Sign in</a>
+</main>
+""")
+
+ACCOUNT_CHOOSER_BODY = Template("""<main class="card">
+    <h1>Choose an account</h1>
+    <p>to continue to Google AI Studio</p>
+    <div role="list">$accounts</div>
+    <div role="link" data-identifier="" onclick="location.href='$other_url'">Use another account</div>
+</main>
+""")
+
+ACCOUNT_ITEM = Template("""
+        <div role="link" data-identifier="$email" data-email="$email" onclick="location.href='$url'">$email</div>""")
+
+EMAIL_BODY = Template("""<main class="card">
+    <h1>Sign in</h1>
+    <p>to continue to Google AI Studio</p>
+    <form method="post" action="$action">
+        <input type="email" name="identifier" id="identifierId" autocomplete="username" aria-label="Email or phone">
+        <input type="hidden" name="continue" value="$continue_path">
+        <button type="submit">Next</button>
+    </form>
+</main>
+""")
+
+PASSWORD_BODY = Template("""<main class="card">
+    <h1>Welcome</h1>
+    <p>$email</p>
+    <form method="post" action="$action">
+        <input type="password" name="Passwd" id="password" autocomplete="current-password" aria-label="Enter your password">
+        <input type="hidden" name="identifier" value="$email">
+        <input type="hidden" name="continue" value="$continue_path">
+        <p class="error">$error</p>
+        <button type="submit">Next</button>
+    </form>
+</main>
+""")
+
+TWOFA_BODY = Template("""<main class="card">
+    <h1>2-Step Verification</h1>
+    <p>Enter the code from your authenticator app</p>
+    <form method="post" action="$action">
+        <input type="tel" name="totpPin" id="totpPin" autocomplete="one-time-code" inputmode="numeric"
+               maxlength="6" aria-label="Enter code">
+        <input type="hidden" name="continue" value="$continue_path">
+        <p class="error">$error</p>
+        <button type="submit">Next</button>
+    </form>
+</main>
+""")
+
+ERROR_BODY = Template("""<main class="card">
+    <h1>Something went wrong</h1>
+    <p class="error">Error $status</p>
+</main>
+""")
+
+CHAT_BODY = Template("""<header>
+    <a href="$chat_url" aria-label="New chat" data-testid="new-chat">New chat</a>
+    <button class="user-avatar" aria-label="Google account: $email">$initial</button>
+</header>
+<main class="chat">
+    <h2>Chat prompt</h2>
+    <div id="turns"></div>
+    <div class="generating" id="generating" hidden>Generating...</div>
+    <div id="composer"></div>
+</main>
+<script>
+(() => {
+    const options = $options;
+    const turns = document.getElementById('turns');
+    const generating = document.getElementById('generating');
+    let timers = [];
+    let busy = false;
+    let input, runButton, stopButton;
+    
+    const finish = () => {
+        timers.forEach(clearTimeout);
+        timers = [];
+        busy = false;
+        generating.hidden = true;
+        stopButton.hidden = true;
+        runButton.disabled = false;
+    };
+    
+    const addTurn = (role, text) => {
+        const turn = document.createElement('div');
+        turn.className = 'chat-turn ' + role;
+        turn.setAttribute('data-message-author-role', role);
+        if (role === 'model') turn.classList.add('model-response');
+        turn.textContent = text;
+        turns.appendChild(turn);
+        return turn;
+    };
+    
+    const send = async () => {
+        const prompt = input.value.trim();
+        if (!prompt || busy) return;
+        busy = true;
+        addTurn('user', prompt);
+        input.value = '';
+        runButton.disabled = true;
+        generating.hidden = false;
+        stopButton.hidden = false;
+        
+        let plan;
+        try {
+            const response = await fetch(options.generateUrl, {
+                method: 'POST',
+                headers: { 'Content-Type': 'application/json' },
+                body: JSON.stringify({ prompt: prompt })
+            });
+            plan = await response.json();
+        } catch (e) {
+            plan = { error: 'Failed to generate content' };
+        }
+        if (!busy) return;
+        
+        if (plan.error) {
+            timers.push(setTimeout(() => {
+                addTurn('model', 'An internal error has occurred. ' + plan.error);
+                finish();
+            }, plan.first_token_ms || 0));
+            return;
+        }
+        
+        // Um token por intervalo a partir do primeiro, como o streaming do app
+        let turn = null;
+        plan.tokens.forEach((token, index) => {
+            timers.push(setTimeout(() => {
+                if (!turn) turn = addTurn('model', '');
+                turn.textContent += token;
+                if (index === plan.tokens.length - 1) finish();
+            }, plan.first_token_ms + index * plan.token_ms));
+        });
+        if (!plan.tokens.length) finish();
+    };
+    
+    // O campo só aparece depois da "hidratação" do app
+    setTimeout(() => {
+        const composer = document.getElementById('composer');
+        input = document.createElement('textarea');
+        input.placeholder = 'Start typing a prompt';
+        input.setAttribute('aria-label', 'Type something or pick a prompt');
+        input.addEventListener('keydown', (event) => {
+            if (event.key === 'Enter' && !event.shiftKey) {
+                event.preventDefault();
+                send();
+            }
+        });
+        
+        runButton = document.createElement('button');
+        runButton.type = 'submit';
+        runButton.textContent = 'Run';
+        runButton.setAttribute('aria-label', 'Run (send)');
+        runButton.addEventListener('click', send);
+        
+        stopButton = document.createElement('button');
+        stopButton.textContent = 'Stop';
+        stopButton.setAttribute('aria-label', 'Stop generation');
+        stopButton.hidden = true;
+        stopButton.addEventListener('click', finish);
+        
+        composer.append(input, runButton, stopButton);
+    }, options.renderDelayMs);
+})();
+</script>
+""")
+
+class AIStudioSimulator:
+    """
+    Servidor local que imita o AI Studio e o login do Google
+    
+    Acesso direto: http://127.0.0.1:<porta>/aistudio.google.com/... e
+    /accounts.google.com/... (as URLs contêm o host, então as verificações de
+    URL dos fluxos continuam valendo). Pelo Playwright, attach_simulator()
+    desvia as URLs reais e os redirecionamentos voltam a apontar para elas.
+    
+    O streaming é feito por timers na página: a resposta HTTP é entregue de
+    uma vez e os tokens aparecem no DOM em first_token_ms + n * token_ms.
+    """
+    
+    def __init__(self, host: str = "127.0.0.1", port: int = 0, **config):
+        """
+        Inicializa o simulador (use start() ou um bloco with)
+        
+        Args:
+            host (str): Endereço de escuta
+            port (int): Porta (0 = escolhida pelo sistema)
+            **config: Sobrescreve DEFAULT_CONFIG
+        """
+        self.host = host
+        self.port = port
+        self.config = dict(DEFAULT_CONFIG)
+        self.configure(**config)
+        self.sessions: Dict[str, float] = {}
+        self.lock = threading.Lock()
+        self.stats = {'requests': 0, 'failures': 0, 'logins': 0, 'generations': 0}
+        self.server = None
+        self.thread = None
+    
+    def configure(self, **changes):
+        """Altera a configuração em tempo de execução (ex.: ligar falhas no meio do teste)"""
+        unknown = set(changes) - set(DEFAULT_CONFIG)
+        if unknown:
+            raise Exception(f"Opções desconhecidas do simulador: {', '.join(sorted(unknown))}")
+        self.config.update(changes)
+        if 'seed' in changes or not hasattr(self, 'random'):
+            self.random = random.Random(self.config['seed'])
+    
+    @property
+    def base_url(self) -> str:
+        return f"http://{self.host}:{self.port}"
+    
+    def start(self):
+        """Inicia o servidor em uma thread"""
+        if self.server:
+            return self
+        handler = type("SimulatorRequestHandler", (SimulatorRequestHandler,), {'simulator': self})
+        self.server = ThreadingHTTPServer((self.host, self.port), handler)
+        self.port = self.server.server_address[1]
+        self.thread = threading.Thread(target=self.server.serve_forever, name="ai-studio-simulator",
+                                       daemon=True)
+        self.thread.start()
+        print(f"🧪 Simulador do AI Studio em {self.base_url}")
+        return self
+    
+    def stop(self):
+        if self.server:
+            self.server.shutdown()
+            self.server.server_close()
+            self.server = None
+    
+    def __enter__(self):
+        return self.start()
+    
+    def __exit__(self, exc_type, exc, tb):
+        self.stop()
+    
+    def create_session(self) -> str:
+        """Registra uma sessão logada e retorna o valor do cookie"""
+        token = secrets.token_hex(16)
+        with self.lock:
+            self.sessions[token] = time.time() + self.config['session_ttl']
+        return token
+    
+    def expire_sessions(self):
+        """Invalida todas as sessões (simula logout/expiração no servidor)"""
+        with self.lock:
+            self.sessions.clear()
+    
+    def is_session_valid(self, token: Optional[str]) -> bool:
+        with self.lock:
+            expires = self.sessions.get(token or "")
+        return expires is not None and expires > time.time()
+    
+    def session_cookies(self, routed: bool = True) -> list:
+        """
+        Cookies de uma sessão nova no formato de context.add_cookies()
+        
+        Args:
+            routed (bool): True para os domínios reais (attach_simulator), False
+                para o acesso direto ao endereço do simulador
+        """
+        token = self.create_session()
+        expires = time.time() + self.config['session_ttl']
+        if not routed:
+            return [{'name': 'SID', 'value': token, 'url': self.base_url, 'expires': expires}]
+        return [{'name': name, 'value': token, 'domain': '.google.com', 'path': '/',
+                 'expires': expires, 'secure': True}
+                for name in ('SID', '__Secure-1PSID')]
+    
+    def response_tokens(self, prompt: str) -> list:
+        """Tokens da resposta simulada (palavras com o espaço seguinte)"""
+        template = self.config['response_text']
+        if template:
+            text = template.replace("{prompt}", prompt)
+        else:
+            words = [f"Esta é uma resposta simulada do AI Studio para: {prompt}."]
+            filler = ("O simulador gera texto determinístico para medir o tempo até o primeiro "
+                      "token e o tempo até a resposta completa sem acessar a rede.").split()
+            needed = max(0, self.config['response_tokens'] - len(words[0].split()))
+            words.extend(filler[index % len(filler)] for index in range(needed))
+            text = " ".join(words)
+        return re.findall(r"\S+\s*", text)
+
+class SimulatorRequestHandler(BaseHTTPRequestHandler):
+    """Rotas das páginas simuladas (um host por prefixo ou pelo cabeçalho X-Sim-Host)"""
+    
+    simulator: AIStudioSimulator = None
+    
+    def _target(self) -> Tuple[str, str, dict, bool]:
+        """Host simulado, caminho, parâmetros e se a requisição veio desviada"""
+        parts = urlsplit(self.path)
+        path = parts.path or "/"
+        routed_host = self.headers.get(SIM_HOST_HEADER)
+        if routed_host:
+            host = routed_host
+        else:
+            segments = path.lstrip("/").split("/", 1)
+            if segments[0] in SIMULATED_HOSTS:
+                host = segments[0]
+                path = "/" + (segments[1] if len(segments) > 1 else "")
+            else:
+                host = AI_STUDIO_HOST
+        query = {key: values[-1] for key, values in parse_qs(parts.query).items()}
+        return host, path, query, bool(routed_host)
+    
+    def _link(self, host: str, path: str) -> str:
+        """URL de uma página simulada do ponto de vista do navegador"""
+        return f"https://{host}{path}" if self.routed else f"/{host}{path}"
+    
+    def _session_token(self) -> Optional[str]:
+        for chunk in (self.headers.get("Cookie") or "").split(";"):
+            name, _, value = chunk.strip().partition("=")
+            if name in ("SID", "__Secure-1PSID"):
+                return value
+        return None
+    
+    def _send(self, status: int, body: str = "", content_type: str = "text/html; charset=utf-8",
+              headers: Optional[list] = None):
+        data = body.encode('utf-8')
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(data)))
+        self.send_header("Cache-Control", "no-store")
+        for name, value in headers or []:
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
+    
+    def _page(self, title: str, body: str, status: int = 200, headers: Optional[list] = None):
+        self._send(status, PAGE_TEMPLATE.substitute(title=title, body=body), headers=headers)
+    
+    def _redirect(self, host: str, path: str, headers: Optional[list] = None):
+        self._send(302, headers=[("Location", self._link(host, path))] + (headers or []))
+    
+    def _read_form(self) -> dict:
+        length = int(self.headers.get("Content-Length", 0))
+        raw = self.rfile.read(length).decode('utf-8') if length else ""
+        if "json" in (self.headers.get("Content-Type") or ""):
+            try:
+                return json.loads(raw or "{}")
+            except ValueError:
+                return {}
+        return {key: values[-1] for key, values in parse_qs(raw).items()}
+    
+    def _inject_faults(self, path: str) -> bool:
+        """Aplica latência e falhas configuradas; True se a resposta já foi enviada"""
+        sim = self.simulator
+        config = sim.config
+        delay_ms = config['latency_ms'] + sum(extra for fragment, extra in config['slow_paths'].items()
+                                              if fragment in path)
+        if delay_ms:
+            time.sleep(delay_ms / 1000)
+        
+        with sim.lock:
+            sim.stats['requests'] += 1
+            status = next((code for fragment, code in config['fail_paths'].items() if fragment in path), None)
+            if status is None and config['failure_rate'] and sim.random.random() < config['failure_rate']:
+                status = 503
+            if status:
+                sim.stats['failures'] += 1
+        if status:
+            self._page("Error", ERROR_BODY.substitute(status=status), status=status)
+            return True
+        return False
+    
+    @staticmethod
+    def _continue_path(value: Optional[str]) -> str:
+        """Caminho do AI Studio a abrir depois do login (aceita a URL real em continue)"""
+        if not value:
+            return CHAT_PATH
+        parts = urlsplit(value)
+        if parts.netloc and parts.netloc != AI_STUDIO_HOST:
+            return CHAT_PATH
+        path = parts.path
+        for host in SIMULATED_HOSTS:
+            if path.startswith(f"/{host}"):
+                path = path[len(host) + 1:]
+        return (path or "/") + (f"?{parts.query}" if parts.query else "")
+    
+    def _login_cookies(self) -> list:
+        sim = self.simulator
+        token = sim.create_session()
+        with sim.lock:
+            sim.stats['logins'] += 1
+        max_age = sim.config['session_ttl']
+        if not self.routed:
+            return [("Set-Cookie", f"SID={token}; Path=/; Max-Age={max_age}")]
+        return [("Set-Cookie", f"{name}={token}; Path=/; Domain=.google.com; Max-Age={max_age}; Secure")
+                for name in ("SID", "__Secure-1PSID")]
+    
+    def do_GET(self):
+        self._handle("GET")
+    
+    def do_POST(self):
+        self._handle("POST")
+    
+    def _handle(self, method: str):
+        host, path, query, self.routed = self._target()
+        if self._inject_faults(path):
+            return
+        if host == ACCOUNTS_HOST:
+            self._accounts(method, path, query)
+        else:
+            self._ai_studio(method, path)
+    
+    def _ai_studio(self, method: str, path: str):
+        sim = self.simulator
+        logged_in = sim.is_session_valid(self._session_token())
+        
+        if path == "/__sim/generate" and method == "POST":
+            prompt = str(self._read_form().get('prompt', ""))
+            with sim.lock:
+                sim.stats['generations'] += 1
+            plan = {'first_token_ms': sim.config['first_token_ms'], 'token_ms': sim.config['token_ms']}
+            if sim.config['response_error']:
+                plan['error'] = "Failed to generate content"
+            else:
+                plan['tokens'] = sim.response_tokens(prompt)
+            self._send(200, json.dumps(plan), "application/json")
+        elif path == "/":
+            self._redirect(AI_STUDIO_HOST, CHAT_PATH if logged_in else "/welcome")
+        elif path == "/welcome":
+            self._page("Google AI Studio", WELCOME_BODY.substitute(
+                chat_url=self._link(AI_STUDIO_HOST, CHAT_PATH),
+                signin_url=self._link(ACCOUNTS_HOST, f"/v3/signin/identifier?continue={quote(CHAT_PATH)}")))
+        elif path.startswith(("/app/", "/prompts/", "/u/")):
+            if not logged_in:
+                entry = "/accountchooser" if sim.config['account_chooser'] else "/v3/signin/identifier"
+                self._redirect(ACCOUNTS_HOST, f"{entry}?continue={quote(path)}")
+                return
+            email = sim.config['accounts'][0] if sim.config['accounts'] else "usuario@gmail.com"
+            options = {
+                'generateUrl': self._link(AI_STUDIO_HOST, "/__sim/generate"),
+                'renderDelayMs': sim.config['render_delay_ms']
+            }
+            self._page("Google AI Studio", CHAT_BODY.substitute(
+                chat_url=self._link(AI_STUDIO_HOST, CHAT_PATH), email=html.escape(email),
+                initial=html.escape(email[:1].upper()), options=json.dumps(options)))
+        else:
+            self._page("Not Found", ERROR_BODY.substitute(status=404), status=404)
+    
+    def _accounts(self, method: str, path: str, query: dict):
+        sim = self.simulator
+        form = self._read_form() if method == "POST" else {}
+        continue_path = self._continue_path(form.get('continue') or query.get('continue'))
+        email = form.get('identifier') or query.get('identifier') or ""
+        
+        def action(target: str) -> str:
+            return html.escape(self._link(ACCOUNTS_HOST, target))
+        
+        def challenge(target: str) -> str:
+            return f"{target}?continue={quote(continue_path)}&identifier={quote(email)}"
+        
+        if path == "/accountchooser":
+            items = "".join(ACCOUNT_ITEM.substitute(
+                email=html.escape(account),
+                url=self._link(ACCOUNTS_HOST, f"/v3/signin/challenge/pwd?continue={quote(continue_path)}"
+                                              f"&identifier={quote(account)}"))
+                for account in sim.config['accounts'])
+            self._page("Choose an account", ACCOUNT_CHOOSER_BODY.substitute(
+                accounts=items,
+                other_url=self._link(ACCOUNTS_HOST, f"/v3/signin/identifier?continue={quote(continue_path)}")))
+        elif path in ("/signin", "/ServiceLogin", "/v3/signin/identifier", "/signin/v2/identifier"):
+            if method == "POST" and email:
+                self._redirect(ACCOUNTS_HOST, challenge("/v3/signin/challenge/pwd"))
+                return
+            self._page("Sign in - Google Accounts", EMAIL_BODY.substitute(
+                action=action("/v3/signin/identifier"), continue_path=html.escape(continue_path)))
+        elif "/challenge/pwd" in path:
+            error = ""
+            if method == "POST":
+                expected = sim.config['password']
+                if expected is None or form.get('Passwd') == expected:
+                    if sim.config['require_2fa']:
+                        self._redirect(ACCOUNTS_HOST, challenge("/v3/signin/challenge/totp"))
+                    else:
+                        self._redirect(AI_STUDIO_HOST, continue_path, self._login_cookies())
+                    return
+                error = "Wrong password. Try again or click Forgot password to reset it."
+            self._page("Sign in - Google Accounts", PASSWORD_BODY.substitute(
+                action=action("/v3/signin/challenge/pwd"), email=html.escape(email),
+                continue_path=html.escape(continue_path), error=error))
+        elif "/challenge/totp" in path:
+            error = ""
+            if method == "POST":
+                if form.get('totpPin', "").strip() == sim.config['twofa_code']:
+                    self._redirect(AI_STUDIO_HOST, continue_path, self._login_cookies())
+                    return
+                error = "Wrong code. Try again."
+            self._page("2-Step Verification", TWOFA_BODY.substitute(
+                action=action("/v3/signin/challenge/totp"), continue_path=html.escape(continue_path),
+                error=error))
+        else:
+            self._page("Not Found", ERROR_BODY.substitute(status=404), status=404)
+    
+    def log_message(self, format, *args):
+        # Sem log por requisição: os fluxos fazem muitas
+        pass
+
+def main():
+    """Executa o simulador pela linha de comando"""
+    parser = argparse.ArgumentParser(description="Simulador offline do Google AI Studio")
+    parser.add_argument("--host", default="127.0.0.1", help="Endereço de escuta")
+    parser.add_argument("-p", "--port", type=int, default=8800, help="Porta HTTP")
+    parser.add_argument("--latency-ms", type=int, default=0, help="Atraso de toda resposta")
+    parser.add_argument("--first-token-ms", type=int, default=DEFAULT_CONFIG['first_token_ms'],
+                        help="Tempo até o primeiro token")
+    parser.add_argument("--token-ms", type=int, default=DEFAULT_CONFIG['token_ms'], help="Intervalo entre tokens")
+    parser.add_argument("--failure-rate", type=float, default=0.0, help="Fração de páginas com erro 503")
+    parser.add_argument("--seed", type=int, default=0, help="Semente das falhas aleatórias")
+    parser.add_argument("--no-2fa", action="store_true", help="Login sem verificação em duas etapas")
+    parser.add_argument("--account-chooser", action="store_true", help="Começar o login pela escolha de conta")
+    args = parser.parse_args()
+    
+    simulator = AIStudioSimulator(args.host, args.port, latency_ms=args.latency_ms,
+                                  first_token_ms=args.first_token_ms, token_ms=args.token_ms,
+                                  failure_rate=args.failure_rate, seed=args.seed,
+                                  require_2fa=not args.no_2fa, account_chooser=args.account_chooser)
+    simulator.start()
+    print(f"💡 Para usar nos fluxos: export {SIMULATOR_ENV}={simulator.base_url}")
+    print(f"🔢 Código 2FA: {simulator.config['twofa_code']}")
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        print("\n⚠️ Encerrando simulador...")
+    finally:
+        simulator.stop()
+
+if __name__ == "__main__":
+    main()
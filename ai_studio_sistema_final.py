@@ -14,6 +14,8 @@ sys.path.append('/workspaces/replit')
 
 from ai_studio_login_2fa import AIStudioLogin2FA
 from credentials_manager import CredentialsManager
+from waits import wait_until, wait_for_page_ready, wait_for_url, wait_for_url_change
+from navigation import goto_app
 
 class AIStudioFinalWorking(AIStudioLogin2FA):
     
@@ -78,8 +80,7 @@ class AIStudioFinalWorking(AIStudioLogin2FA):
             target_url = "https://aistudio.google.com/u/3/prompts/new_chat"
             print(f"🔗 Acessando: {target_url}")
             
-            self.page.goto(target_url, timeout=30000)
-            time.sleep(3)
+            goto_app(self.page, target_url, timeout=30000)
             
             current_url = self.page.url
             print(f"📍 URL inicial: {current_url}")
@@ -108,7 +109,7 @@ class AIStudioFinalWorking(AIStudioLogin2FA):
                             elements.first.click()
                             print("✅ Conta clicada")
                             
-                            time.sleep(5)
+                            wait_for_url_change(self.page, current_url, 'account_select')
                             current_url = self.page.url
                             
                             if "challenge/pwd" in current_url:
@@ -150,8 +151,8 @@ class AIStudioFinalWorking(AIStudioLogin2FA):
                     self.page.keyboard.press('Enter')
                     print("✅ Formulário enviado")
                     
-                    # Aguardar processamento
-                    time.sleep(5)
+                    # Aguardar processamento (campo de senha sai da tela)
+                    wait_until(lambda: not self.page.is_visible('input[type="password"]'), 'password_step', page=self.page)
                     current_url = self.page.url
                     print(f"📍 URL após senha: {current_url}")
                     
@@ -169,15 +170,9 @@ class AIStudioFinalWorking(AIStudioLogin2FA):
                 self.take_screenshot("06_2fa_page")
                 
                 # Aguardar até 60 segundos para 2FA
-                for i in range(12):  # 12 * 5 = 60 segundos
-                    time.sleep(5)
-                    current_url = self.page.url
-                    
-                    if "aistudio.google.com" in current_url:
-                        print("✅ 2FA aprovado automaticamente!")
-                        break
-                    
-                    print(f"⏳ Aguardando... ({(i+1)*5}s/60s)")
+                print("⏳ Aguardando até 60s...")
+                if wait_for_url(self.page, lambda url: "aistudio.google.com" in url, 'twofa_manual', timeout=60):
+                    print("✅ 2FA aprovado automaticamente!")
                 
                 self.take_screenshot("07_after_2fa")
             
@@ -190,13 +185,12 @@ class AIStudioFinalWorking(AIStudioLogin2FA):
                 self.take_screenshot("08_success_ai_studio")
                 
                 # Aguardar página carregar
-                time.sleep(5)
+                wait_for_page_ready(self.page)
                 
                 # Tentar ir para o chat específico
                 try:
                     chat_url = "https://aistudio.google.com/u/3/prompts/new_chat"
-                    self.page.goto(chat_url, timeout=15000)
-                    time.sleep(3)
+                    goto_app(self.page, chat_url, timeout=15000)
                     
                     final_chat_url = self.page.url
                     print(f"📍 URL do chat: {final_chat_url}")
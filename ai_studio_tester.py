@@ -4,56 +4,89 @@
 Testa se conseguimos acessar AI Studio sem login
 """
 
-import requests
 import json
 import time
 from pathlib import Path
+from http_probe import HTTPProbe
+
+URLS_TO_TEST = [
+    "https://aistudio.google.com/",
+    "https://aistudio.google.com/app",
+    "https://aistudio.google.com/prompts",
+    "https://aistudio.google.com/prompts/new_chat",
+    "https://makersuite.google.com/",
+    "https://bard.google.com/",
+    "https://gemini.google.com/"
+]
+
+PUBLIC_PATHS = [
+    "/api/models",
+    "/api/chat",
+    "/api/generate",
+    "/v1/models",
+    "/health",
+    "/status",
+    "/.well-known/openapi",
+    "/docs",
+    "/swagger",
+    "/api/docs"
+]
+
+PUBLIC_BASE_URLS = [
+    "https://aistudio.google.com",
+    "https://makersuite.google.com"
+]
+
+AUTH_TEST_URL = "https://aistudio.google.com/api/models"
+
+# Tentar com diferentes tipos de auth
+AUTH_HEADERS = {
+    "API Key": {"X-API-Key": "test", "Authorization": "Bearer test"},
+    "OAuth": {"Authorization": "Bearer test_token"},
+    "Session": {"Cookie": "session=test"}
+}
+
+GEMINI_URLS = [
+    "https://generativelanguage.googleapis.com/v1/models",
+    "https://ai.google.dev/api",
+    "https://developers.generativeai.google/api"
+]
 
 class AIStudioTester:
     def __init__(self):
-        self.session = requests.Session()
-        
-        # Headers para simular navegador
-        self.session.headers.update({
-            'User-Agent': 'Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
-            'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
-            'Accept-Language': 'en-US,en;q=0.5',
-            'Accept-Encoding': 'gzip, deflate, br',
-            'DNT': '1',
-            'Connection': 'keep-alive',
-            'Upgrade-Insecure-Requests': '1',
-        })
+        # Conexões reaproveitadas, cookies em memória e requisições em paralelo
+        self.http = HTTPProbe(max_workers=16, timeout=10)
+        self.session = self.http.session
+    
+    def url_matrix(self):
+        """Todas as requisições do teste completo, para dispará-las de uma vez"""
+        specs = list(URLS_TO_TEST)
+        specs.extend({'url': f"{base}{path}", 'timeout': 5} for base in PUBLIC_BASE_URLS for path in PUBLIC_PATHS)
+        specs.extend({'url': AUTH_TEST_URL, 'headers': headers, 'timeout': 5} for headers in AUTH_HEADERS.values())
+        specs.extend(GEMINI_URLS)
+        return specs
         
     def test_urls(self):
         """Testa diferentes URLs do AI Studio"""
         print("🧪 TESTANDO ACESSO DIRETO AO AI STUDIO")
         print("=" * 50)
         
-        urls_to_test = [
-            "https://aistudio.google.com/",
-            "https://aistudio.google.com/app",
-            "https://aistudio.google.com/prompts",
-            "https://aistudio.google.com/prompts/new_chat",
-            "https://makersuite.google.com/",
-            "https://bard.google.com/",
-            "https://gemini.google.com/"
-        ]
-        
         results = {}
         
-        for url in urls_to_test:
+        for url, response in zip(URLS_TO_TEST, self.http.fetch_all(URLS_TO_TEST)):
             print(f"\n🔍 Testando: {url}")
             try:
-                response = self.session.get(url, timeout=10)
-                print(f"   📊 Status: {response.status_code}")
-                print(f"   🌐 URL final: {response.url}")
+                if response.error:
+                    raise Exception(response.error)
+                print(f"   📊 Status: {response.status} ({response.elapsed_ms:.0f}ms)")
+                print(f"   🌐 URL final: {response.final_url}")
                 print(f"   📏 Tamanho: {len(response.text)} bytes")
                 
                 # Verificar se há redirecionamento para login
-                if "accounts.google.com" in response.url:
+                if "accounts.google.com" in response.final_url:
                     print("   🔐 Redirecionou para login")
                     results[url] = "LOGIN_REQUIRED"
-                elif response.status_code == 200:
+                elif response.status == 200:
                     print("   ✅ Acessível!")
                     results[url] = "ACCESSIBLE"
                     
@@ -67,8 +100,8 @@ class AIStudioTester:
                         f.write(response.text)
                     print(f"   💾 Salvo em: {filename}")
                 else:
-                    print(f"   ❌ Erro: {response.status_code}")
-                    results[url] = f"ERROR_{response.status_code}"
+                    print(f"   ❌ Erro: {response.status}")
+                    results[url] = f"ERROR_{response.status}"
                     
             except Exception as e:
                 print(f"   ❌ Exceção: {e}")
@@ -81,92 +114,62 @@ class AIStudioTester:
         print("\n🔍 PROCURANDO ENDPOINTS PÚBLICOS")
         print("=" * 50)
         
-        public_paths = [
-            "/api/models",
-            "/api/chat",
-            "/api/generate",
-            "/v1/models",
-            "/health",
-            "/status",
-            "/.well-known/openapi",
-            "/docs",
-            "/swagger",
-            "/api/docs"
-        ]
+        # Todas as combinações base × caminho em paralelo
+        specs = [{'url': f"{base}{path}", 'timeout': 5} for base in PUBLIC_BASE_URLS for path in PUBLIC_PATHS]
+        responses = iter(self.http.fetch_all(specs))
         
-        base_urls = [
-            "https://aistudio.google.com",
-            "https://makersuite.google.com"
-        ]
-        
-        for base in base_urls:
+        for base in PUBLIC_BASE_URLS:
             print(f"\n🌐 Base: {base}")
-            for path in public_paths:
-                url = f"{base}{path}"
-                try:
-                    response = self.session.get(url, timeout=5)
-                    if response.status_code != 404:
-                        print(f"   ✅ {path} -> {response.status_code}")
-                        if response.status_code == 200:
-                            print(f"      📏 {len(response.text)} bytes")
-                except:
-                    pass
+            for path in PUBLIC_PATHS:
+                response = next(responses)
+                if response.ok and response.status != 404:
+                    print(f"   ✅ {path} -> {response.status} ({response.elapsed_ms:.0f}ms)")
+                    if response.status == 200:
+                        print(f"      📏 {len(response.text)} bytes")
                     
     def check_authentication_methods(self):
         """Verifica métodos de autenticação"""
         print("\n🔐 VERIFICANDO MÉTODOS DE AUTENTICAÇÃO")
         print("=" * 50)
         
-        # Tentar com diferentes tipos de auth
-        auth_headers = {
-            "API Key": {"X-API-Key": "test", "Authorization": "Bearer test"},
-            "OAuth": {"Authorization": "Bearer test_token"},
-            "Session": {"Cookie": "session=test"}
-        }
-        
-        test_url = "https://aistudio.google.com/api/models"
+        # Cabeçalhos de cada tipo somados aos da sessão, em paralelo
+        responses = self.http.fetch_all([
+            {'url': AUTH_TEST_URL, 'headers': headers, 'timeout': 5} for headers in AUTH_HEADERS.values()
+        ])
         
-        for auth_type, headers in auth_headers.items():
+        for auth_type, response in zip(AUTH_HEADERS, responses):
             print(f"\n🔑 Testando {auth_type}:")
-            try:
-                temp_headers = self.session.headers.copy()
-                temp_headers.update(headers)
-                
-                response = requests.get(test_url, headers=temp_headers, timeout=5)
-                print(f"   📊 Status: {response.status_code}")
-                
-                if response.status_code != 404:
-                    print(f"   📝 Response: {response.text[:200]}...")
-                    
-            except Exception as e:
-                print(f"   ❌ Erro: {e}")
+            if response.error:
+                print(f"   ❌ Erro: {response.error}")
+                continue
+            
+            print(f"   📊 Status: {response.status} ({response.elapsed_ms:.0f}ms)")
+            if response.status != 404:
+                print(f"   📝 Response: {response.text[:200]}...")
                 
     def test_gemini_api(self):
         """Testa acesso direto à API do Gemini"""
         print("\n💎 TESTANDO API GEMINI DIRETA")
         print("=" * 50)
         
-        gemini_urls = [
-            "https://generativelanguage.googleapis.com/v1/models",
-            "https://ai.google.dev/api",
-            "https://developers.generativeai.google/api"
-        ]
-        
-        for url in gemini_urls:
+        for url, response in zip(GEMINI_URLS, self.http.fetch_all(GEMINI_URLS)):
             print(f"\n🔍 Testando: {url}")
-            try:
-                response = self.session.get(url, timeout=10)
-                print(f"   📊 Status: {response.status_code}")
-                if response.status_code == 200:
-                    print(f"   📝 Conteúdo: {response.text[:300]}...")
-            except Exception as e:
-                print(f"   ❌ Erro: {e}")
+            if response.error:
+                print(f"   ❌ Erro: {response.error}")
+                continue
+            print(f"   📊 Status: {response.status} ({response.elapsed_ms:.0f}ms)")
+            if response.status == 200:
+                print(f"   📝 Conteúdo: {response.text[:300]}...")
                 
     def run_complete_test(self):
         """Executa teste completo"""
         print("🌟 AI STUDIO - TESTE COMPLETO DE ACESSO")
         print("=" * 60)
         
+        # Disparar a matriz inteira de uma vez; cada etapa consome as respostas
+        # prontas e o teste dura o tempo da requisição mais lenta
+        self.http.prefetch(self.url_matrix())
+        
         # 1. Testar URLs principais
         results = self.test_urls()
         
@@ -186,6 +189,7 @@ class AIStudioTester:
             print(f"🌐 {url}")
             print(f"   {status}")
             
+        print(f"\n📊 HTTP: {self.http.summary()}")
         print("\n✅ Teste completo finalizado!")
         return results
 
@@ -10,6 +10,8 @@ sys.path.append('/workspaces/replit')
 
 from ai_studio_login_2fa import AIStudioLogin2FA
 from credentials_manager import CredentialsManager
+from waits import wait_until, wait_for_url, wait_for_url_change
+from navigation import goto_app
 
 class AIStudioFixed(AIStudioLogin2FA):
     
@@ -35,13 +37,13 @@ class AIStudioFixed(AIStudioLogin2FA):
                 # SOLUÇÃO: Usar Keyboard Enter em vez de click
                 print("🎯 Usando Keyboard Enter para selecionar conta...")
                 account_locator.focus()
-                time.sleep(1)
+                url_before = self.page.url
                 self.page.keyboard.press('Enter')
                 
                 print("✅ Enter pressionado na conta")
                 
                 # Aguardar navegação
-                time.sleep(5)
+                wait_for_url_change(self.page, url_before, 'account_select')
                 
                 new_url = self.page.url
                 print(f"📍 Nova URL: {new_url}")
@@ -98,7 +100,7 @@ class AIStudioFixed(AIStudioLogin2FA):
                     return False
                 
                 # Aguardar carregar nova página
-                time.sleep(3)
+                wait_for_url_change(self.page, current_url, 'account_select')
                 current_url = self.page.url
             
             # Verificar se está na página de senha
@@ -121,8 +123,8 @@ class AIStudioFixed(AIStudioLogin2FA):
                     self.page.keyboard.press('Enter')
                     print("✅ Enter pressionado para enviar senha")
                     
-                    # Aguardar processamento
-                    time.sleep(5)
+                    # Aguardar processamento (campo de senha sai da tela)
+                    wait_until(lambda: not self.page.is_visible('input[type="password"]'), 'password_step', page=self.page)
                     
                     # Capturar screenshot após envio
                     screenshot_path = f"/workspaces/replit/after_password_submit_{int(time.time())}.png"
@@ -173,8 +175,7 @@ class AIStudioFixed(AIStudioLogin2FA):
             target_url = "https://aistudio.google.com/u/3/prompts/new_chat"
             print(f"🔗 Acessando: {target_url}")
             
-            self.page.goto(target_url, timeout=30000)
-            time.sleep(3)
+            goto_app(self.page, target_url, timeout=30000)
             
             # Verificar se precisa fazer login
             current_url = self.page.url
@@ -185,7 +186,7 @@ class AIStudioFixed(AIStudioLogin2FA):
                     return False
             
             # Verificar se chegou ao AI Studio
-            time.sleep(5)
+            wait_for_url(self.page, lambda url: "aistudio.google.com" in url)
             final_url = self.page.url
             print(f"📍 URL final: {final_url}")
             
@@ -1,8 +1,8 @@
 import streamlit as st
 import os
 from dotenv import load_dotenv
-from automation import GoogleAIStudioAutomation
 from utils import validate_email, sanitize_input, check_playwright_installation, get_browser_info
+from job_queue import get_job_queue, QUEUED, DONE
 
 # Carregar variáveis de ambiente do arquivo .env se existir
 load_dotenv()
@@ -148,9 +148,12 @@ def main():
                 st.info("💡 **Dica**: Use o botão 'Simular Automação' para ver uma demonstração completa!")
                 return
             
-            # Executar automação
+            # Enfileirar automação (executa em segundo plano)
             execute_automation(email, password, headless_mode, timeout_2fa)
     
+    # Progresso do job da sessão, atualizado a cada segundo
+    show_job_progress()
+    
     # Botão alternativo para demonstração
     st.markdown("---")
     col1, col2, col3 = st.columns([1, 2, 1])
@@ -167,109 +170,89 @@ def main():
             # Executar simulação
             simulate_automation(email, password, timeout_2fa)
 
+@st.cache_resource
+def get_queue():
+    """
+    Fila de jobs compartilhada por todas as sessões do app
+    
+    Os navegadores ficam nos workers da fila: reruns e outros usuários
+    reaproveitam os mesmos navegadores aquecidos.
+    """
+    return get_job_queue()
+
 def execute_automation(email: str, password: str, headless: bool, timeout_2fa: int):
     """
-    Executa a automação de login
+    Enfileira a automação de login; o progresso é acompanhado por show_job_progress
     """
     # Sanitizar inputs
     email = sanitize_input(email)
     password = sanitize_input(password)
     
-    # Inicializar variável de automação
-    automation = None
+    job = get_queue().submit('login', email=email, password=password, timeout_2fa=timeout_2fa)
+    st.session_state['job_id'] = job.id
+
+def show_job_progress():
+    """
+    Mostra o progresso do job da sessão
     
-    # Criar container para status
-    status_container = st.container()
+    Enquanto o job roda, só este trecho é reexecutado a cada segundo; o resto
+    da página não é refeito e nenhum navegador é reiniciado.
+    """
+    job_id = st.session_state.get('job_id')
+    job = get_queue().get(job_id) if job_id else None
+    if job is None:
+        return
     
-    with status_container:
-        # Barra de progresso
-        progress_bar = st.progress(0)
-        status_text = st.empty()
+    st.fragment(render_job_progress, run_every=None if job.finished else 1)(job)
+
+def render_job_progress(job):
+    """
+    Barra de progresso, etapas e resultado de um job
+    """
+    state = job.to_dict()
+    
+    with st.container():
+        # Barra de progresso e última etapa
+        st.progress(state['progress'])
+        last_event = state['events'][-1] if state['events'] else None
+        if state['status'] == QUEUED:
+            ahead = get_queue().queued_ahead(job.id)
+            st.text(f"⏳ Na fila ({ahead} job(s) à frente)")
+        elif last_event:
+            st.text(last_event['message'])
         
-        try:
-            # Inicializar automação
-            automation = GoogleAIStudioAutomation(headless=headless, timeout_2fa=timeout_2fa)
-            
-            # Etapa 1: Inicializar navegador
-            status_text.text("🔄 Inicializando navegador...")
-            progress_bar.progress(10)
-            automation.initialize_browser()
-            
-            # Etapa 2: Navegar para o site
-            status_text.text("🌐 Navegando para Google AI Studio...")
-            progress_bar.progress(25)
-            automation.navigate_to_ai_studio()
-            
-            # Etapa 3: Iniciar login
-            status_text.text("🔑 Iniciando processo de login...")
-            progress_bar.progress(40)
-            automation.start_login()
-            
-            # Etapa 4: Inserir email
-            status_text.text("📧 Inserindo email...")
-            progress_bar.progress(55)
-            automation.enter_email(email)
-            
-            # Etapa 5: Inserir senha
-            status_text.text("🔒 Inserindo senha...")
-            progress_bar.progress(70)
-            automation.enter_password(password)
-            
-            # Etapa 6: Aguardar 2FA
-            status_text.text(f"📱 Verificando autenticação de dois fatores...")
-            progress_bar.progress(85)
-            automation.wait_for_2fa()
-            
-            # Verificar se há screenshot de 2FA
-            import os
-            if os.path.exists("2fa_page.png"):
-                st.info("📱 **2FA Detectado!** Screenshot da página salvo em: `2fa_page.png`")
+        with st.expander(f"📜 Etapas do job {state['id']} ({state['elapsed']}s)", expanded=False):
+            for event in state['events']:
+                st.caption(f"[{event['progress']:3d}%] {event['message']}")
+        
+        if not job.finished:
+            return
+        
+        # Job concluído: um rerun completo recria o trecho sem polling
+        if st.session_state.get('job_done') != job.id:
+            st.session_state['job_done'] = job.id
+            st.rerun()
+        
+        if state['status'] == DONE:
+            result = state['result'] or {}
+            if result.get('two_factor'):
+                twofa_screenshots = [path for path in result.get('screenshots', []) if path.endswith("2fa_page.png")]
+                st.info(f"📱 **2FA Detectado!** Screenshot da página salvo em: "
+                        f"`{twofa_screenshots[0] if twofa_screenshots else '2fa_page.png'}`")
                 st.info("🔍 **Verificação necessária**: Confirme no seu celular ou use o modo interativo")
-                
-                # Mostrar opção para modo interativo
-                if st.button("🔧 Usar Modo Interativo", key="interactive_mode"):
-                    st.info("💻 **Execute no terminal**: `python interactive_login.py`")
-            
-            # Finalizar
-            progress_bar.progress(100)
-            status_text.text("✅ Login concluído com sucesso!")
+                st.info("💻 **Modo interativo**: execute no terminal `python interactive_login.py`")
             
             st.success("🎉 Automação finalizada com sucesso!")
             
             # Mostrar screenshots se existirem
-            screenshot_files = ["login_success.png", "current_page.png", "2fa_page.png"]
-            for screenshot in screenshot_files:
-                if os.path.exists(screenshot):
-                    st.success(f"📸 Screenshot salvo: `{screenshot}`")
-            
-            st.balloons()
-            
-            automation.close_browser()
+            for screenshot in result.get('screenshots', []):
+                st.success(f"📸 Screenshot salvo: `{screenshot}`")
             
-        except Exception as e:
-            progress_bar.progress(100)
-            status_text.text("❌ Erro durante a automação")
-            
-            # Capturar screenshot se possível
-            error_details = str(e)
-            
-            if automation and hasattr(automation, 'page') and automation.page:
-                try:
-                    screenshot_path = "erro_automacao.png"
-                    automation.page.screenshot(path=screenshot_path)
-                    st.error(f"❌ Erro: {error_details}")
-                    st.info("📸 Screenshot do erro foi capturada: erro_automacao.png")
-                except:
-                    st.error(f"❌ Erro: {error_details}")
-            else:
-                st.error(f"❌ Erro: {error_details}")
-            
-            # Tentar fechar o navegador mesmo em caso de erro
-            try:
-                if automation and hasattr(automation, 'browser') and automation.browser:
-                    automation.close_browser()
-            except:
-                pass
+            if st.session_state.get('celebrated') != job.id:
+                st.session_state['celebrated'] = job.id
+                st.balloons()
+        else:
+            st.error(f"❌ Erro: {state['error']}")
 
 def simulate_automation(email: str, password: str, timeout_2fa: int):
     """
@@ -0,0 +1,404 @@
+"""
+Cache de Assets HTTP em Disco Compartilhado
+- Serve bundles JS/CSS estáticos do AI Studio a partir do disco para qualquer contexto
+- Chave por URL; validadores (ETag/Last-Modified) para revalidar entradas vencidas
+- Respeita no-store, private e Vary; URLs recusadas voltam ao caminho normal do navegador
+- Tamanho limitado com remoção LRU e contadores de acertos/falhas
+- Índice compartilhado entre processos e perfis (gravação atômica com flock)
+"""
+
+import os
+import json
+import time
+import atexit
+import fcntl
+import hashlib
+import threading
+from typing import Optional
+
+# Tipos de recurso que valem a pena guardar (bundles estáticos)
+CACHEABLE_TYPES = ("script", "stylesheet")
+
+# Modos: "auto" só junto com a política de rotas, "on" sempre, "off" nunca
+CACHE_MODES = ("auto", "on", "off")
+
+# Vary por estes cabeçalhos não muda o corpo guardado (já decodificado)
+IGNORED_VARY = ("accept-encoding",)
+
+# Frescor mínimo para guardar: respostas sem max-age longo ou immutable são ignoradas
+MIN_MAX_AGE = 3600
+
+# Cabeçalhos que não podem ser repetidos ao servir o corpo já decodificado
+DROP_HEADERS = ("content-encoding", "content-length", "transfer-encoding", "connection",
+                "set-cookie", "keep-alive")
+
+def parse_cache_control(value: str) -> dict:
+    """Diretivas do Cache-Control ("max-age=60, immutable" → {'max-age': '60', 'immutable': True})"""
+    directives = {}
+    for part in (value or "").split(","):
+        part = part.strip().lower()
+        if not part:
+            continue
+        if "=" in part:
+            key, _, val = part.partition("=")
+            directives[key.strip()] = val.strip().strip('"')
+        else:
+            directives[part] = True
+    return directives
+
+def freshness(headers: dict) -> Optional[float]:
+    """
+    Tempo de vida (segundos) de uma resposta cacheável, ou None se não deve ser guardada
+    
+    Args:
+        headers (dict): Cabeçalhos da resposta (nomes em minúsculas)
+    """
+    directives = parse_cache_control(headers.get("cache-control", ""))
+    if "no-store" in directives or "private" in directives:
+        return None
+    if "immutable" in directives:
+        return 365 * 24 * 3600
+    try:
+        max_age = int(directives.get("s-maxage") or directives.get("max-age") or 0)
+    except ValueError:
+        return None
+    return max_age if max_age >= MIN_MAX_AGE else None
+
+def varies(headers: dict) -> bool:
+    """True se a resposta depende de cabeçalhos da requisição que a chave (só a URL) não cobre"""
+    names = [name.strip().lower() for name in headers.get("vary", "").split(",") if name.strip()]
+    return any(name not in IGNORED_VARY for name in names)
+
+class AssetCache:
+    """
+    Cache de respostas estáticas compartilhado por todos os contextos
+    
+    Registrado com context.route(); para requisições que não são assets
+    cacheáveis chama route.fallback() e não interfere nos demais handlers.
+    URLs cuja resposta foi recusada (no-store, private, Vary, frescor curto)
+    também seguem por route.fallback() nas próximas vezes, sem route.fetch().
+    """
+    
+    def __init__(self, cache_dir: str, max_bytes: int = 200 * 1024 * 1024):
+        """
+        Inicializa o cache
+        
+        Args:
+            cache_dir (str): Diretório dos corpos e do índice
+            max_bytes (int): Tamanho máximo em disco antes da remoção LRU
+        """
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.index_path = os.path.join(cache_dir, "index.json")
+        self.lock_path = os.path.join(cache_dir, ".index.lock")
+        self.lock = threading.Lock()
+        self.entries = {}
+        self.uncacheable = set()
+        self.dirty = False
+        self.last_save = 0.0
+        self.stats = {'hits': 0, 'misses': 0, 'revalidated': 0, 'stored': 0, 'evicted': 0,
+                      'uncacheable': 0, 'bytes_served': 0}
+        
+        os.makedirs(cache_dir, exist_ok=True)
+        self.entries = self._read_index()
+    
+    @staticmethod
+    def key_for(url: str) -> str:
+        return hashlib.sha1(url.encode('utf-8')).hexdigest()
+    
+    def _body_path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, key[:2], key)
+    
+    def _read_index(self) -> dict:
+        try:
+            with open(self.index_path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (FileNotFoundError, ValueError):
+            return {}
+    
+    @property
+    def total_bytes(self) -> int:
+        return sum(entry['size'] for entry in self.entries.values())
+    
+    def lookup(self, url: str) -> Optional[dict]:
+        """Entrada do índice para a URL, se o corpo ainda existir"""
+        key = self.key_for(url)
+        with self.lock:
+            entry = self.entries.get(key)
+        if entry and os.path.exists(self._body_path(key)):
+            return entry
+        return None
+    
+    def read_body(self, url: str) -> Optional[bytes]:
+        try:
+            with open(self._body_path(self.key_for(url)), 'rb') as f:
+                return f.read()
+        except FileNotFoundError:
+            return None
+    
+    def touch(self, url: str, expires_at: Optional[float] = None):
+        """Atualiza o último acesso (e o vencimento após uma revalidação)"""
+        with self.lock:
+            entry = self.entries.get(self.key_for(url))
+            if entry:
+                entry['last_access'] = time.time()
+                if expires_at:
+                    entry['expires_at'] = expires_at
+                self.dirty = True
+    
+    def store(self, url: str, status: int, headers: dict, body: bytes) -> bool:
+        """
+        Guarda uma resposta se ela for cacheável
+        
+        Returns:
+            bool: True se a resposta foi guardada
+        """
+        if status != 200 or not body:
+            return False
+        key = self.key_for(url)
+        ttl = freshness(headers)
+        if ttl is None or varies(headers):
+            # Não volta a passar pelo Python: as próximas vão direto ao navegador
+            with self.lock:
+                self.uncacheable.add(key)
+                self.stats['uncacheable'] += 1
+            return False
+        
+        path = self._body_path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        temp_path = f"{path}.{os.getpid()}.tmp"
+        with open(temp_path, 'wb') as f:
+            f.write(body)
+        os.replace(temp_path, path)
+        
+        now = time.time()
+        with self.lock:
+            self.entries[key] = {
+                'url': url,
+                'size': len(body),
+                'headers': {name: value for name, value in headers.items() if name not in DROP_HEADERS},
+                'etag': headers.get('etag'),
+                'last_modified': headers.get('last-modified'),
+                'stored_at': now,
+                'expires_at': now + ttl,
+                'last_access': now
+            }
+            self.stats['stored'] += 1
+            self.dirty = True
+            self._evict()
+        
+        self.save(force=False)
+        return True
+    
+    def _evict(self):
+        """Remove as entradas menos usadas até ficar abaixo de 90% do limite (com lock)"""
+        total = self.total_bytes
+        if total <= self.max_bytes:
+            return
+        for key, entry in sorted(self.entries.items(), key=lambda item: item[1]['last_access']):
+            if total <= self.max_bytes * 0.9:
+                break
+            try:
+                os.remove(self._body_path(key))
+            except FileNotFoundError:
+                pass
+            total -= entry['size']
+            del self.entries[key]
+            self.stats['evicted'] += 1
+    
+    def save(self, force: bool = True):
+        """Grava o índice, mesclando com o de outros processos"""
+        if not self.dirty or (not force and time.time() - self.last_save < 5):
+            return
+        
+        with open(self.lock_path, 'w') as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                with self.lock:
+                    merged = self._read_index()
+                    for key, entry in self.entries.items():
+                        if key not in merged or merged[key]['last_access'] <= entry['last_access']:
+                            merged[key] = entry
+                    # Descartar entradas cujo corpo foi removido por outro processo
+                    merged = {key: entry for key, entry in merged.items()
+                              if os.path.exists(self._body_path(key))}
+                    self.entries = merged
+                    self._evict()
+                    
+                    temp_path = f"{self.index_path}.{os.getpid()}.tmp"
+                    with open(temp_path, 'w', encoding='utf-8') as f:
+                        json.dump(self.entries, f)
+                    os.replace(temp_path, self.index_path)
+                    self.dirty = False
+                    self.last_save = time.time()
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+    
+    def _plan(self, request):
+        """
+        Decide como tratar a requisição
+        
+        Returns:
+            tuple: ("skip", None), ("hit", entry), ("revalidate", entry) ou ("miss", None)
+        """
+        if request.method != "GET" or request.resource_type not in CACHEABLE_TYPES:
+            return "skip", None
+        if self.key_for(request.url) in self.uncacheable:
+            return "skip", None
+        entry = self.lookup(request.url)
+        if entry is None:
+            return "miss", None
+        if entry['expires_at'] > time.time():
+            return "hit", entry
+        if entry.get('etag') or entry.get('last_modified'):
+            return "revalidate", entry
+        return "miss", None
+    
+    @staticmethod
+    def _conditional_headers(request, entry: dict) -> dict:
+        headers = dict(request.headers)
+        if entry.get('etag'):
+            headers['if-none-match'] = entry['etag']
+        if entry.get('last_modified'):
+            headers['if-modified-since'] = entry['last_modified']
+        return headers
+    
+    def _serve_cached(self, url: str, entry: dict) -> Optional[dict]:
+        """Argumentos de route.fulfill() para uma entrada do cache"""
+        body = self.read_body(url)
+        if body is None:
+            return None
+        with self.lock:
+            self.stats['bytes_served'] += len(body)
+        return {'status': 200, 'headers': entry['headers'], 'body': body}
+    
+    def handle(self, route, request):
+        """Handler de rota para a API síncrona do Playwright"""
+        action, entry = self._plan(request)
+        if action == "skip":
+            route.fallback()
+            return
+        
+        if action == "hit":
+            cached = self._serve_cached(request.url, entry)
+            if cached:
+                self.stats['hits'] += 1
+                self.touch(request.url)
+                route.fulfill(**cached)
+                return
+        
+        headers = self._conditional_headers(request, entry) if action == "revalidate" else None
+        try:
+            response = route.fetch(headers=headers) if headers else route.fetch()
+        except Exception as e:
+            print(f"⚠️ Cache de assets: falha ao buscar {request.url}: {e}")
+            route.fallback()
+            return
+        
+        if response.status == 304 and entry:
+            cached = self._serve_cached(request.url, entry)
+            if cached:
+                self.stats['revalidated'] += 1
+                ttl = freshness(response.headers) or freshness(entry['headers']) or MIN_MAX_AGE
+                self.touch(request.url, time.time() + ttl)
+                route.fulfill(**cached)
+                return
+        
+        self.stats['misses'] += 1
+        self.store(request.url, response.status, response.headers, response.body())
+        route.fulfill(response=response)
+    
+    async def handle_async(self, route, request):
+        """Handler de rota para a API assíncrona do Playwright"""
+        action, entry = self._plan(request)
+        if action == "skip":
+            await route.fallback()
+            return
+        
+        if action == "hit":
+            cached = self._serve_cached(request.url, entry)
+            if cached:
+                self.stats['hits'] += 1
+                self.touch(request.url)
+                await route.fulfill(**cached)
+                return
+        
+        headers = self._conditional_headers(request, entry) if action == "revalidate" else None
+        try:
+            response = await (route.fetch(headers=headers) if headers else route.fetch())
+        except Exception as e:
+            print(f"⚠️ Cache de assets: falha ao buscar {request.url}: {e}")
+            await route.fallback()
+            return
+        
+        if response.status == 304 and entry:
+            cached = self._serve_cached(request.url, entry)
+            if cached:
+                self.stats['revalidated'] += 1
+                ttl = freshness(response.headers) or freshness(entry['headers']) or MIN_MAX_AGE
+                self.touch(request.url, time.time() + ttl)
+                await route.fulfill(**cached)
+                return
+        
+        self.stats['misses'] += 1
+        self.store(request.url, response.status, response.headers, await response.body())
+        await route.fulfill(response=response)
+    
+    def apply(self, context):
+        """Registra o cache em um contexto síncrono"""
+        context.route("**/*", self.handle)
+    
+    async def apply_async(self, context):
+        """Registra o cache em um contexto assíncrono"""
+        await context.route("**/*", self.handle_async)
+    
+    def summary(self) -> dict:
+        """Contadores do cache e ocupação em disco"""
+        stats = dict(self.stats)
+        lookups = stats['hits'] + stats['revalidated'] + stats['misses']
+        stats['hit_ratio'] = round((stats['hits'] + stats['revalidated']) / lookups, 3) if lookups else 0
+        stats['entries'] = len(self.entries)
+        stats['total_bytes'] = self.total_bytes
+        return stats
+    
+    def print_report(self):
+        """Imprime os contadores do cache"""
+        summary = self.summary()
+        print("\n🗄️ CACHE DE ASSETS")
+        print("=" * 40)
+        print(f"   Acertos: {summary['hits']} | Revalidados: {summary['revalidated']} | "
+              f"Falhas: {summary['misses']} (taxa {summary['hit_ratio']:.0%})")
+        print(f"   {summary['bytes_served'] / 1024:.0f} KB servidos do disco")
+        print(f"   {summary['entries']} entradas, {summary['total_bytes'] / 1024 / 1024:.1f} MB em disco")
+
+_cache = None
+_cache_lock = threading.Lock()
+
+def asset_cache_mode() -> str:
+    """
+    Modo configurado em ASSET_CACHE (padrão "auto")
+    
+    Qualquer rota no contexto desliga o cache HTTP do próprio navegador; no modo
+    "auto" o cache só é registrado onde a política de rotas já intercepta tudo.
+    """
+    mode = os.getenv("ASSET_CACHE", "auto").lower()
+    return mode if mode in CACHE_MODES else "auto"
+
+def get_asset_cache() -> Optional[AssetCache]:
+    """
+    Retorna o cache compartilhado do processo, ou None se desativado
+    
+    ASSET_CACHE=off desativa; ASSET_CACHE_DIR e ASSET_CACHE_MAX_MB configuram
+    o diretório e o limite de tamanho.
+    """
+    global _cache
+    if asset_cache_mode() == "off":
+        return None
+    with _cache_lock:
+        if _cache is None:
+            _cache = AssetCache(
+                os.getenv("ASSET_CACHE_DIR", "/workspaces/replit/asset_cache"),
+                max_bytes=int(os.getenv("ASSET_CACHE_MAX_MB", 200)) * 1024 * 1024
+            )
+            atexit.register(_cache.save)
+        return _cache
@@ -0,0 +1,192 @@
+"""
+Armazém de Estado Autenticado (storage_state)
+- Captura o storage_state de um contexto logado uma única vez
+- Qualquer número de contextos novos nasce logado via new_context(storage_state=...)
+- Versões numeradas com gravação atômica; leitores nunca veem um arquivo pela metade
+- Várias execuções paralelas compartilham o mesmo diretório com segurança (flock)
+"""
+
+import os
+import json
+import fcntl
+import hashlib
+import threading
+from typing import Optional
+
+DEFAULT_AUTH_DIR = "/workspaces/replit/auth_state"
+
+# Versões antigas mantidas para diagnóstico/rollback
+DEFAULT_KEEP = 5
+
+# Cookies da conta que só mudam em um novo login. Os demais (SIDCC,
+# __Secure-*PSIDTS, ...) e o localStorage do AI Studio são reescritos a cada
+# visita e entram no fingerprint só pelo nome do cookie, senão cada captura
+# viraria uma versão nova e reciclaria os contextos do pool.
+STABLE_AUTH_COOKIES = ("SID", "HSID", "SSID", "APISID", "SAPISID",
+                       "__Secure-1PSID", "__Secure-3PSID")
+
+class AuthStateStore:
+    """
+    Versões do storage_state em um diretório
+    
+    Cada versão é um arquivo state-NNNNNN.json no formato do Playwright (pode
+    ser passado direto para new_context). O arquivo LATEST aponta para a versão
+    atual e só é trocado depois que a versão está completa no disco.
+    """
+    
+    def __init__(self, root: str = DEFAULT_AUTH_DIR, keep: int = DEFAULT_KEEP):
+        """
+        Inicializa o armazém
+        
+        Args:
+            root (str): Diretório das versões
+            keep (int): Quantas versões manter
+        """
+        self.root = root
+        self.keep = max(1, keep)
+        self.latest_file = os.path.join(root, "LATEST")
+        self.lock_path = os.path.join(root, ".lock")
+        self.lock = threading.Lock()
+        self._cached = (None, None)
+        os.makedirs(root, exist_ok=True)
+    
+    def path_for(self, version: int) -> str:
+        return os.path.join(self.root, f"state-{version:06d}.json")
+    
+    def latest_version(self) -> Optional[int]:
+        """Versão atual, ou None se nada foi capturado"""
+        try:
+            with open(self.latest_file, 'r') as f:
+                return int(f.read().strip())
+        except (OSError, ValueError):
+            return None
+    
+    def latest_path(self) -> Optional[str]:
+        """Arquivo da versão atual (para new_context ou para a sonda de sessão)"""
+        version = self.latest_version()
+        return self.path_for(version) if version is not None else None
+    
+    def load(self, version: Optional[int] = None) -> Optional[dict]:
+        """
+        storage_state de uma versão (padrão: a atual)
+        
+        A última versão lida fica em memória: workers criando contextos em
+        sequência não releem o arquivo.
+        """
+        version = self.latest_version() if version is None else version
+        if version is None:
+            return None
+        
+        with self.lock:
+            if self._cached[0] == version:
+                return self._cached[1]
+        
+        try:
+            with open(self.path_for(version), 'r') as f:
+                state = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"⚠️ Erro ao ler estado autenticado v{version}: {e}")
+            return None
+        
+        with self.lock:
+            self._cached = (version, state)
+        return state
+    
+    @staticmethod
+    def _fingerprint(state: dict) -> str:
+        """Hash dos cookies estáveis da conta e dos nomes dos demais (ignora a ordem)"""
+        cookies = state.get('cookies', [])
+        stable = sorted((c.get('domain', ''), c.get('name', ''), c.get('value', ''))
+                        for c in cookies if c.get('name') in STABLE_AUTH_COOKIES)
+        names = sorted({(c.get('domain', ''), c.get('name', '')) for c in cookies})
+        return hashlib.sha1(json.dumps([stable, names]).encode('utf-8')).hexdigest()
+    
+    def save(self, state: dict) -> int:
+        """
+        Grava uma nova versão se o estado mudou
+        
+        Returns:
+            int: Versão atual depois da gravação
+        """
+        with open(self.lock_path, 'w') as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                current = self.latest_version()
+                if current is not None:
+                    previous = self.load(current)
+                    if previous and self._fingerprint(previous) == self._fingerprint(state):
+                        return current
+                
+                version = (current or 0) + 1
+                path = self.path_for(version)
+                temp_path = f"{path}.{os.getpid()}.tmp"
+                with open(temp_path, 'w') as f:
+                    json.dump(state, f)
+                    f.flush()
+                    os.fsync(f.fileno())
+                os.replace(temp_path, path)
+                
+                temp_latest = f"{self.latest_file}.{os.getpid()}.tmp"
+                with open(temp_latest, 'w') as f:
+                    f.write(str(version))
+                os.replace(temp_latest, self.latest_file)
+                
+                self._prune(version)
+                print(f"🔐 Estado autenticado salvo (v{version})")
+                return version
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+    
+    def capture(self, context) -> Optional[int]:
+        """
+        Captura o storage_state de um contexto logado
+        
+        Returns:
+            Optional[int]: Versão atual, ou None em caso de erro
+        """
+        try:
+            return self.save(context.storage_state())
+        except Exception as e:
+            print(f"⚠️ Erro ao capturar estado autenticado: {e}")
+            return None
+    
+    def _prune(self, current: int):
+        """Remove versões além das keep mais recentes (com o lock do diretório)"""
+        for name in os.listdir(self.root):
+            if not (name.startswith("state-") and name.endswith(".json")):
+                continue
+            try:
+                version = int(name[len("state-"):-len(".json")])
+            except ValueError:
+                continue
+            if version <= current - self.keep:
+                try:
+                    os.remove(os.path.join(self.root, name))
+                except FileNotFoundError:
+                    pass
+    
+    def context_options(self) -> dict:
+        """Opções para new_context com o estado atual ({} se não houver)"""
+        state = self.load()
+        return {'storage_state': state} if state else {}
+    
+    def new_context(self, browser, **options):
+        """
+        Cria um contexto já autenticado com a versão atual
+        
+        Args:
+            browser: Browser do Playwright
+            **options: Demais opções de new_context
+        """
+        return browser.new_context(**self.context_options(), **options)
+
+_stores = {}
+_stores_lock = threading.Lock()
+
+def get_auth_store(root: Optional[str] = None) -> AuthStateStore:
+    """Armazém compartilhado do processo (AUTH_STATE_DIR sobrescreve o diretório)"""
+    root = root or os.getenv("AUTH_STATE_DIR", DEFAULT_AUTH_DIR)
+    with _stores_lock:
+        if root not in _stores:
+            _stores[root] = AuthStateStore(root)
+        return _stores[root]
@@ -10,23 +10,41 @@ except ImportError:
 
 import time
 import os
-from typing import Optional
+from typing import List, Optional
 
-class GoogleAIStudioAutomation:
+from selector_engine import race_selectors
+from capture_policy import get_capture_policy, REQUIRED
+from waits import wait_until, wait_for_page_ready, wait_for_any, wait_for_url_change, get_wait_report
+from navigation import goto_app, LOGIN_REDIRECT
+from route_policy import attach_route_policy, get_route_policy
+from asset_cache import get_asset_cache
+from tracing import Traced, get_tracer
+from ai_studio_selectors import AUTOMATION_2FA_INDICATOR_SELECTORS, AUTOMATION_2FA_CODE_SELECTORS
+
+class GoogleAIStudioAutomation(Traced):
     """
     Classe para automação de login no Google AI Studio usando Playwright
     """
     
-    def __init__(self, headless: bool = True, timeout_2fa: int = 40):
+    def __init__(self, headless: bool = True, timeout_2fa: int = 40, pool=None,
+                 screenshot_dir: Optional[str] = None):
         """
         Inicializa a automação
         
         Args:
             headless (bool): Se True, executa o navegador em modo headless
             timeout_2fa (int): Timeout em segundos para aguardar autenticação 2FA
+            pool (BrowserPool): Pool compartilhado do qual a página é emprestada
+            screenshot_dir (str): Diretório dos screenshots do fluxo (padrão: diretório atual)
         """
         self.headless = headless
         self.timeout_2fa = timeout_2fa * 1000  # Converter para milissegundos
+        self.pool = pool
+        self.screenshot_dir = screenshot_dir or os.getcwd()
+        self.screenshots: List[str] = []
+        self.two_factor_detected = False
+        self.pooled_page = None
+        self.app_state = None
         self.playwright = None
         self.browser: Optional[Browser] = None
         self.context: Optional[BrowserContext] = None
@@ -42,6 +60,16 @@ class GoogleAIStudioAutomation:
                           "Para usar esta funcionalidade, instale o Playwright: "
                           "'pip install playwright' e 'playwright install'")
         
+        if self.pool:
+            # Reaproveitar navegador aquecido em vez de lançar um novo; o contexto
+            # é sempre novo, para o login não herdar a sessão de outro usuário
+            self.pooled_page = self.pool.checkout(fresh=True)
+            self.browser = self.pooled_page.browser
+            self.context = self.pooled_page.context
+            self.page = self.pooled_page.page
+            print("✅ Página emprestada do pool de navegadores!")
+            return
+        
         try:
             self.playwright = sync_playwright().start()
             
@@ -88,6 +116,10 @@ class GoogleAIStudioAutomation:
                     'Upgrade-Insecure-Requests': '1',
                 }
             )
+            
+            # Bloquear imagens, fontes e analytics (o navegador é sempre headless aqui)
+            attach_route_policy(self.context, headless=True)
+            
             self.page = self.context.new_page()
             
             # Remover propriedades que indicam automação
@@ -131,8 +163,8 @@ class GoogleAIStudioAutomation:
         Navega para o Google AI Studio
         """
         try:
-            self.page.goto("https://aistudio.google.com/", wait_until='networkidle')
-            self.page.wait_for_load_state('domcontentloaded')
+            # Termina quando o app mostra a welcome, o chat ou redireciona para login
+            self.app_state = goto_app(self.page, "https://aistudio.google.com/")
             
         except Exception as e:
             raise Exception(f"Erro ao navegar para Google AI Studio: {str(e)}")
@@ -142,8 +174,10 @@ class GoogleAIStudioAutomation:
         Inicia o processo de login clicando no botão Sign in ou Get started
         """
         try:
-            # Aguardar a página carregar completamente
-            self.page.wait_for_load_state('networkidle')
+            # Já redirecionado para o login do Google: nada para clicar
+            if self.app_state == LOGIN_REDIRECT:
+                print("✅ Já na página de login do Google")
+                return
             
             # Lista de seletores para botões de login/cadastro
             login_selectors = [
@@ -184,7 +218,7 @@ class GoogleAIStudioAutomation:
                 # Tentar uma abordagem mais geral
                 try:
                     # Procurar por qualquer botão ou link que contenha palavras relacionadas a login
-                    self.page.wait_for_timeout(2000)
+                    wait_for_page_ready(self.page)
                     
                     # JavaScript para encontrar botões de login
                     login_button = self.page.evaluate("""
@@ -227,9 +261,9 @@ class GoogleAIStudioAutomation:
             
             if not clicked:
                 # Capturar screenshot para debug
-                screenshot_path = "debug_login_page.png"
-                self.page.screenshot(path=screenshot_path)
-                raise Exception(f"Nenhum botão de login encontrado. Screenshot salvo em: {screenshot_path}")
+                screenshot_path = self._record_screenshot(get_capture_policy("automation", self.screenshot_dir).error(
+                    self.page, "debug_login_page", path=os.path.join(self.screenshot_dir, "debug_login_page.png")))
+                raise Exception(f"Nenhum botão de login encontrado. Screenshot salvo em: {screenshot_path or 'não gravado'}")
             
             # Aguardar redirecionamento ou mudança na página
             try:
@@ -245,7 +279,8 @@ class GoogleAIStudioAutomation:
         except Exception as e:
             # Capturar screenshot em caso de erro
             try:
-                self.page.screenshot(path="erro_start_login.png")
+                self._record_screenshot(get_capture_policy("automation", self.screenshot_dir).error(
+                    self.page, "erro_start_login", path=os.path.join(self.screenshot_dir, "erro_start_login.png")))
             except:
                 pass
             raise Exception(f"Erro ao iniciar login: {str(e)}")
@@ -258,9 +293,6 @@ class GoogleAIStudioAutomation:
             email (str): Email para login
         """
         try:
-            # Aguardar campo de email com tempo extra
-            self.page.wait_for_load_state('networkidle', timeout=10000)
-            
             email_selectors = [
                 "input[type='email']",
                 "input[name='identifier']", 
@@ -270,15 +302,8 @@ class GoogleAIStudioAutomation:
                 "input[name*='email']"
             ]
             
-            email_field = None
-            for selector in email_selectors:
-                try:
-                    self.page.wait_for_selector(selector, timeout=5000)
-                    if self.page.is_visible(selector):
-                        email_field = selector
-                        break
-                except:
-                    continue
+            # Todos os candidatos em corrida, dentro do orçamento da etapa
+            email_field = wait_for_any(self.page, email_selectors, 'email_field')
             
             if not email_field:
                 raise Exception("Campo de email não encontrado")
@@ -315,8 +340,8 @@ class GoogleAIStudioAutomation:
                 except:
                     continue
             
-            # Aguardar carregamento da próxima página
-            self.page.wait_for_timeout(3000)
+            # Aguardar carregamento da próxima página (campo de senha)
+            wait_for_any(self.page, ["input[type='password']", "input[name='password']"], 'email_step')
             
         except Exception as e:
             raise Exception(f"Erro ao inserir email: {str(e)}")
@@ -329,9 +354,6 @@ class GoogleAIStudioAutomation:
             password (str): Senha para login
         """
         try:
-            # Aguardar página de senha carregar completamente
-            self.page.wait_for_load_state('networkidle', timeout=15000)
-            
             password_selectors = [
                 "input[type='password']",
                 "input[name='password']", 
@@ -341,15 +363,8 @@ class GoogleAIStudioAutomation:
                 "input[name*='passwd']"
             ]
             
-            password_field = None
-            for selector in password_selectors:
-                try:
-                    self.page.wait_for_selector(selector, timeout=10000)
-                    if self.page.is_visible(selector):
-                        password_field = selector
-                        break
-                except:
-                    continue
+            # Todos os candidatos em corrida, dentro do orçamento da etapa
+            password_field = wait_for_any(self.page, password_selectors, 'password_field')
             
             if not password_field:
                 raise Exception("Campo de senha não encontrado")
@@ -387,8 +402,8 @@ class GoogleAIStudioAutomation:
                 except:
                     continue
             
-            # Aguardar processamento
-            self.page.wait_for_timeout(2000)
+            # Aguardar processamento (campo de senha sai da tela)
+            wait_until(lambda: not self.page.is_visible(password_field), 'password_step', page=self.page)
             
         except Exception as e:
             raise Exception(f"Erro ao inserir senha: {str(e)}")
@@ -400,38 +415,22 @@ class GoogleAIStudioAutomation:
         try:
             print("🔍 Verificando se há 2FA...")
             
-            # Aguardar um pouco para a página carregar
-            self.page.wait_for_timeout(3000)
-            
-            # Verificar se estamos na página de 2FA
-            two_fa_indicators = [
-                "text=2-Step Verification",
-                "text=Verificação em duas etapas", 
-                "text=Enter code",
-                "text=Digite o código",
-                "input[type='tel']",
-                "input[name='totpPin']",
-                "input[id*='code']",
-                "input[id*='pin']",
-                "[data-testid*='code']"
-            ]
+            # Aguardar a página carregar
+            wait_for_page_ready(self.page, 'twofa_detect')
             
-            is_2fa_page = False
-            for indicator in two_fa_indicators:
-                try:
-                    if self.page.is_visible(indicator, timeout=2000):
-                        is_2fa_page = True
-                        print(f"✅ Detectada página de 2FA: {indicator}")
-                        break
-                except:
-                    continue
+            # Verificar se estamos na página de 2FA (todos os indicadores em uma passada)
+            indicator = race_selectors(self.page, AUTOMATION_2FA_INDICATOR_SELECTORS, timeout=5000)
+            is_2fa_page = indicator is not None
             
             if is_2fa_page:
+                print(f"✅ Detectada página de 2FA: {indicator}")
                 print("📱 2FA detectado!")
+                self.two_factor_detected = True
                 
                 # Capturar screenshot da página de 2FA
-                screenshot_path = "2fa_page.png"
+                screenshot_path = os.path.join(self.screenshot_dir, "2fa_page.png")
                 self.page.screenshot(path=screenshot_path)
+                self._record_screenshot(screenshot_path)
                 print(f"📸 Screenshot da página 2FA salvo em: {screenshot_path}")
                 
                 # Extrair texto da página para mostrar ao usuário
@@ -455,76 +454,60 @@ class GoogleAIStudioAutomation:
                         print(f"  → {text}")
                 
                 # Procurar campo de código
-                code_selectors = [
-                    "input[type='tel']",
-                    "input[name='totpPin']", 
-                    "input[id*='code']",
-                    "input[id*='pin']",
-                    "input[autocomplete='one-time-code']",
-                    "input[inputmode='numeric']"
-                ]
-                
-                code_field = None
-                for selector in code_selectors:
-                    try:
-                        if self.page.is_visible(selector):
-                            code_field = selector
-                            print(f"✅ Campo de código encontrado: {selector}")
-                            break
-                    except:
-                        continue
+                code_field = race_selectors(self.page, AUTOMATION_2FA_CODE_SELECTORS, timeout=2000)
+                if code_field:
+                    print(f"✅ Campo de código encontrado: {code_field}")
                 
                 if code_field:
                     print("⏳ Aguardando você inserir o código 2FA...")
                     print("💡 Opções:")
                     print("   1. Verifique seu celular para o código")
-                    print("   2. Olhe o screenshot: 2fa_page.png") 
+                    print(f"   2. Olhe o screenshot: {screenshot_path}")
                     print("   3. O código será inserido automaticamente quando recebido")
                     
-                    # Aguardar o código ser inserido (manualmente ou por outro meio)
-                    start_time = time.time()
-                    timeout_seconds = self.timeout_2fa / 1000
+                    # Aguardar o código ser inserido (manualmente ou por outro meio) ou o redirecionamento
+                    def code_entered_or_redirected():
+                        if "accounts.google.com" not in self.page.url:
+                            return "redirected"
+                        value = self.page.input_value(code_field)
+                        return "code" if value and len(value) >= 6 else None
+                    
+                    outcome = wait_until(code_entered_or_redirected, 'twofa_manual',
+                                         timeout=self.timeout_2fa / 1000, interval=0.5, page=self.page)
                     
-                    while time.time() - start_time < timeout_seconds:
+                    if outcome == "code":
                         try:
-                            # Verificar se o campo foi preenchido
                             current_value = self.page.input_value(code_field)
-                            if current_value and len(current_value) >= 6:
-                                print(f"✅ Código detectado: {current_value}")
-                                
-                                # Procurar botão de submissão
-                                submit_selectors = [
-                                    "text=Next",
-                                    "text=Próximo",
-                                    "text=Verify", 
-                                    "text=Verificar",
-                                    "button[type='submit']",
-                                    "input[type='submit']"
-                                ]
-                                
-                                for selector in submit_selectors:
-                                    try:
-                                        if self.page.is_visible(selector):
-                                            self.page.click(selector)
-                                            print("✅ Código submetido!")
-                                            break
-                                    except:
-                                        continue
-                                
-                                # Aguardar processamento
-                                self.page.wait_for_timeout(3000)
-                                break
-                                
-                        except:
-                            pass
+                            print(f"✅ Código detectado: {current_value}")
+                            url_before_submit = self.page.url
                             
-                        # Verificar se saiu da página de 2FA
-                        current_url = self.page.url
-                        if "accounts.google.com" not in current_url:
-                            print("✅ 2FA concluído - redirecionado!")
-                            break
+                            # Procurar botão de submissão
+                            submit_selectors = [
+                                "text=Next",
+                                "text=Próximo",
+                                "text=Verify", 
+                                "text=Verificar",
+                                "button[type='submit']",
+                                "input[type='submit']"
+                            ]
                             
-                        self.page.wait_for_timeout(1000)  # Verificar a cada segundo
+                            for selector in submit_selectors:
+                                try:
+                                    if self.page.is_visible(selector):
+                                        self.page.click(selector)
+                                        print("✅ Código submetido!")
+                                        break
+                                except:
+                                    continue
+                            
+                            # Aguardar processamento
+                            wait_for_url_change(self.page, url_before_submit)
+                        
+                        except:
+                            pass
+                    
+                    elif outcome == "redirected":
+                        print("✅ 2FA concluído - redirecionado!")
                     
                     else:
                         print("⚠️ Timeout do 2FA - continuando...")
@@ -541,6 +524,26 @@ class GoogleAIStudioAutomation:
         """
         Fecha o navegador e limpa recursos
         """
+        if self.pooled_page:
+            # O contexto tem os cookies deste login: é descartado, mas o
+            # navegador continua aquecido no pool
+            self.pool.checkin(self.pooled_page, reusable=False)
+            self.pooled_page = None
+            self.browser = None
+            self.context = None
+            self.page = None
+            return
+        
+        # Tempo gasto esperando em cada etapa comparado ao orçamento
+        if get_wait_report().steps:
+            get_wait_report().print_report()
+        if get_route_policy().stats['requests']:
+            get_route_policy().print_report()
+        asset_cache = get_asset_cache()
+        if asset_cache and asset_cache.stats['hits'] + asset_cache.stats['misses']:
+            asset_cache.print_report()
+        get_tracer().print_report()
+        
         try:
             if self.page:
                 self.page.close()
@@ -555,6 +558,12 @@ class GoogleAIStudioAutomation:
             # Não propagar erros de fechamento
             pass
     
+    def _record_screenshot(self, path: Optional[str]) -> Optional[str]:
+        """Registra um screenshot gravado por este fluxo"""
+        if path and path not in self.screenshots:
+            self.screenshots.append(path)
+        return path
+    
     def take_screenshot(self, path: str = "screenshot.png"):
         """
         Captura screenshot da página atual
@@ -564,8 +573,9 @@ class GoogleAIStudioAutomation:
         """
         try:
             if self.page:
-                self.page.screenshot(path=path, full_page=True)
-                return path
+                policy = get_capture_policy("automation", os.path.dirname(os.path.abspath(path)))
+                # Chamado explicitamente pelos scripts: grava em qualquer nível
+                return policy.capture(self.page, os.path.basename(path), REQUIRED, path=path)
         except Exception:
             return None
     
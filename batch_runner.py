@@ -0,0 +1,303 @@
+"""
+Execução em Lote de Prompts no AI Studio
+- Lê prompts de um arquivo JSONL e distribui entre várias abas do mesmo contexto logado
+- Limite de concorrência configurável (uma aba por prompt em andamento)
+- Grava cada resultado no JSONL de saída assim que a resposta termina
+"""
+
+import os
+import json
+import time
+import argparse
+from collections import deque
+from datetime import datetime
+from typing import List, Optional
+
+from browser_pool import BrowserPool
+from selector_engine import race_selectors
+from fast_input import enter_text
+from response_detector import ResponseCompletionDetector
+from ai_studio_login_2fa import AIStudioLogin2FA
+from ai_studio_selectors import MESSAGE_INPUT_SELECTORS
+from waits import get_wait_report
+from route_policy import get_route_policy
+from asset_cache import get_asset_cache
+from session_probe import probe_session, VALID
+from auth_state import get_auth_store
+
+# URL que abre um chat vazio diretamente
+NEW_CHAT_URL = "https://aistudio.google.com/app/prompts/new_chat"
+
+# Perfil persistente com a sessão logada
+PROFILE_DIR = "/workspaces/replit/browser_profile"
+
+class BatchSlot:
+    """Aba do lote e o prompt que ela está processando"""
+    
+    def __init__(self, index: int, pooled):
+        self.index = index
+        self.pooled = pooled
+        self.page = pooled.page
+        self.detector = ResponseCompletionDetector(self.page)
+        self.job = None
+        self.started_at = None
+
+class BatchRunner:
+    """Envia N prompts e coleta N respostas com concorrência limitada"""
+    
+    def __init__(self, concurrency: int = 3, timeout: float = 90, headless: bool = True,
+                 pool: Optional[BrowserPool] = None, chat_url: str = NEW_CHAT_URL):
+        """
+        Inicializa o executor
+        
+        Args:
+            concurrency (int): Número de abas processando prompts ao mesmo tempo
+            timeout (float): Prazo em segundos para cada resposta
+            headless (bool): Executar sem interface gráfica
+            pool (BrowserPool): Pool existente; por padrão usa contextos novos com o
+                estado autenticado salvo, ou o perfil persistente se não houver
+            chat_url (str): URL aberta para cada novo prompt
+        """
+        self.concurrency = max(1, concurrency)
+        self.timeout = timeout
+        self.headless = headless
+        self.chat_url = chat_url
+        self.pool = pool or self._default_pool()
+        self.slots: List[BatchSlot] = []
+        self.stats = {'ok': 0, 'timeout': 0, 'error': 0}
+    
+    def _default_pool(self) -> BrowserPool:
+        """Contextos novos a partir do storage_state (um navegador), senão o perfil"""
+        store = get_auth_store()
+        if store.latest_version() is not None:
+            print(f"🔐 Contextos a partir do estado autenticado v{store.latest_version()}")
+            return BrowserPool(size=self.concurrency, max_pages=self.concurrency,
+                               headless=self.headless, auth_store=store)
+        return BrowserPool(size=self.concurrency, max_pages=self.concurrency,
+                           headless=self.headless, user_data_dir=PROFILE_DIR)
+    
+    @staticmethod
+    def load_prompts(input_path: str) -> List[dict]:
+        """
+        Lê o arquivo de prompts
+        
+        Cada linha é um objeto JSON com "prompt" (ou "message") e "id" opcional.
+        
+        Returns:
+            List[dict]: Prompts com id garantido
+        """
+        jobs = []
+        with open(input_path, 'r') as f:
+            for line_number, line in enumerate(f, 1):
+                line = line.strip()
+                if not line:
+                    continue
+                data = json.loads(line)
+                prompt = data.get('prompt') or data.get('message')
+                if not prompt:
+                    print(f"⚠️ Linha {line_number} sem prompt, ignorando")
+                    continue
+                jobs.append({'id': str(data.get('id', line_number)), 'prompt': prompt})
+        return jobs
+    
+    @staticmethod
+    def load_done_ids(output_path: str) -> set:
+        """Ids já concluídos com sucesso no arquivo de saída (para retomar)"""
+        done = set()
+        if not os.path.exists(output_path):
+            return done
+        
+        with open(output_path, 'r') as f:
+            for line in f:
+                try:
+                    result = json.loads(line)
+                except ValueError:
+                    continue
+                if result.get('status') == 'ok':
+                    done.add(str(result.get('id')))
+        return done
+    
+    def check_login(self) -> bool:
+        """Confirma que o perfil está logado antes de distribuir os prompts"""
+        # Sonda sem navegador; só abre o perfil se ela não confirmar a sessão
+        probe = probe_session()
+        if probe.status == VALID:
+            print(f"⚡ Sessão válida pela sonda ({probe.elapsed_ms}ms)")
+            return True
+        
+        login = AIStudioLogin2FA(headless=self.headless, pool=self.pool)
+        try:
+            login.initialize_browser()
+            return login.check_if_logged_in()
+        finally:
+            login.cleanup()
+    
+    def start_job(self, slot: BatchSlot, job: dict):
+        """Abre um chat novo na aba e envia o prompt"""
+        slot.job = job
+        slot.started_at = time.time()
+        
+        slot.page.goto(self.chat_url, wait_until='domcontentloaded', timeout=30000)
+        if "accounts.google.com" in slot.page.url:
+            raise Exception("Sessão expirada (redirecionado para login)")
+        
+        selector = race_selectors(slot.page, MESSAGE_INPUT_SELECTORS, timeout=15000)
+        if not selector:
+            raise Exception("Campo de mensagem não encontrado")
+        
+        if not enter_text(slot.page, selector, job['prompt'], "fast"):
+            raise Exception("Texto do prompt não confere no campo de mensagem")
+        slot.detector.arm()
+        slot.page.press(selector, "Enter")
+        print(f"📤 [aba {slot.index}] Prompt {job['id']} enviado")
+    
+    def poll_job(self, slot: BatchSlot) -> Optional[dict]:
+        """
+        Verifica a aba sem bloquear
+        
+        Returns:
+            Optional[dict]: Resultado se o prompt terminou (ou expirou), senão None
+        """
+        state = slot.detector.state()
+        elapsed = time.time() - slot.started_at
+        
+        if state and state['done']:
+            return self.make_result(slot, 'ok', state['text'], state)
+        
+        if elapsed > self.timeout:
+            slot.detector.stop()
+            return self.make_result(slot, 'timeout', state['text'] if state else '', state)
+        
+        return None
+    
+    def make_result(self, slot: BatchSlot, status: str, response: str,
+                    state: Optional[dict] = None, error: Optional[str] = None) -> dict:
+        """Monta o registro de saída de um prompt"""
+        return {
+            'id': slot.job['id'],
+            'prompt': slot.job['prompt'],
+            'status': status,
+            'response': response,
+            'error': error,
+            'first_token_ms': state.get('first_token_ms') if state else None,
+            'total_ms': round((time.time() - slot.started_at) * 1000),
+            'page': slot.index,
+            'finished_at': datetime.now().isoformat()
+        }
+    
+    def run(self, input_path: str, output_path: str, resume: bool = True) -> dict:
+        """
+        Processa todos os prompts do arquivo de entrada
+        
+        Args:
+            input_path (str): JSONL com os prompts
+            output_path (str): JSONL onde os resultados são acrescentados
+            resume (bool): Pula prompts que já têm resultado "ok" na saída
+        
+        Returns:
+            dict: Resumo com contagens, duração e prompts por minuto
+        """
+        jobs = self.load_prompts(input_path)
+        if resume:
+            done = self.load_done_ids(output_path)
+            jobs = [job for job in jobs if job['id'] not in done]
+        
+        print(f"📋 {len(jobs)} prompts para processar com {self.concurrency} abas")
+        if not jobs:
+            return self.summary(0)
+        
+        if not self.check_login():
+            raise Exception("Perfil não está logado. Execute o login antes do lote.")
+        
+        directory = os.path.dirname(output_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        
+        pending = deque(jobs)
+        started = time.time()
+        
+        try:
+            for index in range(min(self.concurrency, len(jobs))):
+                self.slots.append(BatchSlot(index, self.pool.checkout()))
+            
+            with open(output_path, 'a') as output:
+                while pending or any(slot.job for slot in self.slots):
+                    progressed = False
+                    
+                    for slot in self.slots:
+                        result = None
+                        
+                        try:
+                            if slot.job is None and pending:
+                                self.start_job(slot, pending.popleft())
+                                progressed = True
+                            elif slot.job is not None:
+                                result = self.poll_job(slot)
+                        except Exception as e:
+                            print(f"❌ [aba {slot.index}] Erro no prompt {slot.job['id']}: {e}")
+                            result = self.make_result(slot, 'error', '', error=str(e))
+                        
+                        if result:
+                            output.write(json.dumps(result, ensure_ascii=False) + "\n")
+                            output.flush()
+                            self.stats[result['status']] += 1
+                            print(f"✅ [aba {slot.index}] Prompt {result['id']}: "
+                                  f"{result['status']} em {result['total_ms']}ms")
+                            slot.job = None
+                            progressed = True
+                    
+                    # Espera curta que também processa os eventos do Playwright
+                    if not progressed and self.slots:
+                        self.slots[0].page.wait_for_timeout(100)
+        
+        finally:
+            for slot in self.slots:
+                self.pool.checkin(slot.pooled, reusable=slot.job is None)
+            self.slots = []
+        
+        return self.summary(time.time() - started)
+    
+    def summary(self, elapsed: float) -> dict:
+        """Resumo do lote com a vazão em prompts por minuto"""
+        total = sum(self.stats.values())
+        summary = dict(self.stats)
+        summary['total'] = total
+        summary['elapsed_s'] = round(elapsed, 1)
+        summary['prompts_per_minute'] = round(total / elapsed * 60, 2) if elapsed else 0
+        summary['waited_s'] = get_wait_report().summary()['waited']
+        routes = get_route_policy().summary()
+        summary['requests_blocked'] = routes['blocked']
+        summary['kb_saved'] = round(routes['bytes_saved'] / 1024)
+        cache = get_asset_cache()
+        if cache is not None:
+            assets = cache.summary()
+            summary['asset_hits'] = assets['hits'] + assets['revalidated']
+            summary['asset_misses'] = assets['misses']
+            summary['kb_from_cache'] = round(assets['bytes_served'] / 1024)
+        return summary
+
+def main():
+    """Executa um lote pela linha de comando"""
+    parser = argparse.ArgumentParser(description="Executa prompts em lote no AI Studio")
+    parser.add_argument("input", help="JSONL com um objeto {\"id\", \"prompt\"} por linha")
+    parser.add_argument("-o", "--output", default="/workspaces/replit/interactions/batch_results.jsonl",
+                        help="JSONL de saída (resultados são acrescentados)")
+    parser.add_argument("-c", "--concurrency", type=int, default=3, help="Abas simultâneas")
+    parser.add_argument("-t", "--timeout", type=float, default=90, help="Prazo por resposta (s)")
+    parser.add_argument("--visible", action="store_true", help="Mostrar o navegador")
+    parser.add_argument("--no-resume", action="store_true", help="Reprocessar prompts já concluídos")
+    args = parser.parse_args()
+    
+    print("🤖 EXECUÇÃO EM LOTE - AI STUDIO")
+    print("=" * 40)
+    
+    runner = BatchRunner(concurrency=args.concurrency, timeout=args.timeout,
+                         headless=not args.visible)
+    try:
+        summary = runner.run(args.input, args.output, resume=not args.no_resume)
+        print(f"\n📊 Resumo: {summary}")
+    finally:
+        runner.pool.close()
+
+if __name__ == "__main__":
+    main()
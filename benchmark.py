@@ -0,0 +1,490 @@
+"""
+Benchmark de Ponta a Ponta com Tempo por Etapa
+- Roda os fluxos reais (AIStudioInteraction e BatchRunner) contra o simulador
+  local do AI Studio: sem rede, sem conta e com latências reproduzíveis
+- Cada cenário é repetido N vezes (com rodadas de aquecimento descartadas)
+- p50/p95/p99 por etapa a partir dos spans do rastreamento; prompts/min do lote
+- Resultados acrescentados a um histórico JSONL e comparados com uma linha de base
+"""
+
+import os
+import sys
+import json
+import math
+import time
+import shutil
+import tempfile
+import argparse
+import subprocess
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from ai_studio_simulator import AIStudioSimulator, SIMULATOR_ENV
+from tracing import read_spans, FIRST_TOKEN_STAGE
+
+BENCHMARK_DIR = "/workspaces/replit/benchmarks"
+DEFAULT_HISTORY_FILE = os.path.join(BENCHMARK_DIR, "history.jsonl")
+DEFAULT_BASELINE_FILE = os.path.join(BENCHMARK_DIR, "baseline.json")
+
+# Etapas do fluxo de interação, na ordem em que aparecem no relatório
+INTERACTION_STAGES = ('login_check', 'navigation', 'chat_creation', 'message_input',
+                      FIRST_TOKEN_STAGE, 'response_complete', 'interaction')
+
+# Etapas derivadas dos resultados do lote (um valor por prompt)
+BATCH_STAGES = ('batch_first_token', 'batch_prompt')
+
+DEFAULT_PROMPT = "Explique em uma frase o que é um benchmark."
+
+# Variação percentual que conta como regressão (ou melhora) na comparação
+DEFAULT_THRESHOLD = 10.0
+
+def percentile(values: List[float], pct: float) -> Optional[float]:
+    """Percentil pelo método do posto mais próximo (None se não houver valores)"""
+    if not values:
+        return None
+    ordered = sorted(values)
+    rank = max(1, math.ceil(pct / 100 * len(ordered)))
+    return ordered[rank - 1]
+
+def stage_stats(values: List[float], errors: int = 0) -> dict:
+    """Contagem, média e percentis (ms) de uma etapa"""
+    return {
+        'count': len(values),
+        'errors': errors,
+        'mean': round(sum(values) / len(values), 1) if values else None,
+        'p50': percentile(values, 50),
+        'p95': percentile(values, 95),
+        'p99': percentile(values, 99),
+        'max': max(values) if values else None
+    }
+
+def spans_by_stage(spans: List[dict], since: float, stages=INTERACTION_STAGES) -> Dict[str, dict]:
+    """
+    Estatísticas por etapa dos spans deste processo a partir de um instante
+    
+    Args:
+        spans (List[dict]): Spans lidos do JSONL
+        since (float): Ignora spans iniciados antes (rodadas de aquecimento)
+        stages: Etapas incluídas no resultado
+    
+    Returns:
+        Dict[str, dict]: Etapa → stage_stats()
+    """
+    durations: Dict[str, List[float]] = {stage: [] for stage in stages}
+    errors: Dict[str, int] = {stage: 0 for stage in stages}
+    for span in spans:
+        if span.get('pid') != os.getpid() or span['start'] < since or span['name'] not in durations:
+            continue
+        durations[span['name']].append(span['duration_ms'])
+        if span.get('status') == 'error' or span.get('attrs', {}).get('result') is False:
+            errors[span['name']] += 1
+    return {stage: stage_stats(durations[stage], errors[stage])
+            for stage in stages if durations[stage]}
+
+def git_commit() -> Optional[str]:
+    """Commit atual do repositório (None fora de um checkout git)"""
+    try:
+        output = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                                cwd=os.path.dirname(os.path.abspath(__file__)), timeout=5)
+        return output.stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+class BenchmarkRun:
+    """Uma execução do benchmark: simulador, estado autenticado e spans isolados"""
+    
+    def __init__(self, iterations: int = 5, warmup: int = 1, batch_size: int = 10,
+                 concurrency: int = 3, headless: bool = True, prompt: str = DEFAULT_PROMPT,
+                 simulator_config: Optional[dict] = None, work_dir: Optional[str] = None):
+        """
+        Prepara a execução
+        
+        Args:
+            iterations (int): Repetições medidas de cada cenário
+            warmup (int): Repetições iniciais descartadas (navegador frio)
+            batch_size (int): Prompts do cenário em lote (0 desliga o cenário)
+            concurrency (int): Abas simultâneas do lote
+            headless (bool): Executar sem interface gráfica
+            prompt (str): Mensagem enviada em cada interação
+            simulator_config (dict): Latências e falhas do simulador (DEFAULT_CONFIG)
+            work_dir (str): Diretório dos artefatos (padrão: temporário)
+        """
+        self.iterations = max(1, iterations)
+        self.warmup = max(0, warmup)
+        self.batch_size = max(0, batch_size)
+        self.concurrency = max(1, concurrency)
+        self.headless = headless
+        self.prompt = prompt
+        self.simulator_config = simulator_config or {}
+        self.work_dir = work_dir or tempfile.mkdtemp(prefix="aistudio-bench-")
+        self.trace_file = os.path.join(self.work_dir, "spans.jsonl")
+        self.simulator: Optional[AIStudioSimulator] = None
+        self.store = None
+    
+    def setup(self):
+        """
+        Sobe o simulador e isola o processo dos arquivos reais
+        
+        As variáveis de ambiente precisam valer antes do primeiro uso dos
+        singletons (rastreador, armazém de estado autenticado): o benchmark
+        nunca grava spans, cookies, seletores ou logs nos arquivos de produção.
+        As URLs simuladas são as reais, então seletores vencedores no DOM do
+        simulador iriam para o cache real.
+        """
+        self.simulator = AIStudioSimulator(**self.simulator_config)
+        self.simulator.start()
+        
+        os.environ[SIMULATOR_ENV] = self.simulator.base_url
+        os.environ["TRACE_FILE"] = self.trace_file
+        os.environ["METRICS_FILE"] = os.path.join(self.work_dir, "metrics.prom")
+        os.environ["AUTH_STATE_DIR"] = os.path.join(self.work_dir, "auth_state")
+        os.environ["SELECTOR_CACHE_FILE"] = os.path.join(self.work_dir, "selector_cache.json")
+        os.environ["TRACING"] = "on"
+        
+        # Sessão válida no simulador: pool e sonda partem de um perfil logado
+        from auth_state import get_auth_store
+        self.store = get_auth_store()
+        cookies = [dict(cookie, httpOnly=False, sameSite='Lax')
+                   for cookie in self.simulator.session_cookies()]
+        self.store.save({'cookies': cookies, 'origins': []})
+        print(f"🧪 Simulador em {self.simulator.base_url}, artefatos em {self.work_dir}")
+    
+    def teardown(self, keep_artifacts: bool = False):
+        if self.simulator:
+            self.simulator.stop()
+            self.simulator = None
+        if not keep_artifacts:
+            shutil.rmtree(self.work_dir, ignore_errors=True)
+    
+    def _new_interaction(self, pool):
+        """AIStudioInteraction com sessão e logs dentro do diretório de trabalho"""
+        from ai_studio_interaction_complete import AIStudioInteraction
+        from interaction_log import get_log_writer
+        
+        interaction = AIStudioInteraction(headless=self.headless, pool=pool)
+        interaction.session_file = os.path.join(self.work_dir, "session_data.json")
+        interaction.interactions_dir = os.path.join(self.work_dir, "interactions")
+        interaction.ensure_interaction_dirs()
+        interaction.interaction_log = get_log_writer(interaction.interactions_dir)
+        return interaction
+    
+    def run_interaction(self) -> dict:
+        """
+        Cenário de interação: verificação de login, chat novo, envio e resposta
+        
+        Returns:
+            dict: Etapas (stage_stats) e contagem de interações com resposta
+        """
+        from browser_pool import BrowserPool
+        from interaction_log import get_log_writer
+        
+        pool = BrowserPool(size=1, max_pages=1, headless=self.headless, auth_store=self.store)
+        completed = 0
+        measured_from = time.time()
+        
+        try:
+            for index in range(self.warmup + self.iterations):
+                if index == self.warmup:
+                    measured_from = time.time()
+                label = "aquecimento" if index < self.warmup else f"{index - self.warmup + 1}/{self.iterations}"
+                print(f"\n⏱️ Interação {label}")
+                
+                interaction = self._new_interaction(pool)
+                try:
+                    result = interaction.complete_interaction(self.prompt)
+                finally:
+                    interaction.cleanup()
+                
+                if index >= self.warmup and result and result['response']:
+                    completed += 1
+        finally:
+            pool.close()
+            # O escritor grava em segundo plano; esvazia antes do diretório ser removido
+            get_log_writer(os.path.join(self.work_dir, "interactions")).flush()
+        
+        return {
+            'iterations': self.iterations,
+            'completed': completed,
+            'stages': spans_by_stage(read_spans(self.trace_file), measured_from)
+        }
+    
+    def run_batch(self) -> dict:
+        """
+        Cenário em lote: batch_size prompts com concurrency abas
+        
+        Returns:
+            dict: Resumo do BatchRunner e etapas por prompt (primeiro token e total)
+        """
+        from browser_pool import BrowserPool
+        from batch_runner import BatchRunner
+        
+        input_path = os.path.join(self.work_dir, "batch_prompts.jsonl")
+        output_path = os.path.join(self.work_dir, "batch_results.jsonl")
+        with open(input_path, 'w') as f:
+            for index in range(self.batch_size):
+                f.write(json.dumps({'id': f"bench-{index + 1}", 'prompt': self.prompt}) + "\n")
+        
+        pool = BrowserPool(size=self.concurrency, max_pages=self.concurrency,
+                           headless=self.headless, auth_store=self.store)
+        runner = BatchRunner(concurrency=self.concurrency, headless=self.headless, pool=pool)
+        try:
+            summary = runner.run(input_path, output_path, resume=False)
+        finally:
+            pool.close()
+        
+        results = []
+        with open(output_path, 'r') as f:
+            for line in f:
+                results.append(json.loads(line))
+        failed = sum(1 for result in results if result['status'] != 'ok')
+        
+        return {
+            'prompts': summary['total'],
+            'ok': summary['ok'],
+            'elapsed_s': summary['elapsed_s'],
+            'prompts_per_minute': summary['prompts_per_minute'],
+            'stages': {
+                'batch_first_token': stage_stats([result['first_token_ms'] for result in results
+                                                  if result['first_token_ms'] is not None]),
+                'batch_prompt': stage_stats([result['total_ms'] for result in results], failed)
+            }
+        }
+    
+    def run(self) -> dict:
+        """
+        Executa os cenários e monta o registro do histórico
+        
+        Returns:
+            dict: Registro com configuração, etapas e vazão do lote
+        """
+        record = {
+            'timestamp': datetime.now().isoformat(),
+            'commit': git_commit(),
+            'config': {
+                'iterations': self.iterations,
+                'warmup': self.warmup,
+                'batch_size': self.batch_size,
+                'concurrency': self.concurrency,
+                'simulator': self.simulator_config
+            }
+        }
+        
+        interaction = self.run_interaction()
+        record['interaction'] = {key: value for key, value in interaction.items() if key != 'stages'}
+        record['stages'] = interaction['stages']
+        
+        if self.batch_size:
+            batch = self.run_batch()
+            record['batch'] = {key: value for key, value in batch.items() if key != 'stages'}
+            record['stages'].update(batch['stages'])
+        
+        return record
+
+def append_history(record: dict, path: str = DEFAULT_HISTORY_FILE):
+    """Acrescenta o registro ao histórico (uma linha por execução)"""
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, 'a', encoding='utf-8') as f:
+        f.write(json.dumps(record, ensure_ascii=False) + "\n")
+
+def load_history(path: str = DEFAULT_HISTORY_FILE) -> List[dict]:
+    """Registros do histórico, do mais antigo para o mais recente"""
+    records = []
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    records.append(json.loads(line))
+                except ValueError:
+                    continue
+    except OSError:
+        pass
+    return records
+
+def save_baseline(record: dict, path: str = DEFAULT_BASELINE_FILE):
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(record, f, indent=2, ensure_ascii=False)
+
+def load_baseline(path: str = DEFAULT_BASELINE_FILE) -> Optional[dict]:
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+def _delta(current: Optional[float], base: Optional[float]) -> Optional[float]:
+    """Variação percentual (positiva = mais lento / maior)"""
+    if current is None or not base:
+        return None
+    return round((current - base) / base * 100, 1)
+
+def compare(record: dict, baseline: dict, threshold: float = DEFAULT_THRESHOLD) -> dict:
+    """
+    Compara uma execução com a linha de base
+    
+    Uma etapa regride quando o p50 ou o p95 fica mais de threshold% mais
+    lento; o lote regride quando os prompts/min caem mais de threshold%.
+    
+    Args:
+        record (dict): Execução atual
+        baseline (dict): Execução de referência
+        threshold (float): Variação percentual tolerada
+    
+    Returns:
+        dict: Variações por etapa, do lote e listas de regressões e melhoras
+    """
+    stages = {}
+    regressions = []
+    improvements = []
+    
+    for stage, current in record['stages'].items():
+        base = baseline.get('stages', {}).get(stage)
+        if not base:
+            continue
+        deltas = {pct: _delta(current[pct], base[pct]) for pct in ('p50', 'p95', 'p99')}
+        stages[stage] = deltas
+        relevant = [deltas[pct] for pct in ('p50', 'p95') if deltas[pct] is not None]
+        if any(delta > threshold for delta in relevant):
+            regressions.append(stage)
+        elif relevant and all(delta < -threshold for delta in relevant):
+            improvements.append(stage)
+    
+    throughput = None
+    if record.get('batch') and baseline.get('batch'):
+        throughput = _delta(record['batch']['prompts_per_minute'], baseline['batch']['prompts_per_minute'])
+        if throughput is not None:
+            if throughput < -threshold:
+                regressions.append('prompts_per_minute')
+            elif throughput > threshold:
+                improvements.append('prompts_per_minute')
+    
+    return {
+        'stages': stages,
+        'prompts_per_minute': throughput,
+        'regressions': regressions,
+        'improvements': improvements,
+        'same_config': record.get('config') == baseline.get('config')
+    }
+
+def _ms(value: Optional[float]) -> str:
+    return f"{value:8.1f}" if value is not None else "       -"
+
+def print_report(record: dict):
+    """Tabela de percentis por etapa e vazão do lote"""
+    print("\n📊 BENCHMARK POR ETAPA (ms)")
+    print("=" * 66)
+    print(f"   {'etapa':<22}{'n':>4}{'p50':>9}{'p95':>9}{'p99':>9}{'máx':>9}  erros")
+    for stage in INTERACTION_STAGES + BATCH_STAGES:
+        stats = record['stages'].get(stage)
+        if not stats:
+            continue
+        print(f"   {stage:<22}{stats['count']:>4}{_ms(stats['p50']):>9}{_ms(stats['p95']):>9}"
+              f"{_ms(stats['p99']):>9}{_ms(stats['max']):>9}  {stats['errors']}")
+    
+    interaction = record['interaction']
+    print(f"\n💬 Interações com resposta: {interaction['completed']}/{interaction['iterations']}")
+    batch = record.get('batch')
+    if batch:
+        print(f"📦 Lote: {batch['ok']}/{batch['prompts']} prompts em {batch['elapsed_s']}s "
+              f"→ {batch['prompts_per_minute']} prompts/min")
+
+def _mark(delta: Optional[float], threshold: float) -> str:
+    if delta is None:
+        return "➖"
+    if delta > threshold:
+        return "⚠️"
+    if delta < -threshold:
+        return "✅"
+    return "➖"
+
+def print_comparison(comparison: dict, baseline: dict, threshold: float = DEFAULT_THRESHOLD):
+    """Variação de cada etapa em relação à linha de base"""
+    print(f"\n📈 COMPARAÇÃO COM A LINHA DE BASE ({baseline.get('commit') or 'sem commit'}, "
+          f"{baseline.get('timestamp', '?')[:19]})")
+    print("=" * 66)
+    if not comparison['same_config']:
+        print("⚠️ Configuração diferente da linha de base: as variações não são comparáveis")
+    
+    for stage in INTERACTION_STAGES + BATCH_STAGES:
+        deltas = comparison['stages'].get(stage)
+        if not deltas:
+            continue
+        text = "  ".join(f"{pct} {deltas[pct]:+.1f}%" if deltas[pct] is not None else f"{pct} -"
+                         for pct in ('p50', 'p95', 'p99'))
+        worst = max((deltas[pct] for pct in ('p50', 'p95') if deltas[pct] is not None), default=None)
+        print(f"   {_mark(worst, threshold)} {stage:<22}{text}")
+    
+    throughput = comparison['prompts_per_minute']
+    if throughput is not None:
+        print(f"   {_mark(-throughput, threshold)} {'prompts_per_minute':<22}{throughput:+.1f}%")
+    
+    if comparison['regressions']:
+        print(f"\n⚠️ Regressões (>{threshold:g}%): {', '.join(comparison['regressions'])}")
+    if comparison['improvements']:
+        print(f"✅ Melhoras (>{threshold:g}%): {', '.join(comparison['improvements'])}")
+    if not comparison['regressions'] and not comparison['improvements']:
+        print(f"\n➖ Sem variações acima de {threshold:g}%")
+
+def main():
+    """Executa o benchmark pela linha de comando"""
+    parser = argparse.ArgumentParser(description="Benchmark de ponta a ponta contra o AI Studio simulado")
+    parser.add_argument("-n", "--iterations", type=int, default=5, help="Repetições medidas de cada cenário")
+    parser.add_argument("--warmup", type=int, default=1, help="Repetições de aquecimento descartadas")
+    parser.add_argument("-b", "--batch-size", type=int, default=10, help="Prompts do lote (0 desliga)")
+    parser.add_argument("-c", "--concurrency", type=int, default=3, help="Abas simultâneas do lote")
+    parser.add_argument("--latency-ms", type=int, default=0, help="Atraso de toda resposta do simulador")
+    parser.add_argument("--first-token-ms", type=int, help="Tempo até o primeiro token no simulador")
+    parser.add_argument("--token-ms", type=int, help="Intervalo entre tokens no simulador")
+    parser.add_argument("--history", default=DEFAULT_HISTORY_FILE, help="JSONL do histórico")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE_FILE, help="Linha de base para comparação")
+    parser.add_argument("--save-baseline", action="store_true", help="Gravar esta execução como linha de base")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help="Variação percentual que conta como regressão")
+    parser.add_argument("--fail-on-regression", action="store_true",
+                        help="Sair com código 1 se houver regressão")
+    parser.add_argument("--keep-artifacts", action="store_true", help="Manter spans, logs e resultados")
+    parser.add_argument("--visible", action="store_true", help="Mostrar o navegador")
+    args = parser.parse_args()
+    
+    print("🏁 BENCHMARK - AI STUDIO SIMULADO")
+    print("=" * 40)
+    
+    simulator_config = {'latency_ms': args.latency_ms}
+    if args.first_token_ms is not None:
+        simulator_config['first_token_ms'] = args.first_token_ms
+    if args.token_ms is not None:
+        simulator_config['token_ms'] = args.token_ms
+    
+    run = BenchmarkRun(iterations=args.iterations, warmup=args.warmup, batch_size=args.batch_size,
+                       concurrency=args.concurrency, headless=not args.visible,
+                       simulator_config=simulator_config)
+    try:
+        run.setup()
+        record = run.run()
+    finally:
+        run.teardown(args.keep_artifacts)
+        if args.keep_artifacts:
+            print(f"📁 Artefatos mantidos em {run.work_dir}")
+    
+    print_report(record)
+    append_history(record, args.history)
+    print(f"\n💾 Histórico: {args.history} ({len(load_history(args.history))} execuções)")
+    
+    regressions = []
+    baseline = load_baseline(args.baseline)
+    if baseline:
+        comparison = compare(record, baseline, args.threshold)
+        print_comparison(comparison, baseline, args.threshold)
+        regressions = comparison['regressions']
+    else:
+        print(f"ℹ️ Sem linha de base em {args.baseline} (use --save-baseline)")
+    
+    if args.save_baseline:
+        save_baseline(record, args.baseline)
+        print(f"📌 Linha de base gravada em {args.baseline}")
+    
+    if args.fail_on_regression and regressions:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
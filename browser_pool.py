@@ -0,0 +1,360 @@
+"""
+Pool de Navegadores Compartilhado
+- Mantém processos Chromium aquecidos com contextos e páginas pré-criados
+- Empréstimo/devolução de páginas com verificação de saúde
+- Reciclagem por idade máxima e limite de páginas simultâneas
+- Contextos novos podem nascer logados a partir do armazém de storage_state
+"""
+
+import atexit
+import time
+from contextlib import contextmanager
+from typing import List, Optional
+
+try:
+    from playwright.sync_api import sync_playwright
+    PLAYWRIGHT_AVAILABLE = True
+except ImportError:
+    PLAYWRIGHT_AVAILABLE = False
+
+from route_policy import attach_route_policy
+from auth_state import AuthStateStore
+from profile_manager import get_profile_manager
+
+# Configurações otimizadas para Docker/Alpine (mesmas do AIStudioLogin2FA)
+DEFAULT_LAUNCH_OPTIONS = {
+    'executable_path': '/usr/bin/chromium-browser',
+    'args': [
+        '--no-sandbox',
+        '--disable-dev-shm-usage',
+        '--disable-gpu',
+        '--disable-web-security',
+        '--disable-extensions',
+        '--no-first-run',
+        '--disable-default-apps',
+        '--disable-blink-features=AutomationControlled',
+        '--user-agent=Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
+    ]
+}
+
+DEFAULT_CONTEXT_OPTIONS = {
+    'viewport': {'width': 1366, 'height': 768}
+}
+
+# Script para mascarar automação
+STEALTH_INIT_SCRIPT = """
+    Object.defineProperty(navigator, 'webdriver', {
+        get: () => undefined,
+    });
+    delete window.cdc_adoQpoasnfa76pfcZLmcfl_Array;
+    delete window.cdc_adoQpoasnfa76pfcZLmcfl_Promise;
+    delete window.cdc_adoQpoasnfa76pfcZLmcfl_Symbol;
+"""
+
+class PooledPage:
+    """Página emprestada pelo pool, com o contexto e o navegador de origem"""
+    
+    def __init__(self, page, context, browser, owns_context: bool):
+        self.page = page
+        self.context = context
+        self.browser = browser
+        self.owns_context = owns_context
+        self.created_at = time.time()
+        self.uses = 0
+        self.auth_version = None
+    
+    @property
+    def age(self) -> float:
+        """Idade do slot em segundos"""
+        return time.time() - self.created_at
+
+class BrowserPool:
+    """
+    Pool de navegadores, contextos e páginas reutilizáveis
+    
+    A API síncrona do Playwright não é thread-safe: cada pool deve ser usado
+    apenas pela thread que o criou. Para várias threads, crie um pool por
+    thread.
+    """
+    
+    def __init__(self, size: int = 2, max_pages: int = 4, max_age: float = 1800,
+                 max_uses: int = 50, headless: bool = True, browsers: int = 1,
+                 user_data_dir: Optional[str] = None, launch_options: Optional[dict] = None,
+                 context_options: Optional[dict] = None, auth_store: Optional[AuthStateStore] = None):
+        """
+        Inicializa o pool
+        
+        Args:
+            size (int): Páginas ociosas mantidas aquecidas
+            max_pages (int): Limite de páginas emprestadas ao mesmo tempo
+            max_age (float): Idade máxima (segundos) de páginas e navegadores
+            max_uses (int): Empréstimos por página antes de reciclar
+            headless (bool): Executar sem interface gráfica
+            browsers (int): Processos Chromium (ignorado com user_data_dir)
+            user_data_dir (str): Perfil persistente; todas as páginas compartilham o contexto
+            launch_options (dict): Sobrescreve DEFAULT_LAUNCH_OPTIONS
+            context_options (dict): Sobrescreve DEFAULT_CONTEXT_OPTIONS
+            auth_store (AuthStateStore): Cria cada contexto novo com o storage_state
+                atual; slots de versões anteriores são reciclados
+        """
+        self.size = size
+        self.max_pages = max_pages
+        self.max_age = max_age
+        self.max_uses = max_uses
+        self.headless = headless
+        self.browser_count = max(1, browsers)
+        self.user_data_dir = user_data_dir
+        self.launch_options = dict(DEFAULT_LAUNCH_OPTIONS, **(launch_options or {}))
+        self.context_options = dict(DEFAULT_CONTEXT_OPTIONS, **(context_options or {}))
+        self.auth_store = auth_store
+        
+        self.playwright = None
+        self.browsers: List[dict] = []
+        self.persistent_context = None
+        self.profile_lease = None
+        self.idle: List[PooledPage] = []
+        self.in_use: List[PooledPage] = []
+        self.next_browser = 0
+        self.stats = {'checkouts': 0, 'created': 0, 'recycled': 0, 'unhealthy': 0}
+    
+    def start(self):
+        """Inicia o Playwright, os navegadores e as páginas aquecidas"""
+        if not PLAYWRIGHT_AVAILABLE:
+            raise Exception("❌ Playwright não está instalado. "
+                            "Instale com 'pip install playwright' e 'playwright install'")
+        
+        if self.playwright:
+            return self
+        
+        self.playwright = sync_playwright().start()
+        
+        if self.user_data_dir:
+            self._launch_persistent_context()
+        else:
+            for _ in range(self.browser_count):
+                self.browsers.append(self._launch_browser())
+        
+        while len(self.idle) < self.size:
+            self.idle.append(self._create_slot())
+        
+        print(f"✅ Pool de navegadores pronto ({len(self.idle)} páginas aquecidas)")
+        return self
+    
+    def _launch_browser(self) -> dict:
+        """Inicia um processo Chromium"""
+        browser = self.playwright.chromium.launch(headless=self.headless, **self.launch_options)
+        return {'browser': browser, 'launched_at': time.time()}
+    
+    def _launch_persistent_context(self):
+        """Abre o contexto persistente compartilhado por todas as páginas"""
+        # Outro processo com o mesmo perfil recebe um clone em vez de disputar a trava
+        self.profile_lease = get_profile_manager().lease_profile(self.user_data_dir)
+        self.persistent_context = self.playwright.chromium.launch_persistent_context(
+            self.profile_lease.path,
+            headless=self.headless,
+            **self.launch_options,
+            **self.context_options
+        )
+        self.persistent_context.add_init_script(STEALTH_INIT_SCRIPT)
+        attach_route_policy(self.persistent_context, self.headless)
+        
+        # Reaproveitar a aba inicial aberta pelo Chromium
+        for page in self.persistent_context.pages:
+            self.idle.append(PooledPage(page, self.persistent_context, None, owns_context=False))
+    
+    def _pick_browser(self) -> dict:
+        """Escolhe o navegador do próximo slot, relançando os expirados ou desconectados"""
+        index = self.next_browser % len(self.browsers)
+        self.next_browser += 1
+        entry = self.browsers[index]
+        
+        busy = any(slot.browser is entry['browser'] for slot in self.in_use + self.idle)
+        expired = time.time() - entry['launched_at'] > self.max_age
+        
+        if not entry['browser'].is_connected() or (expired and not busy):
+            print("♻️ Reciclando processo do navegador")
+            try:
+                entry['browser'].close()
+            except Exception:
+                pass
+            entry = self._launch_browser()
+            self.browsers[index] = entry
+            self.stats['recycled'] += 1
+        
+        return entry
+    
+    def _create_slot(self, clean: bool = False) -> PooledPage:
+        """
+        Cria uma nova página (e contexto, se não for persistente)
+        
+        Args:
+            clean (bool): Contexto sem o storage_state do armazém
+        """
+        self.stats['created'] += 1
+        
+        if self.persistent_context:
+            page = self.persistent_context.new_page()
+            slot = PooledPage(page, self.persistent_context, None, owns_context=False)
+        else:
+            browser = self._pick_browser()['browser']
+            auth_version = self.auth_store.latest_version() if self.auth_store and not clean else None
+            if auth_version is not None:
+                context = browser.new_context(storage_state=self.auth_store.load(auth_version),
+                                              **self.context_options)
+            else:
+                context = browser.new_context(**self.context_options)
+            context.add_init_script(STEALTH_INIT_SCRIPT)
+            attach_route_policy(context, self.headless)
+            page = context.new_page()
+            slot = PooledPage(page, context, browser, owns_context=True)
+            slot.auth_version = auth_version
+        
+        slot.page.set_default_timeout(30000)
+        return slot
+    
+    def _destroy_slot(self, slot: PooledPage):
+        """Fecha a página e o contexto próprio do slot"""
+        try:
+            if not slot.page.is_closed():
+                slot.page.close()
+            if slot.owns_context:
+                slot.context.close()
+        except Exception:
+            pass
+    
+    def is_healthy(self, slot: PooledPage) -> bool:
+        """Verifica se a página e o navegador ainda respondem"""
+        try:
+            if slot.page.is_closed():
+                return False
+            if slot.browser and not slot.browser.is_connected():
+                return False
+            return slot.page.evaluate("() => 1") == 1
+        except Exception:
+            return False
+    
+    def _is_expired(self, slot: PooledPage) -> bool:
+        """Indica se o slot passou da idade, do número de usos ou da versão do login"""
+        if slot.owns_context and self.auth_store and slot.auth_version != self.auth_store.latest_version():
+            return True
+        return slot.age > self.max_age or slot.uses >= self.max_uses
+    
+    def checkout(self, fresh: bool = False) -> PooledPage:
+        """
+        Empresta uma página aquecida
+        
+        Args:
+            fresh (bool): Contexto novo, sem cookies nem storage_state, que nunca
+                foi usado (ex.: login de um usuário); só o navegador é reaproveitado.
+                Devolva esses slots com checkin(reusable=False).
+        
+        Returns:
+            PooledPage: Slot com page, context e browser
+        """
+        if fresh and self.user_data_dir:
+            raise Exception("Contexto isolado indisponível: o pool usa um perfil persistente compartilhado")
+        
+        self.start()
+        
+        if len(self.in_use) >= self.max_pages:
+            raise Exception(f"Limite de {self.max_pages} páginas simultâneas atingido no pool")
+        
+        if fresh:
+            slot = self._create_slot(clean=True)
+            slot.uses += 1
+            self.in_use.append(slot)
+            self.stats['checkouts'] += 1
+            return slot
+        
+        slot = None
+        while self.idle:
+            candidate = self.idle.pop()
+            if self._is_expired(candidate):
+                self.stats['recycled'] += 1
+                self._destroy_slot(candidate)
+            elif not self.is_healthy(candidate):
+                self.stats['unhealthy'] += 1
+                self._destroy_slot(candidate)
+            else:
+                slot = candidate
+                break
+        
+        if slot is None:
+            slot = self._create_slot()
+        
+        slot.uses += 1
+        self.in_use.append(slot)
+        self.stats['checkouts'] += 1
+        return slot
+    
+    def checkin(self, slot: PooledPage, reusable: bool = True):
+        """
+        Devolve uma página ao pool
+        
+        Args:
+            slot (PooledPage): Slot obtido em checkout()
+            reusable (bool): False para descartar a página (ex.: após erro)
+        """
+        if slot in self.in_use:
+            self.in_use.remove(slot)
+        
+        if (reusable and len(self.idle) < self.size and not self._is_expired(slot)
+                and self.is_healthy(slot)):
+            self.idle.append(slot)
+        else:
+            self._destroy_slot(slot)
+    
+    @contextmanager
+    def page(self):
+        """Empresta uma página dentro de um bloco with"""
+        slot = self.checkout()
+        reusable = True
+        try:
+            yield slot.page
+        except Exception:
+            reusable = False
+            raise
+        finally:
+            self.checkin(slot, reusable=reusable)
+    
+    def close(self):
+        """Fecha todas as páginas, contextos e navegadores"""
+        for slot in self.idle + self.in_use:
+            self._destroy_slot(slot)
+        self.idle = []
+        self.in_use = []
+        
+        try:
+            if self.persistent_context:
+                self.persistent_context.close()
+            for entry in self.browsers:
+                entry['browser'].close()
+            if self.playwright:
+                self.playwright.stop()
+        except Exception:
+            pass
+        
+        if self.profile_lease:
+            self.profile_lease.release()
+            self.profile_lease = None
+        self.persistent_context = None
+        self.browsers = []
+        self.playwright = None
+
+_default_pools = {}
+
+def get_default_pool(user_data_dir: Optional[str] = None, headless: bool = True, **kwargs) -> BrowserPool:
+    """
+    Retorna o pool compartilhado do processo (um por perfil)
+    
+    Args:
+        user_data_dir (str): Perfil persistente, ou None para contextos novos
+        headless (bool): Executar sem interface gráfica
+        **kwargs: Demais opções de BrowserPool na primeira criação
+    """
+    key = (user_data_dir, headless)
+    if key not in _default_pools:
+        pool = BrowserPool(user_data_dir=user_data_dir, headless=headless, **kwargs)
+        _default_pools[key] = pool
+        atexit.register(pool.close)
+    return _default_pools[key]
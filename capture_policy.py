@@ -0,0 +1,175 @@
+"""
+Política Central de Screenshots
+- Níveis: off, on-error, milestones, full-trace
+- Configuração por execução e por subsistema (variáveis de ambiente ou código)
+- Buffer circular em memória com os últimos quadros, gravado só quando ocorre erro
+"""
+
+import os
+import threading
+from collections import deque
+from typing import Optional
+
+from screenshot_pipeline import get_screenshot_pipeline
+
+LEVELS = ("off", "on-error", "milestones", "full-trace")
+
+# Nível usado quando nada é configurado: nenhum screenshot em disco fora de erros
+DEFAULT_LEVEL = "on-error"
+
+# Tipos de captura, do mais frequente ao mais importante
+TRACE = "trace"
+MILESTONE = "milestone"
+ERROR = "error"
+
+# Capturas funcionais pedidas explicitamente (ex.: tela do 2FA para o usuário)
+REQUIRED = "required"
+
+# Trechos do nome que indicam o tipo quando ele não é informado
+ERROR_HINTS = ("error", "erro", "fail", "falh", "timeout", "no_", "unknown")
+TRACE_HINTS = ("waiting", "attempt", "monitor")
+
+# Ação por nível e tipo: "disk" grava, "ring" guarda em memória, None ignora
+ACTIONS = {
+    "off": {TRACE: None, MILESTONE: None, ERROR: None, REQUIRED: "disk"},
+    "on-error": {TRACE: None, MILESTONE: "ring", ERROR: "disk", REQUIRED: "disk"},
+    "milestones": {TRACE: "ring", MILESTONE: "disk", ERROR: "disk", REQUIRED: "disk"},
+    "full-trace": {TRACE: "disk", MILESTONE: "disk", ERROR: "disk", REQUIRED: "disk"}
+}
+
+# Níveis definidos em código para a execução atual (subsistema → nível; None = todos)
+_run_levels = {}
+
+def set_run_level(level: str, subsystem: Optional[str] = None):
+    """
+    Define o nível para a execução atual, sobrepondo as variáveis de ambiente
+    
+    Args:
+        level (str): Um dos LEVELS
+        subsystem (str): Subsistema específico, ou None para todos
+    """
+    if level not in LEVELS:
+        raise ValueError(f"Nível de captura inválido: {level} (use {', '.join(LEVELS)})")
+    _run_levels[subsystem] = level
+
+def resolve_level(subsystem: str) -> str:
+    """
+    Nível efetivo do subsistema
+    
+    Ordem: set_run_level(subsistema) > CAPTURE_POLICY_<SUBSISTEMA> >
+    set_run_level(None) > CAPTURE_POLICY > DEFAULT_LEVEL
+    """
+    candidates = [
+        _run_levels.get(subsystem),
+        os.getenv(f"CAPTURE_POLICY_{subsystem.upper()}"),
+        _run_levels.get(None),
+        os.getenv("CAPTURE_POLICY")
+    ]
+    for level in candidates:
+        if level in LEVELS:
+            return level
+    return DEFAULT_LEVEL
+
+def classify(name: str) -> str:
+    """Deduz o tipo de captura a partir do nome do screenshot"""
+    lowered = name.lower()
+    if any(hint in lowered for hint in ERROR_HINTS):
+        return ERROR
+    if any(hint in lowered for hint in TRACE_HINTS):
+        return TRACE
+    return MILESTONE
+
+class CapturePolicy:
+    """Decide se, onde e como cada screenshot de um subsistema é capturado"""
+    
+    def __init__(self, subsystem: str, output_dir: str, ring_size: Optional[int] = None):
+        """
+        Inicializa a política
+        
+        Args:
+            subsystem (str): Nome do subsistema (ex.: "login", "interaction")
+            output_dir (str): Diretório dos screenshots gravados
+            ring_size (int): Quadros mantidos em memória (padrão CAPTURE_RING_SIZE ou 5)
+        """
+        self.subsystem = subsystem
+        self.output_dir = output_dir
+        if ring_size is None:
+            ring_size = int(os.getenv("CAPTURE_RING_SIZE", 5))
+        self.ring = deque(maxlen=max(ring_size, 0))
+        self.stats = {'disk': 0, 'ring': 0, 'skipped': 0, 'ring_flushed': 0}
+    
+    @property
+    def level(self) -> str:
+        return resolve_level(self.subsystem)
+    
+    def capture(self, page, name: str, kind: Optional[str] = None, full_page: bool = False,
+                path: Optional[str] = None) -> Optional[str]:
+        """
+        Captura conforme o nível do subsistema
+        
+        Args:
+            page: Página do Playwright
+            name (str): Nome do screenshot
+            kind (str): TRACE, MILESTONE, ERROR ou REQUIRED (deduzido do nome se omitido)
+            full_page (bool): Página inteira em vez da área visível
+            path (str): Caminho explícito do arquivo
+        
+        Returns:
+            Optional[str]: Caminho gravado, ou None se não foi para o disco
+        """
+        if page is None:
+            return None
+        
+        kind = kind or classify(name)
+        action = ACTIONS[self.level][kind]
+        
+        if action is None or (action == "ring" and not self.ring.maxlen):
+            self.stats['skipped'] += 1
+            return None
+        
+        pipeline = get_screenshot_pipeline(self.output_dir)
+        
+        if action == "ring":
+            # Quadro barato em memória; só vai ao disco se um erro acontecer
+            data = page.screenshot(type="jpeg", quality=pipeline.quality)
+            self.ring.append((name, data))
+            self.stats['ring'] += 1
+            return None
+        
+        if kind == ERROR:
+            self.flush_ring()
+        
+        self.stats['disk'] += 1
+        return pipeline.capture(page, name, full_page=full_page, path=path)
+    
+    def trace(self, page, name: str) -> Optional[str]:
+        return self.capture(page, name, TRACE)
+    
+    def milestone(self, page, name: str, path: Optional[str] = None) -> Optional[str]:
+        return self.capture(page, name, MILESTONE, path=path)
+    
+    def error(self, page, name: str, path: Optional[str] = None) -> Optional[str]:
+        return self.capture(page, name, ERROR, path=path)
+    
+    def flush_ring(self):
+        """Grava os quadros em memória que antecederam o erro"""
+        if not self.ring:
+            return
+        
+        pipeline = get_screenshot_pipeline(self.output_dir)
+        print(f"📸 Gravando {len(self.ring)} quadros anteriores ao erro")
+        for index, (name, data) in enumerate(self.ring):
+            pipeline.submit(f"ring{index}_{name}", data)
+            self.stats['ring_flushed'] += 1
+        self.ring.clear()
+
+_policies = {}
+_policies_lock = threading.Lock()
+
+def get_capture_policy(subsystem: str, output_dir: str) -> CapturePolicy:
+    """Retorna a política compartilhada do processo para o subsistema e diretório"""
+    key = (subsystem, os.path.abspath(output_dir))
+    with _policies_lock:
+        if key not in _policies:
+            _policies[key] = CapturePolicy(subsystem, output_dir)
+        return _policies[key]
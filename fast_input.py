@@ -0,0 +1,140 @@
+"""
+Entrada de Texto Rápida
+- Insere o prompt inteiro em uma única operação (fill / insertText)
+- Funciona em textarea, input e contenteditable
+- Verifica o conteúdo depois de inserir e tenta o método alternativo se divergir
+- Modo "human" mantém a digitação caractere a caractere
+"""
+
+import os
+import time
+import random
+
+INPUT_MODES = ("fast", "human")
+
+# Padrão para lote e API; INPUT_MODE=human restaura a digitação com atrasos
+DEFAULT_INPUT_MODE = os.getenv("INPUT_MODE", "fast")
+
+# Lê o conteúdo atual do campo, seja textarea/input ou contenteditable
+READ_FIELD_JS = """
+(el) => el.isContentEditable ? el.innerText : (el.value !== undefined ? el.value : el.textContent)
+"""
+
+# Limpa o campo e dispara "input" para frameworks que observam o valor
+CLEAR_FIELD_JS = """
+(el) => {
+    el.focus();
+    if (el.isContentEditable) {
+        const range = document.createRange();
+        range.selectNodeContents(el);
+        const selection = window.getSelection();
+        selection.removeAllRanges();
+        selection.addRange(range);
+        document.execCommand('delete');
+    } else {
+        el.value = '';
+    }
+    el.dispatchEvent(new Event('input', { bubbles: true }));
+}
+"""
+
+def _normalize(text: str) -> str:
+    """Ignora diferenças de espaços e quebras de linha entre value e innerText"""
+    return " ".join((text or "").split())
+
+def read_field(page, selector: str) -> str:
+    """Retorna o texto atual do campo"""
+    return page.locator(selector).first.evaluate(READ_FIELD_JS)
+
+def verify_field(page, selector: str, text: str) -> bool:
+    """Confere se o campo contém exatamente o texto esperado"""
+    try:
+        return _normalize(read_field(page, selector)) == _normalize(text)
+    except Exception:
+        return False
+
+def fill_fast(page, selector: str, text: str) -> bool:
+    """
+    Insere o texto completo em uma operação e verifica
+    
+    Tenta locator.fill() primeiro; se o editor não aceitar ou o conteúdo não
+    conferir, limpa o campo e usa keyboard.insert_text() (um único evento
+    insertText, sem keydown por caractere).
+    
+    Args:
+        page: Página do Playwright
+        selector (str): Seletor do campo
+        text (str): Texto a inserir
+    
+    Returns:
+        bool: True se o conteúdo final confere com o texto
+    """
+    field = page.locator(selector).first
+    
+    try:
+        field.fill(text)
+        if verify_field(page, selector, text):
+            return True
+    except Exception as e:
+        print(f"⚠️ fill() falhou, usando insertText: {e}")
+    
+    try:
+        field.evaluate(CLEAR_FIELD_JS)
+        field.focus()
+        page.keyboard.insert_text(text)
+    except Exception as e:
+        print(f"❌ Erro ao inserir texto: {e}")
+        return False
+    
+    return verify_field(page, selector, text)
+
+def type_human(page, selector: str, text: str, delay: int = 50) -> bool:
+    """
+    Digita caractere a caractere com atraso variável (comportamento anterior)
+    
+    Args:
+        page: Página do Playwright
+        selector (str): Seletor do campo
+        text (str): Texto a digitar
+        delay (int): Atraso base entre teclas em milissegundos
+    
+    Returns:
+        bool: True se o conteúdo final confere com o texto
+    """
+    field = page.locator(selector).first
+    field.click()
+    field.evaluate(CLEAR_FIELD_JS)
+    time.sleep(0.3)
+    
+    for char in text:
+        page.keyboard.type(char, delay=delay + random.randint(0, 40))
+    
+    return verify_field(page, selector, text)
+
+def enter_text(page, selector: str, text: str, mode: str = None) -> bool:
+    """
+    Preenche o campo de mensagem conforme o modo
+    
+    Args:
+        page: Página do Playwright
+        selector (str): Seletor do campo
+        text (str): Texto a inserir
+        mode (str): "fast" ou "human" (padrão DEFAULT_INPUT_MODE)
+    
+    Returns:
+        bool: True se o conteúdo final confere com o texto
+    """
+    mode = mode or DEFAULT_INPUT_MODE
+    started = time.time()
+    
+    if mode == "human":
+        ok = type_human(page, selector, text)
+    else:
+        ok = fill_fast(page, selector, text)
+    
+    elapsed_ms = round((time.time() - started) * 1000)
+    if ok:
+        print(f"⌨️ {len(text)} caracteres inseridos em {elapsed_ms}ms (modo {mode})")
+    else:
+        print(f"⚠️ Conteúdo do campo não confere após inserir texto (modo {mode})")
+    return ok
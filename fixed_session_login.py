@@ -7,6 +7,8 @@ import os
 import time
 import json
 from automation import GoogleAIStudioAutomation
+from profile_manager import get_profile_manager
+from route_policy import attach_route_policy
 from playwright.sync_api import sync_playwright
 
 class FixedSessionLogin:
@@ -16,16 +18,25 @@ class FixedSessionLogin:
         self.playwright = None
         self.context = None
         self.page = None
+        self.profile_lease = None
         
-    def ensure_clean_profile(self):
-        """Garante um perfil limpo"""
-        if os.path.exists(self.user_data_dir):
+    def ensure_clean_profile(self, fresh=False):
+        """
+        Garante um perfil utilizável e exclusivo deste processo
+        
+        A concessão remove as travas Singleton* deixadas por execuções
+        interrompidas; os dados (e a sessão) só são apagados com fresh=True.
+        """
+        if not self.profile_lease:
+            self.profile_lease = get_profile_manager().lease_profile(self.user_data_dir)
+        
+        if fresh:
             import shutil
-            shutil.rmtree(self.user_data_dir)
+            shutil.rmtree(self.profile_lease.path, ignore_errors=True)
             print("🧹 Perfil anterior removido")
         
-        os.makedirs(self.user_data_dir, exist_ok=True)
-        print(f"📁 Novo perfil criado: {self.user_data_dir}")
+        os.makedirs(self.profile_lease.path, exist_ok=True)
+        print(f"📁 Perfil pronto: {self.profile_lease.path}")
     
     def save_session_data(self):
         """Salva cookies e dados de sessão de forma mais robusta"""
@@ -126,12 +137,17 @@ class FixedSessionLogin:
                 }
             }
             
+            self.ensure_clean_profile()
+            
             # Usar contexto persistente
             self.context = self.playwright.chromium.launch_persistent_context(
-                self.user_data_dir,
+                self.profile_lease.path,
                 **context_options
             )
             
+            # Bloqueio de recursos, cache de assets e simulador (contexto headless)
+            attach_route_policy(self.context, headless=True)
+            
             self.page = self.context.new_page()
             
             # Script para remover detecção de automação
@@ -340,6 +356,10 @@ class FixedSessionLogin:
                 self.playwright.stop()
         except:
             pass
+        
+        if self.profile_lease:
+            self.profile_lease.release()
+            self.profile_lease = None
 
 def test_fixed_session():
     """Testa o sistema corrigido de sessão"""
@@ -0,0 +1,193 @@
+"""
+Motor de Sondagem HTTP
+- Sessão requests com pool de conexões (keep-alive) e cookies em memória
+- Concorrência limitada com ThreadPoolExecutor; resultados na ordem dos pedidos
+- Tempo de cada requisição e resumo da rodada
+- prefetch(): dispara a matriz inteira de URLs de uma vez e os testes consomem
+  as respostas já prontas
+"""
+
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Union
+
+try:
+    import requests
+    from requests.adapters import HTTPAdapter
+except ImportError:
+    requests = None
+
+DEFAULT_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
+    'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
+    'Accept-Language': 'en-US,en;q=0.5',
+    'Accept-Encoding': 'gzip, deflate',
+    'DNT': '1',
+    'Connection': 'keep-alive',
+    'Upgrade-Insecure-Requests': '1',
+}
+
+class HTTPResult:
+    """Resposta (ou erro) de uma requisição com o tempo gasto"""
+    
+    def __init__(self, method: str, url: str, status: int = 0, final_url: str = "",
+                 text: str = "", elapsed_ms: float = 0, error: Optional[str] = None):
+        self.method = method
+        self.url = url
+        self.status = status
+        self.final_url = final_url or url
+        self.text = text
+        self.elapsed_ms = elapsed_ms
+        self.error = error
+    
+    @property
+    def ok(self) -> bool:
+        """True se a requisição foi concluída (qualquer status HTTP)"""
+        return self.error is None
+    
+    def __repr__(self):
+        outcome = self.error or self.status
+        return f"HTTPResult({self.method} {self.url} → {outcome}, {self.elapsed_ms:.0f}ms)"
+
+RequestSpec = Union[str, dict]
+
+class HTTPProbe:
+    """Cliente HTTP compartilhado pelos analisadores"""
+    
+    def __init__(self, max_workers: int = 8, timeout: float = 10, headers: Optional[dict] = None):
+        """
+        Inicializa o motor
+        
+        Args:
+            max_workers (int): Requisições simultâneas (e conexões por host no pool)
+            timeout (float): Prazo padrão por requisição em segundos
+            headers (dict): Cabeçalhos padrão (padrão: DEFAULT_HEADERS)
+        """
+        if requests is None:
+            raise Exception("❌ requests não está instalado. Instale com 'pip install requests'")
+        
+        self.max_workers = max(1, max_workers)
+        self.timeout = timeout
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=16, pool_maxsize=self.max_workers)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self.session.headers.update(headers or DEFAULT_HEADERS)
+        
+        self.lock = threading.Lock()
+        self.prefetched: Dict[tuple, List[HTTPResult]] = {}
+        self.stats = {'requests': 0, 'errors': 0, 'total_ms': 0.0, 'max_ms': 0.0}
+    
+    @property
+    def cookies(self):
+        """Cookie jar em memória (compartilhado entre as requisições)"""
+        return self.session.cookies
+    
+    @staticmethod
+    def _normalize(spec: RequestSpec) -> dict:
+        if isinstance(spec, str):
+            spec = {'url': spec}
+        return dict({'method': 'GET', 'headers': None, 'data': None, 'timeout': None,
+                     'allow_redirects': True}, **spec)
+    
+    @staticmethod
+    def _key(spec: dict) -> tuple:
+        headers = tuple(sorted((spec['headers'] or {}).items()))
+        data = tuple(sorted(spec['data'].items())) if isinstance(spec['data'], dict) else spec['data']
+        return (spec['method'].upper(), spec['url'], headers, data, spec['allow_redirects'])
+    
+    def request(self, method: str, url: str, headers: Optional[dict] = None, data=None,
+                timeout: Optional[float] = None, allow_redirects: bool = True) -> HTTPResult:
+        """
+        Executa uma requisição (nunca lança exceção)
+        
+        Uma resposta idêntica disparada por prefetch() é consumida em vez de
+        repetir a requisição.
+        
+        Returns:
+            HTTPResult: Status, URL final, corpo e tempo, ou o erro
+        """
+        spec = {'method': method, 'url': url, 'headers': headers, 'data': data,
+                'timeout': timeout, 'allow_redirects': allow_redirects}
+        with self.lock:
+            pending = self.prefetched.get(self._key(spec))
+            cached = pending.pop(0) if pending else None
+        if cached:
+            return cached
+        
+        started = time.perf_counter()
+        try:
+            response = self.session.request(method, url, headers=headers, data=data,
+                                            timeout=timeout or self.timeout,
+                                            allow_redirects=allow_redirects)
+            result = HTTPResult(method, url, response.status_code, response.url, response.text,
+                                (time.perf_counter() - started) * 1000)
+        except Exception as e:
+            result = HTTPResult(method, url, elapsed_ms=(time.perf_counter() - started) * 1000,
+                                error=str(e))
+        
+        with self.lock:
+            self.stats['requests'] += 1
+            self.stats['total_ms'] += result.elapsed_ms
+            self.stats['max_ms'] = max(self.stats['max_ms'], result.elapsed_ms)
+            if not result.ok:
+                self.stats['errors'] += 1
+        return result
+    
+    def get(self, url: str, **kwargs) -> HTTPResult:
+        return self.request('GET', url, **kwargs)
+    
+    def post(self, url: str, data=None, **kwargs) -> HTTPResult:
+        return self.request('POST', url, data=data, **kwargs)
+    
+    def fetch_all(self, specs: List[RequestSpec]) -> List[HTTPResult]:
+        """
+        Executa as requisições em paralelo (até max_workers ao mesmo tempo)
+        
+        Args:
+            specs (List): URLs ou dicts com method, url, headers, data, timeout, allow_redirects
+        
+        Returns:
+            List[HTTPResult]: Resultados na mesma ordem dos pedidos
+        """
+        specs = [self._normalize(spec) for spec in specs]
+        if not specs:
+            return []
+        
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=min(self.max_workers, len(specs))) as executor:
+            results = list(executor.map(lambda spec: self.request(**spec), specs))
+        
+        wall_ms = (time.perf_counter() - started) * 1000
+        slowest = max(result.elapsed_ms for result in results)
+        print(f"⚡ {len(results)} requisições em {wall_ms:.0f}ms (mais lenta: {slowest:.0f}ms)")
+        return results
+    
+    def prefetch(self, specs: List[RequestSpec]):
+        """Dispara todas as requisições agora; request() com os mesmos parâmetros usa o resultado"""
+        specs = [self._normalize(spec) for spec in specs]
+        results = self.fetch_all(specs)
+        with self.lock:
+            for spec, result in zip(specs, results):
+                self.prefetched.setdefault(self._key(spec), []).append(result)
+    
+    def summary(self) -> dict:
+        """Totais das requisições executadas"""
+        with self.lock:
+            stats = dict(self.stats)
+        stats['avg_ms'] = round(stats['total_ms'] / stats['requests'], 1) if stats['requests'] else 0
+        stats['total_ms'] = round(stats['total_ms'], 1)
+        stats['max_ms'] = round(stats['max_ms'], 1)
+        return stats
+    
+    def print_timings(self, results: List[HTTPResult]):
+        """Tabela de tempo por requisição, da mais lenta para a mais rápida"""
+        print("\n⏱️ TEMPO POR REQUISIÇÃO")
+        print("=" * 40)
+        for result in sorted(results, key=lambda item: -item.elapsed_ms):
+            outcome = f"❌ {result.error[:40]}" if result.error else result.status
+            print(f"   {result.elapsed_ms:7.0f}ms  {outcome}  {result.url}")
+    
+    def close(self):
+        self.session.close()
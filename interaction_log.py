@@ -0,0 +1,279 @@
+"""
+Log de Interações em JSONL
+- Cada ação é acrescentada como uma linha, sem reler nem reescrever o arquivo
+- Buffer descarregado em segundo plano por uma thread
+- Rotação por tamanho ou idade com renomeação atômica dos segmentos
+- Leitor que reconstrói as últimas N entradas lendo os arquivos de trás para frente
+"""
+
+import os
+import json
+import time
+import atexit
+import fcntl
+import threading
+from datetime import datetime
+from typing import Iterator, List, Optional
+
+class InteractionLogWriter:
+    """
+    Escritor de log append-only
+    
+    O segmento ativo é "<prefix>.jsonl". Na rotação ele é renomeado (os.replace,
+    atômico) para "<prefix>.<data>_<pid>.jsonl" e nunca mais é alterado.
+    Vários processos podem escrever no mesmo diretório: cada descarga é um
+    único write() com O_APPEND e a rotação é protegida por flock.
+    
+    A idade do segmento conta da criação do arquivo, registrada em
+    ".<prefix>.created" (inode e data): processos curtos, que abrem o segmento
+    uma vez por execução, também rotacionam por idade.
+    """
+    
+    def __init__(self, log_dir: str, prefix: str = "interaction_log",
+                 max_bytes: int = 5 * 1024 * 1024, max_age: float = 24 * 3600,
+                 flush_interval: float = 1.0, max_segments: int = 20):
+        """
+        Inicializa o escritor
+        
+        Args:
+            log_dir (str): Diretório dos segmentos
+            prefix (str): Prefixo dos arquivos
+            max_bytes (int): Tamanho do segmento ativo que dispara a rotação
+            max_age (float): Idade (segundos) do segmento ativo que dispara a rotação
+            flush_interval (float): Intervalo entre descargas do buffer
+            max_segments (int): Segmentos fechados mantidos (os mais antigos são apagados)
+        """
+        self.log_dir = log_dir
+        self.prefix = prefix
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        self.flush_interval = flush_interval
+        self.max_segments = max_segments
+        self.active_path = os.path.join(log_dir, f"{prefix}.jsonl")
+        self.lock_path = os.path.join(log_dir, f".{prefix}.lock")
+        self.created_path = os.path.join(log_dir, f".{prefix}.created")
+        
+        self.buffer: List[str] = []
+        self.buffer_lock = threading.Lock()
+        self.write_lock = threading.Lock()
+        self.wakeup = threading.Event()
+        self.closed = False
+        self.fd = None
+        self.created_at = None
+        
+        os.makedirs(log_dir, exist_ok=True)
+        self.thread = threading.Thread(target=self._flush_loop, name="interaction-log", daemon=True)
+        self.thread.start()
+    
+    def append(self, entry: dict):
+        """Acrescenta uma entrada ao buffer (não bloqueia em disco)"""
+        line = json.dumps(entry, ensure_ascii=False, default=str) + "\n"
+        with self.buffer_lock:
+            self.buffer.append(line)
+            if len(self.buffer) >= 100:
+                self.wakeup.set()
+    
+    def _flush_loop(self):
+        """Descarrega o buffer periodicamente até o escritor ser fechado"""
+        while not self.closed:
+            self.wakeup.wait(self.flush_interval)
+            self.wakeup.clear()
+            try:
+                self.flush()
+            except Exception as e:
+                print(f"⚠️ Erro ao gravar log de interações: {e}")
+    
+    def _open_active(self):
+        """Abre o segmento ativo, reabrindo se outro processo o rotacionou"""
+        if self.fd is not None:
+            try:
+                if os.fstat(self.fd).st_ino == os.stat(self.active_path).st_ino:
+                    return
+            except FileNotFoundError:
+                pass
+            os.close(self.fd)
+        
+        self.fd = os.open(self.active_path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        self.created_at = self._segment_created_at(os.fstat(self.fd).st_ino)
+    
+    def _segment_created_at(self, inode: int) -> float:
+        """
+        Data de criação do segmento ativo
+        
+        O ctime do arquivo muda a cada escrita, então a data fica em um arquivo
+        ao lado, ligada ao inode. Sem registro (segmento novo ou de uma versão
+        anterior) a contagem começa agora.
+        """
+        try:
+            with open(self.created_path, 'r') as f:
+                stored_inode, created = f.read().split()
+            if int(stored_inode) == inode:
+                return float(created)
+        except (OSError, ValueError):
+            pass
+        
+        created = time.time()
+        temp_path = f"{self.created_path}.{os.getpid()}.tmp"
+        with open(temp_path, 'w') as f:
+            f.write(f"{inode} {created}")
+        os.replace(temp_path, self.created_path)
+        return created
+    
+    def flush(self):
+        """Grava imediatamente as entradas pendentes"""
+        with self.buffer_lock:
+            lines, self.buffer = self.buffer, []
+        
+        if not lines:
+            return
+        
+        with self.write_lock:
+            self._open_active()
+            os.write(self.fd, "".join(lines).encode('utf-8'))
+            
+            size = os.fstat(self.fd).st_size
+            if size >= self.max_bytes or time.time() - self.created_at >= self.max_age:
+                self.rotate()
+    
+    def rotate(self):
+        """Fecha o segmento ativo renomeando-o para um segmento imutável"""
+        with open(self.lock_path, 'w') as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                # Outro processo pode ter rotacionado enquanto esperávamos o lock
+                if not os.path.exists(self.active_path) or os.path.getsize(self.active_path) == 0:
+                    return
+                
+                timestamp = datetime.now().strftime("%Y%m%d_%H%M%S_%f")
+                segment = os.path.join(self.log_dir, f"{self.prefix}.{timestamp}_{os.getpid()}.jsonl")
+                os.replace(self.active_path, segment)
+                try:
+                    os.remove(self.created_path)
+                except FileNotFoundError:
+                    pass
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+        
+        if self.fd is not None:
+            os.close(self.fd)
+            self.fd = None
+        
+        self._prune()
+    
+    def _prune(self):
+        """Apaga os segmentos fechados mais antigos além de max_segments"""
+        segments = InteractionLogReader(self.log_dir, self.prefix).closed_segments()
+        for path in segments[:-self.max_segments] if self.max_segments else []:
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+    
+    def close(self):
+        """Para a thread e grava o que restou no buffer"""
+        if self.closed:
+            return
+        self.closed = True
+        self.wakeup.set()
+        self.thread.join(timeout=5)
+        self.flush()
+        with self.write_lock:
+            if self.fd is not None:
+                os.close(self.fd)
+                self.fd = None
+
+class InteractionLogReader:
+    """Leitor dos segmentos do log de interações"""
+    
+    def __init__(self, log_dir: str, prefix: str = "interaction_log"):
+        self.log_dir = log_dir
+        self.prefix = prefix
+    
+    def closed_segments(self) -> List[str]:
+        """Segmentos fechados em ordem cronológica"""
+        if not os.path.isdir(self.log_dir):
+            return []
+        names = [
+            name for name in os.listdir(self.log_dir)
+            if name.startswith(f"{self.prefix}.") and name.endswith(".jsonl")
+            and name != f"{self.prefix}.jsonl"
+        ]
+        return [os.path.join(self.log_dir, name) for name in sorted(names)]
+    
+    def segments(self) -> List[str]:
+        """Todos os segmentos, do mais antigo ao ativo"""
+        segments = self.closed_segments()
+        active = os.path.join(self.log_dir, f"{self.prefix}.jsonl")
+        if os.path.exists(active):
+            segments.append(active)
+        return segments
+    
+    @staticmethod
+    def _read_lines_reverse(path: str, block_size: int = 65536) -> Iterator[str]:
+        """Lê as linhas de um arquivo da última para a primeira, em blocos"""
+        try:
+            f = open(path, 'rb')
+        except FileNotFoundError:
+            return
+        
+        with f:
+            f.seek(0, os.SEEK_END)
+            position = f.tell()
+            remainder = b""
+            
+            while position > 0:
+                read_size = min(block_size, position)
+                position -= read_size
+                f.seek(position)
+                lines = (f.read(read_size) + remainder).split(b"\n")
+                remainder = lines.pop(0)
+                for line in reversed(lines):
+                    if line.strip():
+                        yield line.decode('utf-8', errors='replace')
+            
+            if remainder.strip():
+                yield remainder.decode('utf-8', errors='replace')
+    
+    def iter_reverse(self) -> Iterator[dict]:
+        """Entradas da mais recente para a mais antiga, lidas sob demanda"""
+        for path in reversed(self.segments()):
+            for line in self._read_lines_reverse(path):
+                try:
+                    yield json.loads(line)
+                except ValueError:
+                    # Linha parcial de uma gravação interrompida
+                    continue
+    
+    def last(self, n: int = 100, action: Optional[str] = None) -> List[dict]:
+        """
+        Reconstrói a visão das últimas N entradas
+        
+        Args:
+            n (int): Número de entradas
+            action (str): Filtra por tipo de ação
+        
+        Returns:
+            List[dict]: Entradas da mais antiga para a mais recente
+        """
+        entries = []
+        for entry in self.iter_reverse():
+            if action and entry.get('action') != action:
+                continue
+            entries.append(entry)
+            if len(entries) >= n:
+                break
+        entries.reverse()
+        return entries
+
+_writers = {}
+_writers_lock = threading.Lock()
+
+def get_log_writer(log_dir: str, prefix: str = "interaction_log") -> InteractionLogWriter:
+    """Retorna o escritor compartilhado do processo para o diretório"""
+    key = (os.path.abspath(log_dir), prefix)
+    with _writers_lock:
+        if key not in _writers:
+            writer = InteractionLogWriter(log_dir, prefix)
+            _writers[key] = writer
+            atexit.register(writer.close)
+        return _writers[key]
@@ -8,6 +8,8 @@ import sys
 sys.path.append('/workspaces/replit')
 
 from ai_studio_login_2fa import AIStudioLogin2FA
+from waits import wait_for_page_ready
+from navigation import goto_app
 
 class AIStudioInvestigation(AIStudioLogin2FA):
     def __init__(self):
@@ -31,8 +33,7 @@ class AIStudioInvestigation(AIStudioLogin2FA):
             
             # Ir para página principal
             print("\n📍 Indo para página principal...")
-            self.page.goto("https://aistudio.google.com/", timeout=20000)
-            time.sleep(3)
+            goto_app(self.page, "https://aistudio.google.com/", timeout=20000)
             
             current_url = self.page.url
             print(f"🔗 URL atual: {current_url}")
@@ -181,7 +182,7 @@ class AIStudioInvestigation(AIStudioLogin2FA):
                     # Aguardar e clicar
                     self.page.wait_for_selector(selector, timeout=5000)
                     self.page.click(selector)
-                    time.sleep(5)
+                    wait_for_page_ready(self.page)
                     
                     # Verificar nova URL
                     new_url = self.page.url
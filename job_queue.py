@@ -0,0 +1,323 @@
+"""
+Fila de Jobs de Automação em Segundo Plano
+- O app só enfileira o job e acompanha o progresso; o script do Streamlit nunca bloqueia
+- Workers em threads próprias, cada um dono de um BrowserPool aquecido
+  (a API síncrona do Playwright só pode ser usada pela thread que a criou)
+- Cada job registra eventos numerados (etapa, progresso, mensagem) para polling
+- Usuários e execuções repetidas compartilham os mesmos navegadores aquecidos
+"""
+
+import os
+import time
+import queue
+import atexit
+import itertools
+import threading
+from typing import Callable, Dict, List, Optional
+
+from browser_pool import BrowserPool
+
+# Estados de um job
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+
+FINISHED_STATES = (DONE, FAILED)
+
+# Jobs concluídos mantidos para consulta (os mais antigos são descartados)
+MAX_FINISHED_JOBS = 100
+
+DEFAULT_WORKERS = int(os.getenv("JOB_WORKERS", "2"))
+
+# Screenshots de cada job ficam em um subdiretório com o id do job
+JOB_SCREENSHOT_DIR = os.getenv("JOB_SCREENSHOT_DIR", "/workspaces/replit/job_screenshots")
+
+class Job:
+    """Job enfileirado com o registro de eventos"""
+    
+    def __init__(self, job_id: str, kind: str, params: dict):
+        self.id = job_id
+        self.kind = kind
+        self.params = params
+        self.status = QUEUED
+        self.progress = 0
+        self.events: List[dict] = []
+        self.result: Optional[dict] = None
+        self.error: Optional[str] = None
+        self.created_at = time.time()
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self.worker: Optional[str] = None
+        self.lock = threading.Lock()
+    
+    @property
+    def finished(self) -> bool:
+        return self.status in FINISHED_STATES
+    
+    def emit(self, message: str, progress: Optional[int] = None, stage: Optional[str] = None,
+             level: str = "info"):
+        """
+        Registra um evento do job
+        
+        Args:
+            message (str): Texto mostrado na interface
+            progress (int): Progresso de 0 a 100 (padrão: mantém o anterior)
+            stage (str): Nome curto da etapa
+            level (str): info, success, warning ou error
+        """
+        with self.lock:
+            if progress is not None:
+                self.progress = max(0, min(100, progress))
+            self.events.append({
+                'seq': len(self.events),
+                'time': time.time(),
+                'stage': stage,
+                'progress': self.progress,
+                'message': message,
+                'level': level
+            })
+    
+    def events_since(self, seq: int = 0) -> List[dict]:
+        """Eventos a partir do número seq (para polling incremental)"""
+        with self.lock:
+            return list(self.events[seq:])
+    
+    @property
+    def elapsed(self) -> float:
+        """Segundos de execução (até agora, se ainda estiver rodando)"""
+        if self.started_at is None:
+            return 0.0
+        return (self.finished_at or time.time()) - self.started_at
+    
+    def to_dict(self) -> dict:
+        """Estado do job sem os parâmetros (que podem conter credenciais)"""
+        with self.lock:
+            return {
+                'id': self.id,
+                'kind': self.kind,
+                'status': self.status,
+                'progress': self.progress,
+                'events': list(self.events),
+                'result': self.result,
+                'error': self.error,
+                'worker': self.worker,
+                'created_at': self.created_at,
+                'elapsed': round(self.elapsed, 1)
+            }
+    
+    def __repr__(self):
+        return f"Job({self.id} {self.kind} → {self.status}, {self.progress}%)"
+
+JobHandler = Callable[[Job, BrowserPool], Optional[dict]]
+
+class JobQueue:
+    """
+    Fila de jobs com workers donos dos navegadores
+    
+    Cada worker cria seu BrowserPool na primeira vez que precisa dele e o
+    mantém aquecido entre jobs; só o contexto de cada job é descartado.
+    """
+    
+    def __init__(self, workers: int = DEFAULT_WORKERS, pool_factory: Optional[Callable[[], BrowserPool]] = None):
+        """
+        Inicializa a fila e os workers
+        
+        Args:
+            workers (int): Threads (e navegadores) dedicados aos jobs
+            pool_factory (Callable): Cria o pool de cada worker (padrão: 1 página headless)
+        """
+        self.workers = max(1, workers)
+        self.pool_factory = pool_factory or (lambda: BrowserPool(size=1, max_pages=1, headless=True))
+        self.handlers: Dict[str, JobHandler] = dict(JOB_HANDLERS)
+        self.jobs: Dict[str, Job] = {}
+        self.pending: "queue.Queue[Optional[Job]]" = queue.Queue()
+        self.lock = threading.Lock()
+        self.counter = itertools.count(1)
+        self.stats = {'submitted': 0, 'done': 0, 'failed': 0, 'cold_starts': 0}
+        self.threads: List[threading.Thread] = []
+        
+        for index in range(self.workers):
+            thread = threading.Thread(target=self._worker_loop, args=(f"worker-{index + 1}",),
+                                      name=f"job-worker-{index + 1}", daemon=True)
+            thread.start()
+            self.threads.append(thread)
+    
+    def register(self, kind: str, handler: JobHandler):
+        """Registra a função que executa os jobs de um tipo"""
+        self.handlers[kind] = handler
+    
+    def submit(self, kind: str, **params) -> Job:
+        """
+        Enfileira um job
+        
+        Args:
+            kind (str): Tipo registrado (ex.: 'login')
+            **params: Parâmetros repassados ao handler
+        
+        Returns:
+            Job: Job criado (acompanhe com get() ou events_since())
+        """
+        if kind not in self.handlers:
+            raise Exception(f"Tipo de job desconhecido: {kind}")
+        
+        job = Job(f"{int(time.time())}-{next(self.counter)}", kind, params)
+        job.emit("⏳ Na fila, aguardando um worker livre...", 0, stage="queued")
+        with self.lock:
+            self.jobs[job.id] = job
+            self.stats['submitted'] += 1
+            self._prune()
+        self.pending.put(job)
+        return job
+    
+    def get(self, job_id: str) -> Optional[Job]:
+        with self.lock:
+            return self.jobs.get(job_id)
+    
+    def events_since(self, job_id: str, seq: int = 0) -> List[dict]:
+        job = self.get(job_id)
+        return job.events_since(seq) if job else []
+    
+    def queued_ahead(self, job_id: str) -> int:
+        """Quantos jobs enfileirados antes deste ainda não começaram"""
+        with self.lock:
+            waiting = [job for job in self.jobs.values() if job.status == QUEUED]
+        waiting.sort(key=lambda job: job.created_at)
+        ids = [job.id for job in waiting]
+        return ids.index(job_id) if job_id in ids else 0
+    
+    def _prune(self):
+        """Descarta os jobs concluídos mais antigos (com o lock da fila)"""
+        finished = sorted((job for job in self.jobs.values() if job.finished),
+                          key=lambda job: job.finished_at or 0)
+        for job in finished[:max(0, len(finished) - MAX_FINISHED_JOBS)]:
+            del self.jobs[job.id]
+    
+    def _worker_loop(self, name: str):
+        """Executa jobs até receber o sinal de parada; o pool vive nesta thread"""
+        pool = None
+        try:
+            while True:
+                job = self.pending.get()
+                if job is None:
+                    break
+                
+                if pool is None:
+                    pool = self.pool_factory()
+                    with self.lock:
+                        self.stats['cold_starts'] += 1
+                self._run(job, pool, name)
+        finally:
+            if pool:
+                pool.close()
+    
+    def _run(self, job: Job, pool: BrowserPool, worker: str):
+        job.worker = worker
+        job.started_at = time.time()
+        job.status = RUNNING
+        try:
+            job.result = self.handlers[job.kind](job, pool) or {}
+            job.status = DONE
+        except Exception as e:
+            job.error = str(e)
+            job.status = FAILED
+            job.emit(f"❌ Erro: {e}", 100, stage="error", level="error")
+        finally:
+            # Credenciais não ficam guardadas depois da execução
+            job.params = {}
+            job.finished_at = time.time()
+            with self.lock:
+                self.stats['done' if job.status == DONE else 'failed'] += 1
+        print(f"🧵 {job} em {job.elapsed:.1f}s ({worker})")
+    
+    def shutdown(self, wait: bool = True):
+        """Para os workers (os navegadores são fechados pelas próprias threads)"""
+        for _ in self.threads:
+            self.pending.put(None)
+        if wait:
+            for thread in self.threads:
+                thread.join(timeout=30)
+        self.threads = []
+    
+    def summary(self) -> dict:
+        with self.lock:
+            stats = dict(self.stats)
+            stats['queued'] = sum(1 for job in self.jobs.values() if job.status == QUEUED)
+            stats['running'] = sum(1 for job in self.jobs.values() if job.status == RUNNING)
+        stats['workers'] = self.workers
+        return stats
+
+def run_login_job(job: Job, pool: BrowserPool) -> dict:
+    """
+    Fluxo de login do GoogleAIStudioAutomation com a página do worker
+    
+    Params do job: email, password, timeout_2fa
+    
+    Returns:
+        dict: Screenshots gerados (no diretório do job) e se a página de 2FA apareceu
+    """
+    from automation import GoogleAIStudioAutomation
+    from utils import sanitize_input
+    
+    email = sanitize_input(job.params['email'])
+    password = sanitize_input(job.params['password'])
+    screenshot_dir = os.path.join(JOB_SCREENSHOT_DIR, job.id)
+    os.makedirs(screenshot_dir, exist_ok=True)
+    automation = GoogleAIStudioAutomation(headless=True, timeout_2fa=job.params.get('timeout_2fa', 40),
+                                          pool=pool, screenshot_dir=screenshot_dir)
+    
+    try:
+        job.emit("🔄 Obtendo navegador aquecido...", 10, stage="browser")
+        automation.initialize_browser()
+        
+        job.emit("🌐 Navegando para Google AI Studio...", 25, stage="navigate")
+        automation.navigate_to_ai_studio()
+        
+        job.emit("🔑 Iniciando processo de login...", 40, stage="start_login")
+        automation.start_login()
+        
+        job.emit("📧 Inserindo email...", 55, stage="email")
+        automation.enter_email(email)
+        
+        job.emit("🔒 Inserindo senha...", 70, stage="password")
+        automation.enter_password(password)
+        
+        job.emit("📱 Verificando autenticação de dois fatores...", 85, stage="2fa")
+        automation.wait_for_2fa()
+        
+        job.emit("✅ Login concluído com sucesso!", 100, stage="done", level="success")
+        return {
+            'two_factor': automation.two_factor_detected,
+            'screenshots': list(automation.screenshots)
+        }
+    except Exception:
+        if automation.page:
+            try:
+                error_path = os.path.join(screenshot_dir, "erro_automacao.png")
+                automation.page.screenshot(path=error_path)
+                job.emit(f"📸 Screenshot do erro foi capturada: {error_path}", stage="error")
+            except Exception:
+                pass
+        raise
+    finally:
+        # O contexto (criado só para este job) tem os cookies deste usuário:
+        # a página não volta ao pool, mas o navegador do worker continua aquecido
+        if automation.pooled_page:
+            pool.checkin(automation.pooled_page, reusable=False)
+            automation.pooled_page = None
+
+JOB_HANDLERS: Dict[str, JobHandler] = {
+    'login': run_login_job
+}
+
+_queue = None
+_queue_lock = threading.Lock()
+
+def get_job_queue() -> JobQueue:
+    """Fila compartilhada do processo (JOB_WORKERS define o número de workers)"""
+    global _queue
+    with _queue_lock:
+        if _queue is None:
+            _queue = JobQueue()
+            atexit.register(_queue.shutdown, False)
+        return _queue
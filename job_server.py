@@ -0,0 +1,456 @@
+"""
+Servidor Local de Jobs de Prompt
+- API HTTP local: POST /jobs, GET /jobs/<id>, GET /jobs/<id>/result, GET /health
+- GET /metrics: latência por etapa de todos os workers (formato do Prometheus)
+- N processos worker, cada um com seu navegador aquecido e contexto autenticado
+- Fila única no despachante: cada worker recebe um job por vez, quando fica livre
+- Worker que morre é relançado; o job em andamento falha e um job ainda não
+  iniciado volta para a fila
+"""
+
+import os
+import json
+import time
+import queue
+import argparse
+import itertools
+import threading
+import collections
+import multiprocessing
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Optional
+
+from job_queue import QUEUED, RUNNING, DONE, FAILED, FINISHED_STATES
+from tracing import get_tracer
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = int(os.getenv("JOB_SERVER_PORT", "8765"))
+
+# Cada worker é um Chromium inteiro: metade dos núcleos deixa folga para o renderer
+DEFAULT_WORKERS = int(os.getenv("JOB_SERVER_WORKERS", str(max(1, (os.cpu_count() or 2) // 2))))
+
+# Jobs na fila por worker antes de recusar novos pedidos (503)
+MAX_PENDING_PER_WORKER = 16
+
+# Jobs concluídos mantidos para consulta
+MAX_FINISHED_JOBS = 500
+
+# Espera máxima (segundos) antes de relançar um worker cujo navegador não iniciou
+RESTART_BACKOFF_MAX = 60
+
+def _worker_pool():
+    """Pool do worker: contextos do estado autenticado salvo, senão clone do perfil"""
+    from browser_pool import BrowserPool
+    from auth_state import get_auth_store
+    from batch_runner import PROFILE_DIR
+    
+    store = get_auth_store()
+    if store.latest_version() is not None:
+        return BrowserPool(size=1, max_pages=1, headless=True, auth_store=store)
+    # Com vários workers, o ProfileManager entrega um clone do perfil a cada processo
+    return BrowserPool(size=1, max_pages=1, headless=True, user_data_dir=PROFILE_DIR)
+
+def worker_main(name: str, jobs: multiprocessing.Queue, events: multiprocessing.Queue):
+    """
+    Laço do processo worker
+    
+    O pool é criado e usado só neste processo; entre jobs a página volta
+    para o pool e o navegador continua aberto.
+    
+    Args:
+        name (str): Identificador do worker
+        jobs (Queue): Próximo job (job_id, message) ou None para encerrar
+        events (Queue): Eventos (tipo, job_id, worker, dados) para o despachante
+    """
+    from ai_studio_interaction_complete import AIStudioInteraction
+    
+    pool = _worker_pool()
+    try:
+        pool.start()
+    except Exception as e:
+        # Sem navegador o worker não atende jobs: encerra para ser relançado
+        events.put(('ready', None, name, str(e)))
+        pool.close()
+        return
+    events.put(('ready', None, name, None))
+    
+    try:
+        while True:
+            item = jobs.get()
+            if item is None:
+                break
+            
+            job_id, message = item
+            events.put(('started', job_id, name, None))
+            interaction = AIStudioInteraction(headless=True, pool=pool)
+            try:
+                result = interaction.complete_interaction(message)
+                if result is None:
+                    events.put(('failed', job_id, name, "interação não concluída"))
+                else:
+                    events.put(('done', job_id, name, result))
+            except Exception as e:
+                events.put(('failed', job_id, name, str(e)))
+            finally:
+                interaction.cleanup()
+    finally:
+        pool.close()
+
+class WorkerHandle:
+    """Processo worker visto pelo despachante"""
+    
+    def __init__(self, name: str, process, jobs):
+        self.name = name
+        self.process = process
+        self.jobs = jobs
+        self.current: Optional[str] = None
+        self.ready = False
+        self.startup_error: Optional[str] = None
+        self.exited_at: Optional[float] = None
+        self.completed = 0
+        self.restarts = 0
+    
+    @property
+    def idle(self) -> bool:
+        """Pronto para receber o próximo job"""
+        return (self.ready and self.current is None and not self.startup_error
+                and self.process.is_alive())
+    
+    def to_dict(self) -> dict:
+        return {
+            'name': self.name,
+            'alive': self.process.is_alive(),
+            'ready': self.ready,
+            'startup_error': self.startup_error,
+            'current': self.current,
+            'completed': self.completed,
+            'restarts': self.restarts
+        }
+
+class JobDispatcher:
+    """Distribui jobs entre os processos worker e acompanha os resultados"""
+    
+    def __init__(self, workers: int = DEFAULT_WORKERS, max_pending: int = MAX_PENDING_PER_WORKER):
+        """
+        Inicializa o despachante
+        
+        Args:
+            workers (int): Processos worker (um navegador cada)
+            max_pending (int): Jobs na fila por worker antes de recusar pedidos
+        """
+        # spawn: o Playwright não sobrevive a fork de um processo com threads
+        self.mp = multiprocessing.get_context("spawn")
+        self.events = self.mp.Queue()
+        self.max_pending = max(1, max_pending)
+        self.jobs: Dict[str, dict] = {}
+        self.backlog = collections.deque()
+        self.lock = threading.Lock()
+        self.counter = itertools.count(1)
+        self.running = True
+        self.workers = [self._spawn(f"worker-{index + 1}") for index in range(max(1, workers))]
+        
+        self.collector = threading.Thread(target=self._collect_events, name="job-events", daemon=True)
+        self.collector.start()
+        self.monitor = threading.Thread(target=self._monitor_workers, name="job-monitor", daemon=True)
+        self.monitor.start()
+    
+    def _spawn(self, name: str) -> WorkerHandle:
+        jobs = self.mp.Queue()
+        process = self.mp.Process(target=worker_main, args=(name, jobs, self.events),
+                                  name=name, daemon=True)
+        process.start()
+        print(f"🚀 {name} iniciado (pid {process.pid})")
+        return WorkerHandle(name, process, jobs)
+    
+    def _dispatch(self):
+        """
+        Entrega os jobs da fila aos workers livres (com o lock)
+        
+        Um job só vai para um worker quando ele termina o anterior, então um
+        job lento não segura a fila enquanto outros workers estão parados.
+        Worker cujo navegador não iniciou não recebe jobs até ser relançado.
+        """
+        while self.backlog:
+            idle = [worker for worker in self.workers if worker.idle]
+            if not idle:
+                return
+            worker = min(idle, key=lambda worker: worker.completed)
+            job_id = self.backlog.popleft()
+            job = self.jobs.get(job_id)
+            if job is None or job['status'] != QUEUED:
+                continue
+            job['worker'] = worker.name
+            worker.current = job_id
+            worker.jobs.put((job_id, job['message']))
+    
+    def submit(self, message: str) -> Optional[dict]:
+        """
+        Enfileira um prompt para o próximo worker livre
+        
+        Returns:
+            Optional[dict]: Registro do job, ou None se a fila está cheia
+        """
+        with self.lock:
+            if len(self.backlog) >= self.max_pending * len(self.workers):
+                return None
+            
+            job_id = f"{int(time.time())}-{next(self.counter)}"
+            job = {
+                'id': job_id,
+                'message': message,
+                'status': QUEUED,
+                'worker': None,
+                'created_at': time.time(),
+                'started_at': None,
+                'finished_at': None,
+                'result': None,
+                'error': None
+            }
+            self.jobs[job_id] = job
+            self.backlog.append(job_id)
+            self._prune()
+            self._dispatch()
+        
+        return self.status(job_id)
+    
+    def status(self, job_id: str) -> Optional[dict]:
+        """Estado do job sem o resultado"""
+        with self.lock:
+            job = self.jobs.get(job_id)
+            if job is None:
+                return None
+            view = {key: value for key, value in job.items() if key not in ('result', 'message')}
+        
+        finished_at = view['finished_at'] or time.time()
+        view['elapsed'] = round(finished_at - view['started_at'], 1) if view['started_at'] else 0
+        return view
+    
+    def result(self, job_id: str) -> Optional[dict]:
+        with self.lock:
+            job = self.jobs.get(job_id)
+            return dict(job) if job else None
+    
+    def _prune(self):
+        """Descarta os jobs concluídos mais antigos (com o lock)"""
+        finished = sorted((job for job in self.jobs.values() if job['status'] in FINISHED_STATES),
+                          key=lambda job: job['finished_at'])
+        for job in finished[:max(0, len(finished) - MAX_FINISHED_JOBS)]:
+            del self.jobs[job['id']]
+    
+    def _worker(self, name: str) -> Optional[WorkerHandle]:
+        return next((worker for worker in self.workers if worker.name == name), None)
+    
+    def _collect_events(self):
+        """Aplica os eventos enviados pelos workers aos registros dos jobs"""
+        while self.running:
+            try:
+                kind, job_id, name, data = self.events.get(timeout=1)
+            except queue.Empty:
+                continue
+            except (EOFError, OSError):
+                break
+            
+            with self.lock:
+                worker = self._worker(name)
+                if kind == 'ready':
+                    if worker:
+                        worker.ready = data is None
+                        worker.startup_error = data
+                    if data:
+                        print(f"❌ {name} não conseguiu iniciar o navegador: {data}")
+                    self._dispatch()
+                    continue
+                
+                job = self.jobs.get(job_id)
+                if job is None:
+                    continue
+                if kind == 'started':
+                    job['status'] = RUNNING
+                    job['started_at'] = time.time()
+                    continue
+                
+                job['status'] = DONE if kind == 'done' else FAILED
+                job['finished_at'] = time.time()
+                if kind == 'done':
+                    job['result'] = data
+                else:
+                    job['error'] = data
+                if worker and worker.current == job_id:
+                    worker.current = None
+                    worker.completed += 1
+                self._dispatch()
+    
+    def _monitor_workers(self):
+        """
+        Relança workers mortos e trata o job que estava com eles
+        
+        Só o job que o worker já tinha começado é marcado como falha; um job
+        entregue e ainda não iniciado volta para o início da fila.
+        
+        Um worker que encerrou porque o navegador não iniciou é relançado com
+        espera crescente (2, 4, 8... até RESTART_BACKOFF_MAX segundos).
+        """
+        while self.running:
+            time.sleep(2)
+            with self.lock:
+                for index, worker in enumerate(self.workers):
+                    if worker.process.is_alive() or not self.running:
+                        continue
+                    
+                    if worker.exited_at is None:
+                        worker.exited_at = time.time()
+                    if worker.startup_error:
+                        backoff = min(RESTART_BACKOFF_MAX, 2 ** (worker.restarts + 1))
+                        if time.time() - worker.exited_at < backoff:
+                            continue
+                    
+                    print(f"⚠️ {worker.name} encerrou (código {worker.process.exitcode}), relançando")
+                    job = self.jobs.get(worker.current) if worker.current else None
+                    if job and job['status'] == RUNNING:
+                        job['status'] = FAILED
+                        job['error'] = f"{worker.name} encerrou durante o job"
+                        job['finished_at'] = time.time()
+                    elif job and job['status'] == QUEUED:
+                        job['worker'] = None
+                        self.backlog.appendleft(job['id'])
+                    
+                    replacement = self._spawn(worker.name)
+                    replacement.completed = worker.completed
+                    replacement.restarts = worker.restarts + 1
+                    self.workers[index] = replacement
+                    self._dispatch()
+    
+    def health(self) -> dict:
+        with self.lock:
+            statuses = [job['status'] for job in self.jobs.values()]
+            return {
+                'workers': [worker.to_dict() for worker in self.workers],
+                'backlog': len(self.backlog),
+                'queued': statuses.count(QUEUED),
+                'running': statuses.count(RUNNING),
+                'done': statuses.count(DONE),
+                'failed': statuses.count(FAILED)
+            }
+    
+    def shutdown(self, timeout: float = 30):
+        """Encerra os workers (cada um fecha o próprio navegador)"""
+        self.running = False
+        for worker in self.workers:
+            try:
+                worker.jobs.put(None)
+            except Exception:
+                pass
+        for worker in self.workers:
+            worker.process.join(timeout)
+            if worker.process.is_alive():
+                worker.process.terminate()
+
+class JobRequestHandler(BaseHTTPRequestHandler):
+    """Rotas HTTP da API de jobs"""
+    
+    dispatcher: JobDispatcher = None
+    
+    def _send_json(self, status: int, payload):
+        body = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+    
+    def _read_json(self) -> Optional[dict]:
+        try:
+            length = int(self.headers.get("Content-Length", 0))
+            data = json.loads(self.rfile.read(length) or b"{}")
+            return data if isinstance(data, dict) else None
+        except ValueError:
+            return None
+    
+    def do_POST(self):
+        if self.path.rstrip("/") != "/jobs":
+            self._send_json(404, {'error': "rota não encontrada"})
+            return
+        
+        data = self._read_json()
+        message = (data or {}).get('message')
+        if not isinstance(message, str) or not message.strip():
+            self._send_json(400, {'error': "corpo deve ser JSON com 'message'"})
+            return
+        
+        job = self.dispatcher.submit(message)
+        if job is None:
+            self._send_json(503, {'error': "todos os workers estão ocupados, tente novamente"})
+            return
+        self._send_json(202, job)
+    
+    def do_GET(self):
+        parts = [part for part in self.path.split("?")[0].split("/") if part]
+        
+        if parts == ["health"]:
+            self._send_json(200, self.dispatcher.health())
+        elif parts == ["metrics"]:
+            # Os workers gravam no mesmo JSONL: o arquivo tem os spans de todos
+            body = get_tracer().prometheus().encode('utf-8')
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+        elif len(parts) == 2 and parts[0] == "jobs":
+            job = self.dispatcher.status(parts[1])
+            if job is None:
+                self._send_json(404, {'error': "job não encontrado"})
+            else:
+                self._send_json(200, job)
+        elif len(parts) == 3 and parts[0] == "jobs" and parts[2] == "result":
+            job = self.dispatcher.result(parts[1])
+            if job is None:
+                self._send_json(404, {'error': "job não encontrado"})
+            elif job['status'] not in FINISHED_STATES:
+                # 202: ainda em andamento, consulte de novo
+                self._send_json(202, {'id': job['id'], 'status': job['status']})
+            else:
+                self._send_json(200, {'id': job['id'], 'status': job['status'],
+                                      'result': job['result'], 'error': job['error']})
+        else:
+            self._send_json(404, {'error': "rota não encontrada"})
+    
+    def log_message(self, format, *args):
+        # Sem log por requisição: o polling dos clientes é frequente
+        pass
+
+def serve(host: str = DEFAULT_HOST, port: int = DEFAULT_PORT, workers: int = DEFAULT_WORKERS):
+    """
+    Inicia o despachante e o servidor HTTP (bloqueia até Ctrl+C)
+    
+    Args:
+        host (str): Endereço de escuta (padrão: apenas local)
+        port (int): Porta HTTP
+        workers (int): Processos worker
+    """
+    dispatcher = JobDispatcher(workers=workers)
+    JobRequestHandler.dispatcher = dispatcher
+    server = ThreadingHTTPServer((host, port), JobRequestHandler)
+    print(f"🌐 Servidor de jobs em http://{host}:{port} ({workers} workers)")
+    
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\n⚠️ Encerrando servidor de jobs...")
+    finally:
+        server.server_close()
+        dispatcher.shutdown()
+
+def main():
+    """Executa o servidor pela linha de comando"""
+    parser = argparse.ArgumentParser(description="Servidor local de jobs de prompt do AI Studio")
+    parser.add_argument("--host", default=DEFAULT_HOST, help="Endereço de escuta")
+    parser.add_argument("-p", "--port", type=int, default=DEFAULT_PORT, help="Porta HTTP")
+    parser.add_argument("-w", "--workers", type=int, default=DEFAULT_WORKERS,
+                        help="Processos worker (um navegador cada)")
+    args = parser.parse_args()
+    
+    serve(args.host, args.port, args.workers)
+
+if __name__ == "__main__":
+    main()
@@ -11,6 +11,8 @@ import time
 import os
 from datetime import datetime
 from ai_studio_login_2fa import AIStudioLogin2FA
+from screenshot_pipeline import get_screenshot_pipeline
+from waits import wait_for_url_change, wait_for_login_exit
 
 class Monitor2FA:
     def __init__(self):
@@ -25,15 +27,13 @@ class Monitor2FA:
     def capture_enhanced_screenshot(self, name_prefix="2fa"):
         """Captura screenshot com informações detalhadas"""
         try:
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+            pipeline = get_screenshot_pipeline(self.screenshots_dir)
             
             # Screenshot completo
-            full_screenshot = f"{self.screenshots_dir}/{name_prefix}_full_{timestamp}.png"
-            self.login_system.page.screenshot(path=full_screenshot, full_page=True)
+            full_screenshot = pipeline.capture(self.login_system.page, f"{name_prefix}_full", full_page=True)
             
             # Screenshot da viewport atual
-            viewport_screenshot = f"{self.screenshots_dir}/{name_prefix}_viewport_{timestamp}.png"
-            self.login_system.page.screenshot(path=viewport_screenshot)
+            viewport_screenshot = pipeline.capture(self.login_system.page, f"{name_prefix}_viewport")
             
             print(f"📸 Screenshots salvos:")
             print(f"   📄 Página completa: {full_screenshot}")
@@ -300,7 +300,9 @@ Página completa: {screenshots[0]}
             print("🔍 Monitorando por 2FA...")
             
             for attempt in range(12):  # 60 segundos total (12 x 5s)
-                time.sleep(5)
+                # Próxima verificação após 5s ou assim que a URL mudar
+                page = self.login_system.page
+                wait_for_url_change(page, page.url, 'twofa_detect', timeout=5)
                 
                 # Capturar estado atual
                 screenshots = self.capture_enhanced_screenshot(f"monitor_attempt_{attempt}")
@@ -343,7 +345,7 @@ Página completa: {screenshots[0]}
                             # Tentar inserir código
                             if self.insert_2fa_code(code, context['twofa_fields']):
                                 print("✅ Código inserido com sucesso!")
-                                time.sleep(5)
+                                wait_for_login_exit(self.login_system.page, 'url_change')
                                 
                                 # Verificar se login foi concluído
                                 if self.login_system.check_if_logged_in():
@@ -389,9 +391,7 @@ Página completa: {screenshots[0]}
             
             # Limpar e inserir código
             self.login_system.page.fill(selector, "")
-            time.sleep(0.5)
             self.login_system.page.fill(selector, code)
-            time.sleep(1)
             
             # Tentar submeter
             submit_selectors = [
@@ -8,6 +8,8 @@ import sys
 sys.path.append('/workspaces/replit')
 
 from ai_studio_login_2fa import AIStudioLogin2FA
+from waits import wait_for_page_ready
+from navigation import goto_app
 
 class AIStudioNavigator(AIStudioLogin2FA):
     def __init__(self):
@@ -31,8 +33,7 @@ class AIStudioNavigator(AIStudioLogin2FA):
             
             # Ir para a página de boas-vindas
             print("\n📍 Navegando para página principal...")
-            self.page.goto("https://aistudio.google.com/", timeout=20000)
-            time.sleep(3)
+            goto_app(self.page, "https://aistudio.google.com/", timeout=20000)
             
             current_url = self.page.url
             print(f"🔗 URL atual: {current_url}")
@@ -157,7 +158,7 @@ class AIStudioNavigator(AIStudioLogin2FA):
                                 print(f"🖱️ Clicando no elemento...")
                                 self.page.click(f"text={link['text']}")
                             
-                            time.sleep(5)
+                            wait_for_page_ready(self.page)
                             
                             new_url = self.page.url
                             print(f"🔗 Nova URL: {new_url}")
@@ -195,8 +196,7 @@ class AIStudioNavigator(AIStudioLogin2FA):
                             
                         # Voltar para página inicial para tentar próximo link
                         try:
-                            self.page.goto("https://aistudio.google.com/", timeout=15000)
-                            time.sleep(2)
+                            goto_app(self.page, "https://aistudio.google.com/", timeout=15000)
                         except:
                             pass
             else:
@@ -0,0 +1,130 @@
+"""
+Sinal de Aplicação Pronta para Navegação
+- Navegações terminam quando o AI Studio está utilizável, não quando a rede fica ociosa
+- Sinais específicos do app: campo de chat montado, botão da welcome, redirecionamento para login
+- Retorna qual estado foi alcançado para o fluxo decidir o próximo passo
+"""
+
+import time
+from typing import Optional, Sequence
+
+try:
+    from playwright.sync_api import TimeoutError as PlaywrightTimeoutError
+except ImportError:
+    PlaywrightTimeoutError = TimeoutError
+
+from selector_engine import RACE_SELECTORS_JS
+from waits import budget_for, get_wait_report
+from ai_studio_selectors import (
+    MESSAGE_INPUT_SELECTORS,
+    GET_STARTED_SELECTORS,
+    LOGGED_IN_SELECTORS
+)
+
+# Estados que encerram uma navegação
+LOGIN_REDIRECT = "login_redirect"
+CHAT_READY = "chat_ready"
+WELCOME = "welcome"
+HOME = "home"
+TIMEOUT = "timeout"
+
+APP_STATES = (LOGIN_REDIRECT, CHAT_READY, WELCOME, HOME)
+
+# Sinais de cada estado em ordem de prioridade: trechos da URL e seletores visíveis.
+# O redirecionamento é decidido só pela URL, antes de qualquer seletor, porque as
+# páginas de login também têm campos de texto.
+STATE_SIGNALS = [
+    (LOGIN_REDIRECT, ["accounts.google.com"], []),
+    (CHAT_READY, [], MESSAGE_INPUT_SELECTORS),
+    (WELCOME, ["/welcome"], GET_STARTED_SELECTORS),
+    (HOME, [], LOGGED_IN_SELECTORS)
+]
+
+# Verifica URL e seletores de todos os estados em uma única avaliação na página
+APP_READY_JS = """
+(arg) => {
+    const race = %s;
+    const href = window.location.href;
+    
+    for (const rule of arg.urls) {
+        if (href.includes(rule.pattern)) return { state: rule.state };
+    }
+    
+    if (document.readyState === 'loading' || !document.body) return null;
+    
+    const result = race(arg.selectors);
+    return result ? { state: arg.owners[result.index] } : null;
+}
+""" % RACE_SELECTORS_JS.strip()
+
+def _signals_for(states: Sequence[str]) -> dict:
+    """Argumento do script com as regras dos estados aceitos"""
+    urls, selectors, owners = [], [], []
+    for state, patterns, state_selectors in STATE_SIGNALS:
+        if state not in states:
+            continue
+        urls.extend({'state': state, 'pattern': pattern} for pattern in patterns)
+        selectors.extend(state_selectors)
+        owners.extend([state] * len(state_selectors))
+    return {'urls': urls, 'selectors': selectors, 'owners': owners}
+
+def wait_for_app_ready(page, states: Optional[Sequence[str]] = None, step: str = 'app_ready',
+                       timeout: Optional[float] = None) -> str:
+    """
+    Aguarda a página chegar a um estado utilizável do AI Studio
+    
+    Args:
+        page: Página do Playwright
+        states (Sequence[str]): Estados aceitos (padrão: todos de APP_STATES)
+        step (str): Etapa usada no orçamento e no relatório de esperas
+        timeout (float): Prazo em segundos (padrão: orçamento da etapa)
+    
+    Returns:
+        str: Estado alcançado (LOGIN_REDIRECT, CHAT_READY, WELCOME, HOME) ou TIMEOUT
+    """
+    arg = _signals_for(states or APP_STATES)
+    budget = budget_for(step, timeout)
+    started = time.time()
+    deadline = started + budget
+    state = TIMEOUT
+    
+    while True:
+        remaining = deadline - time.time()
+        if remaining <= 0:
+            break
+        
+        try:
+            handle = page.wait_for_function(APP_READY_JS, arg=arg, timeout=remaining * 1000, polling=100)
+            state = handle.json_value()['state']
+            break
+        except PlaywrightTimeoutError:
+            break
+        except Exception:
+            # Contexto destruído por um redirecionamento: avaliar de novo na página nova
+            page.wait_for_timeout(100)
+    
+    get_wait_report().record(step, time.time() - started, budget, state != TIMEOUT)
+    return state
+
+def goto_app(page, url: str, timeout: int = 30000, states: Optional[Sequence[str]] = None,
+             step: str = 'app_ready') -> str:
+    """
+    Navega para uma URL do AI Studio e aguarda o app ficar pronto
+    
+    Não espera o evento load nem a rede ociosa: o goto retorna assim que a
+    resposta chega e a espera termina no primeiro sinal do app.
+    
+    Args:
+        page: Página do Playwright
+        url (str): URL de destino
+        timeout (int): Prazo do goto em milissegundos
+        states (Sequence[str]): Estados aceitos (padrão: todos)
+        step (str): Etapa usada no orçamento e no relatório de esperas
+    
+    Returns:
+        str: Estado alcançado ou TIMEOUT
+    """
+    page.goto(url, timeout=timeout, wait_until="commit")
+    state = wait_for_app_ready(page, states, step)
+    print(f"🧭 {url} → {state}")
+    return state
@@ -0,0 +1,201 @@
+"""
+Exploração Paralela de URLs em Várias Abas
+- Abre as URLs candidatas em abas do mesmo contexto autenticado, com limite de abas
+- As navegações são disparadas juntas: a rodada leva o tempo de um carregamento
+- Inventário estruturado de campos e botões de cada página em uma única avaliação
+- Resultado ordenado da página mais promissora para a menos
+"""
+
+import time
+from typing import List, Optional, Sequence
+
+from navigation import wait_for_app_ready, LOGIN_REDIRECT, CHAT_READY, TIMEOUT
+
+# Inventário de campos de texto e botões relacionados a chat
+INVENTORY_JS = """
+() => {
+    const inputs = [];
+    const buttons = [];
+    
+    document.querySelectorAll('textarea, input, [contenteditable="true"]').forEach(el => {
+        if (!el.offsetParent) return;
+        const rect = el.getBoundingClientRect();
+        if (rect.width <= 200) return;
+        inputs.push({
+            tag: el.tagName,
+            placeholder: el.placeholder || el.getAttribute('aria-label') || '',
+            text: (el.textContent || '').slice(0, 50),
+            className: Array.from(el.classList).join(' ').slice(0, 50),
+            width: Math.round(rect.width),
+            height: Math.round(rect.height),
+            chat: rect.height > 30
+        });
+    });
+    
+    const chatKeywords = ['chat', 'new', 'create', 'start', 'prompt', 'text', 'conversation'];
+    document.querySelectorAll('button, a, [role="button"]').forEach(el => {
+        const text = el.textContent.trim();
+        const lower = text.toLowerCase();
+        if (!el.offsetParent || text.length >= 100) return;
+        if (!chatKeywords.some(keyword => lower.includes(keyword))) return;
+        buttons.push({
+            tag: el.tagName,
+            text: text,
+            href: el.href || '',
+            className: Array.from(el.classList).join(' ').slice(0, 50),
+            id: el.id
+        });
+    });
+    
+    return { title: document.title, inputs: inputs, buttons: buttons };
+}
+"""
+
+class PageInventory:
+    """O que foi encontrado em uma URL candidata"""
+    
+    def __init__(self, url: str):
+        self.url = url
+        self.final_url = url
+        self.state = TIMEOUT
+        self.title = ""
+        self.inputs: List[dict] = []
+        self.buttons: List[dict] = []
+        self.elapsed_ms = 0
+        self.error: Optional[str] = None
+    
+    @property
+    def chat_inputs(self) -> List[dict]:
+        """Campos grandes o bastante para serem o campo de mensagem"""
+        return [field for field in self.inputs if field.get('chat')]
+    
+    @property
+    def score(self) -> int:
+        """Pontuação para ordenar as páginas (maior = mais promissora)"""
+        if self.error or self.state == LOGIN_REDIRECT:
+            return -1
+        score = 100 * len(self.chat_inputs[:1]) + 10 * min(len(self.inputs), 3) + min(len(self.buttons), 10)
+        if self.state == CHAT_READY:
+            score += 50
+        return score
+    
+    def to_dict(self) -> dict:
+        return {
+            'url': self.url,
+            'final_url': self.final_url,
+            'state': self.state,
+            'title': self.title,
+            'score': self.score,
+            'inputs': self.inputs,
+            'buttons': self.buttons,
+            'elapsed_ms': self.elapsed_ms,
+            'error': self.error
+        }
+    
+    def __repr__(self):
+        return f"PageInventory({self.url} → {self.state}, score={self.score})"
+
+def _start_navigation(page, inventory: PageInventory):
+    """
+    Dispara a navegação e espera só o commit (resposta recebida, documento novo)
+    
+    Sem o commit a aba ainda mostra a página da rodada anterior, e o sinal do
+    app ou o inventário seriam lidos da URL errada. O carregamento em si
+    continua em paralelo com as outras abas.
+    """
+    try:
+        page.goto(inventory.url, wait_until="commit")
+    except Exception as e:
+        inventory.error = str(e)
+
+def _collect(page, inventory: PageInventory, step: str, timeout: Optional[float]):
+    """Aguarda o sinal do app e lê o inventário da aba"""
+    if inventory.error:
+        return
+    try:
+        inventory.state = wait_for_app_ready(page, step=step, timeout=timeout)
+        inventory.final_url = page.url
+        if inventory.state != LOGIN_REDIRECT and "accounts.google.com" not in page.url:
+            data = page.evaluate(INVENTORY_JS)
+            inventory.title = data['title']
+            inventory.inputs = data['inputs']
+            inventory.buttons = data['buttons']
+        else:
+            inventory.state = LOGIN_REDIRECT
+    except Exception as e:
+        inventory.error = str(e)
+
+def explore_urls(context, urls: Sequence[str], max_tabs: int = 4, step: str = 'chat_probe',
+                 timeout: Optional[float] = None) -> List[PageInventory]:
+    """
+    Explora as URLs em abas paralelas do contexto
+    
+    As navegações de cada rodada (até max_tabs URLs) são disparadas juntas
+    (cada uma só até o commit) e só depois cada aba é aguardada; como os
+    carregamentos correm ao mesmo tempo, a rodada dura aproximadamente o
+    carregamento mais lento.
+    
+    Args:
+        context: BrowserContext autenticado (as abas compartilham os cookies)
+        urls (Sequence[str]): URLs candidatas
+        max_tabs (int): Abas abertas ao mesmo tempo
+        step (str): Etapa usada no orçamento e no relatório de esperas
+        timeout (float): Prazo por aba em segundos (padrão: orçamento da etapa)
+    
+    Returns:
+        List[PageInventory]: Inventários do mais promissor para o menos
+    """
+    started = time.time()
+    results = [PageInventory(url) for url in urls]
+    tabs = []
+    
+    try:
+        for _ in range(min(max(1, max_tabs), len(results))):
+            tab = context.new_page()
+            tab.set_default_timeout(15000)
+            tabs.append(tab)
+        
+        for offset in range(0, len(results), len(tabs)):
+            batch = list(zip(tabs, results[offset:offset + len(tabs)]))
+            batch_started = time.time()
+            
+            for tab, inventory in batch:
+                _start_navigation(tab, inventory)
+            
+            for tab, inventory in batch:
+                _collect(tab, inventory, step, timeout)
+                inventory.elapsed_ms = round((time.time() - batch_started) * 1000)
+    finally:
+        for tab in tabs:
+            try:
+                tab.close()
+            except Exception:
+                pass
+    
+    ranked = sorted(results, key=lambda inventory: -inventory.score)
+    print(f"🗂️ {len(results)} URLs exploradas em {time.time() - started:.1f}s "
+          f"({len(tabs)} abas em paralelo)")
+    return ranked
+
+def print_inventory(inventory: PageInventory):
+    """Resumo do inventário de uma página"""
+    print(f"\n🔍 {inventory.url} (pontuação {inventory.score}, {inventory.elapsed_ms}ms)")
+    print(f"   🔗 URL final: {inventory.final_url} [{inventory.state}]")
+    if inventory.error:
+        print(f"   ❌ Erro: {inventory.error}")
+        return
+    if inventory.state == LOGIN_REDIRECT:
+        print("   ⚠️ Redirecionado para login")
+        return
+    
+    if inventory.inputs:
+        print(f"   📝 CAMPOS DE INPUT ({len(inventory.inputs)}):")
+        for field in inventory.inputs[:3]:
+            print(f"      {field['tag']}: placeholder='{field['placeholder']}' "
+                  f"{field['width']}x{field['height']}")
+    if inventory.buttons:
+        print(f"   🔘 BOTÕES RELEVANTES ({len(inventory.buttons)}):")
+        for button in inventory.buttons[:5]:
+            print(f"      {button['tag']}: '{button['text']}'")
+    if not inventory.inputs and not inventory.buttons:
+        print("   ❌ Nenhum elemento de chat encontrado")
@@ -5,12 +5,19 @@ Sistema de login persistente usando perfil de navegador
 import os
 import time
 from automation import GoogleAIStudioAutomation
+from waits import wait_for_login_exit
+from navigation import goto_app, HOME, LOGIN_REDIRECT
+from auth_state import get_auth_store
+from profile_manager import get_profile_manager
+from route_policy import attach_route_policy
+from tracing import Traced
 from playwright.sync_api import sync_playwright
 
-class PersistentGoogleLogin:
+class PersistentGoogleLogin(Traced):
     def __init__(self):
         self.user_data_dir = "/workspaces/replit/browser_profile"
         self.automation = None
+        self.profile_lease = None
         
     def ensure_profile_dir(self):
         """Cria diretório do perfil se não existir"""
@@ -45,11 +52,18 @@ class PersistentGoogleLogin:
                 'user_agent': 'Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
             }
             
+            # Perfil exclusivo deste processo (clone do principal se estiver em uso)
+            self.profile_lease = get_profile_manager().lease_profile(self.user_data_dir)
+            
             # Usar contexto persistente
             self.context = self.playwright.chromium.launch_persistent_context(
-                self.user_data_dir,
+                self.profile_lease.path,
                 **context_options
             )
+            
+            # Bloqueio de recursos, cache de assets e simulador (contexto headless)
+            attach_route_policy(self.context, headless=True)
+            
             self.page = self.context.new_page()
             self.browser = None  # Não há browser separado com contexto persistente
             
@@ -71,11 +85,26 @@ class PersistentGoogleLogin:
             raise Exception(f"Erro ao inicializar navegador: {e}")
     
     def check_if_logged_in(self):
-        """Verifica se já está logado"""
+        """
+        Verifica se já está logado
+        
+        Sem a sonda HTTP: ela lê o armazém de estado autenticado, e os cookies
+        deste perfil persistente não vêm de lá.
+        """
         try:
             print("🔍 Verificando se já está logado...")
-            self.page.goto("https://aistudio.google.com/", timeout=30000)
-            time.sleep(5)
+            
+            state = goto_app(self.page, "https://aistudio.google.com/", timeout=30000)
+            
+            # CHAT_READY só indica campo de texto pronto; a sessão vem dos indicadores
+            if state == HOME:
+                print(f"✅ App pronto ({state}) - já está logado")
+                self.page.screenshot(path="already_logged_in.png")
+                get_auth_store().capture(self.context)
+                return True
+            if state == LOGIN_REDIRECT:
+                print("❌ Redirecionado para login")
+                return False
             
             # Indicadores de que está logado
             logged_in_indicators = [
@@ -102,6 +131,7 @@ class PersistentGoogleLogin:
                     if self.page.is_visible(indicator, timeout=3000):
                         print(f"✅ Indicador de login encontrado: {indicator}")
                         self.page.screenshot(path="already_logged_in.png")
+                        get_auth_store().capture(self.context)
                         return True
                 except:
                     continue
@@ -162,7 +192,7 @@ class PersistentGoogleLogin:
             automation.wait_for_2fa()
             
             print("⏳ Aguardando conclusão do login...")
-            time.sleep(5)
+            wait_for_login_exit(self.page, 'url_change')
             
             # Verificar se login foi bem-sucedido
             if self.check_if_logged_in():
@@ -224,6 +254,10 @@ class PersistentGoogleLogin:
                 self.playwright.stop()
         except:
             pass
+        
+        if self.profile_lease:
+            self.profile_lease.release()
+            self.profile_lease = None
 
 def main():
     """Função principal"""
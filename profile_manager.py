@@ -0,0 +1,264 @@
+"""
+Gerenciador de Perfis do Navegador
+- Concessões exclusivas (flock) de um diretório de perfil por processo
+- Clones baratos do perfil principal para workers concorrentes (reflink quando o
+  sistema de arquivos permite, cópia comum caso contrário)
+- Remove travas Singleton* deixadas por Chromium encerrado à força
+- Coleta de clones abandonados
+"""
+
+import os
+import time
+import fcntl
+import shutil
+import threading
+from typing import Optional
+
+GOLDEN_PROFILE = "/workspaces/replit/browser_profile"
+CLONES_DIR = "/workspaces/replit/profile_clones"
+
+# Clones sem concessão mais antigos que isso são removidos pela coleta
+CLONE_MAX_AGE = 6 * 3600
+
+# Travas do Chromium que impedem abrir o perfil depois de um encerramento forçado
+SINGLETON_FILES = ("SingletonLock", "SingletonSocket", "SingletonCookie")
+
+# Caches regeneráveis que não precisam ir para o clone
+CLONE_IGNORE = ("Cache", "Code Cache", "GPUCache", "GrShaderCache", "ShaderCache",
+                "DawnCache", "Crashpad") + SINGLETON_FILES
+
+FICLONE = 0x40049409
+
+def _reflink_copy(src: str, dst: str) -> str:
+    """
+    Copia um arquivo compartilhando os blocos (FICLONE) quando possível
+    
+    Hardlinks não são usados: o Chromium grava os bancos SQLite no próprio
+    arquivo, e um hardlink faria o clone alterar o perfil principal.
+    """
+    try:
+        with open(src, 'rb') as source, open(dst, 'wb') as target:
+            fcntl.ioctl(target.fileno(), FICLONE, source.fileno())
+        shutil.copystat(src, dst)
+        return dst
+    except OSError:
+        return shutil.copy2(src, dst)
+
+def clear_singleton_locks(profile_dir: str):
+    """Remove as travas Singleton* do Chromium (só com a concessão do perfil)"""
+    for name in SINGLETON_FILES:
+        path = os.path.join(profile_dir, name)
+        if os.path.lexists(path):
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+class ProfileLease:
+    """Concessão exclusiva de um diretório de perfil"""
+    
+    def __init__(self, path: str, lock_file, is_clone: bool = False):
+        self.path = path
+        self.lock_file = lock_file
+        self.is_clone = is_clone
+    
+    def release(self):
+        """Libera o perfil para outro processo"""
+        if self.lock_file:
+            try:
+                fcntl.flock(self.lock_file, fcntl.LOCK_UN)
+                self.lock_file.close()
+            except Exception:
+                pass
+            self.lock_file = None
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc, tb):
+        self.release()
+    
+    def __repr__(self):
+        kind = "clone" if self.is_clone else "perfil"
+        return f"ProfileLease({kind} {self.path})"
+
+class ProfileManager:
+    """Distribui perfis entre processos e workers do mesmo host"""
+    
+    def __init__(self, golden: str = GOLDEN_PROFILE, clones_dir: str = CLONES_DIR,
+                 max_clone_age: float = CLONE_MAX_AGE):
+        """
+        Inicializa o gerenciador
+        
+        Args:
+            golden (str): Perfil principal (com a sessão logada)
+            clones_dir (str): Diretório dos clones por worker
+            max_clone_age (float): Idade (segundos) a partir da qual um clone livre é removido
+        """
+        self.golden = golden
+        self.clones_dir = clones_dir
+        self.max_clone_age = max_clone_age
+        self.stats = {'leases': 0, 'clones': 0, 'clone_seconds': 0.0, 'collected': 0}
+    
+    @staticmethod
+    def _lease_path(profile_dir: str) -> str:
+        # Ao lado do perfil, para não ser copiado nos clones
+        return profile_dir.rstrip("/") + ".lease"
+    
+    def try_acquire(self, profile_dir: str) -> Optional[ProfileLease]:
+        """
+        Tenta obter a concessão sem esperar
+        
+        Returns:
+            Optional[ProfileLease]: Concessão, ou None se outro processo usa o perfil
+        """
+        os.makedirs(os.path.dirname(profile_dir.rstrip("/")) or ".", exist_ok=True)
+        lock_file = open(self._lease_path(profile_dir), 'a+')
+        try:
+            fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            lock_file.close()
+            return None
+        
+        lock_file.seek(0)
+        lock_file.truncate()
+        lock_file.write(f"{os.getpid()} {time.time()}\n")
+        lock_file.flush()
+        
+        # Com a concessão, qualquer trava do Chromium é de um processo morto
+        os.makedirs(profile_dir, exist_ok=True)
+        clear_singleton_locks(profile_dir)
+        self.stats['leases'] += 1
+        return ProfileLease(profile_dir, lock_file, is_clone=profile_dir.startswith(self.clones_dir))
+    
+    def acquire(self, profile_dir: str, timeout: float = 30) -> ProfileLease:
+        """
+        Obtém a concessão exclusiva, esperando até o prazo
+        
+        Raises:
+            Exception: Se o perfil continuar em uso após o prazo
+        """
+        deadline = time.time() + timeout
+        while True:
+            lease = self.try_acquire(profile_dir)
+            if lease:
+                return lease
+            if time.time() >= deadline:
+                raise Exception(f"Perfil em uso por outro processo: {profile_dir}")
+            time.sleep(0.2)
+    
+    def clone(self, worker_id: Optional[str] = None, source: Optional[str] = None) -> ProfileLease:
+        """
+        Cria (ou reaproveita) o clone de um worker a partir do perfil principal
+        
+        Um clone livre do mesmo worker é reaproveitado enquanto for mais novo
+        que max_clone_age; caso contrário é recriado a partir da origem.
+        
+        Args:
+            worker_id (str): Identificador estável do worker (padrão: pid)
+            source (str): Perfil de origem (padrão: golden)
+        
+        Returns:
+            ProfileLease: Concessão do clone
+        """
+        source = source or self.golden
+        base_id = worker_id or f"pid{os.getpid()}"
+        
+        # Sem worker_id, vários clones no mesmo processo recebem sufixos
+        for attempt in range(16):
+            suffix = base_id if attempt == 0 else f"{base_id}-{attempt}"
+            clone_dir = os.path.join(self.clones_dir, f"{os.path.basename(source.rstrip('/'))}-{suffix}")
+            lease = self.try_acquire(clone_dir)
+            if lease or worker_id:
+                break
+        if lease is None:
+            raise Exception(f"Clone em uso por outro processo: {clone_dir}")
+        
+        fresh = os.path.exists(os.path.join(clone_dir, "Default"))
+        if fresh and time.time() - os.path.getmtime(clone_dir) < self.max_clone_age:
+            print(f"♻️ Reaproveitando clone do perfil: {clone_dir}")
+            return lease
+        
+        started = time.time()
+        shutil.rmtree(clone_dir, ignore_errors=True)
+        if os.path.exists(source):
+            shutil.copytree(source, clone_dir, symlinks=True, copy_function=_reflink_copy,
+                            ignore=shutil.ignore_patterns(*CLONE_IGNORE), ignore_dangling_symlinks=True)
+        else:
+            os.makedirs(clone_dir, exist_ok=True)
+        os.utime(clone_dir)
+        
+        elapsed = time.time() - started
+        self.stats['clones'] += 1
+        self.stats['clone_seconds'] += elapsed
+        print(f"🧬 Perfil clonado em {elapsed:.2f}s: {clone_dir}")
+        return lease
+    
+    def lease_profile(self, profile_dir: Optional[str] = None, worker_id: Optional[str] = None) -> ProfileLease:
+        """
+        Concessão do perfil ou, se ele estiver em uso, de um clone dele
+        
+        Args:
+            profile_dir (str): Perfil desejado (padrão: golden)
+            worker_id (str): Identificador do worker para o clone
+        
+        Returns:
+            ProfileLease: Use lease.path como user_data_dir e libere no fim
+        """
+        profile_dir = profile_dir or self.golden
+        lease = self.try_acquire(profile_dir)
+        if lease:
+            return lease
+        print(f"🔒 Perfil em uso, usando um clone: {profile_dir}")
+        return self.clone(worker_id, source=profile_dir)
+    
+    def gc(self, max_age: Optional[float] = None) -> int:
+        """
+        Remove clones livres mais antigos que max_age
+        
+        Returns:
+            int: Número de clones removidos
+        """
+        max_age = self.max_clone_age if max_age is None else max_age
+        if not os.path.isdir(self.clones_dir):
+            return 0
+        
+        removed = 0
+        for name in os.listdir(self.clones_dir):
+            clone_dir = os.path.join(self.clones_dir, name)
+            if not os.path.isdir(clone_dir):
+                continue
+            try:
+                if time.time() - os.path.getmtime(clone_dir) < max_age:
+                    continue
+            except OSError:
+                continue
+            
+            lease = self.try_acquire(clone_dir)
+            if lease is None:
+                continue
+            try:
+                shutil.rmtree(clone_dir, ignore_errors=True)
+                os.remove(self._lease_path(clone_dir))
+            except OSError:
+                pass
+            finally:
+                lease.release()
+            removed += 1
+        
+        self.stats['collected'] += removed
+        if removed:
+            print(f"🧹 {removed} clone(s) de perfil removido(s)")
+        return removed
+
+_manager = None
+_manager_lock = threading.Lock()
+
+def get_profile_manager() -> ProfileManager:
+    """Gerenciador compartilhado do processo (coleta clones antigos na criação)"""
+    global _manager
+    with _manager_lock:
+        if _manager is None:
+            _manager = ProfileManager()
+            _manager.gc()
+        return _manager
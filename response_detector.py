@@ -0,0 +1,373 @@
+"""
+Detector de Conclusão de Resposta do AI
+- Instala um MutationObserver na página antes do envio da mensagem
+- Envia eventos "first_token", "typing_gone" e "stable" de volta ao Python
+- Retorna assim que a resposta para de mudar, sem depender de ciclos de polling
+"""
+
+import time
+import weakref
+from typing import Callable, Iterator, List, NamedTuple, Optional, Sequence
+
+from ai_studio_selectors import RESPONSE_SELECTORS, TYPING_SELECTORS
+from tracing import get_tracer, FIRST_TOKEN_STAGE
+
+try:
+    from playwright.sync_api import TimeoutError as PlaywrightTimeoutError
+except ImportError:
+    PlaywrightTimeoutError = TimeoutError
+
+# Nome da função exposta pelo Python dentro da página
+EVENT_BINDING = "__aiResponseEvent"
+
+# Estado do observador dentro da página
+WATCH_STATE = "window.__aiResponseWatch"
+
+# Instala o observador. Recebe os seletores de resposta e de digitação, o
+# tempo de estabilidade e se a resposta já existente deve ser considerada
+# (quando o detector é armado depois do envio).
+INSTALL_WATCH_JS = """
+(options) => {
+    const previous = window.__aiResponseWatch;
+    if (previous && previous.observer) previous.observer.disconnect();
+    if (previous && previous.timer) clearTimeout(previous.timer);
+    
+    const isVisible = (el) => {
+        if (!el || !el.isConnected) return false;
+        const style = window.getComputedStyle(el);
+        if (style.visibility === 'hidden' || style.display === 'none') return false;
+        const rect = el.getBoundingClientRect();
+        return rect.width > 0 && rect.height > 0;
+    };
+    
+    // Último elemento do primeiro seletor de resposta que encontrar algo
+    const findResponses = () => {
+        for (const selector of options.responseSelectors) {
+            try {
+                const elements = document.querySelectorAll(selector);
+                if (elements.length) return Array.from(elements);
+            } catch (e) {}
+        }
+        return [];
+    };
+    
+    const isTyping = () => options.typingSelectors.some((selector) => {
+        try {
+            return Array.from(document.querySelectorAll(selector)).some(isVisible);
+        } catch (e) {
+            return false;
+        }
+    });
+    
+    const readLatest = () => {
+        const elements = findResponses();
+        const last = elements[elements.length - 1];
+        return {
+            count: elements.length,
+            text: last ? (last.textContent || '').trim() : ''
+        };
+    };
+    
+    const initial = readLatest();
+    const watch = {
+        startedAt: performance.now(),
+        baselineCount: options.includeExisting ? 0 : initial.count,
+        baselineText: options.includeExisting ? '' : initial.text,
+        text: '',
+        chunks: [],
+        firstTokenAt: null,
+        lastChangeAt: null,
+        typing: isTyping(),
+        done: false,
+        events: [],
+        observer: null,
+        timer: null
+    };
+    
+    const emit = (type, extra) => {
+        const event = Object.assign({
+            type: type,
+            elapsed_ms: Math.round(performance.now() - watch.startedAt),
+            length: watch.text.length
+        }, extra || {});
+        watch.events.push(event);
+        if (typeof window[options.binding] === 'function') {
+            try { window[options.binding](event); } catch (e) {}
+        }
+    };
+    
+    // Com indicador de digitação visível exige um silêncio maior, para não
+    // travar em páginas que mantêm um indicador "loading" permanente
+    const checkStable = () => {
+        watch.timer = null;
+        if (watch.done || !watch.text) return;
+        const quietMs = performance.now() - watch.lastChangeAt;
+        const neededMs = watch.typing ? options.stableMs * 4 : options.stableMs;
+        if (quietMs >= neededMs) {
+            watch.done = true;
+            watch.observer.disconnect();
+            emit('stable', { quiet_ms: Math.round(quietMs) });
+        } else {
+            watch.timer = setTimeout(checkStable, neededMs - quietMs);
+        }
+    };
+    
+    const scheduleStable = () => {
+        if (watch.timer) clearTimeout(watch.timer);
+        watch.timer = setTimeout(checkStable, options.stableMs);
+    };
+    
+    const update = () => {
+        if (watch.done) return;
+        
+        const latest = readLatest();
+        const isNew = latest.count > watch.baselineCount || latest.text !== watch.baselineText;
+        const text = isNew ? latest.text : '';
+        
+        if (text && text !== watch.text) {
+            // Delta incremental quando a resposta cresce, senão texto completo
+            const delta = text.startsWith(watch.text) ? text.slice(watch.text.length) : text;
+            watch.chunks.push({ delta: delta, reset: !text.startsWith(watch.text) });
+            watch.text = text;
+            watch.lastChangeAt = performance.now();
+            if (watch.firstTokenAt === null) {
+                watch.firstTokenAt = watch.lastChangeAt;
+                emit('first_token');
+            }
+            scheduleStable();
+        }
+        
+        const typing = isTyping();
+        if (watch.typing && !typing) {
+            emit('typing_gone');
+            scheduleStable();
+        }
+        watch.typing = typing;
+    };
+    
+    watch.observer = new MutationObserver(update);
+    watch.observer.observe(document.body, {
+        childList: true,
+        subtree: true,
+        characterData: true,
+        attributes: true,
+        attributeFilter: ['class', 'style', 'hidden', 'aria-busy']
+    });
+    
+    window.__aiResponseWatch = watch;
+    update();
+    return { baselineCount: watch.baselineCount };
+}
+"""
+
+class ResponseDelta(NamedTuple):
+    """Trecho incremental da resposta"""
+    text: str
+    # True quando a página reescreveu a resposta e text contém o texto completo
+    reset: bool = False
+
+# Páginas que já têm a função de eventos exposta e o detector atual de cada uma
+_detectors_by_page = weakref.WeakKeyDictionary()
+
+class ResponseCompletionDetector:
+    """
+    Detecta o fim da geração da resposta a partir de mutações no DOM
+    
+    Uso típico: chamar arm() logo antes de enviar a mensagem e wait() depois.
+    """
+    
+    def __init__(self, page, response_selectors: Sequence[str] = RESPONSE_SELECTORS,
+                 typing_selectors: Sequence[str] = TYPING_SELECTORS, stable_ms: int = 1500,
+                 on_event: Optional[Callable[[dict], None]] = None):
+        """
+        Inicializa o detector
+        
+        Args:
+            page: Página do Playwright
+            response_selectors (Sequence[str]): Seletores das respostas do modelo
+            typing_selectors (Sequence[str]): Indicadores de geração em andamento
+            stable_ms (int): Tempo sem mudanças para considerar a resposta concluída
+            on_event (Callable): Callback opcional chamado para cada evento
+        """
+        self.page = page
+        self.response_selectors = list(response_selectors)
+        self.typing_selectors = list(typing_selectors)
+        self.stable_ms = stable_ms
+        self.on_event = on_event
+        self.events: List[dict] = []
+        self.armed = False
+        self.armed_at = None
+        self.span_parent = None
+    
+    def _ensure_binding(self):
+        """Expõe a função de eventos na página (uma única vez por página)"""
+        if self.page not in _detectors_by_page:
+            page_ref = weakref.ref(self.page)
+            
+            def dispatch(event):
+                page = page_ref()
+                detector = _detectors_by_page.get(page) if page else None
+                if detector:
+                    detector._handle_event(event)
+            
+            self.page.expose_function(EVENT_BINDING, dispatch)
+        
+        _detectors_by_page[self.page] = self
+    
+    def _handle_event(self, event: dict):
+        """Recebe um evento enviado pela página"""
+        self.events.append(event)
+        
+        messages = {
+            'first_token': "⚡ Primeiro token recebido",
+            'typing_gone': "⌛ Indicador de digitação sumiu",
+            'stable': "✅ Resposta estável"
+        }
+        print(f"{messages.get(event['type'], event['type'])} ({event['elapsed_ms']}ms)")
+        
+        if event['type'] == 'first_token':
+            get_tracer().record(FIRST_TOKEN_STAGE, event['elapsed_ms'], parent=self.span_parent)
+        
+        if self.on_event:
+            self.on_event(event)
+    
+    def arm(self, include_existing: bool = False):
+        """
+        Instala o observador na página
+        
+        Args:
+            include_existing (bool): Considera a resposta já presente na página
+                (usado quando o detector é armado depois do envio)
+        """
+        self._ensure_binding()
+        self.events = []
+        self.page.evaluate(INSTALL_WATCH_JS, {
+            'responseSelectors': self.response_selectors,
+            'typingSelectors': self.typing_selectors,
+            'stableMs': self.stable_ms,
+            'includeExisting': include_existing,
+            'binding': EVENT_BINDING
+        })
+        self.armed = True
+        self.armed_at = time.time()
+        self.span_parent = get_tracer().current()
+    
+    def state(self) -> dict:
+        """
+        Lê o estado atual do observador sem esperar
+        
+        Returns:
+            dict: text, done, typing, first_token_ms e número de eventos
+        """
+        return self.page.evaluate(f"""
+            () => {{
+                const watch = {WATCH_STATE};
+                if (!watch) return null;
+                return {{
+                    text: watch.text,
+                    done: watch.done,
+                    typing: watch.typing,
+                    first_token_ms: watch.firstTokenAt === null ? null :
+                        Math.round(watch.firstTokenAt - watch.startedAt),
+                    events: watch.events.length
+                }};
+            }}
+        """)
+    
+    def wait(self, timeout: float = 60) -> Optional[str]:
+        """
+        Aguarda a resposta ficar estável
+        
+        Polling por intervalo e não por requestAnimationFrame: com várias abas
+        abertas, as que estão em segundo plano não recebem frames.
+        
+        Args:
+            timeout (float): Prazo em segundos
+        
+        Returns:
+            Optional[str]: Texto da resposta, ou None se o prazo expirar
+        """
+        if not self.armed:
+            self.arm(include_existing=True)
+        
+        try:
+            self.page.wait_for_function(
+                f"() => {WATCH_STATE} && {WATCH_STATE}.done",
+                timeout=max(timeout, 0.001) * 1000,
+                polling=100
+            )
+        except PlaywrightTimeoutError:
+            return None
+        
+        self.armed = False
+        state = self.state()
+        return state['text'] if state else None
+    
+    def stream(self, timeout: float = 60) -> Iterator[ResponseDelta]:
+        """
+        Gera os trechos da resposta conforme ela cresce no DOM
+        
+        Cada espera termina assim que o observador registra um novo trecho ou
+        a conclusão (verificada a cada 100ms, como em wait), então o primeiro
+        token chega ao chamador sem esperar o fim da resposta.
+        
+        Args:
+            timeout (float): Prazo total em segundos
+        
+        Yields:
+            ResponseDelta: Texto novo desde o trecho anterior
+        """
+        if not self.armed:
+            self.arm(include_existing=True)
+        
+        deadline = time.time() + timeout
+        read = 0
+        
+        while True:
+            remaining = deadline - time.time()
+            if remaining <= 0:
+                return
+            
+            try:
+                self.page.wait_for_function(
+                    f"(read) => {WATCH_STATE} && ({WATCH_STATE}.chunks.length > read || {WATCH_STATE}.done)",
+                    arg=read,
+                    timeout=remaining * 1000,
+                    polling=100
+                )
+            except PlaywrightTimeoutError:
+                return
+            
+            batch = self.page.evaluate(f"""
+                (read) => {{
+                    const watch = {WATCH_STATE};
+                    return {{ chunks: watch.chunks.slice(read), done: watch.done }};
+                }}
+            """, read)
+            
+            for chunk in batch['chunks']:
+                read += 1
+                yield ResponseDelta(chunk['delta'], chunk['reset'])
+            
+            if batch['done']:
+                self.armed = False
+                return
+    
+    def stop(self):
+        """Desconecta o observador da página sem esperar a conclusão"""
+        self.armed = False
+        self.page.evaluate(f"""
+            () => {{
+                const watch = {WATCH_STATE};
+                if (watch && watch.observer) watch.observer.disconnect();
+                if (watch && watch.timer) clearTimeout(watch.timer);
+            }}
+        """)
+    
+    @property
+    def first_token_ms(self) -> Optional[int]:
+        """Tempo até o primeiro token, em milissegundos"""
+        for event in self.events:
+            if event['type'] == 'first_token':
+                return event['elapsed_ms']
+        return None
@@ -0,0 +1,294 @@
+"""
+Política de Interceptação de Requisições
+- Bloqueia recursos pesados e não essenciais (imagens, mídia, fontes, analytics)
+- Regras de permitir/bloquear por tipo de recurso e por domínio, a primeira que casar vence
+- Aplicada a todos os contextos (pool, perfil persistente, automação e modo async)
+- Relatório de requisições e bytes economizados na execução
+- Com AI_STUDIO_SIMULATOR, o AI Studio e o login do Google vêm do simulador local
+"""
+
+import os
+import threading
+from typing import List, Optional, Sequence
+from urllib.parse import urlsplit
+
+from asset_cache import get_asset_cache, asset_cache_mode
+from simulator_hook import simulator_url, attach_simulator, attach_simulator_async
+
+ALLOW = "allow"
+BLOCK = "block"
+
+# Modos: "auto" aplica só em execuções headless, "on" sempre, "off" nunca
+ROUTE_MODES = ("auto", "on", "off")
+
+# Páginas de login sempre carregam completas (captcha, imagens do 2FA)
+DEFAULT_ALLOWED_DOMAINS = ("accounts.google.com",)
+
+# Beacons de analytics e telemetria
+DEFAULT_BLOCKED_DOMAINS = (
+    "google-analytics.com",
+    "googletagmanager.com",
+    "doubleclick.net",
+    "googlesyndication.com",
+    "googleadservices.com"
+)
+
+DEFAULT_BLOCKED_TYPES = ("image", "media", "font")
+
+# Tamanho médio estimado por tipo (bytes): recursos bloqueados nunca são baixados,
+# então a economia é estimada a partir do tipo
+SIZE_ESTIMATES = {
+    'image': 25 * 1024,
+    'media': 500 * 1024,
+    'font': 60 * 1024,
+    'stylesheet': 30 * 1024,
+    'script': 80 * 1024,
+    'xhr': 5 * 1024,
+    'fetch': 5 * 1024,
+    'ping': 1024,
+    'other': 10 * 1024
+}
+
+def _env_list(name: str) -> Optional[List[str]]:
+    """Lista separada por vírgulas de uma variável de ambiente (None se ausente)"""
+    value = os.getenv(name)
+    if value is None:
+        return None
+    return [item.strip().lower() for item in value.split(",") if item.strip()]
+
+def domain_matches(host: str, domain: str) -> bool:
+    """True se o host é o domínio ou um subdomínio dele"""
+    return host == domain or host.endswith("." + domain)
+
+class RouteRule:
+    """Regra de roteamento: ação para um conjunto de tipos e/ou domínios"""
+    
+    def __init__(self, action: str, resource_types: Optional[Sequence[str]] = None,
+                 domains: Optional[Sequence[str]] = None):
+        """
+        Args:
+            action (str): ALLOW ou BLOCK
+            resource_types (Sequence[str]): Tipos do Playwright (None = qualquer)
+            domains (Sequence[str]): Domínios, incluindo subdomínios (None = qualquer)
+        """
+        if action not in (ALLOW, BLOCK):
+            raise ValueError(f"Ação de rota inválida: {action}")
+        self.action = action
+        self.resource_types = tuple(resource_types) if resource_types else None
+        self.domains = tuple(domains) if domains else None
+    
+    def matches(self, resource_type: str, host: str) -> bool:
+        if self.resource_types and resource_type not in self.resource_types:
+            return False
+        if self.domains and not any(domain_matches(host, domain) for domain in self.domains):
+            return False
+        return True
+    
+    def __repr__(self):
+        return f"RouteRule({self.action}, types={self.resource_types}, domains={self.domains})"
+
+def default_rules() -> List[RouteRule]:
+    """
+    Regras padrão, ajustáveis por variáveis de ambiente
+    
+    ROUTE_ALLOW_DOMAINS, ROUTE_BLOCK_DOMAINS e ROUTE_BLOCK_TYPES substituem as
+    listas padrão (valores separados por vírgula; vazio desativa a regra).
+    """
+    allowed = _env_list("ROUTE_ALLOW_DOMAINS")
+    blocked_domains = _env_list("ROUTE_BLOCK_DOMAINS")
+    blocked_types = _env_list("ROUTE_BLOCK_TYPES")
+    
+    allowed = DEFAULT_ALLOWED_DOMAINS if allowed is None else allowed
+    blocked_domains = DEFAULT_BLOCKED_DOMAINS if blocked_domains is None else blocked_domains
+    blocked_types = DEFAULT_BLOCKED_TYPES if blocked_types is None else blocked_types
+    
+    rules = []
+    if allowed:
+        rules.append(RouteRule(ALLOW, domains=allowed))
+    if blocked_domains:
+        rules.append(RouteRule(BLOCK, domains=blocked_domains))
+    if blocked_types:
+        rules.append(RouteRule(BLOCK, resource_types=blocked_types))
+    return rules
+
+class RoutePolicy:
+    """Decide, para cada requisição, se ela segue ou é abortada"""
+    
+    def __init__(self, rules: Optional[List[RouteRule]] = None):
+        """
+        Inicializa a política
+        
+        Args:
+            rules (List[RouteRule]): Regras em ordem de prioridade (padrão: default_rules())
+        """
+        self.rules = default_rules() if rules is None else list(rules)
+        self.lock = threading.Lock()
+        self.reset()
+    
+    def reset(self):
+        """Zera as estatísticas da execução"""
+        with self.lock:
+            self.stats = {
+                'requests': 0,
+                'blocked': 0,
+                'bytes_saved': 0,
+                'blocked_by_type': {},
+                'blocked_by_domain': {}
+            }
+    
+    def decide(self, resource_type: str, url: str) -> str:
+        """
+        Ação para uma requisição (a primeira regra que casar vence; padrão ALLOW)
+        
+        Args:
+            resource_type (str): request.resource_type
+            url (str): request.url
+        
+        Returns:
+            str: ALLOW ou BLOCK
+        """
+        host = (urlsplit(url).hostname or "").lower()
+        for rule in self.rules:
+            if rule.matches(resource_type, host):
+                return rule.action
+        return ALLOW
+    
+    def _record(self, resource_type: str, url: str, action: str):
+        with self.lock:
+            self.stats['requests'] += 1
+            if action != BLOCK:
+                return
+            host = (urlsplit(url).hostname or "").lower()
+            self.stats['blocked'] += 1
+            self.stats['bytes_saved'] += SIZE_ESTIMATES.get(resource_type, SIZE_ESTIMATES['other'])
+            by_type = self.stats['blocked_by_type']
+            by_type[resource_type] = by_type.get(resource_type, 0) + 1
+            by_domain = self.stats['blocked_by_domain']
+            by_domain[host] = by_domain.get(host, 0) + 1
+    
+    def handle(self, route, request):
+        """Handler de rota para a API síncrona do Playwright"""
+        action = self.decide(request.resource_type, request.url)
+        self._record(request.resource_type, request.url, action)
+        if action == BLOCK:
+            route.abort("blockedbyclient")
+        else:
+            # fallback deixa handlers registrados antes (ex.: cache) tratarem a requisição
+            route.fallback()
+    
+    async def handle_async(self, route, request):
+        """Handler de rota para a API assíncrona do Playwright"""
+        action = self.decide(request.resource_type, request.url)
+        self._record(request.resource_type, request.url, action)
+        if action == BLOCK:
+            await route.abort("blockedbyclient")
+        else:
+            await route.fallback()
+    
+    def apply(self, context):
+        """Registra a política em um contexto síncrono"""
+        context.route("**/*", self.handle)
+    
+    async def apply_async(self, context):
+        """Registra a política em um contexto assíncrono"""
+        await context.route("**/*", self.handle_async)
+    
+    def summary(self) -> dict:
+        """Requisições e bytes (estimados) economizados"""
+        with self.lock:
+            stats = dict(self.stats)
+            stats['blocked_by_type'] = dict(self.stats['blocked_by_type'])
+            stats['blocked_by_domain'] = dict(self.stats['blocked_by_domain'])
+        stats['blocked_ratio'] = round(stats['blocked'] / stats['requests'], 3) if stats['requests'] else 0
+        return stats
+    
+    def print_report(self):
+        """Imprime o relatório de economia da execução"""
+        summary = self.summary()
+        print("\n🚦 RELATÓRIO DE REQUISIÇÕES BLOQUEADAS")
+        print("=" * 40)
+        print(f"   {summary['blocked']} de {summary['requests']} requisições bloqueadas")
+        print(f"   ~{summary['bytes_saved'] / 1024:.0f} KB economizados (estimativa)")
+        for resource_type, count in sorted(summary['blocked_by_type'].items(), key=lambda item: -item[1]):
+            print(f"   {resource_type}: {count}")
+
+_policy = None
+_policy_lock = threading.Lock()
+
+def route_mode() -> str:
+    """Modo configurado em ROUTE_POLICY (padrão "auto")"""
+    mode = os.getenv("ROUTE_POLICY", "auto").lower()
+    return mode if mode in ROUTE_MODES else "auto"
+
+def get_route_policy() -> RoutePolicy:
+    """Retorna a política compartilhada do processo"""
+    global _policy
+    with _policy_lock:
+        if _policy is None:
+            _policy = RoutePolicy()
+        return _policy
+
+def route_policy_enabled(headless: bool) -> bool:
+    """Indica se a política deve ser aplicada a um contexto"""
+    mode = route_mode()
+    return mode == "on" or (mode == "auto" and headless)
+
+def _cache_for(policy_enabled: bool):
+    """
+    Cache de assets a registrar no contexto, ou None
+    
+    Qualquer rota "**/*" desliga o cache HTTP do navegador: sem a política (ex.:
+    execuções com interface) o contexto fica sem rota nenhuma, a menos que
+    ASSET_CACHE=on peça o cache mesmo assim.
+    """
+    cache = get_asset_cache()
+    if cache is None or not (policy_enabled or asset_cache_mode() == "on"):
+        return None
+    return cache
+
+def attach_route_policy(context, headless: bool = True) -> Optional[RoutePolicy]:
+    """
+    Aplica a política compartilhada a um contexto síncrono, se habilitada
+    
+    O cache de assets é registrado antes da política: o Playwright executa o
+    último handler registrado primeiro, então a política decide e as
+    requisições permitidas caem no cache via route.fallback(). Sem política
+    (e sem ASSET_CACHE=on) nenhuma rota "**/*" é registrada.
+    O simulador, quando ativo, é o primeiro registrado e responde por último.
+    
+    Args:
+        context: BrowserContext do Playwright
+        headless (bool): Se o navegador é headless (modo "auto" só aplica nesse caso)
+    
+    Returns:
+        Optional[RoutePolicy]: A política aplicada, ou None
+    """
+    if simulator_url():
+        attach_simulator(context)
+    
+    enabled = route_policy_enabled(headless)
+    cache = _cache_for(enabled)
+    if cache is not None:
+        cache.apply(context)
+    
+    if not enabled:
+        return None
+    policy = get_route_policy()
+    policy.apply(context)
+    return policy
+
+async def attach_route_policy_async(context, headless: bool = True) -> Optional[RoutePolicy]:
+    """Equivalente de attach_route_policy para contextos assíncronos"""
+    if simulator_url():
+        await attach_simulator_async(context)
+    
+    enabled = route_policy_enabled(headless)
+    cache = _cache_for(enabled)
+    if cache is not None:
+        await cache.apply_async(context)
+    
+    if not enabled:
+        return None
+    policy = get_route_policy()
+    await policy.apply_async(context)
+    return policy
@@ -0,0 +1,239 @@
+"""
+Pipeline Assíncrono de Screenshots
+- Captura apenas bytes JPEG da área visível (sem PNG de página inteira)
+- Conversão, hash e gravação em disco feitas por uma thread em segundo plano
+- Quadros iguais ao anterior (hash perceptual) viram hardlinks em vez de novos arquivos
+- Orçamento de bytes por execução: ao esgotar, as capturas param
+"""
+
+import os
+import io
+import queue
+import atexit
+import hashlib
+import threading
+from datetime import datetime
+from typing import Optional
+
+try:
+    from PIL import Image
+    PIL_AVAILABLE = True
+except ImportError:
+    PIL_AVAILABLE = False
+
+class ScreenshotPipeline:
+    """
+    Captura de screenshots fora do caminho crítico
+    
+    Apenas page.screenshot() roda na thread do Playwright; o restante vai
+    para a fila do worker. Sem Pillow, a deduplicação usa hash exato dos bytes
+    e o formato WebP cai para JPEG.
+    """
+    
+    def __init__(self, output_dir: str, image_format: str = "jpeg", quality: int = 70,
+                 byte_budget: int = 50 * 1024 * 1024, dedupe: bool = True,
+                 hash_distance: int = 4, max_queue: int = 32):
+        """
+        Inicializa o pipeline
+        
+        Args:
+            output_dir (str): Diretório dos screenshots
+            image_format (str): "jpeg" ou "webp"
+            quality (int): Qualidade de compressão (0-100)
+            byte_budget (int): Máximo de bytes gravados na execução (0 = sem limite)
+            dedupe (bool): Pular quadros iguais ao anterior
+            hash_distance (int): Distância de Hamming máxima para considerar iguais
+            max_queue (int): Quadros pendentes antes de descartar novas capturas
+        """
+        self.output_dir = output_dir
+        self.image_format = image_format if image_format == "jpeg" or PIL_AVAILABLE else "jpeg"
+        self.quality = quality
+        self.byte_budget = byte_budget
+        self.dedupe = dedupe
+        self.hash_distance = hash_distance
+        self.queue = queue.Queue(maxsize=max_queue)
+        
+        self.last_frames = {}
+        self.bytes_written = 0
+        self.stats = {'captured': 0, 'written': 0, 'duplicates': 0, 'over_budget': 0, 'dropped': 0}
+        
+        os.makedirs(output_dir, exist_ok=True)
+        self.thread = threading.Thread(target=self._worker, name="screenshot-pipeline", daemon=True)
+        self.thread.start()
+    
+    @property
+    def extension(self) -> str:
+        return "webp" if self.image_format == "webp" else "jpg"
+    
+    @property
+    def budget_exhausted(self) -> bool:
+        return bool(self.byte_budget) and self.bytes_written >= self.byte_budget
+    
+    def capture(self, page, name: str, full_page: bool = False, path: Optional[str] = None) -> Optional[str]:
+        """
+        Captura a página e agenda a gravação
+        
+        Args:
+            page: Página do Playwright
+            name (str): Nome lógico do screenshot (vira prefixo do arquivo)
+            full_page (bool): Página inteira em vez da área visível
+            path (str): Caminho explícito; ".png" mantém PNG sem compressão
+        
+        Returns:
+            Optional[str]: Caminho onde o arquivo será gravado, ou None se pulado
+        """
+        if self.budget_exhausted:
+            self.stats['over_budget'] += 1
+            return None
+        
+        if path and path.lower().endswith(".png"):
+            data = page.screenshot(type="png", full_page=full_page)
+            image_format = "png"
+        else:
+            data = page.screenshot(type="jpeg", quality=self.quality, full_page=full_page)
+            image_format = "jpeg"
+        
+        return self.submit(name, data, image_format, path=path)
+    
+    def submit(self, name: str, data: bytes, image_format: str = "jpeg",
+               path: Optional[str] = None) -> Optional[str]:
+        """
+        Agenda a gravação de bytes já capturados
+        
+        Args:
+            name (str): Nome lógico do screenshot
+            data (bytes): Imagem capturada por page.screenshot()
+            image_format (str): Formato dos bytes ("jpeg" ou "png")
+            path (str): Caminho explícito
+        
+        Returns:
+            Optional[str]: Caminho onde o arquivo será gravado, ou None se descartado
+        """
+        explicit = bool(path)
+        if not path:
+            extension = "png" if image_format == "png" else self.extension
+            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S_%f")
+            path = os.path.join(self.output_dir, f"{name}_{timestamp}.{extension}")
+        
+        # WebP só para nomes gerados; caminhos explícitos mantêm a extensão pedida
+        if image_format != "png" and not explicit:
+            image_format = self.image_format
+        
+        # Quadros com caminho explícito só são comparados com o mesmo caminho
+        key = path if explicit else "frames"
+        
+        try:
+            self.queue.put_nowait((key, path, data, image_format))
+        except queue.Full:
+            self.stats['dropped'] += 1
+            return None
+        
+        self.stats['captured'] += 1
+        return path
+    
+    def _frame_hash(self, data: bytes):
+        """dHash de 64 bits com Pillow, ou hash exato dos bytes sem ele"""
+        if not PIL_AVAILABLE:
+            return hashlib.sha1(data).hexdigest()
+        
+        image = Image.open(io.BytesIO(data)).convert("L").resize((9, 8))
+        pixels = list(image.getdata())
+        value = 0
+        for row in range(8):
+            for col in range(8):
+                left = pixels[row * 9 + col]
+                right = pixels[row * 9 + col + 1]
+                value = (value << 1) | (1 if left > right else 0)
+        return value
+    
+    def _is_duplicate(self, previous, current) -> bool:
+        if previous is None:
+            return False
+        if isinstance(current, int):
+            return bin(previous ^ current).count("1") <= self.hash_distance
+        return previous == current
+    
+    def _encode(self, data: bytes, image_format: str) -> bytes:
+        """Converte para WebP quando configurado"""
+        if image_format != "webp":
+            return data
+        output = io.BytesIO()
+        Image.open(io.BytesIO(data)).save(output, format="WEBP", quality=self.quality)
+        return output.getvalue()
+    
+    def _write(self, key, path: str, data: bytes, image_format: str):
+        """Processa um quadro da fila"""
+        frame_hash = self._frame_hash(data) if self.dedupe else None
+        previous = self.last_frames.get(key)
+        
+        if self.dedupe and previous and self._is_duplicate(previous[0], frame_hash):
+            self.stats['duplicates'] += 1
+            # Hardlink para o quadro anterior: o caminho retornado continua válido
+            if previous[1] != path and os.path.exists(previous[1]):
+                try:
+                    os.link(previous[1], path)
+                except OSError:
+                    pass
+            return
+        
+        if self.budget_exhausted:
+            self.stats['over_budget'] += 1
+            return
+        
+        encoded = self._encode(data, image_format)
+        
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        
+        temp_path = f"{path}.tmp"
+        with open(temp_path, 'wb') as f:
+            f.write(encoded)
+        os.replace(temp_path, path)
+        
+        self.bytes_written += len(encoded)
+        self.stats['written'] += 1
+        self.last_frames[key] = (frame_hash, path)
+        
+        if self.budget_exhausted:
+            print(f"⚠️ Orçamento de screenshots esgotado ({self.bytes_written} bytes)")
+    
+    def _worker(self):
+        """Consome a fila de quadros até receber o sinal de parada"""
+        while True:
+            item = self.queue.get()
+            try:
+                if item is None:
+                    return
+                self._write(*item)
+            except Exception as e:
+                print(f"❌ Erro ao gravar screenshot: {e}")
+            finally:
+                self.queue.task_done()
+    
+    def flush(self):
+        """Aguarda a gravação de todos os quadros pendentes"""
+        self.queue.join()
+    
+    def close(self):
+        """Grava os quadros pendentes e encerra o worker"""
+        if self.thread.is_alive():
+            self.queue.put(None)
+            self.thread.join(timeout=10)
+
+_pipelines = {}
+_pipelines_lock = threading.Lock()
+
+def get_screenshot_pipeline(output_dir: str) -> ScreenshotPipeline:
+    """Retorna o pipeline compartilhado do processo para o diretório"""
+    key = os.path.abspath(output_dir)
+    with _pipelines_lock:
+        if key not in _pipelines:
+            pipeline = ScreenshotPipeline(
+                output_dir,
+                image_format=os.getenv("SCREENSHOT_FORMAT", "jpeg"),
+                byte_budget=int(os.getenv("SCREENSHOT_BYTE_BUDGET", 50 * 1024 * 1024))
+            )
+            _pipelines[key] = pipeline
+            atexit.register(pipeline.close)
+        return _pipelines[key]
@@ -0,0 +1,313 @@
+"""
+Cache Persistente de Seletores
+- Registra qual seletor encontrou o elemento em cada tipo de página
+- Tenta primeiro o último vencedor e reordena candidatos pela taxa de acerto
+- Remove entradas que falham repetidamente
+- Gravação em lote (intervalo e saída do processo), somando as contagens de
+  outros processos sob flock
+"""
+
+import os
+import re
+import json
+import time
+import fcntl
+import atexit
+from typing import Dict, List, Optional, Sequence
+from urllib.parse import urlparse
+
+DEFAULT_CACHE_FILE = "/workspaces/replit/selector_cache.json"
+
+# Segmentos de URL variáveis (índice de conta, ids de prompt) viram curinga
+VARIABLE_SEGMENT = re.compile(r'^(\d+|[A-Za-z0-9_-]{16,})$')
+
+# Intervalo mínimo (segundos) entre gravações fora do encerramento
+SAVE_INTERVAL = 5
+
+class SelectorCache:
+    """
+    Cache de seletores vencedores persistido entre execuções
+    
+    As entradas são agrupadas por tipo de elemento (ex.: "message_input") e
+    padrão de URL, já que o mesmo elemento muda de seletor entre páginas.
+    """
+    
+    def __init__(self, cache_file: Optional[str] = None, max_failures: int = 3):
+        """
+        Inicializa o cache
+        
+        Args:
+            cache_file (str): Arquivo JSON onde o cache é persistido
+                (padrão: SELECTOR_CACHE_FILE ou DEFAULT_CACHE_FILE)
+            max_failures (int): Falhas consecutivas antes de remover um seletor
+        """
+        self.cache_file = cache_file or os.getenv("SELECTOR_CACHE_FILE", DEFAULT_CACHE_FILE)
+        self.lock_path = f"{self.cache_file}.lock"
+        self.max_failures = max_failures
+        self.entries: Dict[str, dict] = {}
+        # Variações desde a última gravação: somadas ao arquivo no save()
+        self.deltas: Dict[str, Dict[str, dict]] = {}
+        self.winners: Dict[str, tuple] = {}
+        self.dirty = False
+        self.last_save = time.time()
+        self.load()
+        atexit.register(self.save)
+    
+    @staticmethod
+    def url_pattern(url: Optional[str]) -> str:
+        """
+        Normaliza a URL para um padrão estável
+        
+        Args:
+            url (str): URL da página
+        
+        Returns:
+            str: Host e caminho com segmentos variáveis trocados por '*'
+        """
+        if not url:
+            return "*"
+        
+        parsed = urlparse(url)
+        segments = [
+            '*' if VARIABLE_SEGMENT.match(segment) else segment
+            for segment in parsed.path.split('/') if segment
+        ]
+        return f"{parsed.netloc}/{'/'.join(segments)}"
+    
+    def make_key(self, kind: str, url: Optional[str]) -> str:
+        """Monta a chave do cache a partir do tipo e da URL"""
+        return f"{kind}|{self.url_pattern(url)}"
+    
+    def _read_file(self) -> Dict[str, dict]:
+        """Conteúdo atual do arquivo (vazio se não existir)"""
+        if not os.path.exists(self.cache_file):
+            return {}
+        with open(self.cache_file, 'r') as f:
+            return json.load(f)
+    
+    def load(self):
+        """Carrega o cache do disco"""
+        try:
+            self.entries = self._read_file()
+        except Exception as e:
+            print(f"⚠️ Erro ao carregar cache de seletores: {e}")
+            self.entries = {}
+    
+    def _merge(self, merged: Dict[str, dict]) -> Dict[str, dict]:
+        """
+        Aplica as variações deste processo ao conteúdo lido do disco
+        
+        Acertos e falhas são somados; as falhas consecutivas recomeçam da
+        contagem local quando houve um acerto desde a última gravação.
+        """
+        for key, selectors in self.deltas.items():
+            entry = merged.setdefault(key, {'last_winner': None, 'selectors': {}})
+            for selector, delta in selectors.items():
+                stats = entry['selectors'].setdefault(selector, {
+                    'hits': 0,
+                    'misses': 0,
+                    'consecutive_failures': 0,
+                    'last_used': None
+                })
+                stats['hits'] += delta['hits']
+                stats['misses'] += delta['misses']
+                if delta['reset']:
+                    stats['consecutive_failures'] = delta['trailing']
+                else:
+                    stats['consecutive_failures'] += delta['trailing']
+                if delta['last_used'] and (stats['last_used'] or 0) < delta['last_used']:
+                    stats['last_used'] = delta['last_used']
+                
+                if stats['consecutive_failures'] >= self.max_failures:
+                    del entry['selectors'][selector]
+            
+            # Vencedor mais recente entre o do arquivo e o deste processo
+            winner, winner_at = self.winners.get(key, (None, None))
+            current = entry['selectors'].get(entry['last_winner'] or "")
+            if winner in entry['selectors'] and (not current or (current['last_used'] or 0) <= winner_at):
+                entry['last_winner'] = winner
+            elif entry['last_winner'] not in entry['selectors']:
+                entry['last_winner'] = None
+            
+            if not entry['selectors']:
+                del merged[key]
+        return merged
+    
+    def save(self, force: bool = True):
+        """
+        Grava o cache, somando as variações às de outros processos
+        
+        Args:
+            force (bool): Gravar mesmo antes de SAVE_INTERVAL desde a última vez
+        """
+        if not self.dirty or (not force and time.time() - self.last_save < SAVE_INTERVAL):
+            return
+        
+        try:
+            directory = os.path.dirname(self.cache_file)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            
+            with open(self.lock_path, 'w') as lock_file:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+                try:
+                    try:
+                        merged = self._read_file()
+                    except ValueError:
+                        merged = {}
+                    self.entries = self._merge(merged)
+                    
+                    temp_file = f"{self.cache_file}.{os.getpid()}.tmp"
+                    with open(temp_file, 'w') as f:
+                        json.dump(self.entries, f, indent=2)
+                    os.replace(temp_file, self.cache_file)
+                    
+                    self.deltas = {}
+                    self.winners = {}
+                    self.dirty = False
+                    self.last_save = time.time()
+                finally:
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
+        
+        except Exception as e:
+            print(f"⚠️ Erro ao salvar cache de seletores: {e}")
+    
+    def last_winner(self, kind: str, url: Optional[str]) -> Optional[str]:
+        """Retorna o último seletor que encontrou o elemento"""
+        entry = self.entries.get(self.make_key(kind, url))
+        return entry.get('last_winner') if entry else None
+    
+    def hit_rate(self, kind: str, url: Optional[str], selector: str) -> Optional[float]:
+        """Retorna a taxa de acerto histórica do seletor, ou None se desconhecido"""
+        entry = self.entries.get(self.make_key(kind, url))
+        if not entry or selector not in entry['selectors']:
+            return None
+        
+        stats = entry['selectors'][selector]
+        attempts = stats['hits'] + stats['misses']
+        return stats['hits'] / attempts if attempts else None
+    
+    def order(self, kind: str, url: Optional[str], candidates: Sequence[str]) -> List[str]:
+        """
+        Reordena os candidatos usando o histórico
+        
+        O último vencedor vem primeiro (mesmo que não esteja na lista estática),
+        seguido dos seletores conhecidos por taxa de acerto e depois dos demais
+        na ordem original.
+        
+        Args:
+            kind (str): Tipo de elemento procurado
+            url (str): URL da página atual
+            candidates (Sequence[str]): Seletores em ordem de prioridade
+        
+        Returns:
+            List[str]: Seletores reordenados, sem duplicatas
+        """
+        known = []
+        unknown = []
+        for selector in candidates:
+            rate = self.hit_rate(kind, url, selector)
+            if rate:
+                known.append((rate, selector))
+            else:
+                unknown.append(selector)
+        
+        # sort estável: empates mantêm a prioridade original
+        known.sort(key=lambda item: item[0], reverse=True)
+        ordered = [selector for _, selector in known] + unknown
+        
+        winner = self.last_winner(kind, url)
+        if winner:
+            ordered = [winner] + [selector for selector in ordered if selector != winner]
+        
+        return ordered
+    
+    def _selector_stats(self, kind: str, url: Optional[str], selector: str) -> dict:
+        """Retorna (criando se necessário) as estatísticas de um seletor"""
+        entry = self.entries.setdefault(self.make_key(kind, url), {
+            'last_winner': None,
+            'selectors': {}
+        })
+        return entry['selectors'].setdefault(selector, {
+            'hits': 0,
+            'misses': 0,
+            'consecutive_failures': 0,
+            'last_used': None
+        })
+    
+    def _delta(self, key: str, selector: str) -> dict:
+        """Variação pendente de um seletor (criando se necessário)"""
+        self.dirty = True
+        return self.deltas.setdefault(key, {}).setdefault(selector, {
+            'hits': 0,
+            'misses': 0,
+            'reset': False,
+            'trailing': 0,
+            'last_used': None
+        })
+    
+    def record_hit(self, kind: str, url: Optional[str], selector: str, save: bool = True):
+        """Registra que o seletor encontrou o elemento"""
+        key = self.make_key(kind, url)
+        now = time.time()
+        stats = self._selector_stats(kind, url, selector)
+        stats['hits'] += 1
+        stats['consecutive_failures'] = 0
+        stats['last_used'] = now
+        
+        self.entries[key]['last_winner'] = selector
+        
+        delta = self._delta(key, selector)
+        delta['hits'] += 1
+        delta['reset'] = True
+        delta['trailing'] = 0
+        delta['last_used'] = now
+        self.winners[key] = (selector, now)
+        
+        if save:
+            self.save(force=False)
+    
+    def record_miss(self, kind: str, url: Optional[str], selector: str, save: bool = True):
+        """Registra uma falha e remove o seletor se falhar repetidamente"""
+        key = self.make_key(kind, url)
+        entry = self.entries.get(key)
+        if not entry or selector not in entry['selectors']:
+            return
+        
+        stats = entry['selectors'][selector]
+        stats['misses'] += 1
+        stats['consecutive_failures'] += 1
+        
+        delta = self._delta(key, selector)
+        delta['misses'] += 1
+        delta['trailing'] += 1
+        
+        if stats['consecutive_failures'] >= self.max_failures:
+            print(f"🗑️ Removendo seletor do cache: {selector}")
+            del entry['selectors'][selector]
+            if entry['last_winner'] == selector:
+                entry['last_winner'] = None
+            if not entry['selectors']:
+                del self.entries[key]
+        
+        if save:
+            self.save(force=False)
+    
+    def record_result(self, kind: str, url: Optional[str], ordered: Sequence[str],
+                      winner: Optional[str]):
+        """
+        Registra o resultado de uma resolução completa
+        
+        Os seletores conhecidos que estavam à frente do vencedor contam como
+        falha, e o vencedor como acerto. O arquivo é gravado no máximo a cada
+        SAVE_INTERVAL segundos e na saída do processo.
+        """
+        for selector in ordered:
+            if selector == winner:
+                break
+            self.record_miss(kind, url, selector, save=False)
+        
+        if winner:
+            self.record_hit(kind, url, winner, save=False)
+        
+        self.save(force=False)
@@ -0,0 +1,162 @@
+"""
+Motor de Resolução de Seletores
+- Avalia toda a lista de seletores candidatos em uma única passada na página
+- Retorna o primeiro seletor visível respeitando a ordem de prioridade
+- Usa um único prazo global em vez de um timeout por seletor
+"""
+
+from typing import List, Optional, Sequence
+
+try:
+    from playwright.sync_api import TimeoutError as PlaywrightTimeoutError
+except ImportError:
+    # Permite importar o módulo sem Playwright (ex.: modo simulação do app)
+    PlaywrightTimeoutError = TimeoutError
+
+# Script executado dentro da página. Entende os formatos de seletor usados no
+# projeto: CSS puro, "text=..." (substring, sem diferenciar maiúsculas; entre
+# aspas para texto exato) e "<css>:has-text('...')". Retorna {index} do
+# primeiro seletor com um elemento visível, ou null se nenhum corresponder.
+RACE_SELECTORS_JS = """
+(selectors) => {
+    const normalize = (text) => (text || '').replace(/\\s+/g, ' ').trim();
+    
+    const isVisible = (el) => {
+        if (!el || !el.isConnected) return false;
+        const style = window.getComputedStyle(el);
+        if (style.visibility === 'hidden' || style.display === 'none') return false;
+        const rect = el.getBoundingClientRect();
+        return rect.width > 0 && rect.height > 0;
+    };
+    
+    const unquote = (text) => {
+        const match = text.match(/^(['"])(.*)\\1$/);
+        return match ? { value: match[2], exact: true } : { value: text, exact: false };
+    };
+    
+    const textMatches = (el, needle) => {
+        const text = normalize(el.innerText || el.textContent).toLowerCase();
+        const value = normalize(needle.value).toLowerCase();
+        return needle.exact ? text === value : text.includes(value);
+    };
+    
+    const matchText = (needle) => {
+        const walker = document.createTreeWalker(document.body, NodeFilter.SHOW_TEXT);
+        const value = normalize(needle.value).toLowerCase();
+        let node;
+        while ((node = walker.nextNode())) {
+            if (!normalize(node.textContent).toLowerCase().includes(value)) continue;
+            let el = node.parentElement;
+            // Subir até o menor elemento que contém o texto completo
+            while (el && !textMatches(el, needle) && el.parentElement) {
+                el = el.parentElement;
+            }
+            if (el && textMatches(el, needle) && isVisible(el)) return true;
+        }
+        return false;
+    };
+    
+    const matchOne = (selector) => {
+        try {
+            if (selector.startsWith('text=')) {
+                return matchText(unquote(selector.slice(5).trim()));
+            }
+            
+            const hasText = selector.match(/^(.*):has-text\\((['"])(.*)\\2\\)$/);
+            if (hasText) {
+                const base = hasText[1] || '*';
+                const needle = { value: hasText[3], exact: false };
+                for (const el of document.querySelectorAll(base)) {
+                    if (textMatches(el, needle) && isVisible(el)) return true;
+                }
+                return false;
+            }
+            
+            for (const el of document.querySelectorAll(selector)) {
+                if (isVisible(el)) return true;
+            }
+        } catch (e) {
+            // Seletor inválido para querySelectorAll: ignorar
+        }
+        return false;
+    };
+    
+    if (!document.body) return null;
+    
+    for (let i = 0; i < selectors.length; i++) {
+        if (matchOne(selectors[i])) return { index: i };
+    }
+    return null;
+}
+"""
+
+def race_selectors(page, selectors: Sequence[str], timeout: int = 5000,
+                   polling: int = 100) -> Optional[str]:
+    """
+    Aguarda até que algum seletor da lista esteja visível
+    
+    Todos os candidatos são avaliados juntos a cada verificação dentro da
+    página, então o custo de uma falha é o prazo total e não a soma dos
+    timeouts individuais.
+    
+    Args:
+        page: Página do Playwright
+        selectors (Sequence[str]): Seletores em ordem de prioridade
+        timeout (int): Prazo global em milissegundos
+        polling (int): Intervalo entre verificações em milissegundos
+    
+    Returns:
+        Optional[str]: Primeiro seletor visível, ou None se o prazo expirar
+    """
+    selectors = list(selectors)
+    if not selectors:
+        return None
+    
+    if timeout <= 0:
+        return probe_selectors(page, selectors)
+    
+    try:
+        handle = page.wait_for_function(
+            RACE_SELECTORS_JS, arg=selectors, timeout=timeout, polling=polling
+        )
+    except PlaywrightTimeoutError:
+        return None
+    
+    result = handle.json_value()
+    return selectors[result['index']] if result else None
+
+def probe_selectors(page, selectors: Sequence[str]) -> Optional[str]:
+    """
+    Verifica uma única vez, sem esperar, qual seletor está visível
+    
+    Args:
+        page: Página do Playwright
+        selectors (Sequence[str]): Seletores em ordem de prioridade
+    
+    Returns:
+        Optional[str]: Primeiro seletor visível, ou None
+    """
+    selectors = list(selectors)
+    if not selectors:
+        return None
+    
+    result = page.evaluate(RACE_SELECTORS_JS, selectors)
+    return selectors[result['index']] if result else None
+
+def split_matches(selector: Optional[str], *groups: List[str]) -> int:
+    """
+    Indica a qual grupo pertence o seletor vencedor de uma corrida combinada
+    
+    Args:
+        selector (Optional[str]): Seletor retornado por race_selectors
+        *groups (List[str]): Grupos concatenados na corrida, em ordem
+    
+    Returns:
+        int: Índice do grupo, ou -1 se o seletor for None ou desconhecido
+    """
+    if selector is None:
+        return -1
+    for index, group in enumerate(groups):
+        if selector in group:
+            return index
+    return -1
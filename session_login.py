@@ -6,10 +6,13 @@ import json
 import os
 import time
 from automation import GoogleAIStudioAutomation
+from session_probe import probe_session, VALID
+from auth_state import get_auth_store
 
 class SessionManager:
     def __init__(self, session_file="google_session.json"):
         self.session_file = session_file
+        self.last_probe = None
         
     def save_session(self, automation):
         """
@@ -36,6 +39,9 @@ class SessionManager:
             
             with open(self.session_file, 'w') as f:
                 json.dump(session_data, f, indent=2)
+            
+            # Mesma sessão no armazém versionado (contextos novos já nascem logados)
+            get_auth_store().save(storage_state)
                 
             print(f"✅ Sessão salva em: {self.session_file}")
             print(f"📅 Timestamp: {time.ctime()}")
@@ -80,9 +86,18 @@ class SessionManager:
     def is_session_valid(self):
         """
         Verifica se existe uma sessão válida
+        
+        Usa a sonda rápida (cookies + uma requisição HTTP, sem navegador); se
+        ela não for conclusiva, mantém o critério de idade do arquivo (24 horas).
         """
         if not os.path.exists(self.session_file):
             return False
+        
+        self.last_probe = probe_session(self.session_file)
+        print(f"⚡ Sonda de sessão: {self.last_probe.status} - {self.last_probe.reason} "
+              f"({self.last_probe.elapsed_ms}ms)")
+        if self.last_probe.conclusive:
+            return self.last_probe.status == VALID
             
         try:
             with open(self.session_file, 'r') as f:
@@ -128,7 +143,13 @@ def automated_login_with_session():
             print("🔄 Tentando usar sessão salva...")
             if session_manager.load_session(automation):
                 
-                # Testar se a sessão ainda funciona
+                # Sonda já confirmou a sessão: não é preciso testar no navegador
+                if session_manager.last_probe and session_manager.last_probe.status == VALID:
+                    print("🎉 SESSÃO VÁLIDA! Você já está logado!")
+                    automation.navigate_to_ai_studio()
+                    return automation
+                
+                # Sonda inconclusiva: testar se a sessão ainda funciona
                 print("🧪 Testando sessão...")
                 automation.page.goto("https://aistudio.google.com/", timeout=30000)
                 
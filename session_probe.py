@@ -0,0 +1,222 @@
+"""
+Sonda Rápida de Validade da Sessão
+- Lê os cookies salvos (storage_state do Playwright ou arquivo do SessionManager)
+- Confere os cookies de autenticação do Google e suas datas de expiração
+- Uma única requisição HTTP (conexão reaproveitada) classifica a sessão
+- Sem navegador: o fluxo só abre o Chromium quando o resultado é inconclusivo
+"""
+
+import os
+import re
+import json
+import time
+import threading
+from typing import Iterable, List, Optional
+from urllib.parse import urlsplit
+
+from auth_state import get_auth_store
+from simulator_hook import simulated_request
+
+try:
+    import requests
+    from requests.adapters import HTTPAdapter
+except ImportError:
+    requests = None
+
+# Resultados da sonda
+VALID = "valid"
+EXPIRED = "expired"
+MISSING = "missing"
+AMBIGUOUS = "ambiguous"
+
+# Página que exige login: sem sessão o AI Studio redireciona para o login do Google
+PROBE_URL = "https://aistudio.google.com/app/prompts/new_chat"
+LOGGED_OUT_REDIRECTS = ("accounts.google.com", "/welcome")
+
+# Cookies que identificam uma conta Google logada
+AUTH_COOKIES = ("SID", "__Secure-1PSID", "__Secure-3PSID")
+
+# A casca do app pode responder 200 sem sessão: só um sinal positivo confirma
+# o login (cookies da sessão renovados na resposta ou dados da conta na página)
+SESSION_REFRESH_COOKIES = ("SIDCC", "__Secure-1PSIDCC", "__Secure-3PSIDCC",
+                           "__Secure-1PSIDTS", "__Secure-3PSIDTS")
+ACCOUNT_MARKERS = (
+    re.compile(r'"oPEP7c":"[^"]+@'),
+    re.compile(r'aria-label="Google account: [^"]*@', re.IGNORECASE)
+)
+
+PROBE_TIMEOUT = 3.0
+
+# Resultados recentes por arquivo (invalidados quando o arquivo muda)
+PROBE_TTL = 60
+
+USER_AGENT = ("Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 "
+              "(KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36")
+
+class ProbeResult:
+    """Classificação da sessão e o motivo"""
+    
+    def __init__(self, status: str, reason: str, elapsed_ms: int = 0):
+        self.status = status
+        self.reason = reason
+        self.elapsed_ms = elapsed_ms
+    
+    @property
+    def conclusive(self) -> bool:
+        """False quando só o navegador pode decidir"""
+        return self.status != AMBIGUOUS
+    
+    def __repr__(self):
+        return f"ProbeResult({self.status}, {self.reason!r}, {self.elapsed_ms}ms)"
+
+_http = None
+_http_lock = threading.Lock()
+_results = {}
+
+def _http_session():
+    """Sessão HTTP compartilhada com pool de conexões (keep-alive entre sondas)"""
+    global _http
+    with _http_lock:
+        if _http is None:
+            _http = requests.Session()
+            _http.mount("https://", HTTPAdapter(pool_connections=2, pool_maxsize=4))
+            _http.headers.update({'User-Agent': USER_AGENT})
+        return _http
+
+def load_cookies(path: str) -> Optional[List[dict]]:
+    """
+    Cookies de um arquivo de sessão
+    
+    Aceita o storage_state do Playwright ({"cookies": [...], "origins": [...]})
+    e o formato do SessionManager ({"cookies": [...], "storage_state": {...}}).
+    
+    Returns:
+        Optional[List[dict]]: Cookies, ou None se o arquivo não existe ou é inválido
+    """
+    try:
+        with open(path, 'r') as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return None
+    
+    cookies = data.get('cookies')
+    if not cookies and isinstance(data.get('storage_state'), dict):
+        cookies = data['storage_state'].get('cookies')
+    return cookies or []
+
+def _domain_matches(host: str, cookie_domain: str) -> bool:
+    domain = cookie_domain.lstrip('.')
+    return host == domain or host.endswith("." + domain)
+
+def inspect_cookies(cookies: List[dict], now: Optional[float] = None) -> Optional[ProbeResult]:
+    """
+    Classificação só pelos cookies, sem rede
+    
+    Returns:
+        Optional[ProbeResult]: MISSING/EXPIRED quando os cookies já decidem, ou None
+    """
+    now = now or time.time()
+    auth = [cookie for cookie in cookies
+            if cookie.get('name') in AUTH_COOKIES and _domain_matches("google.com", cookie.get('domain', ''))]
+    if not auth:
+        return ProbeResult(MISSING, "nenhum cookie de autenticação do Google")
+    
+    # expires -1 = cookie de sessão (o perfil persistente o mantém)
+    alive = [cookie for cookie in auth if cookie.get('expires', -1) <= 0 or cookie['expires'] > now]
+    if not alive:
+        return ProbeResult(EXPIRED, "cookies de autenticação expirados")
+    return None
+
+def classify_response(status_code: int, location: str, body: str = "",
+                      cookie_names: Iterable[str] = ()) -> ProbeResult:
+    """
+    Classificação pela resposta de PROBE_URL (sem seguir redirecionamentos)
+    
+    Args:
+        status_code (int): Status HTTP
+        location (str): Cabeçalho Location
+        body (str): Corpo da resposta
+        cookie_names (Iterable[str]): Cookies definidos pela resposta
+    """
+    if status_code == 200:
+        refreshed = [name for name in cookie_names if name in SESSION_REFRESH_COOKIES]
+        if refreshed:
+            return ProbeResult(VALID, f"AI Studio renovou a sessão ({refreshed[0]})")
+        if any(marker.search(body or "") for marker in ACCOUNT_MARKERS):
+            return ProbeResult(VALID, "AI Studio respondeu com os dados da conta")
+        return ProbeResult(AMBIGUOUS, "AI Studio respondeu 200 sem sinal de sessão")
+    if 300 <= status_code < 400:
+        if any(marker in (location or "") for marker in LOGGED_OUT_REDIRECTS):
+            return ProbeResult(EXPIRED, f"redirecionado para {urlsplit(location).netloc or location}")
+        return ProbeResult(AMBIGUOUS, f"redirecionamento inesperado ({status_code})")
+    return ProbeResult(AMBIGUOUS, f"status HTTP {status_code}")
+
+def probe_cookies(cookies: List[dict], timeout: float = PROBE_TIMEOUT) -> ProbeResult:
+    """
+    Classifica a sessão de uma lista de cookies
+    
+    Args:
+        cookies (List[dict]): Cookies no formato do Playwright
+        timeout (float): Prazo da requisição em segundos
+    
+    Returns:
+        ProbeResult: VALID, EXPIRED, MISSING ou AMBIGUOUS
+    """
+    started = time.time()
+    result = inspect_cookies(cookies)
+    
+    if result is None:
+        if requests is None:
+            result = ProbeResult(AMBIGUOUS, "requests não instalado")
+        else:
+            host = urlsplit(PROBE_URL).hostname
+            header = "; ".join(f"{cookie['name']}={cookie['value']}" for cookie in cookies
+                               if _domain_matches(host, cookie.get('domain', '')))
+            try:
+                # Com o simulador ativo a sonda consulta o simulador, não o site
+                url, extra_headers = simulated_request(PROBE_URL)
+                response = _http_session().get(url, headers=dict(extra_headers, Cookie=header),
+                                               allow_redirects=False, timeout=timeout)
+                result = classify_response(response.status_code, response.headers.get('Location', ''),
+                                           response.text, response.cookies.keys())
+            except Exception as e:
+                result = ProbeResult(AMBIGUOUS, f"falha na requisição: {e}")
+    
+    result.elapsed_ms = round((time.time() - started) * 1000)
+    return result
+
+def probe_session(path: Optional[str] = None, timeout: float = PROBE_TIMEOUT,
+                  use_cache: bool = True) -> ProbeResult:
+    """
+    Classifica a sessão salva em um arquivo
+    
+    Args:
+        path (str): storage_state ou arquivo do SessionManager (padrão: versão
+            atual do armazém de estado autenticado)
+        timeout (float): Prazo da requisição em segundos
+        use_cache (bool): Reaproveitar um resultado dos últimos PROBE_TTL segundos
+    
+    Returns:
+        ProbeResult: VALID, EXPIRED, MISSING ou AMBIGUOUS
+    """
+    path = path or get_auth_store().latest_path()
+    if path is None:
+        return ProbeResult(MISSING, "nenhum estado autenticado capturado")
+    
+    try:
+        mtime = os.path.getmtime(path)
+    except OSError:
+        return ProbeResult(MISSING, f"arquivo não encontrado: {path}")
+    
+    cached = _results.get(path)
+    if use_cache and cached and cached[0] == mtime and time.time() - cached[1] < PROBE_TTL:
+        return cached[2]
+    
+    cookies = load_cookies(path)
+    if cookies is None:
+        return ProbeResult(AMBIGUOUS, f"arquivo ilegível: {path}")
+    
+    result = probe_cookies(cookies, timeout)
+    if result.conclusive:
+        _results[path] = (mtime, time.time(), result)
+    return result
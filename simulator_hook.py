@@ -0,0 +1,94 @@
+"""
+Desvio dos Fluxos para o Simulador do AI Studio
+- AI_STUDIO_SIMULATOR=<url> desvia aistudio.google.com e accounts.google.com de
+  um contexto do Playwright (route.fetch no simulador, sem seguir redirecionamentos)
+- simulated_request() faz o mesmo para requisições HTTP fora do navegador
+- Só o gancho: os módulos de produção não importam o servidor do simulador
+"""
+
+import os
+import re
+from typing import Optional, Tuple
+from urllib.parse import urlsplit
+
+SIMULATOR_ENV = "AI_STUDIO_SIMULATOR"
+
+# Cabeçalho com o host original quando a requisição chega desviada pelo Playwright
+SIM_HOST_HEADER = "X-Sim-Host"
+
+AI_STUDIO_HOST = "aistudio.google.com"
+ACCOUNTS_HOST = "accounts.google.com"
+SIMULATED_HOSTS = (AI_STUDIO_HOST, ACCOUNTS_HOST)
+
+SIMULATED_URL_PATTERN = re.compile(r"^https://(aistudio|accounts)\.google\.com/")
+
+def simulator_url() -> Optional[str]:
+    """Endereço do simulador ativo (AI_STUDIO_SIMULATOR), ou None"""
+    return os.getenv(SIMULATOR_ENV) or None
+
+def simulated_request(url: str) -> Tuple[str, dict]:
+    """
+    URL e cabeçalhos extras para buscar uma URL real no simulador ativo
+    
+    Returns:
+        Tuple[str, dict]: A própria URL e {} quando não há simulador
+    """
+    base = simulator_url()
+    host = urlsplit(url).hostname
+    if not base or host not in SIMULATED_HOSTS:
+        return url, {}
+    return _simulator_target(base.rstrip("/"), url), {SIM_HOST_HEADER: host}
+
+def _simulator_target(base_url: str, url: str) -> str:
+    parts = urlsplit(url)
+    return base_url + parts.path + (f"?{parts.query}" if parts.query else "")
+
+def _forward_headers(headers: dict, host: str) -> dict:
+    forwarded = {name: value for name, value in headers.items()
+                 if not name.startswith(":") and name.lower() != "host"}
+    forwarded[SIM_HOST_HEADER] = host
+    return forwarded
+
+def attach_simulator(context, base_url: Optional[str] = None):
+    """
+    Desvia as URLs do AI Studio e do login do Google de um contexto síncrono
+    
+    Registrar antes da política de rotas: o Playwright executa o último
+    handler primeiro, então a política decide e as requisições permitidas
+    chegam aqui por route.fallback().
+    """
+    base_url = (base_url or simulator_url()).rstrip("/")
+    
+    def handle(route):
+        request = route.request
+        try:
+            # Sem seguir redirecionamentos: o navegador segue para a URL real
+            response = route.fetch(url=_simulator_target(base_url, request.url),
+                                   headers=_forward_headers(request.all_headers(), urlsplit(request.url).hostname),
+                                   max_redirects=0)
+            route.fulfill(response=response)
+        except Exception as e:
+            print(f"⚠️ Simulador não respondeu para {request.url}: {e}")
+            route.abort()
+    
+    context.route(SIMULATED_URL_PATTERN, handle)
+    print(f"🧪 AI Studio simulado em {base_url}")
+
+async def attach_simulator_async(context, base_url: Optional[str] = None):
+    """Equivalente de attach_simulator para contextos assíncronos"""
+    base_url = (base_url or simulator_url()).rstrip("/")
+    
+    async def handle(route):
+        request = route.request
+        try:
+            response = await route.fetch(url=_simulator_target(base_url, request.url),
+                                         headers=_forward_headers(await request.all_headers(),
+                                                                  urlsplit(request.url).hostname),
+                                         max_redirects=0)
+            await route.fulfill(response=response)
+        except Exception as e:
+            print(f"⚠️ Simulador não respondeu para {request.url}: {e}")
+            await route.abort()
+    
+    await context.route(SIMULATED_URL_PATTERN, handle)
+    print(f"🧪 AI Studio simulado em {base_url}")
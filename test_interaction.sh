@@ -118,4 +118,4 @@ echo "✅ Teste concluído!"
 echo "📁 Verifique arquivos em:"
 echo "   📸 Screenshots: /workspaces/replit/interactions/screenshots/"
 echo "   💬 Conversas: /workspaces/replit/interactions/conversations/"
-echo "   📊 Logs: /workspaces/replit/interactions/interaction_log.json"
+echo "   📊 Logs: /workspaces/replit/interactions/interaction_log*.jsonl"
@@ -0,0 +1,438 @@
+"""
+Rastreamento de Latência por Etapa
+- Spans de início/fim para cada etapa dos fluxos (navegador, navegação, login,
+  2FA, chat, envio da mensagem, primeiro token e resposta completa)
+- Mixin Traced: as classes de fluxo e todas as subclasses são instrumentadas
+  automaticamente pelo nome dos métodos (STAGE_METHODS)
+- Spans gravados em JSONL (uma linha por span, seguro entre processos)
+- Histogramas por etapa no formato de texto do Prometheus (arquivo ou endpoint)
+"""
+
+import os
+import sys
+import json
+import time
+import uuid
+import atexit
+import inspect
+import argparse
+import functools
+import threading
+import contextvars
+from contextlib import contextmanager
+from typing import Dict, Iterable, List, Optional
+
+TRACE_DIR = "/workspaces/replit/traces"
+DEFAULT_TRACE_FILE = os.path.join(TRACE_DIR, "spans.jsonl")
+DEFAULT_METRICS_FILE = os.path.join(TRACE_DIR, "metrics.prom")
+
+# Limites dos buckets dos histogramas (segundos)
+BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 20.0, 30.0, 60.0, 120.0)
+
+METRIC_PREFIX = "aistudio_stage"
+
+# Método → etapa. Os nomes cobrem as variações das várias classes de fluxo.
+STAGE_METHODS: Dict[str, str] = {
+    # Navegador
+    'initialize_browser': 'browser_init',
+    'initialize_with_profile': 'browser_init',
+    
+    # Navegação
+    'navigate_to_ai_studio': 'navigation',
+    'navigate_to_studio_home': 'navigation',
+    'navigate_to_studio': 'navigation',
+    'access_chat_directly': 'navigation',
+    
+    # Login
+    'check_if_logged_in': 'login_check',
+    'check_login_status_smart': 'login_check',
+    'check_login_result': 'login_check',
+    'start_login': 'login_form',
+    'start_login_process': 'login_form',
+    'enter_email': 'login_email',
+    'enter_password': 'login_password',
+    
+    # 2FA
+    'wait_for_2fa': 'twofa_wait',
+    'detect_and_handle_2fa': 'twofa_wait',
+    'handle_2fa': 'twofa_wait',
+    'check_2fa_needed': 'twofa_wait',
+    
+    # Chat
+    'create_new_chat': 'chat_creation',
+    'find_and_click_new_chat': 'chat_creation',
+    'try_create_new_chat': 'chat_creation',
+    'send_message': 'message_input',
+    'send_message_robust': 'message_input',
+    'wait_for_ai_response': 'response_complete',
+    'wait_for_response': 'response_complete',
+    'stream_response': 'response_complete',
+    
+    # Fluxos completos (span raiz)
+    'complete_login': 'login_flow',
+    'complete_interaction': 'interaction',
+    'interact_with_ai': 'interaction'
+}
+
+# Span registrado pelo detector de resposta quando o primeiro token aparece
+FIRST_TOKEN_STAGE = 'time_to_first_token'
+
+# Pilha de spans abertos do fluxo atual (cada thread tem a sua)
+_current_spans = contextvars.ContextVar("current_spans", default=())
+
+class Histogram:
+    """Histograma cumulativo de durações (segundos) no modelo do Prometheus"""
+    
+    def __init__(self, buckets: Iterable[float] = BUCKETS):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * len(self.buckets)
+        self.count = 0
+        self.sum = 0.0
+        self.errors = 0
+    
+    def observe(self, seconds: float, error: bool = False):
+        for index, limit in enumerate(self.buckets):
+            if seconds <= limit:
+                self.counts[index] += 1
+        self.count += 1
+        self.sum += seconds
+        if error:
+            self.errors += 1
+
+def aggregate_spans(spans: Iterable[dict], buckets: Iterable[float] = BUCKETS) -> Dict[str, Histogram]:
+    """Histogramas por etapa a partir de spans (dicts no formato do JSONL)"""
+    histograms: Dict[str, Histogram] = {}
+    for span in spans:
+        histogram = histograms.setdefault(span['name'], Histogram(buckets))
+        histogram.observe(span['duration_ms'] / 1000, span.get('status') == 'error')
+    return histograms
+
+def read_spans(path: str = DEFAULT_TRACE_FILE) -> List[dict]:
+    """Spans de um arquivo JSONL (linhas incompletas são ignoradas)"""
+    spans = []
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    spans.append(json.loads(line))
+                except ValueError:
+                    continue
+    except OSError:
+        pass
+    return spans
+
+class FileAggregate:
+    """
+    Histogramas de um JSONL de spans atualizados de forma incremental
+    
+    Cada atualização lê só o que foi acrescentado desde o último offset; o
+    arquivo inteiro só é relido se ele for trocado (outro inode) ou encolher.
+    """
+    
+    def __init__(self, path: str, buckets: Iterable[float] = BUCKETS):
+        self.path = path
+        self.buckets = tuple(buckets)
+        self.lock = threading.Lock()
+        self.histograms: Dict[str, Histogram] = {}
+        self.inode = None
+        self.offset = 0
+    
+    def update(self) -> Dict[str, Histogram]:
+        """Agrega as linhas novas e retorna os histogramas (cópia rasa)"""
+        with self.lock:
+            try:
+                with open(self.path, 'rb') as f:
+                    stat = os.fstat(f.fileno())
+                    if stat.st_ino != self.inode or stat.st_size < self.offset:
+                        self.histograms = {}
+                        self.inode = stat.st_ino
+                        self.offset = 0
+                    f.seek(self.offset)
+                    data = f.read(stat.st_size - self.offset)
+            except OSError:
+                return dict(self.histograms)
+            
+            # Linha ainda sendo gravada fica para a próxima atualização
+            complete = data.rfind(b"\n") + 1
+            self.offset += complete
+            for line in data[:complete].splitlines():
+                try:
+                    span = json.loads(line)
+                except ValueError:
+                    continue
+                histogram = self.histograms.setdefault(span['name'], Histogram(self.buckets))
+                histogram.observe(span['duration_ms'] / 1000, span.get('status') == 'error')
+            return dict(self.histograms)
+
+def prometheus_text(histograms: Dict[str, Histogram]) -> str:
+    """Formato de texto do Prometheus (histograma de duração e erros por etapa)"""
+    lines = [
+        f"# HELP {METRIC_PREFIX}_duration_seconds Duração de cada etapa do fluxo do AI Studio",
+        f"# TYPE {METRIC_PREFIX}_duration_seconds histogram"
+    ]
+    for stage in sorted(histograms):
+        histogram = histograms[stage]
+        for limit, count in zip(histogram.buckets, histogram.counts):
+            lines.append(f'{METRIC_PREFIX}_duration_seconds_bucket{{stage="{stage}",le="{limit:g}"}} {count}')
+        lines.append(f'{METRIC_PREFIX}_duration_seconds_bucket{{stage="{stage}",le="+Inf"}} {histogram.count}')
+        lines.append(f'{METRIC_PREFIX}_duration_seconds_sum{{stage="{stage}"}} {histogram.sum:.6f}')
+        lines.append(f'{METRIC_PREFIX}_duration_seconds_count{{stage="{stage}"}} {histogram.count}')
+    
+    lines.append(f"# HELP {METRIC_PREFIX}_errors_total Etapas que terminaram com exceção")
+    lines.append(f"# TYPE {METRIC_PREFIX}_errors_total counter")
+    for stage in sorted(histograms):
+        lines.append(f'{METRIC_PREFIX}_errors_total{{stage="{stage}"}} {histograms[stage].errors}')
+    return "\n".join(lines) + "\n"
+
+class Tracer:
+    """Registra spans no JSONL e mantém os histogramas do processo"""
+    
+    def __init__(self, trace_file: str = DEFAULT_TRACE_FILE, metrics_file: str = DEFAULT_METRICS_FILE,
+                 enabled: bool = True):
+        """
+        Inicializa o rastreador
+        
+        Args:
+            trace_file (str): JSONL de saída (acrescentado, nunca truncado)
+            metrics_file (str): Arquivo .prom gravado por write_prometheus()
+            enabled (bool): False desliga a gravação (os spans viram no-op)
+        """
+        self.trace_file = trace_file
+        self.metrics_file = metrics_file
+        self.enabled = enabled
+        self.lock = threading.Lock()
+        self.histograms: Dict[str, Histogram] = {}
+        self.file_aggregate = FileAggregate(trace_file)
+        self._file = None
+    
+    def _write(self, span: dict):
+        """Uma linha por span; O_APPEND mantém as linhas inteiras entre processos"""
+        line = json.dumps(span, ensure_ascii=False, default=str) + "\n"
+        with self.lock:
+            histogram = self.histograms.setdefault(span['name'], Histogram())
+            histogram.observe(span['duration_ms'] / 1000, span['status'] == 'error')
+            try:
+                if self._file is None:
+                    os.makedirs(os.path.dirname(self.trace_file) or ".", exist_ok=True)
+                    self._file = open(self.trace_file, 'a', encoding='utf-8', buffering=1)
+                self._file.write(line)
+            except OSError as e:
+                print(f"⚠️ Erro ao gravar span: {e}")
+    
+    def current(self) -> Optional[dict]:
+        """Span aberto mais interno do fluxo atual"""
+        stack = _current_spans.get()
+        return stack[-1] if stack else None
+    
+    @contextmanager
+    def span(self, name: str, **attrs):
+        """
+        Mede um bloco como span (filho do span aberto no momento)
+        
+        Args:
+            name (str): Etapa
+            **attrs: Atributos gravados com o span
+        
+        Yields:
+            dict: Span em andamento (attrs pode ser completado dentro do bloco)
+        """
+        if not self.enabled:
+            yield {'attrs': attrs}
+            return
+        
+        parent = self.current()
+        span = {
+            'name': name,
+            'trace_id': parent['trace_id'] if parent else uuid.uuid4().hex[:16],
+            'span_id': uuid.uuid4().hex[:16],
+            'parent_id': parent['span_id'] if parent else None,
+            'start': time.time(),
+            'status': 'ok',
+            'attrs': attrs
+        }
+        token = _current_spans.set(_current_spans.get() + (span,))
+        started = time.perf_counter()
+        try:
+            yield span
+        except BaseException as e:
+            if not isinstance(e, GeneratorExit):
+                span['status'] = 'error'
+                span['attrs']['error'] = str(e)[:200]
+            raise
+        finally:
+            _current_spans.reset(token)
+            span['duration_ms'] = round((time.perf_counter() - started) * 1000, 1)
+            span['end'] = span['start'] + span['duration_ms'] / 1000
+            span['pid'] = os.getpid()
+            self._write(span)
+    
+    def record(self, name: str, duration_ms: float, status: str = 'ok',
+               parent: Optional[dict] = None, **attrs):
+        """
+        Registra um span medido por outro mecanismo (ex.: primeiro token na página)
+        
+        O span termina agora e começa duration_ms antes.
+        
+        Args:
+            parent (dict): Span pai capturado antes (callbacks da página podem
+                rodar fora do contexto do fluxo); padrão: o span aberto agora
+        """
+        if not self.enabled:
+            return
+        parent = parent or self.current()
+        now = time.time()
+        self._write({
+            'name': name,
+            'trace_id': parent['trace_id'] if parent else uuid.uuid4().hex[:16],
+            'span_id': uuid.uuid4().hex[:16],
+            'parent_id': parent['span_id'] if parent else None,
+            'start': now - duration_ms / 1000,
+            'end': now,
+            'duration_ms': round(duration_ms, 1),
+            'status': status,
+            'attrs': attrs,
+            'pid': os.getpid()
+        })
+    
+    def prometheus(self, from_file: bool = True) -> str:
+        """
+        Métricas no formato de texto do Prometheus
+        
+        Args:
+            from_file (bool): Agregar o JSONL inteiro (inclui outros processos,
+                lendo só as linhas novas desde a última chamada); False usa só
+                os spans deste processo
+        """
+        if from_file:
+            return prometheus_text(self.file_aggregate.update())
+        with self.lock:
+            return prometheus_text(self.histograms)
+    
+    def write_prometheus(self, path: Optional[str] = None, from_file: bool = True) -> str:
+        """Grava as métricas de forma atômica (para o textfile collector)"""
+        path = path or self.metrics_file
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        temp_path = f"{path}.{os.getpid()}.tmp"
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            f.write(self.prometheus(from_file))
+        os.replace(temp_path, path)
+        return path
+    
+    def print_report(self):
+        """Resumo das etapas deste processo"""
+        with self.lock:
+            histograms = dict(self.histograms)
+        if not histograms:
+            return
+        
+        print("\n⏱️ LATÊNCIA POR ETAPA")
+        print("=" * 40)
+        for stage, histogram in sorted(histograms.items(), key=lambda item: -item[1].sum):
+            average = histogram.sum / histogram.count
+            errors = f" ❌ {histogram.errors}" if histogram.errors else ""
+            print(f"   {stage:20s} {histogram.count:3d}x  média {average:6.2f}s  total {histogram.sum:7.2f}s{errors}")
+    
+    def close(self):
+        with self.lock:
+            if self._file:
+                self._file.close()
+                self._file = None
+
+def traced(stage: str):
+    """
+    Decorator que mede o método como span da etapa
+    
+    Se o span aberto no momento já é da mesma etapa (ex.: subclasse chamando
+    super()), a chamada interna não abre outro span nem conta em dobro.
+    Geradores são medidos do início ao fim da iteração.
+    """
+    def decorator(method):
+        def should_trace(tracer: Tracer) -> bool:
+            current = tracer.current()
+            return tracer.enabled and not (current and current['name'] == stage)
+        
+        def span_for(tracer: Tracer, self):
+            return tracer.span(stage, method=f"{type(self).__name__}.{method.__name__}")
+        
+        if inspect.isgeneratorfunction(method):
+            @functools.wraps(method)
+            def generator_wrapper(self, *args, **kwargs):
+                tracer = get_tracer()
+                if not should_trace(tracer):
+                    yield from method(self, *args, **kwargs)
+                    return
+                with span_for(tracer, self):
+                    yield from method(self, *args, **kwargs)
+            wrapper = generator_wrapper
+        else:
+            @functools.wraps(method)
+            def wrapper(self, *args, **kwargs):
+                tracer = get_tracer()
+                if not should_trace(tracer):
+                    return method(self, *args, **kwargs)
+                with span_for(tracer, self) as span:
+                    result = method(self, *args, **kwargs)
+                    # Os fluxos sinalizam falha retornando False em vez de exceção
+                    if result is False:
+                        span['attrs']['result'] = False
+                    return result
+        
+        wrapper.__traced__ = stage
+        return wrapper
+    return decorator
+
+def instrument_class(cls, stages: Dict[str, str] = STAGE_METHODS):
+    """Envolve os métodos de etapa definidos na própria classe"""
+    for name, stage in stages.items():
+        method = cls.__dict__.get(name)
+        if callable(method) and not hasattr(method, '__traced__'):
+            setattr(cls, name, traced(stage)(method))
+    return cls
+
+class Traced:
+    """Mixin: a classe e todas as subclasses têm os métodos de etapa medidos"""
+    
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        instrument_class(cls)
+
+_tracer = None
+_tracer_lock = threading.Lock()
+
+def _flush_at_exit():
+    if _tracer and _tracer.histograms:
+        try:
+            _tracer.write_prometheus()
+        except OSError:
+            pass
+        _tracer.close()
+
+def get_tracer() -> Tracer:
+    """Rastreador do processo (TRACING=off desliga; TRACE_FILE e METRICS_FILE mudam os arquivos)"""
+    global _tracer
+    with _tracer_lock:
+        if _tracer is None:
+            _tracer = Tracer(os.getenv("TRACE_FILE", DEFAULT_TRACE_FILE),
+                             os.getenv("METRICS_FILE", DEFAULT_METRICS_FILE),
+                             enabled=os.getenv("TRACING", "on").lower() != "off")
+            atexit.register(_flush_at_exit)
+        return _tracer
+
+def main():
+    """Gera as métricas do Prometheus a partir de um JSONL de spans"""
+    parser = argparse.ArgumentParser(description="Exporta histogramas de latência por etapa")
+    parser.add_argument("--spans", default=os.getenv("TRACE_FILE", DEFAULT_TRACE_FILE),
+                        help="JSONL de spans")
+    parser.add_argument("-o", "--output", default=os.getenv("METRICS_FILE", DEFAULT_METRICS_FILE),
+                        help="Arquivo .prom de saída ('-' para a saída padrão)")
+    args = parser.parse_args()
+    
+    text = prometheus_text(aggregate_spans(read_spans(args.spans)))
+    if args.output == "-":
+        sys.stdout.write(text)
+    else:
+        tracer = Tracer(args.spans)
+        print(f"📈 Métricas gravadas em {tracer.write_prometheus(args.output)}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,245 @@
+"""
+Esperas por Condição com Prazos por Etapa
+- wait_until(): verifica uma condição até ela ser verdadeira ou o prazo acabar
+- Orçamentos de cada etapa declarados em um único lugar (STEP_BUDGETS)
+- Relatório do tempo realmente gasto esperando em comparação com o orçamento
+"""
+
+import time
+from typing import Any, Callable, Dict, Optional, Sequence
+
+try:
+    from playwright.sync_api import TimeoutError as PlaywrightTimeoutError
+except ImportError:
+    PlaywrightTimeoutError = TimeoutError
+
+from selector_engine import race_selectors
+
+# Prazo máximo (segundos) de cada etapa. As esperas terminam assim que a
+# condição é satisfeita; o orçamento só é consumido inteiro em caso de falha.
+STEP_BUDGETS: Dict[str, float] = {
+    # Navegação
+    'page_load': 15.0,         # goto até o DOM estar pronto
+    'page_settle': 5.0,        # evento load após goto/clique
+    'url_change': 10.0,        # redirecionamento após clique ou envio
+    'element': 10.0,           # elemento esperado aparecer
+    'app_ready': 15.0,         # sinal do app após goto (chat, welcome, login)
+    
+    # Login Google
+    'email_field': 10.0,       # campo de email visível
+    'email_step': 10.0,        # da página de email até o campo de senha
+    'password_field': 15.0,    # campo de senha visível
+    'password_step': 15.0,     # do envio da senha até sair da página de senha
+    'account_select': 10.0,    # depois de escolher a conta
+    'twofa_detect': 5.0,       # tela de 2FA aparecer
+    'twofa_manual': 120.0,     # usuário aprovar o 2FA
+    'manual_login': 60.0,      # usuário concluir o login manualmente
+    
+    # Interface do AI Studio
+    'ui_settle': 2.0,          # animações/menus depois de um clique
+    'chat_ready': 10.0,        # campo de mensagem disponível
+    'chat_probe': 5.0,         # procurar o campo em uma URL candidata
+    'send': 5.0,               # mensagem sair do campo após envio
+    'response': 90.0           # resposta completa do modelo
+}
+
+DEFAULT_INTERVAL = 0.1
+
+class WaitReport:
+    """Acumula o tempo de espera por etapa durante a execução"""
+    
+    def __init__(self):
+        self.steps: Dict[str, dict] = {}
+    
+    def record(self, step: str, waited: float, budget: float, satisfied: bool):
+        """Registra uma espera concluída"""
+        stats = self.steps.setdefault(step, {
+            'count': 0,
+            'waited': 0.0,
+            'budget': 0.0,
+            'max_waited': 0.0,
+            'timeouts': 0
+        })
+        stats['count'] += 1
+        stats['waited'] += waited
+        stats['budget'] += budget
+        stats['max_waited'] = max(stats['max_waited'], waited)
+        if not satisfied:
+            stats['timeouts'] += 1
+    
+    def summary(self) -> dict:
+        """Totais gerais e por etapa"""
+        waited = sum(stats['waited'] for stats in self.steps.values())
+        budget = sum(stats['budget'] for stats in self.steps.values())
+        return {
+            'waited': round(waited, 2),
+            'budget': round(budget, 2),
+            'saved': round(budget - waited, 2),
+            'steps': {
+                step: dict(stats, waited=round(stats['waited'], 2), budget=round(stats['budget'], 2),
+                           max_waited=round(stats['max_waited'], 2))
+                for step, stats in self.steps.items()
+            }
+        }
+    
+    def print_report(self):
+        """Imprime o relatório de esperas"""
+        summary = self.summary()
+        print("\n⏱️ RELATÓRIO DE ESPERAS")
+        print("=" * 40)
+        for step, stats in sorted(summary['steps'].items(), key=lambda item: -item[1]['waited']):
+            timeouts = f" ⚠️ {stats['timeouts']} prazo(s) esgotado(s)" if stats['timeouts'] else ""
+            print(f"   {step}: {stats['waited']}s de {stats['budget']}s "
+                  f"em {stats['count']} espera(s){timeouts}")
+        print(f"   Total: {summary['waited']}s esperando (orçamento {summary['budget']}s)")
+    
+    def reset(self):
+        self.steps = {}
+
+_report = WaitReport()
+
+def get_wait_report() -> WaitReport:
+    """Relatório compartilhado do processo"""
+    return _report
+
+def budget_for(step: str, timeout: Optional[float] = None) -> float:
+    """Prazo da etapa em segundos (timeout explícito tem prioridade)"""
+    if timeout is not None:
+        return timeout
+    return STEP_BUDGETS.get(step, 10.0)
+
+def _sleep(page, seconds: float):
+    """Pausa curta; com página, usa wait_for_timeout para processar eventos do Playwright"""
+    if page is not None:
+        try:
+            page.wait_for_timeout(seconds * 1000)
+            return
+        except Exception:
+            pass
+    time.sleep(seconds)
+
+def wait_until(condition: Callable[[], Any], step: str, timeout: Optional[float] = None,
+               interval: float = DEFAULT_INTERVAL, page=None) -> Any:
+    """
+    Aguarda a condição ser verdadeira
+    
+    Exceções da condição contam como "ainda não" (ex.: página navegando).
+    
+    Args:
+        condition (Callable): Função sem argumentos; o retorno verdadeiro encerra a espera
+        step (str): Nome da etapa em STEP_BUDGETS
+        timeout (float): Prazo em segundos (padrão: orçamento da etapa)
+        interval (float): Intervalo entre verificações em segundos
+        page: Página do Playwright, para pausar sem bloquear os eventos
+    
+    Returns:
+        Any: Último valor da condição, ou None se o prazo esgotou
+    """
+    budget = budget_for(step, timeout)
+    started = time.time()
+    deadline = started + budget
+    
+    while True:
+        try:
+            result = condition()
+        except Exception:
+            result = None
+        
+        if result:
+            _report.record(step, time.time() - started, budget, True)
+            return result
+        
+        remaining = deadline - time.time()
+        if remaining <= 0:
+            _report.record(step, time.time() - started, budget, False)
+            return None
+        
+        _sleep(page, min(interval, remaining))
+
+def wait_for_page_ready(page, step: str = 'page_settle', timeout: Optional[float] = None) -> bool:
+    """
+    Aguarda a página terminar de carregar após goto/clique
+    
+    Substitui o time.sleep fixo depois de navegações: espera o evento load.
+    Não espera rede ociosa: as páginas do Google mantêm conexões abertas e
+    quase nunca ficam ociosas; quem precisa de um elemento espera por ele.
+    
+    Returns:
+        bool: True se a página ficou pronta dentro do prazo
+    """
+    budget = budget_for(step, timeout)
+    started = time.time()
+    ready = False
+    
+    try:
+        page.wait_for_load_state('load', timeout=budget * 1000)
+        ready = True
+    except PlaywrightTimeoutError:
+        pass
+    except Exception:
+        pass
+    
+    _report.record(step, time.time() - started, budget, ready)
+    return ready
+
+def wait_for_url(page, predicate: Callable[[str], bool], step: str = 'url_change',
+                 timeout: Optional[float] = None) -> Optional[str]:
+    """
+    Aguarda a URL satisfazer o predicado
+    
+    Returns:
+        Optional[str]: URL final, ou None se o prazo esgotou
+    """
+    return wait_until(lambda: page.url if predicate(page.url) else None, step, timeout, page=page)
+
+def wait_for_url_change(page, previous_url: str, step: str = 'url_change',
+                        timeout: Optional[float] = None) -> Optional[str]:
+    """Aguarda a URL sair de previous_url"""
+    return wait_for_url(page, lambda url: url != previous_url, step, timeout)
+
+def wait_for_login_exit(page, step: str = 'manual_login', timeout: Optional[float] = None) -> bool:
+    """Aguarda a página sair de accounts.google.com (login ou 2FA concluído)"""
+    return bool(wait_for_url(page, lambda url: "accounts.google.com" not in url, step, timeout))
+
+def wait_for_any(page, selectors: Sequence[str], step: str = 'element',
+                 timeout: Optional[float] = None) -> Optional[str]:
+    """
+    Aguarda algum dos seletores ficar visível (corrida dentro da página)
+    
+    Returns:
+        Optional[str]: Primeiro seletor visível, ou None
+    """
+    budget = budget_for(step, timeout)
+    started = time.time()
+    selector = race_selectors(page, selectors, timeout=int(budget * 1000))
+    _report.record(step, time.time() - started, budget, selector is not None)
+    return selector
+
+def settle(page, step: str = 'ui_settle', timeout: Optional[float] = None) -> bool:
+    """
+    Aguarda o DOM parar de mudar (fim de animações e renderizações)
+    
+    Returns:
+        bool: True se o DOM ficou estável dentro do prazo
+    """
+    budget = budget_for(step, timeout)
+    started = time.time()
+    stable = False
+    
+    try:
+        page.wait_for_function("""
+            () => new Promise((resolve) => {
+                let timer = setTimeout(() => { observer.disconnect(); resolve(true); }, 300);
+                const observer = new MutationObserver(() => {
+                    clearTimeout(timer);
+                    timer = setTimeout(() => { observer.disconnect(); resolve(true); }, 300);
+                });
+                observer.observe(document.body, { childList: true, subtree: true, attributes: true });
+            })
+        """, timeout=budget * 1000)
+        stable = True
+    except Exception:
+        pass
+    
+    _report.record(step, time.time() - started, budget, stable)
+    return stable